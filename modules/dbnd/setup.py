@@ -71,6 +71,8 @@ setuptools.setup(
         ],
         "test-spark2": ["pytest-spark==0.6.0", 'pyspark==2.4.4;python_version<"3.8"'],
         "test-spark3": ["pytest-spark==0.6.0", 'pyspark==3.3.1;python_version>="3.8"'],
+        # streaming of dbt manifest (use_float) at collect_data_from_dbt_core
+        "dbt": ["ijson>=3.1"],
         "jupyter": [
             "qtconsole==4.7.7",
             "nbconvert",
@@ -38,6 +38,35 @@ def wait(timeout):
         logger.info("Tracker is ready.")
 
 
+@tracker.command(help="Send the tracking calls kept in the async-web tracking spool")
+@click.option(
+    "--spool-dir",
+    default=None,
+    help="Spool directory to replay, by default core.tracker_async_spool_dir is used",
+)
+def replay(spool_dir):
+    from dbnd._core.tracking.backends.channels.tracking_spool import (
+        build_tracking_spool,
+    )
+    from dbnd._core.tracking.backends.channels.tracking_web_channel import (
+        TrackingWebChannel,
+    )
+
+    dbnd_bootstrap()
+    with new_dbnd_context(name="new_context") as dbnd_ctx:
+        spool = build_tracking_spool(dbnd_ctx.settings.core, force=True)
+        if spool_dir:
+            spool.spool_dir = spool_dir
+        web_channel = TrackingWebChannel(dbnd_ctx.databand_api_client)
+        logger.info("Replaying tracking calls from %s", spool.spool_dir)
+        try:
+            replayed = spool.replay(web_channel._handle)
+        except Exception:
+            logger.exception("Failed to replay the tracking spool")
+            sys.exit(1)
+        logger.info("Replayed %s tracking calls.", replayed)
+
+
 def _wait_for_tracking_store(dbnd_ctx, wait_timeout):
     try:
         with timeout(wait_timeout, handler=lambda *args: None):
@@ -6,7 +6,7 @@ import logging
 import os
 import typing
 
-from typing import Any, List, Mapping, Optional, Union
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
 
 import attr
 
@@ -39,6 +39,8 @@ if typing.TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+ConfigValueStack = Tuple[Tuple[int, ConfigValue], ...]
+
 
 @attr.s(str=False)
 class _ConfigLayer(object):
@@ -51,6 +53,16 @@ class _ConfigLayer(object):
     layer_config = attr.ib()  # type: _TConfigStore
     parent = attr.ib(default=None)  # type: Optional[_ConfigLayer]
 
+    def __attrs_post_init__(self):
+        self.depth = self.parent.depth + 1 if self.parent else 0
+
+        # layers are never changed after creation (a change of config is a new layer),
+        # so lookups through all the layers are calculated once per layer and shared with child layers
+        # (section, key) -> ((layer depth, value), ...) from this layer to the root layer
+        self._config_value_stacks = {}  # type: Dict[Tuple[str, str], ConfigValueStack]
+        # (sections, key) -> folded values, see DbndConfig.get_multisection_config_value
+        self._multisection_values = {}  # type: Dict[Tuple, Tuple[ConfigValue, ...]]
+
     def get_config_value(self, section, key):
         # type: (str, str)->Optional[ConfigValue]
         section = self.config.get(_lower_config_name(section))
@@ -58,6 +70,60 @@ class _ConfigLayer(object):
             return None
         return section.get(_lower_config_name(key))
 
+    def get_config_value_stack(self, section, key):
+        # type: (str, str) -> ConfigValueStack
+        """
+        All the "raw" values of section.key defined by this layer and its parents (from child to parent),
+        every value comes with the depth of its layer
+        """
+        stack_key = (_lower_config_name(section), _lower_config_name(key))
+
+        # find the closest layer that already knows the stack
+        missing_layers = []
+        layer = self
+        stack = ()
+        while layer:
+            cached_stack = layer._config_value_stacks.get(stack_key)
+            if cached_stack is not None:
+                stack = cached_stack
+                break
+            missing_layers.append(layer)
+            layer = layer.parent
+
+        # and fill it for every layer from the parent to the child
+        for layer in reversed(missing_layers):
+            config_value = layer.layer_config.get_config_value(*stack_key)
+            if config_value:
+                stack = ((layer.depth, config_value),) + stack
+            layer._config_value_stacks[stack_key] = stack
+        return stack
+
+    def get_multisection_config_value(self, sections, key):
+        # type: (Tuple[str, ...], str) -> Tuple[ConfigValue, ...]
+        """
+        Values of the key from all the sections folded by their priority,
+        layer by layer from child to parent, and section by section inside every layer
+        """
+        cache_key = (sections, key)
+        folded = self._multisection_values.get(cache_key)
+        if folded is not None:
+            return folded
+
+        values = [
+            (-depth, section_index, config_value)
+            for section_index, section in enumerate(sections)
+            for depth, config_value in self.get_config_value_stack(section, key)
+        ]
+        values.sort(key=lambda v: v[:2])
+
+        config_value_stack = []
+        for _, _, config_value in values:
+            config_value_stack = fold_config_value(
+                stack=config_value_stack, lower=config_value
+            )
+        folded = self._multisection_values[cache_key] = tuple(config_value_stack)
+        return folded
+
     def merge_and_create_new_layer(
         self,
         name,  # type: str
@@ -190,23 +256,14 @@ class DbndConfig(object):
                 return [config_value]
             return []
 
-        config_value_stack = []
-        layer = self.config_layer  # type: _ConfigLayer
         # start to go from "child layers to parent"
         # section by section
         # Example:  ... -> layer.cmdline[MyTask] -> layer.cmdline[Task] -> layer.config[MyTask] -> ...
-        while layer:
-            for section in sections:
-                # look for the value with highest priority
-                # we are using "row" values from "delta"
-                # we need to take care of priorities
-                config_value = layer.layer_config.get_config_value(section, key)
-                if config_value:
-                    config_value_stack = fold_config_value(
-                        stack=config_value_stack, lower=config_value
-                    )
-            layer = layer.parent  # type: _ConfigLayer
-        return config_value_stack
+        # we are using "raw" values from "delta" and take care of priorities,
+        # the result is memoized by the layer
+        return list(
+            self.config_layer.get_multisection_config_value(tuple(sections), key)
+        )
 
     def get(self, section, key, default=None, expand_env=True):
 
@@ -64,6 +64,15 @@ def failed_to_save_value__wrong_type(value, target, expected_type):
     )
 
 
+def marshaller_chunks_read_not_supported(marshaller, target):
+    return DatabandRuntimeError(
+        "Can not read {target} in chunks, {marshaller} doesn't support chunks read".format(
+            target=target, marshaller=marshaller.__class__.__name__
+        ),
+        help_msg="Use a format that can be read in chunks, for example csv",
+    )
+
+
 def target_must_be_local_for_tensorflow_marshalling(target):
     return DatabandRuntimeError(
         "Can not read value of tensorflow model in path {path}! Path must be local!".format(
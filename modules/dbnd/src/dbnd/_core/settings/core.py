@@ -99,6 +99,70 @@ class CoreConfig(Config):
         description="Set maximum amount of retries allowed for a single tracking store call if it fails.",
     )[int]
 
+    tracker_async_batching = parameter(
+        default=False,
+        description="Enable merging of consecutive async-web tracking calls to the same endpoint "
+        "(log_metrics, log_targets, log_datasets, save_external_links) into a single request.",
+    )[bool]
+
+    tracker_async_batch_max_items = parameter(
+        default=100,
+        description="Set maximum amount of async-web tracking calls merged into a single request.",
+    )[int]
+
+    tracker_async_batch_linger = parameter(
+        default=0.1,
+        description="Set the amount of seconds the async-web tracking worker waits for more calls "
+        "before sending a partial batch.",
+    )[float]
+
+    tracker_async_max_queue_items = parameter(
+        default=0,
+        description="Set maximum amount of pending async-web tracking calls, 0 means unlimited.",
+    )[int]
+
+    tracker_async_max_queue_bytes = parameter(
+        default=0,
+        description="Set maximum total size in bytes of pending async-web tracking calls, "
+        "0 means unlimited.",
+    )[int]
+
+    tracker_async_queue_overflow_policy = parameter(
+        default="block",
+        description="Set the behaviour when the async-web tracking queue is full: "
+        "block, drop-oldest or drop-low-priority. State calls are never dropped.",
+    )[str]
+
+    tracker_async_senders = parameter(
+        default=1,
+        description="Set the amount of threads sending async-web tracking calls concurrently. "
+        "State calls are always sent in order, after all the calls preceding them.",
+    )[int]
+
+    tracker_async_spool = parameter(
+        default=False,
+        description="Enable keeping async-web tracking calls that were not sent to the webserver "
+        "in an on-disk spool, so they can be replayed later with `dbnd tracker replay`.",
+    )[bool]
+
+    tracker_async_spool_dir = parameter(
+        default=None,
+        description="Set the directory of the async-web tracking spool, "
+        "by default it's `tracking_spool` under the dbnd system directory.",
+    )[str]
+
+    tracker_async_spool_flush_timeout = parameter(
+        default=None,
+        description="Set the amount of seconds to wait for pending async-web tracking calls on exit "
+        "when the spool is enabled, the calls that were not sent by then are spooled.",
+    )[float]
+
+    tracker_async_spool_replay = parameter(
+        default=False,
+        description="Enable replaying the spooled async-web tracking calls in the background "
+        "when a new tracking process starts.",
+    )[bool]
+
     client_session_timeout = parameter(
         description="Set number of minutes to recreate the api client's session.",
         default=5,
@@ -9,13 +9,14 @@ import attr
 
 from dbnd._core.parameter import PARAMETER_FACTORY as parameter
 from dbnd._core.task import Config
-from targets import Target
+from targets import DataTarget, Target
 from targets.value_meta import _DEFAULT_VALUE_PREVIEW_MAX_LEN, ValueMeta, ValueMetaConf
 from targets.values import (
     ObjectValueType,
     TargetValueType,
     ValueType,
     get_value_type_of_obj,
+    get_value_type_of_type,
 )
 
 
@@ -89,6 +90,49 @@ class TrackingConfig(Config):
         description="Enable calculation and tracking of histograms. This can be expensive.",
     )[bool]
 
+    log_value_stats_sample_size = parameter(
+        default=None,
+        description="Calculate the value's stats and histograms on a sample of the rows: "
+        "an amount of rows (>= 1) or a fraction of them (< 1). "
+        "Sampled stats and histograms are approximate, the sample is reported at the histogram system metrics.",
+    )[float]
+
+    log_value_stats_sample_seed = parameter(
+        default=None,
+        description="Set the random seed of the stats sample, the same seed produces the same sample.",
+    )[int]
+
+    log_value_stats_exact_counts = parameter(
+        default=False,
+        description="Calculate the counts, mean, std, min, max and distinct count of sampled stats on all the rows. "
+        "The results are more accurate, but every row of the value is scanned.",
+    )[bool]
+
+    log_histograms_parallelism = parameter(
+        default=1,
+        description="Set the amount of threads calculating histograms of different columns. "
+        "Use 0 for the amount of CPUs.",
+    )[int]
+
+    log_value_hash_max_bytes = parameter(
+        default=None,
+        description="Hash only sampled blocks of the value's columns that are larger than this amount of bytes. "
+        "This makes the data hash of huge values much faster, but changes outside of the sampled blocks are not detected.",
+    )[int]
+
+    log_value_spark_cache = parameter(
+        default=False,
+        description="Enable caching of Spark DataFrames between the stats and the histograms calculations. "
+        "This saves reading the data twice, but requires enough memory of the executors.",
+    )[bool]
+
+    log_value_read_chunksize = parameter(
+        default=None,
+        description="Calculate the meta of logged file targets with pandas formats that support chunked reads "
+        "(csv) by reading them in chunks of this amount of rows, so files larger than the memory can be profiled. "
+        "Stats and histograms of files larger than the stats sample are approximate.",
+    )[int]
+
     value_reporting_strategy = parameter(
         default=ValueTrackingLevel.SMART,
         description="Set the strategy used for the reporting of values. There are multiple strategies, "
@@ -142,6 +186,12 @@ class TrackingConfig(Config):
             log_preview=self.log_value_preview,
             log_stats=self.log_value_stats,
             log_histograms=self.log_histograms,
+            log_stats_sample_size=self.log_value_stats_sample_size,
+            log_stats_sample_seed=self.log_value_stats_sample_seed,
+            log_stats_exact_counts=self.log_value_stats_exact_counts,
+            log_histograms_parallelism=self.log_histograms_parallelism,
+            log_data_hash_max_bytes=self.log_value_hash_max_bytes,
+            log_spark_cache=self.log_value_spark_cache,
         )
 
 
@@ -173,10 +223,30 @@ def get_value_meta(value, meta_conf, tracking_config, value_type=None, target=No
         # also Targets are futures types and now would can log their actual value
         value_type = get_value_type_of_obj(value, default_value_type=ObjectValueType())
 
+    if (
+        tracking_config.log_value_read_chunksize
+        and isinstance(value_type, TargetValueType)
+        and isinstance(value, DataTarget)
+        and hasattr(value, "as_pandas")
+        and value.as_pandas.support_chunks_read()
+    ):
+        return _get_target_value_meta_from_chunks(value, meta_conf, tracking_config)
+
     meta_conf = tracking_config.get_value_meta_conf(meta_conf, value_type, target)
     return value_type.get_value_meta(value, meta_conf=meta_conf)
 
 
+def _get_target_value_meta_from_chunks(target, meta_conf, tracking_config):
+    # type: (DataTarget, ValueMetaConf, TrackingConfig) -> ValueMeta
+    """
+    Build the value meta of the data frame stored at the target, reading it chunk by chunk
+    """
+    value_type = get_value_type_of_type("DataFrame").load_value_type()
+    meta_conf = tracking_config.get_value_meta_conf(meta_conf, value_type, target)
+    chunks = target.as_pandas.read_chunks(tracking_config.log_value_read_chunksize)
+    return value_type.get_value_meta_from_chunks(chunks, meta_conf=meta_conf)
+
+
 def calc_meta_conf_for_value_type(tracking_level, value_type, target=None):
     # type: (ValueTrackingLevel, ValueType, Optional[Target]) -> ValueMetaConf
     """
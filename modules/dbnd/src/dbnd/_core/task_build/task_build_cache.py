@@ -0,0 +1,228 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+"""
+Persistent cache of resolved task parameters
+============================================
+Resolving the parameters of a task walks all config layers for every parameter and every task section,
+every process that builds a DAG (a submitted task, a pod, a scheduler) repeats it for the same tasks.
+
+TaskBuildCache keeps the resolved values (as strings) of every task in a content-addressed folder:
+the entry of the task is a json file named by the hash of
+  * the task definition (family, name, parameters and their defaults, code hash if tracked)
+  * the config that is visible to the task (signature of all config layers) and its config sections
+  * the constructor values, children scope values of the parent task and task_env signature
+
+Only tasks with "simple" values are cached - every value has to be parsed back from its string
+into a value with the same signature. Tasks, objects, values with environment variables,
+"@" values (loaded from files or python) are never cached.
+Relative values ("today", "now", "git", ...) are not stored, they are resolved again on every build.
+
+Enabled by [task_build]persistent_cache, the location is [task_build]persistent_cache_dir
+(DBND_SYSTEM/task_build_cache by default).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import typing
+
+from enum import Enum
+
+import six
+
+from dbnd._core.configuration.environ_config import get_dbnd_project_config
+from dbnd._core.constants import _TaskParamContainer
+from dbnd._core.utils import json_utils
+from dbnd._core.utils.basics.nothing import NOTHING
+from targets.values.datetime_value import DateAlias
+from targets.values.version_value import VersionAlias
+
+
+if typing.TYPE_CHECKING:
+    from typing import Any, Dict, Optional
+
+    from dbnd._core.configuration.dbnd_config import _ConfigLayer
+    from dbnd._core.parameter.parameter_definition import ParameterDefinition
+    from dbnd._core.parameter.parameter_value import ParameterValue
+
+logger = logging.getLogger(__name__)
+
+TASK_BUILD_CACHE_VERSION = 1
+
+_SIMPLE_TYPES = six.string_types + six.integer_types + (float, bool, type(None))
+_CONFIG_LAYER_SIGNATURE_ATTR = "_task_build_cache_signature"
+# values that are resolved by the clock or by the current context/project,
+# the same string is a different value at another time or process
+_RELATIVE_VALUE_ALIASES = {
+    DateAlias.now,
+    DateAlias.today,
+    DateAlias.yesterday,
+    "tomorrow",
+    VersionAlias.context_uid,
+    VersionAlias.git,
+}
+
+
+def _hash(value):
+    return hashlib.md5(value.encode("utf-8")).hexdigest()  # nosec B324
+
+
+def config_layer_signature(config_layer):
+    # type: (_ConfigLayer) -> str
+    """
+    Signature of all values visible at the layer (including its parents).
+    Layers are never changed after creation, so the signature is calculated once per layer.
+    """
+    signature = getattr(config_layer, _CONFIG_LAYER_SIGNATURE_ATTR, None)
+    if signature:
+        return signature
+
+    parent_signature = (
+        config_layer_signature(config_layer.parent) if config_layer.parent else ""
+    )
+    # sources are not part of the signature, they are different between processes
+    layer_values = {
+        section: {
+            key: [str(config_value.value), config_value.priority]
+            for key, config_value in six.iteritems(section_values)
+        }
+        for section, section_values in six.iteritems(config_layer.layer_config)
+    }
+    signature = _hash(
+        parent_signature + json_utils.dumps_canonical(layer_values, default=str)
+    )
+    setattr(config_layer, _CONFIG_LAYER_SIGNATURE_ATTR, signature)
+    return signature
+
+
+def is_simple_value(value):
+    if isinstance(value, _SIMPLE_TYPES + (Enum,)):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(is_simple_value(v) for v in value)
+    if isinstance(value, dict):
+        return all(is_simple_value(k) and is_simple_value(v) for k, v in value.items())
+    return False
+
+
+def is_relative_value(value):
+    if isinstance(value, six.string_types):
+        return value.strip().lower() in _RELATIVE_VALUE_ALIASES
+    if isinstance(value, (list, tuple)):
+        return any(is_relative_value(v) for v in value)
+    if isinstance(value, dict):
+        return any(
+            is_relative_value(k) or is_relative_value(v) for k, v in value.items()
+        )
+    return False
+
+
+def serialize_parameter_value(param_def, param_value):
+    # type: (ParameterDefinition, ParameterValue) -> Optional[Dict[str, Any]]
+    """
+    Returns the cache entry of the value, or None if the value can't be restored from a string.
+    Relative values get an entry without the value, they are resolved again when the entry is loaded.
+    """
+    if param_value.parameter is not param_def:
+        # parameter definition has been changed by the runtime value
+        return None
+
+    value = param_value.value
+    if value is NOTHING:
+        return {"nothing": True, "source": param_value.source}
+    if value is None:
+        return {"value": None, "source": param_value.source}
+
+    source_value = param_value.source_value
+    if isinstance(value, _TaskParamContainer) or not is_simple_value(source_value):
+        return None
+    source_str = str(source_value)
+    if "$" in source_str or "@" in source_str:
+        # environment variables and "@" values (files, python objects)
+        # can be different at another process
+        return None
+    if is_relative_value(source_value):
+        # "today" of the next build is another date
+        return {"relative": True, "source": param_value.source}
+
+    try:
+        value_str = param_def.to_str(value)
+        restored = param_def.calc_init_value(value_str)
+        if param_def.signature(restored) != param_def.signature(value):
+            return None
+    except Exception:
+        return None
+    return {"value": value_str, "source": param_value.source}
+
+
+class TaskBuildCache(object):
+    """
+    Content-addressed store of task build entries, shared by all the processes that use the same folder.
+    Entries are never updated (the key changes with any change of its inputs), so writes are atomic
+    renames and a failure to read or write an entry is just a cache miss.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._entries = {}  # type: Dict[str, Dict[str, Any]]
+
+    @staticmethod
+    def build_key(key_dict):
+        return _hash(
+            json_utils.dumps_canonical(
+                dict(key_dict, cache_version=TASK_BUILD_CACHE_VERSION)
+            )
+        )
+
+    def _entry_path(self, key):
+        return os.path.join(self.root, key[:2], key + ".json")
+
+    def get(self, key):
+        # type: (str) -> Optional[Dict[str, Any]]
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        entry_path = self._entry_path(key)
+        if not os.path.exists(entry_path):
+            return None
+        try:
+            with open(entry_path) as fp:
+                entry = json.load(fp)
+        except Exception as ex:
+            logger.debug("Failed to read task build cache %s: %s", entry_path, ex)
+            return None
+        self._entries[key] = entry
+        return entry
+
+    def put(self, key, entry):
+        # type: (str, Dict[str, Any]) -> None
+        self._entries[key] = entry
+
+        entry_path = self._entry_path(key)
+        tmp_path = "%s.%s.tmp" % (entry_path, os.getpid())
+        try:
+            entry_dir = os.path.dirname(entry_path)
+            if not os.path.exists(entry_dir):
+                os.makedirs(entry_dir)
+            with open(tmp_path, "w") as fp:
+                json.dump(entry, fp)
+            os.replace(tmp_path, entry_path)
+        except Exception as ex:
+            logger.debug("Failed to write task build cache %s: %s", entry_path, ex)
+
+    def clear(self):
+        self._entries.clear()
+
+
+_task_build_caches = {}  # type: Dict[str, TaskBuildCache]
+
+
+def get_task_build_cache(root=None):
+    # type: (Optional[str]) -> TaskBuildCache
+    root = root or get_dbnd_project_config().dbnd_system_path("task_build_cache")
+    cache = _task_build_caches.get(root)
+    if cache is None:
+        cache = _task_build_caches[root] = TaskBuildCache(root)
+    return cache
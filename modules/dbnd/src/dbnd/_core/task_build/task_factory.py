@@ -120,6 +120,13 @@ from dbnd._core.parameter.parameter_value import (
     ParameterValue,
     fold_parameter_value,
 )
+from dbnd._core.task_build.task_build_cache import (
+    TaskBuildCache,
+    config_layer_signature,
+    get_task_build_cache,
+    is_simple_value,
+    serialize_parameter_value,
+)
 from dbnd._core.task_build.task_context import (
     TaskContextPhase,
     task_context,
@@ -154,10 +161,20 @@ class TaskFactoryConfig(object):
 
     config_section = "task_build"
 
-    def __init__(self, verbose, sign_with_full_qualified_name, sign_with_task_code):
+    def __init__(
+        self,
+        verbose,
+        sign_with_full_qualified_name,
+        sign_with_task_code,
+        persistent_cache=False,
+        persistent_cache_dir=None,
+    ):
         self.verbose = verbose
         self.sign_with_full_qualified_name = sign_with_full_qualified_name
         self.sign_with_task_code = sign_with_task_code
+        # resolved task params are shared between processes, see task_build_cache
+        self.persistent_cache = persistent_cache
+        self.persistent_cache_dir = persistent_cache_dir
 
     @classmethod
     def from_dbnd_config(cls, conf):
@@ -170,6 +187,8 @@ class TaskFactoryConfig(object):
             verbose=_b("verbose"),
             sign_with_full_qualified_name=_b("sign_with_full_qualified_name"),
             sign_with_task_code=_b("sign_with_task_code"),
+            persistent_cache=_b("persistent_cache"),
+            persistent_cache_dir=conf.get(cls.config_section, "persistent_cache_dir"),
         )
 
 
@@ -630,14 +649,29 @@ class TaskFactory(object):
         # log with the final config
         self._log_config()
 
+        # the same task with the same config has been resolved already (maybe by another process)
+        build_cache_key = self._get_build_cache_key(params_to_build)
+        if build_cache_key:
+            cached_param_values = self._load_cached_param_values(
+                build_cache_key, params_to_build
+            )
+            if cached_param_values is not None:
+                self._log_build_step("Task params are loaded from the build cache")
+                return task_param_values + cached_param_values
+
         # calculate configuration per parameter, and calculate parameter value
+        built_param_values = []
+        target_config_params = []
         for param_def in params_to_build.values():
-            param_def = self._update_params_def_target_config(param_def)
+            updated_param_def = self._update_params_def_target_config(param_def)
+            if updated_param_def is not param_def:
+                target_config_params.append(param_def.name)
             try:
-                p_value = self._build_parameter_value(param_def)
-                task_param_values.append(p_value)
+                p_value = self._build_parameter_value(updated_param_def)
+                built_param_values.append(p_value)
             except MissingParameterError as ex:
                 self.task_errors.append(ex)
+        task_param_values.extend(built_param_values)
 
         # validation for errors and log warnings
         self.validate_no_extra_config_params(task_param_values)
@@ -647,9 +681,126 @@ class TaskFactory(object):
 
         if self.build_warnings:
             self._log_task_build_warnings()
+        elif build_cache_key:
+            # tasks with warnings are not cached, so we don't lose the warnings on the next build
+            self._save_cached_param_values(
+                build_cache_key, built_param_values, target_config_params
+            )
 
         return task_param_values
 
+    def _get_build_cache_key(self, params_to_build):
+        # type: (Dict[str, ParameterDefinition]) -> Optional[str]
+        """
+        The key of the task at the persistent build cache,
+        None if the cache is disabled or the task is built from values that can't be part of the key
+        """
+        if not self.task_factory_config.persistent_cache:
+            return None
+
+        if not is_simple_value(self.task_kwargs):
+            return None
+
+        parent_scope_params = {}
+        if self.parent_task:
+            for name, p_val in six.iteritems(
+                self.parent_task.task_children_scope_params
+            ):
+                if not is_simple_value(p_val.value):
+                    return None
+                parent_scope_params[name] = p_val.value
+
+        return TaskBuildCache.build_key(
+            {
+                "task_name": self.task_name,
+                "full_task_family": self.task_definition.full_task_family,
+                "task_signature_extra": self.task_definition.task_signature_extra,
+                "params": {
+                    name: [str(param_def.value_type), str(param_def.default)]
+                    for name, param_def in six.iteritems(params_to_build)
+                },
+                "config": config_layer_signature(self.config.config_layer),
+                "config_sections": self.config_sections,
+                "task_kwargs": self.task_kwargs,
+                "parent_scope_params": parent_scope_params,
+                "task_env": self.task_env_config.task_signature
+                if self.task_env_config
+                else None,
+            }
+        )
+
+    def _load_cached_param_values(self, build_cache_key, params_to_build):
+        # type: (str, Dict[str, ParameterDefinition]) -> Optional[List[ParameterValue]]
+        build_cache = get_task_build_cache(
+            self.task_factory_config.persistent_cache_dir
+        )
+        entry = build_cache.get(build_cache_key)
+        if not entry:
+            return None
+
+        cached_params = entry["params"]
+        if set(cached_params) != set(params_to_build):
+            return None
+
+        try:
+            param_values = []
+            for name, param_def in six.iteritems(params_to_build):
+                if name in entry["target_config_params"]:
+                    param_def = self._update_params_def_target_config(param_def)
+
+                cached = cached_params[name]
+                if cached.get("relative"):
+                    param_values.append(self._build_parameter_value(param_def))
+                elif cached.get("nothing"):
+                    param_values.append(
+                        ParameterValue(
+                            parameter=param_def,
+                            source=cached["source"],
+                            source_value=NOTHING,
+                            value=NOTHING,
+                            parsed=False,
+                        )
+                    )
+                else:
+                    param_values.append(
+                        build_parameter_value(
+                            param_def,
+                            ConfigValue(cached["value"], source=cached["source"]),
+                        )
+                    )
+            return param_values
+        except Exception as ex:
+            logger.debug(
+                "Failed to load %s from the build cache: %s", self.task_name, ex
+            )
+            return None
+
+    def _save_cached_param_values(
+        self, build_cache_key, param_values, target_config_params
+    ):
+        # type: (str, List[ParameterValue], List[str]) -> None
+        cached_params = {}
+        for p_val in param_values:
+            param_def = self.task_definition.task_param_defs[p_val.name]
+            if p_val.name in target_config_params:
+                param_def = p_val.parameter
+            cached = serialize_parameter_value(param_def, p_val)
+            if cached is None:
+                self._log_build_step(
+                    "Task is not cached, '%s' can't be restored from string"
+                    % p_val.name
+                )
+                return
+            cached_params[p_val.name] = cached
+
+        build_cache = get_task_build_cache(
+            self.task_factory_config.persistent_cache_dir
+        )
+        build_cache.put(
+            build_cache_key,
+            {"params": cached_params, "target_config_params": target_config_params},
+        )
+
     def validate_no_extra_config_params(self, task_param_values):
         task_param_values = {param.name: param for param in task_param_values}
 
@@ -4,6 +4,8 @@ import logging
 import re
 import typing
 
+from collections import deque
+
 from dbnd._core.constants import _TaskDbndRunDataSource
 from dbnd._core.errors import DatabandError, friendly_error
 from dbnd._core.task.base_task import _BaseTask
@@ -130,13 +132,12 @@ class _TaskDagNode(TaskSubCtrl):
         return self._get_all_tasks(upstream=True, should_run_only=should_run_only)
 
     def _get_all_tasks(self, upstream=False, should_run_only=False):
-        seen = set()
+        seen = {self.task.task_id}
         result = []
-        to_process = [self.task]
+        to_process = deque([self.task])
         # should be iterative, we don't like recursive as we can have huge nesting
         while to_process:
-            current = to_process.pop(0)
-            seen.add(current.task_id)
+            current = to_process.popleft()
             if should_run_only and not current.ctrl.should_run():
                 continue
             t_dag = current.ctrl.task_dag
@@ -149,6 +150,8 @@ class _TaskDagNode(TaskSubCtrl):
                     raise DatabandError(
                         "Can't resolve task %s by it's id" % t_connected_task_id
                     )
+                # mark on queueing, a task shared by many tasks is queued once
+                seen.add(t_connected_task_id)
                 to_process.append(connected_task)
 
         return set(result)
@@ -25,6 +25,10 @@ class TaskRunMetaFiles(object):
         source = source or TaskRunMetaFiles._DEFAULT_METRIC_SOURCE
         return self._output(TaskRunMetaFiles._METRICS, source, metric_key)
 
+    def get_metric_index_target(self, source=None):
+        source = source or TaskRunMetaFiles._DEFAULT_METRIC_SOURCE
+        return self._output(TaskRunMetaFiles._METRICS, source + ".index")
+
     def get_artifact_target(self, name):
         return self._output(TaskRunMetaFiles._ARTIFACTS, name)
 
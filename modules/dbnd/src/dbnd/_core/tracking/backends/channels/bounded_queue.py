@@ -0,0 +1,137 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+import queue
+
+from time import time
+from typing import Any, Callable, Optional
+
+
+class QueueOverflowPolicy(object):
+    block = "block"
+    drop_oldest = "drop-oldest"
+    drop_low_priority = "drop-low-priority"
+
+    @classmethod
+    def all(cls):
+        return [cls.block, cls.drop_oldest, cls.drop_low_priority]
+
+
+class QueueItemPriority(object):
+    low = 0
+    normal = 1
+    # critical items are never dropped
+    critical = 2
+
+
+class BoundedQueue(queue.Queue):
+    """
+    queue.Queue bounded by the amount of items and by their total size in bytes.
+
+    When the queue is full, `put` applies the overflow policy:
+      * block - wait until the consumer frees some room
+      * drop-oldest - drop the oldest queued items that are not critical
+      * drop-low-priority - drop queued low priority items, and the new item if it's a low priority one
+    If there is still no room after dropping (e.g. the queue is full of critical items) - `put` blocks.
+    """
+
+    def __init__(
+        self,
+        max_items=0,  # type: int
+        max_bytes=0,  # type: int
+        overflow_policy=QueueOverflowPolicy.block,  # type: str
+        item_priority_callback=None,  # type: Optional[Callable[[Any], int]]
+        item_size_callback=None,  # type: Optional[Callable[[Any], int]]
+    ):
+        if overflow_policy not in QueueOverflowPolicy.all():
+            raise ValueError(
+                "Unknown queue overflow policy '%s', use one of %s"
+                % (overflow_policy, QueueOverflowPolicy.all())
+            )
+        # the builtin maxsize limit stays disabled, limits are managed by the `put` below
+        super(BoundedQueue, self).__init__()
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.overflow_policy = overflow_policy
+        self.item_priority_callback = item_priority_callback
+        self.item_size_callback = item_size_callback
+
+        self.size_bytes = 0
+        self.dropped_count = 0
+        self.blocked_count = 0
+
+    # the underlying deque holds (item, size, priority) entries
+    def _put(self, entry):
+        self.queue.append(entry)
+        self.size_bytes += entry[1]
+
+    def _get(self):
+        item, size, _ = self.queue.popleft()
+        self.size_bytes -= size
+        return item
+
+    def _is_full(self, size):
+        # type: (int) -> bool
+        if self.max_items and self._qsize() >= self.max_items:
+            return True
+        # a single item is allowed to exceed max_bytes, otherwise it would never fit
+        if self.max_bytes and self._qsize() and self.size_bytes + size > self.max_bytes:
+            return True
+        return False
+
+    def _drop_queued(self, size, max_priority):
+        # type: (int, int) -> None
+        """Drop the oldest queued entries up to `max_priority` until `size` bytes fit"""
+        index = 0
+        while index < len(self.queue) and self._is_full(size):
+            _, entry_size, entry_priority = self.queue[index]
+            if entry_priority > max_priority:
+                index += 1
+                continue
+
+            del self.queue[index]
+            self.size_bytes -= entry_size
+            self.dropped_count += 1
+            self.unfinished_tasks -= 1
+            if self.unfinished_tasks == 0:
+                self.all_tasks_done.notify_all()
+
+    def put(self, item, block=True, timeout=None):
+        priority = (
+            self.item_priority_callback(item)
+            if self.item_priority_callback
+            else QueueItemPriority.normal
+        )
+        size = (
+            self.item_size_callback(item)
+            if self.max_bytes and self.item_size_callback
+            else 0
+        )
+
+        with self.not_full:
+            if self._is_full(size) and priority < QueueItemPriority.critical:
+                if self.overflow_policy == QueueOverflowPolicy.drop_oldest:
+                    self._drop_queued(size, max_priority=QueueItemPriority.normal)
+                elif self.overflow_policy == QueueOverflowPolicy.drop_low_priority:
+                    self._drop_queued(size, max_priority=QueueItemPriority.low)
+                    if self._is_full(size) and priority == QueueItemPriority.low:
+                        self.dropped_count += 1
+                        return
+
+            if self._is_full(size):
+                self.blocked_count += 1
+                if not block:
+                    raise queue.Full
+                if timeout is None:
+                    while self._is_full(size):
+                        self.not_full.wait()
+                else:
+                    deadline = time() + timeout
+                    while self._is_full(size):
+                        remaining = deadline - time()
+                        if remaining <= 0.0:
+                            raise queue.Full
+                        self.not_full.wait(remaining)
+
+            self._put((item, size, priority))
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
@@ -5,34 +5,90 @@ import os
 import queue
 import threading
 
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from time import sleep, time
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 import attr
 
+from dbnd._core.constants import MetricSource
 from dbnd._core.current import in_tracking_run, is_orchestration_run
 from dbnd._core.errors.base import DatabandWebserverNotReachableError
 from dbnd._core.errors.errors_utils import log_exception
 from dbnd._core.log.external_exception_logging import log_exception_to_server
 from dbnd._core.tracking.backends.abstract_tracking_store import is_state_call
 from dbnd._core.tracking.backends.channels.abstract_channel import TrackingChannel
+from dbnd._core.tracking.backends.channels.bounded_queue import (
+    BoundedQueue,
+    QueueItemPriority,
+    QueueOverflowPolicy,
+)
+from dbnd._core.tracking.backends.channels.tracking_spool import TrackingSpool
 from dbnd._core.tracking.backends.channels.tracking_web_channel import (
     TrackingWebChannel,
 )
 from dbnd._core.tracking.backends.tracking_store_composite import try_run_handler
+from dbnd._core.tracking.schemas.metrics import Metric
+from dbnd._core.utils import json_utils
 from dbnd._vendor.pendulum import utcnow
+from dbnd.api.tracking_api import log_metrics_schema
 
 
 logger = logging.getLogger(__name__)
 
 _TERMINATOR = object()
 
+# tracking calls that can be merged into one request, mapped to their list field
+_BATCHABLE_LIST_CALLS = {
+    "log_metrics": "metrics_info",
+    "log_targets": "targets_info",
+    "log_datasets": "datasets_info",
+}
+
+# tracking calls that are dropped first when the queue is full and policy is drop-low-priority
+_LOW_PRIORITY_CALLS = {"log_metrics", "log_artifact", "save_external_links"}
+
 
 class TrackingAsyncWebChannelBackgroundWorker(object):
-    def __init__(self, item_processing_handler, skip_processing_callback):
+    def __init__(
+        self,
+        item_processing_handler,
+        skip_processing_callback,
+        item_merging_handler=None,
+        is_batchable_callback=None,
+        batch_max_items=1,
+        batch_linger=0.0,
+        max_queue_items=0,
+        max_queue_bytes=0,
+        queue_overflow_policy=QueueOverflowPolicy.block,
+        item_priority_callback=None,
+        item_size_callback=None,
+        senders_count=1,
+        is_sequential_callback=None,
+    ):
         self.item_processing_handler = item_processing_handler
         self.skip_processing_callback = skip_processing_callback
 
+        # with more than one sender, items are processed concurrently in a thread pool,
+        # except for the sequential items - they wait for all the previous items to complete
+        self.senders_count = senders_count
+        self.is_sequential_callback = is_sequential_callback
+
+        # item_merging_handler(batch, item) returns a merged item or None if the items can't be merged
+        self.item_merging_handler = item_merging_handler
+        self.is_batchable_callback = is_batchable_callback
+        self.batch_max_items = batch_max_items
+        self.batch_linger = batch_linger
+
+        self.max_queue_items = max_queue_items
+        self.max_queue_bytes = max_queue_bytes
+        self.queue_overflow_policy = queue_overflow_policy
+        self.item_priority_callback = item_priority_callback
+        self.item_size_callback = item_size_callback
+        # counters of the queues that were already flushed
+        self._flushed_dropped_count = 0
+        self._flushed_blocked_count = 0
+
         self._lock = None
         self._queue = None
         self._thread = None
@@ -41,9 +97,30 @@ class TrackingAsyncWebChannelBackgroundWorker(object):
     @property
     def queue(self):
         if self._queue is None:
-            self._queue = queue.Queue()
+            self._queue = BoundedQueue(
+                max_items=self.max_queue_items,
+                max_bytes=self.max_queue_bytes,
+                overflow_policy=self.queue_overflow_policy,
+                item_priority_callback=self._get_item_priority,
+                item_size_callback=self.item_size_callback,
+            )
         return self._queue
 
+    def _get_item_priority(self, item: Any) -> int:
+        if item is _TERMINATOR or self.item_priority_callback is None:
+            return QueueItemPriority.critical
+        return self.item_priority_callback(item)
+
+    @property
+    def dropped_count(self) -> int:
+        current = self._queue.dropped_count if self._queue is not None else 0
+        return self._flushed_dropped_count + current
+
+    @property
+    def blocked_count(self) -> int:
+        current = self._queue.blocked_count if self._queue is not None else 0
+        return self._flushed_blocked_count + current
+
     @property
     def lock(self):
         if self._lock is None:
@@ -78,8 +155,31 @@ class TrackingAsyncWebChannelBackgroundWorker(object):
                 self._thread = None
                 self._thread_for_pid = None
                 self._lock = None
+                self._flushed_dropped_count = self.dropped_count
+                self._flushed_blocked_count = self.blocked_count
                 self._queue = None
 
+    def drain(self) -> List[Any]:
+        """
+        Take all the pending items out of the queue, used when flush has timed out.
+        The worker thread stops after its current item.
+        """
+        items = []
+        with self.lock:
+            if self._queue is None:
+                return items
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._queue.task_done()
+                if item is not _TERMINATOR:
+                    items.append(item)
+            if self.is_alive:
+                self._queue.put(_TERMINATOR)
+        return items
+
     def _wait_flush(self, timeout: float) -> None:
         initial_timeout = min(0.1, timeout)
         if not self._timed_queue_join(initial_timeout):
@@ -106,26 +206,112 @@ class TrackingAsyncWebChannelBackgroundWorker(object):
         finally:
             self.queue.all_tasks_done.release()
 
+    def _should_collect_batch(self, item: Any) -> bool:
+        return (
+            self.item_merging_handler is not None
+            and self.batch_max_items > 1
+            and (self.is_batchable_callback is None or self.is_batchable_callback(item))
+        )
+
+    def _collect_batch(self, item: Any) -> Tuple[Any, int, Any]:
+        """
+        Merge the following queued items into `item` while they are mergeable.
+        Waits up to `batch_linger` seconds for new items to arrive.
+
+        @return: (merged item, amount of queue items it holds, the first not merged item or None)
+        """
+        deadline = time() + self.batch_linger
+        items_count = 1
+        while items_count < self.batch_max_items:
+            try:
+                delay = deadline - time()
+                if delay > 0:
+                    next_item = self.queue.get(timeout=delay)
+                else:
+                    next_item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if next_item is _TERMINATOR:
+                return item, items_count, next_item
+
+            merged_item = self.item_merging_handler(item, next_item)
+            if merged_item is None:
+                return item, items_count, next_item
+
+            item = merged_item
+            items_count += 1
+
+        return item, items_count, None
+
+    def _is_sequential(self, item: Any) -> bool:
+        return self.is_sequential_callback is None or self.is_sequential_callback(item)
+
+    def _process_item(self, item: Any, items_count: int) -> None:
+        try:
+            self.item_processing_handler(item)
+        except Exception as e:
+            # It's better to continue cleanning the queue with queue.task_done() to avoid hanging on queue.join()
+            self._failed_on_previous_iteration = True
+            err_msg = "TrackingAsyncWebChannelBackgroundWorker will skip processing next events"
+            log_exception(err_msg, e, logger)
+        finally:
+            for _ in range(items_count):
+                self.queue.task_done()
+
     def _thread_worker(self) -> None:
-        failed_on_previous_iteration = False
+        self._failed_on_previous_iteration = False
+        senders = None
+        if self.senders_count > 1:
+            senders = ThreadPoolExecutor(
+                max_workers=self.senders_count,
+                thread_name_prefix="dbnd.TrackingAsyncWebChannelSender",
+            )
+        in_flight = set()
+
+        # item that was taken from the queue while collecting a batch, but can't be a part of it
+        pending_item = None
         while True:
-            item = self.queue.get()
+            if pending_item is not None:
+                item, pending_item = pending_item, None
+            else:
+                item = self.queue.get()
+            items_count = 1
             try:
                 if item is _TERMINATOR:
+                    wait(in_flight)
                     break
-                if not failed_on_previous_iteration:
-                    self.item_processing_handler(item)
-                else:
+                if self._failed_on_previous_iteration:
                     self.skip_processing_callback(item)
+                    continue
+
+                if self._should_collect_batch(item):
+                    item, items_count, pending_item = self._collect_batch(item)
+
+                if senders is None or self._is_sequential(item):
+                    wait(in_flight)
+                    in_flight.clear()
+                    self._process_item(item, items_count)
+                else:
+                    # don't pull from the (bounded) queue more than the senders can handle
+                    if len(in_flight) >= 2 * self.senders_count:
+                        wait(in_flight, return_when=FIRST_COMPLETED)
+                    in_flight = {f for f in in_flight if not f.done()}
+                    in_flight.add(senders.submit(self._process_item, item, items_count))
+                # the items are marked as done by _process_item
+                items_count = 0
             except Exception as e:
-                # It's better to continue cleanning the queue with queue.task_done() to avoid hanging on queue.join()
-                failed_on_previous_iteration = True
+                self._failed_on_previous_iteration = True
                 err_msg = "TrackingAsyncWebChannelBackgroundWorker will skip processing next events"
                 log_exception(err_msg, e, logger)
             finally:
-                self.queue.task_done()
+                for _ in range(items_count):
+                    self.queue.task_done()
             sleep(0)
 
+        if senders is not None:
+            senders.shutdown(wait=True)
+
     def _ensure_thread(self) -> None:
         if not self.is_alive:
             self.start()
@@ -156,6 +342,16 @@ class TrackingAsyncWebChannel(TrackingChannel):
         tracker_raise_on_error,
         is_verbose,
         databand_api_client,
+        batching=False,
+        batch_max_items=1,
+        batch_linger=0.0,
+        max_queue_items=0,
+        max_queue_bytes=0,
+        queue_overflow_policy=QueueOverflowPolicy.block,
+        senders_count=1,
+        spool=None,
+        spool_flush_timeout=None,
+        spool_replay=False,
         *args,
         **kwargs,
     ):
@@ -166,6 +362,19 @@ class TrackingAsyncWebChannel(TrackingChannel):
         self._background_worker = TrackingAsyncWebChannelBackgroundWorker(
             item_processing_handler=self._background_worker_item_handler,
             skip_processing_callback=self._background_worker_skip_processing_callback,
+            item_merging_handler=(
+                self._background_worker_item_merging_handler if batching else None
+            ),
+            is_batchable_callback=self._background_worker_is_batchable_callback,
+            batch_max_items=batch_max_items,
+            batch_linger=batch_linger,
+            max_queue_items=max_queue_items,
+            max_queue_bytes=max_queue_bytes,
+            queue_overflow_policy=queue_overflow_policy,
+            item_priority_callback=self._background_worker_item_priority_callback,
+            item_size_callback=self._background_worker_item_size_callback,
+            senders_count=senders_count,
+            is_sequential_callback=self._background_worker_is_sequential_callback,
         )
 
         self._max_retries = max_retries
@@ -175,6 +384,13 @@ class TrackingAsyncWebChannel(TrackingChannel):
         self._log_fn = logger.info if self._is_verbose else logger.debug
         self._shutting_down = False
         self._start_time = utcnow()
+        self._reported_queue_counters = (0, 0)
+
+        # not sent calls are kept in the spool instead of being lost
+        self._spool = spool  # type: Optional[TrackingSpool]
+        self._spool_flush_timeout = spool_flush_timeout
+        self._spool_replay = spool_replay
+        self._spool_replay_for_pid = None
 
     def _handle(self, name, data):
         if self._shutting_down:
@@ -186,6 +402,12 @@ class TrackingAsyncWebChannel(TrackingChannel):
             in_tracking_run() and is_state_call(name)
         )
 
+        if self._spool_replay and self._spool_replay_for_pid != os.getpid():
+            self._start_spool_replay()
+
+        if name == TrackingChannel.update_task_run_attempts.__name__:
+            self._report_queue_metrics(data)
+
         # send data for processing in a thread
         item = AsyncWebChannelQueueItem(
             name=name,
@@ -195,6 +417,76 @@ class TrackingAsyncWebChannel(TrackingChannel):
         )
         self._background_worker.submit(item=item)
 
+    def _start_spool_replay(self):
+        """Replay calls spooled by previous processes in a background thread"""
+        self._spool_replay_for_pid = os.getpid()
+        if not self._spool.list_segments():
+            return
+
+        threading.Thread(
+            target=self._replay_spool,
+            daemon=True,
+            name="dbnd.TrackingAsyncWebChannelSpoolReplay",
+        ).start()
+
+    def _replay_spool(self):
+        try:
+            replayed = self._spool.replay(self._send_spooled_call)
+            self._log_fn("TrackingAsyncWebChannel replayed %s spooled calls", replayed)
+        except Exception as e:
+            log_exception(
+                "TrackingAsyncWebChannel failed to replay %s" % self._spool,
+                e,
+                logger,
+                non_critical=True,
+            )
+
+    def _send_spooled_call(self, name, data):
+        tries = self._max_retries if is_state_call(name) else 1
+        try_run_handler(tries, self.web_channel, name, {"data": data})
+
+    def _report_queue_metrics(self, task_run_attempts_data):
+        """
+        Report dropped/blocked tracking calls as system metrics of the updated task runs,
+        only if there are new drops/blocks since the last report
+        """
+        dropped = self._background_worker.dropped_count
+        blocked = self._background_worker.blocked_count
+        if (dropped, blocked) == self._reported_queue_counters:
+            return
+        self._reported_queue_counters = (dropped, blocked)
+
+        timestamp = utcnow()
+        metrics_info = [
+            {
+                "task_run_attempt_uid": update["task_run_attempt_uid"],
+                "metric": Metric(
+                    key=key,
+                    value=value,
+                    timestamp=timestamp,
+                    source=MetricSource.system,
+                ),
+                "source": MetricSource.system,
+            }
+            for update in task_run_attempts_data["task_run_attempt_updates"]
+            for key, value in (
+                ("tracking_queue_dropped_calls", dropped),
+                ("tracking_queue_blocked_calls", blocked),
+            )
+        ]
+        if not metrics_info:
+            return
+
+        marsh = log_metrics_schema.dump(dict(metrics_info=metrics_info))
+        self._background_worker.submit(
+            item=AsyncWebChannelQueueItem(
+                name=TrackingChannel.log_metrics.__name__,
+                data=marsh.data,
+                is_orchestration_run=is_orchestration_run(),
+                stop_tracking_on_failure=self._remove_failed_store,
+            )
+        )
+
     def _background_worker_item_handler(self, item: AsyncWebChannelQueueItem):
         try:
             tries = self._max_retries if is_state_call(item.name) else 1
@@ -213,6 +505,11 @@ class TrackingAsyncWebChannel(TrackingChannel):
                 "Exception in TrackingAsyncWebChannel in background worker",
                 exc_info=True,
             )
+            if self._spool and isinstance(exc, DatabandWebserverNotReachableError):
+                # the webserver is down - spool this call and all the following ones
+                self._spool.append(item.name, item.data)
+                raise exc
+
             if item.stop_tracking_on_failure:
                 raise exc
 
@@ -229,9 +526,66 @@ class TrackingAsyncWebChannel(TrackingChannel):
                     raise exc
             # in all other cases continue
 
+    def _background_worker_is_sequential_callback(
+        self, item: AsyncWebChannelQueueItem
+    ) -> bool:
+        # state calls keep their order, and all the calls before them are completed first
+        return is_state_call(item.name)
+
+    def _background_worker_item_priority_callback(
+        self, item: AsyncWebChannelQueueItem
+    ) -> int:
+        if is_state_call(item.name):
+            return QueueItemPriority.critical
+        if item.name in _LOW_PRIORITY_CALLS:
+            return QueueItemPriority.low
+        return QueueItemPriority.normal
+
+    def _background_worker_item_size_callback(
+        self, item: AsyncWebChannelQueueItem
+    ) -> int:
+        return len(json_utils.dumps(item.data))
+
+    def _background_worker_is_batchable_callback(
+        self, item: AsyncWebChannelQueueItem
+    ) -> bool:
+        return item.name in _BATCHABLE_LIST_CALLS or item.name == "save_external_links"
+
+    def _background_worker_item_merging_handler(
+        self, batch: AsyncWebChannelQueueItem, item: AsyncWebChannelQueueItem
+    ) -> Optional[AsyncWebChannelQueueItem]:
+        if (
+            batch.name != item.name
+            or batch.is_orchestration_run != item.is_orchestration_run
+            or batch.stop_tracking_on_failure != item.stop_tracking_on_failure
+        ):
+            return None
+
+        if item.name in _BATCHABLE_LIST_CALLS:
+            field = _BATCHABLE_LIST_CALLS[item.name]
+            data = {field: batch.data[field] + item.data[field]}
+        elif item.name == "save_external_links":
+            if batch.data["task_run_attempt_uid"] != item.data["task_run_attempt_uid"]:
+                return None
+            external_links_dict = dict(batch.data["external_links_dict"])
+            external_links_dict.update(item.data["external_links_dict"])
+            data = dict(batch.data, external_links_dict=external_links_dict)
+        else:
+            return None
+
+        return attr.evolve(batch, data=data)
+
     def _background_worker_skip_processing_callback(
         self, item: AsyncWebChannelQueueItem
     ):
+        if self._spool:
+            self._log_fn(
+                "TrackingAsyncWebChannel spools %s tracking event due to a previous failure",
+                item.name,
+            )
+            self._spool.append(item.name, item.data)
+            return
+
         self._log_fn(
             "TrackingAsyncWebChannel skips %s tracking event due to a previous failure",
             item.name,
@@ -246,6 +600,9 @@ class TrackingAsyncWebChannel(TrackingChannel):
         tracking_duration = (utcnow() - self._start_time).in_seconds()
         # don't exceed 10% of whole tracking duration while flushing but not less then 5m and no more then 30m
         flush_limit = min(max(tracking_duration * 0.1, 5 * 60), 30 * 60)
+        if self._spool and self._spool_flush_timeout is not None:
+            # the not sent calls are spooled, no need to wait for all of them
+            flush_limit = self._spool_flush_timeout
 
         logger.info(
             "Waiting %ss for TrackingAsyncWebChannel to complete async tasks...",
@@ -256,11 +613,31 @@ class TrackingAsyncWebChannel(TrackingChannel):
             self._background_worker.flush(flush_limit)
             self.web_channel.flush()
             logger.info("TrackingAsyncWebChannel completed all tasks")
+            if self._background_worker.dropped_count:
+                logger.warning(
+                    "TrackingAsyncWebChannel dropped %s tracking events due to a full queue",
+                    self._background_worker.dropped_count,
+                )
         except TimeoutError as e:
-            err_msg = f"TrackingAsyncWebChannel flush exceeded {flush_limit}s timeout"
-            log_exception(err_msg, e, logger)
+            if self._spool:
+                pending_items = self._background_worker.drain()
+                for item in pending_items:
+                    self._spool.append(item.name, item.data)
+                logger.info(
+                    "TrackingAsyncWebChannel flush exceeded %ss timeout, %s pending events are spooled to %s",
+                    flush_limit,
+                    len(pending_items),
+                    self._spool.spool_dir,
+                )
+            else:
+                err_msg = (
+                    f"TrackingAsyncWebChannel flush exceeded {flush_limit}s timeout"
+                )
+                log_exception(err_msg, e, logger)
         finally:
             self._shutting_down = False
+            if self._spool:
+                self._spool.close()
 
     def is_ready(self):
         return self.web_channel.is_ready() and not self._shutting_down
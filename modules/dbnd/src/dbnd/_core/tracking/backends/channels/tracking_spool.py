@@ -0,0 +1,191 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+import logging
+import os
+import threading
+import typing
+
+from time import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dbnd._core.configuration.environ_config import get_dbnd_project_config
+from dbnd._core.utils import json_utils
+from dbnd._core.utils.uid_utils import get_uuid
+
+
+if typing.TYPE_CHECKING:
+    from dbnd._core.settings import CoreConfig
+
+logger = logging.getLogger(__name__)
+
+# closed segment, ready to be replayed
+_SEGMENT_SUFFIX = ".segment"
+# segment that is written by the owner process: <name>.open-<pid>
+_OPEN_STATE = "open"
+# segment that is replayed by the owner process: <name>.replaying-<pid>
+_REPLAYING_STATE = "replaying"
+
+
+def _is_process_alive(pid):
+    # type: (int) -> bool
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # the process exists, but belongs to another user
+        return True
+    return True
+
+
+def _parse_owner(file_name):
+    # type: (str) -> Tuple[Optional[str], Optional[int]]
+    """returns (state, pid) of the segment owner or (None, None) for a closed segment"""
+    _, _, suffix = file_name.rpartition(".")
+    state, _, pid = suffix.partition("-")
+    if state not in (_OPEN_STATE, _REPLAYING_STATE) or not pid.isdigit():
+        return None, None
+    return state, int(pid)
+
+
+class TrackingSpool(object):
+    """
+    Append-only on-disk spool of the tracking calls that were not sent to the webserver.
+
+    Every process writes its own segment files, one json line per tracking call.
+    Closed segments (and segments left by dead processes) can be replayed later,
+    a segment is claimed by the replaying process with an atomic rename,
+    and removed once all of its calls are sent.
+    """
+
+    def __init__(self, spool_dir, max_segment_bytes=16 * 1024 * 1024):
+        # type: (str, int) -> None
+        self.spool_dir = spool_dir
+        self.max_segment_bytes = max_segment_bytes
+
+        self._lock = threading.Lock()
+        self._segment_file = None
+        self._segment_path = None
+        self._segment_for_pid = None
+
+    def _open_segment(self):
+        if not os.path.exists(self.spool_dir):
+            os.makedirs(self.spool_dir, exist_ok=True)
+
+        name = "%d-%s" % (int(time() * 1000), get_uuid().hex)
+        self._segment_path = os.path.join(
+            self.spool_dir, "%s.%s-%d" % (name, _OPEN_STATE, os.getpid())
+        )
+        self._segment_file = open(self._segment_path, "a")
+        self._segment_for_pid = os.getpid()
+
+    def _close_segment(self):
+        if self._segment_file is None:
+            return
+        self._segment_file.close()
+        closed_path = self._segment_path.rpartition(".")[0] + _SEGMENT_SUFFIX
+        os.rename(self._segment_path, closed_path)
+        self._segment_file = None
+        self._segment_path = None
+
+    def append(self, name, data):
+        # type: (str, Dict[str, Any]) -> None
+        line = json_utils.dumps({"name": name, "data": data}) + "\n"
+        with self._lock:
+            if self._segment_for_pid != os.getpid():
+                # a forked process should not write into the parent's segment
+                self._segment_file = None
+            if self._segment_file is None:
+                self._open_segment()
+
+            self._segment_file.write(line)
+            self._segment_file.flush()
+            if self._segment_file.tell() >= self.max_segment_bytes:
+                self._close_segment()
+
+    def close(self):
+        with self._lock:
+            if self._segment_for_pid == os.getpid():
+                self._close_segment()
+
+    def list_segments(self):
+        # type: () -> List[str]
+        """Segments available for replay, from the oldest to the newest"""
+        if not os.path.isdir(self.spool_dir):
+            return []
+
+        segments = []
+        for file_name in sorted(os.listdir(self.spool_dir)):
+            if file_name.endswith(_SEGMENT_SUFFIX):
+                segments.append(os.path.join(self.spool_dir, file_name))
+                continue
+            _, pid = _parse_owner(file_name)
+            if pid is not None and not _is_process_alive(pid):
+                segments.append(os.path.join(self.spool_dir, file_name))
+        return segments
+
+    def _claim(self, segment_path):
+        # type: (str) -> Optional[str]
+        claimed_path = "%s.%s-%d" % (
+            segment_path.rpartition(".")[0],
+            _REPLAYING_STATE,
+            os.getpid(),
+        )
+        try:
+            os.rename(segment_path, claimed_path)
+        except OSError:
+            # already claimed by another process
+            return None
+        return claimed_path
+
+    def replay(self, handler):
+        # type: (Callable[[str, Dict[str, Any]], Any]) -> int
+        """
+        Send all the spooled calls with handler(name, data).
+        Stops on the first failure, the not sent calls stay in the spool.
+
+        @return: the amount of replayed calls
+        """
+        replayed = 0
+        for segment_path in self.list_segments():
+            claimed_path = self._claim(segment_path)
+            if not claimed_path:
+                continue
+
+            with open(claimed_path) as f:
+                lines = [line for line in f if line.strip()]
+
+            for index, line in enumerate(lines):
+                call = json_utils.loads(line)
+                try:
+                    handler(call["name"], call["data"])
+                except Exception:
+                    self._release(claimed_path, lines[index:])
+                    raise
+                replayed += 1
+
+            os.remove(claimed_path)
+        return replayed
+
+    def _release(self, claimed_path, not_sent_lines):
+        # type: (str, List[str]) -> None
+        with open(claimed_path, "w") as f:
+            f.writelines(not_sent_lines)
+        os.rename(claimed_path, claimed_path.rpartition(".")[0] + _SEGMENT_SUFFIX)
+
+    def __str__(self):
+        return "TrackingSpool(%s)" % self.spool_dir
+
+
+def build_tracking_spool(core_config, force=False):
+    # type: (CoreConfig, bool) -> Optional[TrackingSpool]
+    """Build the spool configured by [core] section, None if the spool is disabled"""
+    if not (core_config.tracker_async_spool or force):
+        return None
+
+    spool_dir = core_config.tracker_async_spool_dir
+    if not spool_dir:
+        spool_dir = get_dbnd_project_config().dbnd_system_path("tracking_spool")
+    return TrackingSpool(spool_dir)
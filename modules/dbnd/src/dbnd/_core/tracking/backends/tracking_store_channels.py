@@ -353,6 +353,9 @@ class TrackingStoreThroughChannel(TrackingStore):
         from dbnd._core.tracking.backends.channels.tracking_async_web_channel import (
             TrackingAsyncWebChannel,
         )
+        from dbnd._core.tracking.backends.channels.tracking_spool import (
+            build_tracking_spool,
+        )
 
         parameters = {
             "max_retries": databand_ctx.settings.core.max_tracking_store_retries,
@@ -360,6 +363,16 @@ class TrackingStoreThroughChannel(TrackingStore):
             "tracker_raise_on_error": databand_ctx.settings.core.tracker_raise_on_error,
             "is_verbose": databand_ctx.system_settings.verbose,
             "databand_api_client": databand_ctx.databand_api_client,
+            "batching": databand_ctx.settings.core.tracker_async_batching,
+            "batch_max_items": databand_ctx.settings.core.tracker_async_batch_max_items,
+            "batch_linger": databand_ctx.settings.core.tracker_async_batch_linger,
+            "max_queue_items": databand_ctx.settings.core.tracker_async_max_queue_items,
+            "max_queue_bytes": databand_ctx.settings.core.tracker_async_max_queue_bytes,
+            "queue_overflow_policy": databand_ctx.settings.core.tracker_async_queue_overflow_policy,
+            "senders_count": databand_ctx.settings.core.tracker_async_senders,
+            "spool": build_tracking_spool(databand_ctx.settings.core),
+            "spool_flush_timeout": databand_ctx.settings.core.tracker_async_spool_flush_timeout,
+            "spool_replay": databand_ctx.settings.core.tracker_async_spool_replay,
         }
 
         return TrackingStoreThroughChannel(
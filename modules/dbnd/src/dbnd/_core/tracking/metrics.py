@@ -59,6 +59,8 @@ def log_data(
     with_stats=None,  # type: Optional[Union[bool, str, List[str], LogDataRequest]]
     with_histograms=None,  # type: Optional[Union[bool, str, List[str], LogDataRequest]]
     raise_on_error=False,  # type: bool
+    stats_sample_size=None,  # type: Optional[Union[int, float]]
+    stats_sample_seed=None,  # type: Optional[int]
 ):  # type: (...) -> None
     """
     Log data information to dbnd.
@@ -73,6 +75,8 @@ def log_data(
     @param with_stats: True if should calculate and log stats of the data.
     @param with_histograms: True if should calculate and log histogram of the data.
     @param raise_on_error: raise if error occur.
+    @param stats_sample_size: Calculate stats and histograms on a sample - amount of rows or a fraction of them.
+    @param stats_sample_seed: Random seed of the sample, the same seed produces the same sample.
     """
     if not is_dbnd_enabled():
         return
@@ -89,6 +93,8 @@ def log_data(
         log_size=with_size,
         log_stats=with_stats,
         log_histograms=with_histograms,
+        log_stats_sample_size=stats_sample_size,
+        log_stats_sample_seed=stats_sample_seed,
     )
 
     tracker.log_data(
@@ -117,6 +123,8 @@ log_dataframe.__doc__ = """
         with_stats: True if should calculate and log stats of the dataframe.
         with_histograms: True if should calculate and log histogram of the dataframe.
         raise_on_error: raise if error occur.
+        stats_sample_size: Calculate stats and histograms on a sample - amount of rows or a fraction of them.
+        stats_sample_seed: Random seed of the sample, the same seed produces the same sample.
 
     Example::
 
@@ -1,11 +1,14 @@
 # © Copyright Databand.ai, an IBM Company 2022
 
+import copy
+import functools
 import re
 
 from collections import defaultdict
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 import attr
+import sqlparse
 
 from sqlparse.sql import (
     Comparison,
@@ -46,6 +49,12 @@ CLOUD_SERVICE_URI_REGEX = re.compile(r"s3://\S+|azure://\S+|gcs://\S+")
 
 STAGE_REGEX = re.compile(r"@\S+")
 
+# statements without any of these keywords have no read or write operations, no need to parse them
+OPERATIONS_KEYWORDS_REGEX = re.compile(r"\b(?:from|into|copy)\b", re.IGNORECASE)
+
+# the amount of different queries which extracted operations are kept
+EXTRACTED_QUERIES_CACHE_SIZE = 1024
+
 
 def calculate_file_path_default(file_path):
     return file_path
@@ -55,6 +64,20 @@ class SqlQueryExtractor:
     def __init__(self, calculate_file_path=calculate_file_path_default):
         self.calculate_file_path = calculate_file_path
 
+    def extract_query_operations_schemas(self, query: str) -> Dict[OP_TYPE, Schema]:
+        """
+        Clean and parse the query and extract its operations schemas, see `extract_operations_schemas`.
+        The same queries are executed over and over again, so the extracted operations are cached by the query text,
+        queries that can't have any operations are not parsed at all.
+        """
+        query = query.strip()
+        if not OPERATIONS_KEYWORDS_REGEX.search(query):
+            return {}
+
+        extracted = _extract_query_operations_schemas(self.calculate_file_path, query)
+        # the cached schemas are shared, the callers get their own copy
+        return copy.deepcopy(extracted)
+
     def extract_operations_schemas(self, statement: TokenList) -> Dict[OP_TYPE, Schema]:
         """
         This function go over the statement and extract the used tables names and the operation that it is been done
@@ -369,3 +392,12 @@ class SqlQueryExtractor:
             return "".join(token.value for token in identifier.tokens[:ws_index])
 
         return identifier.value
+
+
+@functools.lru_cache(maxsize=EXTRACTED_QUERIES_CACHE_SIZE)
+def _extract_query_operations_schemas(
+    calculate_file_path: Callable[[str], str], query: str
+) -> Dict[OP_TYPE, Schema]:
+    sql_query_extractor = SqlQueryExtractor(calculate_file_path)
+    parsed_query = sqlparse.parse(sql_query_extractor.clean_query(query))[0]
+    return sql_query_extractor.extract_operations_schemas(parsed_query)
@@ -3,10 +3,8 @@
 import json
 import logging
 import os.path
-import shutil
 
-from datetime import datetime
-from typing import Dict, Optional, TypeVar
+from typing import IO, Dict, Iterator, Optional, Set, Tuple, TypeVar
 
 import attr
 import yaml
@@ -19,10 +17,25 @@ from dbnd._core.utils.one_time_logger import get_one_time_logger
 from dbnd.providers.dbt.dbt_adapters import Adapter
 
 
+try:
+    import ijson
+except ImportError:
+    # manifest is loaded in memory and pruned afterwards
+    ijson = None
+
 T = TypeVar("T")
 
 logger = logging.getLogger(__name__)
 
+# sections of the manifest we report as is
+MANIFEST_SECTIONS = ("metadata", "sources")
+# sections of the manifest keyed by node id, we report only the nodes of the run
+MANIFEST_NODE_SECTIONS = ("nodes", "parent_map", "child_map")
+
+DBT_CORE_MAX_LOGS_SIZE = 10 * 1024 * 1024
+# position of the collected part of dbt.log, see _read_new_logs
+DBT_LOG_STATE_FILE_NAME = ".dbnd_dbt_log_state.json"
+
 
 ################
 #              #
@@ -31,12 +44,20 @@ logger = logging.getLogger(__name__)
 ################
 
 
-def collect_data_from_dbt_core(dbt_project_path: str):
+def collect_data_from_dbt_core(
+    dbt_project_path: str,
+    prune_manifest: bool = True,
+    max_logs_size: Optional[int] = DBT_CORE_MAX_LOGS_SIZE,
+):
     """
     Collect metadata for a single run of dbt core command.
 
     Args:
         dbt_project_path: Path (on local fs) where dbt project is located.
+        prune_manifest: Report only the nodes of the manifest that are part of the run
+            (the manifest is streamed if `ijson` is installed).
+        max_logs_size: Report only the last `max_logs_size` bytes of dbt.log written since the previous
+            collection, None for all of them.
     """
     tracker = _get_tracker()
 
@@ -50,7 +71,9 @@ def collect_data_from_dbt_core(dbt_project_path: str):
     phase: str = ""
     try:
         phase = "load"
-        assets = _load_dbt_core_assets(dbt_project_path)
+        assets = _load_dbt_core_assets(
+            dbt_project_path, prune_manifest=prune_manifest, max_logs_size=max_logs_size
+        )
 
         phase = "extract-metadata"
         data = assets.extract_metadata()
@@ -66,14 +89,22 @@ def collect_data_from_dbt_core(dbt_project_path: str):
         log_exception(f"Could not {phase} data from dbt core", e)
 
 
-def _load_dbt_core_assets(dbt_project_path: str) -> "DbtCoreAssets":
+def _load_dbt_core_assets(
+    dbt_project_path: str,
+    prune_manifest: bool = False,
+    max_logs_size: Optional[int] = None,
+) -> "DbtCoreAssets":
     runs_info = _load_json_file(
         os.path.join(dbt_project_path, "target", "run_results.json")
     )
-    manifest = _load_json_file(
-        os.path.join(dbt_project_path, "target", "manifest.json")
-    )
-    logs = _read_and_truncate_logs(dbt_project_path)
+    manifest_path = os.path.join(dbt_project_path, "target", "manifest.json")
+    if prune_manifest:
+        manifest = _load_pruned_manifest(
+            manifest_path, node_ids={r["unique_id"] for r in runs_info["results"]}
+        )
+    else:
+        manifest = _load_json_file(manifest_path)
+    logs = _read_new_logs(dbt_project_path, max_logs_size=max_logs_size)
     project = _load_yaml_with_jinja(os.path.join(dbt_project_path, "dbt_project.yml"))
     profile = _read_profile(runs_info, project)
 
@@ -197,6 +228,94 @@ def _load_json_file(file_path: str) -> Dict:
         return json.loads(file.read())
 
 
+def _load_pruned_manifest(file_path: str, node_ids: Set[str]) -> Dict:
+    """
+    Loads only the parts of the manifest we report: the nodes of the run, their sources and metadata.
+    With ijson the rest of the manifest (usually the biggest part of it) is never loaded in memory.
+    """
+    if ijson is None:
+        return _prune_manifest(_load_json_file(file_path), node_ids)
+
+    with open(file_path, "rb") as file:
+        return _stream_pruned_manifest(file, node_ids)
+
+
+def _prune_manifest(manifest: Dict, node_ids: Set[str]) -> Dict:
+    pruned = {
+        section: manifest[section]
+        for section in MANIFEST_SECTIONS
+        if section in manifest
+    }
+    for section in MANIFEST_NODE_SECTIONS:
+        if section in manifest:
+            pruned[section] = {
+                node_id: node
+                for node_id, node in manifest[section].items()
+                if node_id in node_ids
+            }
+    return pruned
+
+
+def _stream_pruned_manifest(file: IO[bytes], node_ids: Set[str]) -> Dict:
+    events = ijson.parse(file, use_float=True)
+    pruned = {}
+    # the top level is a map of sections, nested values are consumed by the helpers
+    for _, event, section in events:
+        if event != "map_key":
+            continue
+        if section in MANIFEST_SECTIONS:
+            pruned[section] = _build_json_value(events)
+        elif section in MANIFEST_NODE_SECTIONS:
+            pruned[section] = _build_json_map_entries(events, node_ids)
+        else:
+            _skip_json_value(events)
+    return pruned
+
+
+_JsonEvents = Iterator[Tuple[str, str, object]]
+
+
+def _consume_json_value(events: _JsonEvents, builder=None):
+    depth = 0
+    for _, event, value in events:
+        if builder is not None:
+            builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if depth == 0:
+            return
+
+
+def _build_json_value(events: _JsonEvents):
+    builder = ijson.ObjectBuilder()
+    _consume_json_value(events, builder)
+    return builder.value
+
+
+def _skip_json_value(events: _JsonEvents):
+    _consume_json_value(events)
+
+
+def _build_json_map_entries(events: _JsonEvents, keys: Set[str]) -> Optional[Dict]:
+    """Builds only the entries of the next map (in the events) with the given keys"""
+    _, event, _ = next(events)
+    if event != "start_map":
+        # null
+        return None
+
+    entries = {}
+    for _, event, key in events:
+        if event == "end_map":
+            break
+        if key in keys:
+            entries[key] = _build_json_value(events)
+        else:
+            _skip_json_value(events)
+    return entries
+
+
 def _read_profile(runs_info: Dict, project: Dict) -> Dict:
     try:
         profile_dir = runs_info["args"]["profiles_dir"]
@@ -211,23 +330,62 @@ def _read_profile(runs_info: Dict, project: Dict) -> Dict:
         raise
 
 
-def _read_and_truncate_logs(dbt_project_path: str) -> str:
+def _read_new_logs(dbt_project_path: str, max_logs_size: Optional[int] = None) -> str:
+    """
+    Reads the lines of dbt.log written since the previous collection of the project.
+
+    The log file is never copied or truncated (dbt may still write into it), the position of the
+    collected part is kept at the state file next to the log. A new log file (rotated or truncated)
+    is read from its beginning. If there are more than `max_logs_size` new bytes, only the last ones are read.
+    """
     dbt_log_path = os.path.join(dbt_project_path, "logs", "dbt.log")
-    with open(dbt_log_path, "r") as logs_file:
-        logs = logs_file.read()
+    state_path = os.path.join(dbt_project_path, "logs", DBT_LOG_STATE_FILE_NAME)
+    state = _load_dbt_log_state(state_path)
+
+    with open(dbt_log_path, "rb") as logs_file:
+        log_stat = os.fstat(logs_file.fileno())
+        offset = state.get("offset", 0)
+        if state.get("inode") != log_stat.st_ino or offset > log_stat.st_size:
+            offset = 0
+
+        start = offset
+        if max_logs_size is not None:
+            start = max(offset, log_stat.st_size - max_logs_size)
+        logs_file.seek(start)
+        new_logs = logs_file.read(log_stat.st_size - start)
+
+    # the last line can be still written, we'll collect it next time
+    if not new_logs.endswith(b"\n") and b"\n" in new_logs:
+        new_logs = new_logs[: new_logs.rindex(b"\n") + 1]
+    _save_dbt_log_state(
+        state_path, {"inode": log_stat.st_ino, "offset": start + len(new_logs)}
+    )
 
-    # Copy original log file to new location, only for backup purposes.
-    current_date = datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f")
-    new_file_name = f"dbt.log.{current_date}"
-    new_file_path = os.path.join(dbt_project_path, "logs", new_file_name)
-    shutil.copy(dbt_log_path, new_file_path)
+    logs = new_logs.decode("utf-8", errors="replace")
+    if start > offset:
+        # the first line is (most probably) cut in the middle
+        logs = logs.split("\n", 1)[-1]
+        truncated_size = start + len(new_logs) - offset - len(logs.encode("utf-8"))
+        logs = "[%s bytes of dbt.log are truncated]\n%s" % (truncated_size, logs)
+    return logs
 
-    # Truncate the original file.
-    #  If there are open handles to it, they will continue writing, but to empty file
-    with open(dbt_log_path, "w") as _:
-        pass
 
-    return logs
+def _load_dbt_log_state(state_path: str) -> Dict:
+    if not os.path.exists(state_path):
+        return {}
+    try:
+        with open(state_path, "r") as state_file:
+            return json.load(state_file)
+    except Exception as e:
+        log_exception("Failed to read dbt log state, reading the whole log", e)
+        return {}
+
+
+def _save_dbt_log_state(state_path: str, state: Dict) -> None:
+    tmp_state_path = "%s.%s.tmp" % (state_path, os.getpid())
+    with open(tmp_state_path, "w") as state_file:
+        json.dump(state, state_file)
+    os.replace(tmp_state_path, state_path)
 
 
 def _extract_environment(runs_info, profile):
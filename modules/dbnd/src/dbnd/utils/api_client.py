@@ -3,6 +3,7 @@
 import gzip
 import json
 import logging
+import threading
 import uuid
 
 from datetime import datetime, timedelta
@@ -87,6 +88,8 @@ class ApiClient(object):
 
         self.session: Optional[requests.Session] = None
         self.session_creation_time = None
+        # the session can be shared by multiple sender threads, we want it to be created only once
+        self._session_lock = threading.RLock()
         self.session_timeout = session_timeout
 
         self.default_max_retry = default_max_retry
@@ -293,17 +296,27 @@ class ApiClient(object):
         return bool(self._api_base_url)
 
     def authenticated_session(self):
-        if not self.session or self.is_session_expired():
-            logger.debug(
-                "Webserver session does not exist or timed out, creating new one"
-            )
-            self.create_session()
-            self._authenticate()
-        return self.session
+        with self._session_lock:
+            if not self.session or self.is_session_expired():
+                logger.debug(
+                    "Webserver session does not exist or timed out, creating new one"
+                )
+                self.create_session()
+                self._authenticate()
+            return self.session
 
     def anonymous_session(self) -> requests.Session:
         return requests.session()
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_session_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._session_lock = threading.RLock()
+
     def __str__(self):
         return "{}({})".format(self.__class__.__name__, self._api_base_url)
 
@@ -11,6 +11,7 @@ import attr
 import six
 
 from dbnd._core.current import try_get_databand_run
+from dbnd._core.utils.basics.singleton_context import SingletonContext
 from targets.config import is_in_memory_cache_target_value
 
 
@@ -88,6 +89,71 @@ class TargetCache(object):
 TARGET_CACHE = TargetCache()
 
 
+_WILDCARD_CHARS = ("*", "?", "[", "{")
+
+
+def _get_existence_file_target(target):
+    """The file target that defines existence of the target, None if it can't be resolved by path"""
+    from targets.dir_target import DirTarget
+    from targets.file_target import FileTarget
+
+    if isinstance(target, DirTarget) and target.flag_target:
+        target = target.flag_target
+    if not isinstance(target, FileTarget):
+        return None
+    if any(c in target.path for c in _WILDCARD_CHARS):
+        return None
+    return target
+
+
+class TargetsExistenceCache(SingletonContext):
+    """
+    Existence of targets, shared by all the completeness checks of a run.
+
+    `prefetch` resolves many targets at once by `FileSystem.exists_many`
+    (a single listing per common prefix on object stores), other targets are checked on first access.
+    The cache is used by `target_exists` only while it's the current context,
+    the targets are not re-checked, so it shouldn't be active while tasks create their outputs.
+    """
+
+    def __init__(self):
+        super(TargetsExistenceCache, self).__init__()
+        self._exists = {}  # type: Dict[str, bool]
+
+    def prefetch(self, targets):
+        paths_by_fs = {}
+        for target in targets:
+            file_target = _get_existence_file_target(target)
+            if file_target is None or file_target.path in self._exists:
+                continue
+            fs = file_target.fs
+            paths_by_fs.setdefault(id(fs), (fs, set()))[1].add(file_target.path)
+
+        for fs, paths in paths_by_fs.values():
+            self._exists.update(fs.exists_many(sorted(paths)))
+
+    def exists(self, target):
+        file_target = _get_existence_file_target(target)
+        if file_target is None:
+            return target.exists()
+
+        path = file_target.path
+        if path not in self._exists:
+            self._exists[path] = file_target.exists()
+        return self._exists[path]
+
+    def clear(self):
+        self._exists.clear()
+
+
+def target_exists(target):
+    """Existence of the target, by the current TargetsExistenceCache if there is one"""
+    existence_cache = TargetsExistenceCache.try_get_instance()
+    if existence_cache is None:
+        return target.exists()
+    return existence_cache.exists(target)
+
+
 class DbndLocalFileMetadataRegistry(object):
     """
     :type file_path: str
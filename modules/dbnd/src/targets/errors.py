@@ -26,6 +26,17 @@ class FailedToCopy(FileSystemException):
     """
 
 
+class BulkOperationException(FileSystemException):
+    """
+    Raised when some of the calls of a bulk operation (copy_many, remove_many, ...) failed
+    """
+
+    def __init__(self, message, failures):
+        super(BulkOperationException, self).__init__(message)
+        # list of (args, exception)
+        self.failures = failures
+
+
 class MissingParentDirectory(FileSystemException):
     """
     Raised when a parent directory doesn't exist.
@@ -30,6 +30,21 @@ class PandasMarshallingCtrl(DataTargetCtrl):
         for t in pd_m.load_partitioned(**kwargs):
             yield t
 
+    def read_chunks(self, chunksize, config=None, **kwargs):
+        """Reads the data frame chunk by chunk, without loading all of it into memory"""
+        pd_m = get_marshaller_ctrl(self.target, DataFrame, config=config)
+        for chunk in pd_m.load_chunks(chunksize, **kwargs):
+            yield chunk
+
+    def support_chunks_read(self, config=None):
+        if (config or self.target.config).format is None:
+            return False
+        try:
+            pd_m = get_marshaller_ctrl(self.target, DataFrame, config=config)
+        except Exception:
+            return False
+        return getattr(pd_m.marshaller, "support_chunks_read", False)
+
     @target_timeit
     def to(self, df, config=None, **kwargs):
         pd_m = get_marshaller_ctrl(
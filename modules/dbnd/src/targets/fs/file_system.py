@@ -2,19 +2,47 @@
 
 import abc
 import errno
+import itertools
 import logging
 import os
+import posixpath
 import warnings
 
 import six
 
 from targets.errors import FileAlreadyExists
 from targets.utils.atomic import AtomicLocalFile
+from targets.utils.bulk import (
+    DEFAULT_BULK_MAX_CONCURRENCY,
+    DEFAULT_BULK_MAX_RETRIES,
+    run_bulk,
+)
+from targets.utils.ranged_read import (
+    DEFAULT_BLOCK_SIZE,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_READ_AHEAD_BLOCKS,
+    RangedReadFile,
+)
 
 
 logger = logging.getLogger(__name__)
 
 
+def _listing_prefix(path, depth):
+    """The folder `depth` levels above the path, None if it's the root of the bucket (or higher)"""
+    scheme_end = path.find("://")
+    bucket_root_end = path.find("/", scheme_end + 3) if scheme_end >= 0 else 0
+    if bucket_root_end < 0:
+        return None
+
+    prefix = path.rstrip("/")
+    for _ in range(depth):
+        prefix = posixpath.dirname(prefix)
+    if len(prefix) <= bucket_root_end + 1:
+        return None
+    return prefix + "/"
+
+
 @six.add_metaclass(abc.ABCMeta)
 class FileSystem(object):
     """
@@ -33,6 +61,25 @@ class FileSystem(object):
     _exist_after_write_consistent = True
     local = False
 
+    # resolve existence of many paths by listing their common prefixes, see `exists_many`
+    exists_many_by_listing = False
+    # paths are grouped by their folder `exists_many_listing_depth` levels up,
+    # e.g. `task_family/` for `task_family/task_family_signature/output.csv`
+    exists_many_listing_depth = 2
+    # only groups of more paths are listed, smaller groups are checked path by path
+    exists_many_listing_min_paths = 8
+    # a listing of more objects is stopped, its paths are checked path by path
+    exists_many_listing_max_objects = 10000
+
+    # reads of the files opened by `open_ranged_read`
+    read_block_size = DEFAULT_BLOCK_SIZE
+    read_max_concurrency = DEFAULT_MAX_CONCURRENCY
+    read_ahead_blocks = DEFAULT_READ_AHEAD_BLOCKS
+
+    # bulk operations (`copy_many`, `remove_many`, `put_many`, `get_many`)
+    bulk_max_concurrency = DEFAULT_BULK_MAX_CONCURRENCY
+    bulk_max_retries = DEFAULT_BULK_MAX_RETRIES
+
     @classmethod
     def exist_after_write_consistent(cls):
         return cls._exist_after_write_consistent
@@ -45,6 +92,63 @@ class FileSystem(object):
         :param str path: a path within the FileSystem to check for existence.
         """
 
+    def exists_many(self, paths):
+        """
+        Return a ``{path: exists}`` dict for all the ``paths``.
+
+        File systems with ``exists_many_by_listing`` (object stores, where every ``exists`` is a request)
+        group the paths by their common prefix and resolve every group of more than
+        ``exists_many_listing_min_paths`` paths by a single ``listdir``,
+        limited to ``exists_many_listing_max_objects`` objects. Other paths are checked one by one.
+        """
+        if not self.exists_many_by_listing:
+            return {path: self.exists(path) for path in paths}
+
+        paths_by_prefix = {}
+        for path in paths:
+            prefix = _listing_prefix(path, self.exists_many_listing_depth)
+            paths_by_prefix.setdefault(prefix, []).append(path)
+
+        result = {}
+        for prefix, prefix_paths in paths_by_prefix.items():
+            files = None
+            if (
+                prefix is not None
+                and len(prefix_paths) > self.exists_many_listing_min_paths
+            ):
+                files = self._list_limited(prefix)
+            if files is None:
+                for path in prefix_paths:
+                    result[path] = self.exists(path)
+                continue
+
+            folders = set()
+            for file_path in files:
+                folder = posixpath.dirname(file_path)
+                while len(folder) >= len(prefix) and folder + "/" not in folders:
+                    folders.add(folder + "/")
+                    folder = posixpath.dirname(folder)
+
+            for path in prefix_paths:
+                result[path] = path in files or path.rstrip("/") + "/" in folders
+        return result
+
+    def _list_limited(self, prefix):
+        """The files under the prefix, None if there are more than `exists_many_listing_max_objects`"""
+        files = set(
+            itertools.islice(
+                self.listdir(prefix), self.exists_many_listing_max_objects + 1
+            )
+        )
+        if len(files) > self.exists_many_listing_max_objects:
+            logger.debug(
+                "%s has more than %s objects, checking the paths one by one",
+                prefix,
+                self.exists_many_listing_max_objects,
+            )
+            return None
+        return files
+
     @abc.abstractmethod
     def remove(self, path, recursive=True, skip_trash=True):
         """Remove file or directory at location ``path``
@@ -149,13 +253,15 @@ class FileSystem(object):
 
     def copy_from_local(self, local_path, dest, **kwargs):
         if os.path.isdir(local_path):
+            uploads = []
             for path, subdirs, files in os.walk(local_path):
                 for file in files:
                     # construct the full local path
                     local_file_path = os.path.join(local_path, path, file)
                     relative_path = os.path.relpath(local_file_path, local_path)
                     remote_path = os.path.join(dest, relative_path)
-                    self.copy_from_local_file(local_file_path, remote_path, **kwargs)
+                    uploads.append((local_file_path, remote_path))
+            self.put_many(uploads, **kwargs)
         else:
             self.copy_from_local_file(local_path, dest, **kwargs)
 
@@ -197,11 +303,84 @@ class FileSystem(object):
             "download_file() not implemented on {0}".format(self.__class__.__name__)
         )
 
+    def _run_bulk(self, func, calls):
+        return run_bulk(
+            func,
+            calls,
+            max_concurrency=self.bulk_max_concurrency,
+            max_retries=self.bulk_max_retries,
+        )
+
+    def copy_many(self, pairs, **kwargs):
+        """
+        Copy every ``(path, dest)`` of ``pairs``, see ``copy``.
+
+        The copies run concurrently (up to ``bulk_max_concurrency``), the failed ones are retried,
+        raises :py:class:`BulkOperationException` if some of them still fail.
+        """
+
+        def copy(path, dest):
+            self.copy(path, dest, **kwargs)
+
+        self._run_bulk(copy, pairs)
+
+    def remove_many(self, paths, recursive=True):
+        """
+        Remove all the ``paths`` concurrently, see ``copy_many``.
+
+        File systems with a batch delete API remove many files by a single request.
+        """
+
+        def remove(path):
+            self.remove(path, recursive=recursive)
+
+        self._run_bulk(remove, [(path,) for path in paths])
+
+    def put_many(self, pairs, **kwargs):
+        """
+        Upload every ``(local_path, dest)`` of ``pairs`` concurrently, see ``copy_many``.
+        """
+
+        def put(local_path, dest):
+            self.copy_from_local_file(local_path, dest, **kwargs)
+
+        self._run_bulk(put, pairs)
+
+    def get_many(self, pairs, **kwargs):
+        """
+        Download every ``(path, location)`` of ``pairs`` concurrently, see ``copy_many``.
+        """
+
+        def get(path, location):
+            parent_location = os.path.dirname(location)
+            if parent_location and not os.path.exists(parent_location):
+                try:
+                    os.makedirs(parent_location)
+                except OSError as err:
+                    # another download has already created the path
+                    if err.errno != errno.EEXIST:
+                        raise
+            self.download_file(path, location, **kwargs)
+
+        self._run_bulk(get, pairs)
+
     def open_read(self, path, mode="r"):
         raise NotImplementedError(
             "open_read() not implemented on {0}".format(self.__class__.__name__)
         )
 
+    def open_ranged_read(self, path, size, read_range, **kwargs):
+        """
+        Seekable file over ``read_range(start, end) -> bytes`` (end is exclusive),
+        the ranges are fetched concurrently and read ahead, see :py:class:`RangedReadFile`.
+
+        For file systems that can read a byte range of a file without downloading all of it.
+        """
+        kwargs.setdefault("block_size", self.read_block_size)
+        kwargs.setdefault("max_concurrency", self.read_max_concurrency)
+        kwargs.setdefault("read_ahead_blocks", self.read_ahead_blocks)
+        return RangedReadFile(read_range, size, name=path, **kwargs)
+
     def open_write(self, path, mode="w", **kwargs):
         return AtomicLocalFile(path, self, mode=mode, **kwargs)
 
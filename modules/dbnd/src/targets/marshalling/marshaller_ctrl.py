@@ -102,6 +102,30 @@ class MarshallerCtrl(object):
         for t in self.target.list_partitions():
             yield self.marshaller.target_to_value(t, **kwargs)
 
+    def load_chunks(self, chunksize, **kwargs):
+        """
+        Loads the target chunk by chunk,
+        the partitions of directories are read one after another instead of merging them.
+        """
+        from targets.dir_target import DirTarget
+        from targets.file_target import FileTarget
+        from targets.multi_target import MultiTarget
+
+        target = self.target
+        if isinstance(target, FileTarget) and target.fs.isdir(target.path):
+            target = DirTarget(target.path + "/", target.fs, config=target.config)
+
+        if isinstance(target, (MultiTarget, DirTarget)):
+            partitions = target.list_partitions()
+        else:
+            partitions = [target]
+
+        for partition in partitions:
+            for chunk in self.marshaller.target_to_chunks(
+                partition, chunksize, **kwargs
+            ):
+                yield chunk
+
 
 def _marshaller_options_message(value_type, value_options, object_options):
     value_options = set(value_options.keys())
@@ -0,0 +1,413 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+"""
+Vectorized column statistics for pandas DataFrames.
+
+Columns are grouped by dtype and every group is processed with a few NumPy operations:
+numeric columns are sorted once (min, max, quartiles and distinct count are read from the sorted
+block), other columns are factorized once (unique, top, freq and distinct count are read from the codes).
+The results are the same as of `df.describe(include="all")` that was used before,
+including its json rounding of float values.
+"""
+
+import datetime
+import json
+import logging
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import attr
+import numpy as np
+import pandas as pd
+
+from pandas.api.types import (
+    is_bool_dtype,
+    is_complex_dtype,
+    is_extension_array_dtype,
+    is_numeric_dtype,
+    is_object_dtype,
+    is_string_dtype,
+)
+
+from dbnd._core.tracking.schemas.column_stats import ColumnStatsArgs
+from targets.providers.pandas.pandas_sketches import (
+    estimate_distinct_count,
+    estimate_distinct_count_from_sample,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# `df.describe().to_json()` rounded float values to 10 decimal digits
+_JSON_DOUBLE_PRECISION = 10
+# limits the memory of the sorted copy of a numeric block
+_NUMERIC_BLOCK_MAX_CELLS = 32 * 1024 * 1024
+_QUARTILES = (0.25, 0.5, 0.75)
+
+
+def _to_json_value(value):
+    # type: (Any) -> Any
+    """Normalize value the same way describe().to_json() + json.loads did"""
+    if value is None:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        if np.isnan(value) or np.isinf(value):
+            return None
+        return round(value, _JSON_DOUBLE_PRECISION)
+    if isinstance(value, (pd.Timestamp, datetime.datetime)):
+        # json epoch in milliseconds
+        return int(pd.Timestamp(value).value // 10**6)
+    return value
+
+
+def _is_fast_numeric(dtype):
+    return (
+        is_numeric_dtype(dtype)
+        and not is_bool_dtype(dtype)
+        and not is_complex_dtype(dtype)
+    )
+
+
+def _is_fast_categorical(dtype):
+    return (
+        is_object_dtype(dtype)
+        or is_bool_dtype(dtype)
+        or is_string_dtype(dtype)
+        or isinstance(dtype, pd.CategoricalDtype)
+    )
+
+
+def get_column_type(column):
+    # type: (pd.Series) -> str
+    first_index = column.first_valid_index()
+    if first_index is None:
+        return column.dtype.name
+    first_value = column.at[first_index]
+    return type(first_value).__name__
+
+
+def _describe_columns_legacy(df):
+    # type: (pd.DataFrame) -> List[ColumnStatsArgs]
+    """describe() based calculation, used for columns not supported by the vectorized path"""
+    if df.columns.empty:
+        return []
+    try:
+        stats = df.describe(include="all").to_json()
+    except Exception as e:
+        logger.warning("Failed to describe df: %s", e)
+        stats = df.explode().describe(include="all").to_json()
+    stats = json.loads(stats)
+
+    columns_stats = []
+    for column_name, column in df.items():
+        column_describe = {
+            k: v for k, v in stats.get(str(column_name), {}).items() if v is not None
+        }
+        null_count = np.count_nonzero(pd.isnull(column))
+        try:
+            distinct_count = len(column.unique())
+        except Exception:
+            logger.warning("Failed to determine column type for: %s.", column_name)
+            try:
+                distinct_count = len(column.astype("str").unique())
+            except Exception:
+                # Support pandas >= v1.0
+                distinct_count = len(column.astype("string").unique())
+
+        columns_stats.append(
+            ColumnStatsArgs(
+                column_name=str(column_name),
+                column_type=get_column_type(column),
+                records_count=column.size,
+                null_count=null_count,
+                distinct_count=distinct_count,
+                most_freq_value=column_describe.get("top"),
+                most_freq_value_count=column_describe.get("freq"),
+                unique_count=column_describe.get("unique"),
+                mean_value=column_describe.get("mean"),
+                min_value=column_describe.get("min"),
+                max_value=column_describe.get("max"),
+                std_value=column_describe.get("std"),
+                quartile_1=column_describe.get("25%"),
+                quartile_2=column_describe.get("50%"),
+                quartile_3=column_describe.get("75%"),
+            )
+        )
+    return columns_stats
+
+
+def _numeric_block_stats(block, column_names, column_types):
+    # type: (np.ndarray, List[str], List[Optional[str]]) -> List[ColumnStatsArgs]
+    """
+    Stats of a 2d block of numeric columns of the same dtype.
+    Missing column types are taken from the dtype of the block.
+    """
+    records_count, _ = block.shape
+    is_float = block.dtype.kind == "f"
+
+    # NaNs are sorted to the end, so valid values of a column are sorted_block[:valid_count]
+    sorted_block = np.sort(block, axis=0)
+    # same accumulation dtypes as pandas nanmean/nanstd, so float32 columns get the same values,
+    # column-major layout keeps numpy pairwise summation along the columns
+    block = np.asfortranarray(block)
+    if is_float:
+        valid = ~np.isnan(block)
+        valid_count = valid.sum(axis=0)
+        values = np.asfortranarray(np.where(valid, block, block.dtype.type(0)))
+    else:
+        valid = None
+        valid_count = np.full(block.shape[1], records_count)
+        values = block.astype(np.float64)
+    null_count = records_count - valid_count
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (values.sum(axis=0) / valid_count).astype(values.dtype)
+        deviation = values - values.sum(axis=0, dtype=np.float64) / valid_count
+        if valid is not None:
+            deviation = np.where(valid, deviation, 0.0)
+        variance = (deviation**2).sum(axis=0, dtype=np.float64) / (valid_count - 1)
+        std = np.sqrt(variance.astype(values.dtype)).astype(np.float64)
+        std[valid_count < 2] = np.nan
+    del values, deviation
+
+    if not records_count:
+        # an empty block has no values to read from the sorted block
+        sorted_block = np.full((1, block.shape[1]), np.nan)
+
+    last = np.maximum(valid_count - 1, 0)
+    columns_idx = np.arange(block.shape[1])
+    min_value = sorted_block[0].astype(np.float64)
+    max_value = sorted_block[last, columns_idx].astype(np.float64)
+
+    quartiles = []
+    for q in _QUARTILES:
+        position = q * last
+        lower = np.floor(position).astype(np.intp)
+        upper = np.ceil(position).astype(np.intp)
+        lower_value = sorted_block[lower, columns_idx].astype(np.float64)
+        upper_value = sorted_block[upper, columns_idx].astype(np.float64)
+        quartiles.append(lower_value + (upper_value - lower_value) * (position - lower))
+
+    # unique() counts NaN as a value
+    changes = sorted_block[1:] != sorted_block[:-1]
+    if is_float:
+        changes &= ~np.isnan(sorted_block[1:])
+    distinct_count = np.where(valid_count > 0, changes.sum(axis=0) + 1, 0)
+    distinct_count += null_count > 0
+
+    columns_stats = []
+    for i, column_name in enumerate(column_names):
+        has_values = valid_count[i] > 0
+        column_type = column_types[i]
+        if column_type is None:
+            # numpy dtype columns always hold the scalars of the dtype
+            column_type = block.dtype.type.__name__ if has_values else block.dtype.name
+
+        columns_stats.append(
+            ColumnStatsArgs(
+                column_name=column_name,
+                column_type=column_type,
+                records_count=records_count,
+                null_count=int(null_count[i]),
+                distinct_count=int(distinct_count[i]),
+                mean_value=_to_json_value(mean[i]),
+                std_value=_to_json_value(std[i]),
+                min_value=_to_json_value(min_value[i]) if has_values else None,
+                max_value=_to_json_value(max_value[i]) if has_values else None,
+                quartile_1=_to_json_value(quartiles[0][i]) if has_values else None,
+                quartile_2=_to_json_value(quartiles[1][i]) if has_values else None,
+                quartile_3=_to_json_value(quartiles[2][i]) if has_values else None,
+            )
+        )
+    return columns_stats
+
+
+def _numeric_columns_stats(df, positions):
+    # type: (pd.DataFrame, List[int]) -> List[ColumnStatsArgs]
+    """Stats of the numeric columns at `positions`, all of them are of the same dtype"""
+    dtype = df.dtypes.iloc[positions[0]]
+    max_columns = max(1, _NUMERIC_BLOCK_MAX_CELLS // max(len(df), 1))
+
+    columns_stats = []
+    for start in range(0, len(positions), max_columns):
+        chunk_positions = positions[start : start + max_columns]
+        chunk = df.iloc[:, chunk_positions]
+        column_names = [str(df.columns[position]) for position in chunk_positions]
+        if is_extension_array_dtype(dtype):
+            block = chunk.to_numpy(dtype=np.float64, na_value=np.nan)
+            column_types = [
+                get_column_type(chunk.iloc[:, i]) for i in range(len(chunk_positions))
+            ]
+        else:
+            block = chunk.to_numpy()
+            column_types = [None] * len(chunk_positions)
+
+        columns_stats.extend(_numeric_block_stats(block, column_names, column_types))
+    return columns_stats
+
+
+def _categorical_column_stats(column):
+    # type: (pd.Series) -> ColumnStatsArgs
+    codes, uniques = pd.factorize(column, sort=False)
+    null_mask = codes < 0
+    null_count = int(np.count_nonzero(null_mask))
+
+    unique_count = len(uniques)
+    most_freq_value, most_freq_value_count = None, None
+    if unique_count:
+        counts = np.bincount(codes[~null_mask], minlength=unique_count)
+        # uniques are in the order of appearance like in value_counts(),
+        # sorting the same way picks the same top value on ties
+        top = int(pd.Series(counts).sort_values(ascending=False).index[0])
+        most_freq_value = _to_json_value(uniques[top])
+        most_freq_value_count = int(counts[top])
+
+    # unique() keeps None and NaN as different values, factorize() treats both as null
+    distinct_count = unique_count
+    if null_count:
+        distinct_count += len(pd.unique(column[null_mask]))
+
+    return ColumnStatsArgs(
+        column_name=str(column.name),
+        column_type=get_column_type(column),
+        records_count=column.size,
+        null_count=null_count,
+        distinct_count=distinct_count,
+        unique_count=unique_count,
+        most_freq_value=most_freq_value,
+        most_freq_value_count=most_freq_value_count,
+    )
+
+
+def calculate_columns_stats(df):
+    # type: (pd.DataFrame) -> List[ColumnStatsArgs]
+    """Calculate ColumnStatsArgs of all the columns of the df, in the df columns order"""
+    stats_by_position = {}  # type: Dict[int, ColumnStatsArgs]
+    numeric_groups = {}  # type: Dict[Any, List[int]]
+    legacy_positions = []  # type: List[int]
+
+    for position, dtype in enumerate(df.dtypes):
+        if _is_fast_numeric(dtype):
+            numeric_groups.setdefault(dtype, []).append(position)
+        elif _is_fast_categorical(dtype):
+            column = df.iloc[:, position]
+            try:
+                stats_by_position[position] = _categorical_column_stats(column)
+            except Exception:
+                # unhashable values and similar, describe() has its own workarounds
+                legacy_positions.append(position)
+        else:
+            legacy_positions.append(position)
+
+    for positions in numeric_groups.values():
+        group_stats = _numeric_columns_stats(df, positions)
+        stats_by_position.update(zip(positions, group_stats))
+
+    if legacy_positions:
+        legacy_stats = _describe_columns_legacy(df.iloc[:, legacy_positions])
+        stats_by_position.update(zip(legacy_positions, legacy_stats))
+
+    return [stats_by_position[position] for position in range(len(df.columns))]
+
+
+def calculate_columns_stats_legacy(df):
+    # type: (pd.DataFrame) -> List[ColumnStatsArgs]
+    """The describe() based calculation of all the columns, kept for benchmarks and comparison"""
+    return _describe_columns_legacy(df)
+
+
+def build_sampled_column_stats(
+    sample_stats,  # type: ColumnStatsArgs
+    scale,  # type: float
+    records_count,  # type: int
+    null_count,  # type: int
+    distinct_count,  # type: Optional[int]
+    numeric_stats=None,  # type: Optional[Tuple[Any, Any, Any, Any]]
+):
+    # type: (...) -> ColumnStatsArgs
+    """
+    Combine the stats of a sample with the stats calculated on all the rows.
+    `numeric_stats` is (mean, std, min, max) of all the rows, counts of the sample are scaled by `scale`.
+    """
+    stats = attr.asdict(sample_stats)
+    # derived from the counts below
+    stats.pop("non_null_count")
+    stats.pop("null_percent")
+
+    stats["records_count"] = records_count
+    stats["null_count"] = null_count
+    if distinct_count is not None:
+        stats["distinct_count"] = distinct_count
+        if stats["unique_count"] is not None:
+            stats["unique_count"] = distinct_count - (1 if null_count else 0)
+    if stats["most_freq_value_count"] is not None:
+        stats["most_freq_value_count"] = int(
+            round(stats["most_freq_value_count"] * scale)
+        )
+    if numeric_stats is not None and stats["mean_value"] is not None:
+        mean, std, min_value, max_value = numeric_stats
+        stats["mean_value"] = _to_json_value(mean)
+        stats["std_value"] = _to_json_value(std)
+        # the same float values as the block calculation
+        stats["min_value"] = _to_json_value(float(min_value))
+        stats["max_value"] = _to_json_value(float(max_value))
+
+    return ColumnStatsArgs(**stats)
+
+
+def calculate_sampled_columns_stats(sample_df, records_count, df=None):
+    # type: (pd.DataFrame, int, Optional[pd.DataFrame]) -> List[ColumnStatsArgs]
+    """
+    Calculate ColumnStatsArgs of `records_count` rows from their sample, only the sample is scanned.
+
+    Null counts are scaled from the sample, distinct count is estimated from the sample (Shlosser estimator),
+    mean, std, min, max, quartiles and the most frequent value are the ones of the sample.
+    With `df` (all the rows) the linear stats (counts, mean, std, min and max) are calculated on the whole df
+    and distinct count is estimated with HyperLogLog over all the rows.
+    """
+    scale = records_count / len(sample_df) if len(sample_df) else 0
+
+    columns_stats = []
+    for i, (sample_stats, (_, sample_column)) in enumerate(
+        zip(calculate_columns_stats(sample_df), sample_df.items())
+    ):
+        column = df.iloc[:, i] if df is not None else None
+        try:
+            if column is not None:
+                distinct_count = estimate_distinct_count(column)
+            else:
+                distinct_count = estimate_distinct_count_from_sample(
+                    sample_column, records_count
+                )
+        except Exception:
+            logger.warning(
+                "Failed to estimate distinct count of: %s.", sample_column.name
+            )
+            distinct_count = None
+
+        numeric_stats = None
+        if column is None:
+            null_count = int(round(sample_stats.null_count * scale))
+        else:
+            null_count = int(np.count_nonzero(pd.isnull(column)))
+            if _is_fast_numeric(column.dtype):
+                numeric_stats = (
+                    column.mean(),
+                    column.std(),
+                    column.min(),
+                    column.max(),
+                )
+
+        columns_stats.append(
+            build_sampled_column_stats(
+                sample_stats,
+                scale=scale,
+                records_count=records_count,
+                null_count=null_count,
+                distinct_count=distinct_count,
+                numeric_stats=numeric_stats,
+            )
+        )
+    return columns_stats
@@ -0,0 +1,113 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+"""
+Content hashing of pandas objects.
+
+Columns with numpy dtypes are hashed directly over their memory buffers with blake2b,
+other columns (objects, strings, extension dtypes) are hashed over their per value hashes
+(columns of unhashable values, like lists and dicts, over the hashes of their string representations).
+Huge columns can be hashed by evenly spread blocks only, see `max_column_bytes`.
+"""
+
+import hashlib
+
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from pandas.api.types import is_extension_array_dtype, is_object_dtype
+from pandas.core.util.hashing import hash_pandas_object
+
+
+HASH_DIGEST_SIZE = 16
+# block sampled hashing of a column reads SAMPLED_HASH_BLOCKS blocks of SAMPLED_HASH_BLOCK_BYTES
+SAMPLED_HASH_BLOCKS = 64
+SAMPLED_HASH_BLOCK_BYTES = 64 * 1024
+
+
+def _sampled_blocks_starts(size, block_size):
+    # type: (int, int) -> np.ndarray
+    return np.linspace(0, size - block_size, SAMPLED_HASH_BLOCKS).astype(np.int64)
+
+
+def hash_values(values, index=False):
+    # type: (Union[pd.Series, pd.Index], bool) -> np.ndarray
+    """
+    Per value hashes, the same as `hash_pandas_object`,
+    unhashable values (lists, dicts, sets) are hashed by their string representation
+    """
+    try:
+        return hash_pandas_object(values, index=index).to_numpy()
+    except TypeError:
+        return hash_pandas_object(values.astype(str), index=index).to_numpy()
+
+
+def _column_buffer(column, max_bytes):
+    # type: (Union[pd.Series, pd.Index], Optional[int]) -> np.ndarray
+    """Bytes that represent the values of the column"""
+    dtype = column.dtype
+    if not (is_object_dtype(dtype) or is_extension_array_dtype(dtype)):
+        return np.ascontiguousarray(column.to_numpy()).reshape(-1).view(np.uint8)
+
+    values_hash_size = np.dtype(np.uint64).itemsize
+    if max_bytes and len(column) * values_hash_size > max_bytes:
+        # hash the values of the sampled blocks only, the values hashing is the expensive part
+        block_rows = min(SAMPLED_HASH_BLOCK_BYTES // values_hash_size, len(column))
+        column = pd.concat(
+            [
+                column.iloc[start : start + block_rows]
+                for start in _sampled_blocks_starts(len(column), block_rows)
+            ]
+        )
+    return hash_values(column).view(np.uint8)
+
+
+def _update_with_buffer(hasher, buffer, max_bytes):
+    if not max_bytes or buffer.nbytes <= max_bytes:
+        hasher.update(buffer)
+        return
+
+    hasher.update(b"sampled:%d" % buffer.nbytes)
+    block_bytes = min(SAMPLED_HASH_BLOCK_BYTES, buffer.nbytes)
+    for start in _sampled_blocks_starts(buffer.nbytes, block_bytes):
+        hasher.update(buffer[start : start + block_bytes])
+
+
+def hash_pandas(value, index=True, max_column_bytes=None):
+    # type: (Union[pd.DataFrame, pd.Series], bool, Optional[int]) -> str
+    """
+    Hash of the content of a DataFrame or a Series: shape, column names, dtypes and values.
+
+    @param value: DataFrame or Series to hash
+    @param index: include the index into the hash
+    @param max_column_bytes: hash only sampled blocks of the columns that are larger than this,
+        much faster for huge frames, but changes outside of the sampled blocks are not detected.
+    """
+    if isinstance(value, pd.Series):
+        value = value.to_frame()
+
+    hasher = hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+    hasher.update(repr(value.shape).encode())
+
+    if index:
+        if isinstance(value.index, pd.RangeIndex):
+            range_index = value.index
+            hasher.update(
+                repr((range_index.start, range_index.stop, range_index.step)).encode()
+            )
+        else:
+            hasher.update(str(value.index.dtype).encode())
+            _update_with_buffer(
+                hasher,
+                hash_pandas_object(value.index).to_numpy().view(np.uint8),
+                max_column_bytes,
+            )
+
+    for column_name, column in value.items():
+        hasher.update(repr((column_name, str(column.dtype))).encode())
+        _update_with_buffer(
+            hasher, _column_buffer(column, max_column_bytes), max_column_bytes
+        )
+
+    return hasher.hexdigest()
@@ -1,19 +1,21 @@
 # © Copyright Databand.ai, an IBM Company 2022
 
-import json
 import logging
 import typing
 
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
 from pandas.core.dtypes.common import is_bool_dtype, is_numeric_dtype, is_string_dtype
 
-from dbnd._core.tracking.schemas.column_stats import (
-    ColumnStatsArgs,
-    get_column_stats_by_col_name,
+from dbnd._core.tracking.schemas.column_stats import ColumnStatsArgs
+from targets.providers.pandas.pandas_column_stats import (
+    calculate_columns_stats,
+    calculate_sampled_columns_stats,
+    get_column_type,
 )
 
 
@@ -34,10 +36,39 @@ class PandasHistograms(object):
         self.df = df
         self.meta_conf = meta_conf
 
+        # stats and histograms are calculated on this sample, when sampling is configured
+        self.sample_df = None  # type: Optional[pd.DataFrame]
+        # ratio between the df rows and the sampled rows, used to scale the counts
+        self.sample_scale = 1.0
+        # added to the histogram system metrics, flags the approximate results
+        self.approximation_metrics = {}  # type: Dict[str, Any]
+
+    def _build_sample(self):
+        sample_size = self.meta_conf.get_stats_sample_size(len(self.df))
+        if sample_size is None:
+            return
+
+        sample_seed = self.meta_conf.get_stats_sample_seed()
+        # unlike df.sample (a permutation of all the rows), the cost depends only on the sample size
+        positions = np.random.default_rng(sample_seed).choice(
+            len(self.df), sample_size, replace=False
+        )
+        self.sample_df = self.df.iloc[positions]
+        self.sample_scale = len(self.df) / sample_size
+        self.approximation_metrics = {
+            "stats_approximate": True,
+            "stats_sample_size": sample_size,
+            "stats_sample_seed": sample_seed,
+            "distinct_count_algorithm": "hyperloglog"
+            if self.meta_conf.log_stats_exact_counts
+            else "shlosser",
+        }
+
     def get_histograms_and_stats(
         self,
     ) -> Tuple[List[ColumnStatsArgs], Dict[str, List[List]]]:
         columns_stats, histograms = [], {}
+        self._build_sample()
 
         if self.meta_conf.log_stats:
             columns_stats = self._calculate_stats(self.df)
@@ -46,23 +77,45 @@ class PandasHistograms(object):
             hist_column_names = self._get_column_names_from_request(
                 self.df, self.meta_conf.log_histograms
             )
-            df_histograms = self.df.filter(hist_column_names)
-            if pd.__version__ > "1":
-                # return_type="expand" and orient="list" are used to stabilize produced
-                # histograms data structure across pandas v0 & v1
-                histograms = df_histograms.apply(
-                    self._calculate_histograms,
-                    result_type="expand",
-                    args=(columns_stats,),
-                ).to_dict(orient="list")
-            else:
-                histograms = df_histograms.apply(
-                    self._calculate_histograms, args=(columns_stats,)
-                ).to_dict()
-                histograms = {k: list(v) for k, v in histograms.items()}
+            df = self.df if self.sample_df is None else self.sample_df
+            histograms = self._calculate_columns_histograms(
+                df.filter(hist_column_names), columns_stats
+            )
 
         return columns_stats, histograms
 
+    def _calculate_columns_histograms(self, df, columns_stats):
+        # type: (pd.DataFrame, List[ColumnStatsArgs]) -> Dict[str, List[List]]
+        """
+        Calculate the histograms of all the df columns, in a thread pool when parallelism is configured.
+        Null counts are taken from the already calculated stats.
+        """
+        stats_by_name = {
+            column_stats.column_name: column_stats for column_stats in columns_stats
+        }
+        columns = [column for _, column in df.items()]
+
+        def calculate(column):
+            return self._calculate_histograms(
+                column, stats_by_name.get(str(column.name))
+            )
+
+        parallelism = self.meta_conf.get_histograms_parallelism()
+        if parallelism > 1 and len(columns) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(parallelism, len(columns)),
+                thread_name_prefix="dbnd-histograms",
+            ) as executor:
+                results = list(executor.map(calculate, columns))
+        else:
+            results = [calculate(column) for column in columns]
+
+        # keeps the structure of the histograms produced by df.apply(result_type="expand")
+        return {
+            column.name: list(result) if result is not None else [None, None]
+            for column, result in zip(columns, results)
+        }
+
     def _get_column_names_from_request(self, df, data_request):
         # type: (pd.DataFrame, LogDataRequest) -> List[str]
         column_names = list(data_request.include_columns)
@@ -87,74 +140,33 @@ class PandasHistograms(object):
         return column_names
 
     def _calculate_stats(self, df):
-        # type: (pd.DataFrame) -> Dict[str, Dict]
+        # type: (pd.DataFrame) -> List[ColumnStatsArgs]
         stats_column_names = self._get_column_names_from_request(
             df, self.meta_conf.log_stats
         )
-        df = df.filter(stats_column_names)
-        try:
-            stats = df.describe(include="all").to_json()
-        except Exception as e:
-            logger.warning("Failed to describe df: %s", e)
-            stats = df.explode().describe(include="all").to_json()
-        stats = json.loads(stats)
-        stats = self._remove_none_values(stats)
-        columns_stats: List[ColumnStatsArgs] = []
-        for column_name in stats.keys():
-            # Calculate ColumnStatsArgs metrics
-            records_count = df[column_name].size
-            null_count = np.count_nonzero(pd.isnull(df[column_name]))
-            try:
-                distinct_count = len(df[column_name].unique())
-            except Exception:
-                logger.warning("Failed to determine column type for: %s.", column_name)
-                try:
-                    distinct_count = len(df[column_name].astype("str").unique())
-                except Exception:
-                    # Support pandas >= v1.0
-                    distinct_count = len(df[column_name].astype("string").unique())
-
-            column_type = self._get_column_type(df[column_name])
-            column_stats = ColumnStatsArgs(
-                column_name=column_name,
-                column_type=column_type,
-                records_count=records_count,
-                null_count=null_count,
-                distinct_count=distinct_count,
-                most_freq_value=stats[column_name].get("top"),
-                most_freq_value_count=stats[column_name].get("freq"),
-                unique_count=stats[column_name].get("unique"),
-                mean_value=stats[column_name].get("mean"),
-                min_value=stats[column_name].get("min"),
-                max_value=stats[column_name].get("max"),
-                std_value=stats[column_name].get("std"),
-                quartile_1=stats[column_name].get("25%"),
-                quartile_2=stats[column_name].get("50%"),
-                quartile_3=stats[column_name].get("75%"),
+        if self.sample_df is not None:
+            return calculate_sampled_columns_stats(
+                self.sample_df.filter(stats_column_names),
+                records_count=len(df),
+                # filter copies all the rows, only the exact counts need them
+                df=df.filter(stats_column_names)
+                if self.meta_conf.log_stats_exact_counts
+                else None,
             )
-            columns_stats.append(column_stats)
+        return calculate_columns_stats(df.filter(stats_column_names))
 
-        return columns_stats
-
-    def _remove_none_values(self, input_dict):
-        """remove none values from dict recursively"""
-        for key, value in list(input_dict.items()):
-            if value is None:
-                input_dict.pop(key)
-            elif isinstance(value, dict):
-                self._remove_none_values(value)
-        return input_dict
+    def _scale_counts(self, counts):
+        """Scale counts of the sample to the size of the df"""
+        if self.sample_scale == 1.0:
+            return counts
+        return (counts * self.sample_scale).round().astype(int)
 
     def _get_column_type(self, column):
         # type: (pd.Series) -> str
-        first_index = column.first_valid_index()
-        if first_index is None:
-            return column.dtype.name
-        first_value = column.at[first_index]
-        return type(first_value).__name__
-
-    def _calculate_histograms(self, df_column, columns_stats):
-        # type: (pd.Series, List[ColumnStatsArgs]) -> Optional[Tuple[List, List]]
+        return get_column_type(column)
+
+    def _calculate_histograms(self, df_column, column_stats):
+        # type: (pd.Series, Optional[ColumnStatsArgs]) -> Optional[Tuple[List, List]]
         try:
             if len(df_column) == 0:
                 return
@@ -164,24 +176,23 @@ class PandasHistograms(object):
                 # handle  'Float32', 'Float64', 'Int8', 'Int16', 'Int32', 'Int64', 'UInt8', 'UInt16', 'UInt32', 'UInt64'
                 column_type = column_type.lower()
             if is_string_dtype(column_type) or is_bool_dtype(column_type):
-                counts = df_column.value_counts()  # type: pd.Series
-                column_stats = get_column_stats_by_col_name(
-                    columns_stats, df_column.name
-                )
+                counts = self._scale_counts(df_column.value_counts())  # type: pd.Series
                 if column_stats and column_stats.null_count:
                     null_column = pd.Series([column_stats.null_count], index=[None])
-                    counts = counts.append(null_column)
+                    counts = pd.concat([counts, null_column])
                     counts = counts.sort_values(ascending=False)
                 if len(counts) > 50:
                     counts, tail = counts[:49], counts[49:]
                     tail_sum = pd.Series([tail.sum()], index=["_others"])
-                    counts = counts.append(tail_sum)
+                    counts = pd.concat([counts, tail_sum])
                 values = counts.index
             elif is_numeric_dtype(column_type):
-                df_column = df_column.dropna()
+                if column_stats is None or column_stats.null_count:
+                    df_column = df_column.dropna()
                 counts, values = np.histogram(
                     df_column, bins=20
                 )  # Tuple[np.array, np.array]
+                counts = self._scale_counts(counts)
             else:
                 return
 
@@ -3,6 +3,9 @@
 from __future__ import absolute_import
 
 import logging
+import typing
+
+from typing import Any, Iterator
 
 import pandas as pd
 import six
@@ -19,6 +22,9 @@ from targets.target_config import FileCompressions, FileFormat
 from targets.utils.performance import target_timeit
 
 
+if typing.TYPE_CHECKING:
+    from targets import Target
+
 logger = logging.getLogger(__name__)
 
 PANDAS_CACHE_KEY = "pandas.DataFrame"
@@ -81,6 +87,8 @@ class _PandasMarshaller(Marshaller):
 
     support_cache = False
     disable_default_index = False
+    # pandas reader of the format supports `chunksize`
+    support_chunks_read = False
 
     def __init__(self, series=False):
         self.pandas_series = series
@@ -146,6 +154,38 @@ class _PandasMarshaller(Marshaller):
                 raise friendly_error.failed_to_set_index(ex, df, set_index, target)
         return df
 
+    def target_to_chunks(self, target, chunksize, **kwargs):
+        # type: (Target, int, **Any) -> Iterator[pd.DataFrame]
+        """Read the target chunk by chunk, without loading all of it into memory"""
+        if not self.support_chunks_read:
+            raise friendly_error.targets.marshaller_chunks_read_not_supported(
+                self, target
+            )
+
+        read_kwargs = _get_compression_args(target, self._compression_read_arg).copy()
+        read_kwargs.update(kwargs)
+        read_kwargs["chunksize"] = chunksize
+        logger.info("Loading data frame chunks from target='%s'", target)
+        try:
+            if self.support_direct_read(target):
+                for chunk in self._read_chunks(target.path, **read_kwargs):
+                    yield chunk
+            else:
+                mode = _file_open_mode(target, "r")
+                with target.open(mode) as fp:
+                    for chunk in self._read_chunks(fp, **read_kwargs):
+                        yield chunk
+        except Exception as ex:
+            raise friendly_error.failed_to_read_pandas(ex, target)
+
+    def _read_chunks(self, *args, **kwargs):
+        reader = self._pd_read(*args, **kwargs)
+        try:
+            for chunk in reader:
+                yield chunk
+        finally:
+            reader.close()
+
     def value_to_target(self, value, target, **kwargs):
         if target.config.format != FileFormat.hdf5 and not isinstance(value, NDFrame):
             raise friendly_error.targets.failed_to_save_value__wrong_type(
@@ -196,6 +236,7 @@ class DataFrameToCsv(_PandasMarshaller):
     file_format = FileFormat.csv
 
     disable_default_index = True
+    support_chunks_read = True
 
     _compression_write_arg = "compression"
     _compression_read_arg = "compression"
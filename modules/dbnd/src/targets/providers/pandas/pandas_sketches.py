@@ -0,0 +1,117 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+"""
+Approximate statistics of pandas columns, used when stats are calculated on a sample of the data.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pandas.api.types import is_float_dtype, is_integer_dtype
+
+from targets.providers.pandas.pandas_hashing import hash_values
+
+
+# 2^14 registers, ~0.8% standard error
+HLL_PRECISION = 14
+
+
+def _bit_length(values):
+    # type: (np.ndarray) -> np.ndarray
+    """Bit length of uint64 values, frexp is exact for the 32 bits halves"""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    _, high_length = np.frexp(high)
+    _, low_length = np.frexp(low)
+    return np.where(high > 0, high_length + 32, low_length)
+
+
+def hyperloglog_registers(hashes, precision=HLL_PRECISION):
+    # type: (np.ndarray, int) -> np.ndarray
+    """HyperLogLog registers of 64 bit hashes, registers of different chunks can be merged with np.maximum"""
+    value_bits = 64 - precision
+    index = (hashes >> np.uint64(value_bits)).astype(np.intp)
+    remainder = hashes & np.uint64((1 << value_bits) - 1)
+    rank = (value_bits - _bit_length(remainder) + 1).astype(np.uint8)
+
+    registers = np.zeros(1 << precision, dtype=np.uint8)
+    np.maximum.at(registers, index, rank)
+    return registers
+
+
+def hyperloglog_estimate(registers):
+    # type: (np.ndarray) -> int
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.power(2.0, -registers.astype(np.float64)))
+
+    zero_registers = np.count_nonzero(registers == 0)
+    if estimate <= 2.5 * m and zero_registers:
+        # linear counting is more accurate for small cardinalities
+        estimate = m * np.log(m / zero_registers)
+    return int(round(estimate))
+
+
+def column_hyperloglog_registers(column):
+    # type: (pd.Series) -> Tuple[Optional[np.ndarray], bool]
+    """
+    HyperLogLog registers of the not null values of the column (None if there are no such values),
+    and whether the column has null values.
+    """
+    null_mask = column.isnull().to_numpy()
+    values = column
+    has_nulls = bool(null_mask.any())
+    if has_nulls:
+        values = column[~null_mask]
+    if not len(values):
+        return None, has_nulls
+    if is_integer_dtype(values.dtype) or is_float_dtype(values.dtype):
+        # the same hashes for ints and floats, a column that gets nulls in some chunks becomes float
+        values = values.astype(np.float64)
+    hashes = hash_values(values)
+    return hyperloglog_registers(hashes), has_nulls
+
+
+def estimate_distinct_count_from_registers(registers, has_nulls):
+    # type: (Optional[np.ndarray], bool) -> int
+    """All the null values are counted as a single value, the same as column.unique() does for NaNs"""
+    distinct_count = 1 if has_nulls else 0
+    if registers is not None:
+        distinct_count += hyperloglog_estimate(registers)
+    return distinct_count
+
+
+def estimate_distinct_count(column):
+    # type: (pd.Series) -> int
+    """Approximate len(column.unique()) with HyperLogLog over the hashes of the values"""
+    return estimate_distinct_count_from_registers(*column_hyperloglog_registers(column))
+
+
+def estimate_distinct_count_from_sample(sample, records_count):
+    # type: (pd.Series, int) -> int
+    """
+    Estimate the distinct count of all the `records_count` rows from a uniform sample of them
+    with the Shlosser estimator: values that appear many times in the sample are counted once,
+    values that appear once are scaled up to the size of the data (all of them for a unique column).
+    """
+    null_mask = sample.isnull().to_numpy()
+    values = sample[~null_mask] if null_mask.any() else sample
+    distinct_count = 1 if null_mask.any() else 0
+    if not len(values):
+        return distinct_count
+
+    _, counts = np.unique(hash_values(values), return_counts=True)
+    # frequencies[i] - the amount of values that appear i times in the sample
+    frequencies = np.bincount(counts)
+    times = np.arange(len(frequencies))
+    q = len(sample) / records_count
+    estimate = len(counts)
+    if frequencies[1] and q < 1:
+        estimate += (
+            frequencies[1]
+            * np.sum((1 - q) ** times * frequencies)
+            / np.sum(times * q * (1 - q) ** (times - 1) * frequencies)
+        )
+    return distinct_count + int(round(estimate))
@@ -0,0 +1,445 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+import copy
+import hashlib
+import logging
+import typing
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import attr
+import numpy as np
+import pandas as pd
+
+from pandas.api.types import is_object_dtype
+from pandas.core.dtypes.cast import find_common_type
+from pandas.core.util.hashing import hash_pandas_object
+
+from dbnd._core.tracking.schemas.column_stats import ColumnStatsArgs
+from targets.providers.pandas.pandas_column_stats import (
+    _is_fast_numeric,
+    build_sampled_column_stats,
+    calculate_columns_stats,
+)
+from targets.providers.pandas.pandas_histograms import PandasHistograms
+from targets.providers.pandas.pandas_sketches import (
+    column_hyperloglog_registers,
+    estimate_distinct_count_from_registers,
+)
+
+
+if typing.TYPE_CHECKING:
+    from targets.value_meta import ValueMetaConf
+
+logger = logging.getLogger(__name__)
+
+# rows kept for quartiles, most frequent values and histograms,
+# when the data has less rows all the results are exact
+DEFAULT_ACCUMULATOR_SAMPLE_SIZE = 100000
+# the preview shows the first and the last rows, like df.to_string(max_rows=20)
+_PREVIEW_ROWS = 20
+
+
+def _sample_keys(rows_hashes, seed):
+    # type: (np.ndarray, int) -> np.ndarray
+    """
+    Random keys of the rows derived from their hashes (splitmix64 finalizer),
+    so the same rows are sampled regardless of the chunks sizes and the parts merging.
+    """
+    with np.errstate(over="ignore"):
+        z = rows_hashes + np.uint64((seed * 0x9E3779B97F4A7C15) % 2**64)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def _common_dtypes(dtypes, other_dtypes):
+    # type: (pd.Series, pd.Series) -> pd.Series
+    """The dtypes of the columns of both, the same as pd.concat of the frames of these dtypes"""
+    return pd.Series(
+        [
+            dtype if dtype == other_dtype else find_common_type([dtype, other_dtype])
+            for dtype, other_dtype in zip(dtypes, other_dtypes)
+        ],
+        index=dtypes.index,
+        dtype=object,
+    )
+
+
+def _cast_column(column, dtype):
+    # type: (pd.Series, Any) -> pd.Series
+    if column.dtype == dtype:
+        return column
+    if is_object_dtype(dtype) and not is_object_dtype(column.dtype):
+        # numbers mixed with strings are read as strings when the data is read at once
+        return column.astype(str).where(column.notnull())
+    return column.astype(dtype)
+
+
+def _cast_frame(df, dtypes):
+    # type: (Optional[pd.DataFrame], pd.Series) -> Optional[pd.DataFrame]
+    if df is None or list(df.dtypes) == list(dtypes):
+        return df
+    # columns are cast by their positions, the names are not necessarily unique
+    result = df.set_axis(range(len(df.columns)), axis=1)
+    for i, dtype in enumerate(dtypes):
+        result[i] = _cast_column(result[i], dtype)
+    return result.set_axis(df.columns, axis=1)
+
+
+class _ColumnAccumulator(object):
+    """Mergeable stats of a single column that don't need to keep the values"""
+
+    def __init__(self):
+        self.null_count = 0
+        self.has_nulls = False
+        self.hll_registers = None  # type: Optional[np.ndarray]
+        self.hll_failed = False
+
+        # moments of the not null values of numeric columns, merged with Chan's algorithm
+        self.values_count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min_value = None
+        self.max_value = None
+
+    def update(self, column):
+        # type: (pd.Series) -> None
+        null_mask = pd.isnull(column)
+        if not isinstance(null_mask, np.ndarray):
+            null_mask = null_mask.to_numpy()
+        self.null_count += int(np.count_nonzero(null_mask))
+
+        if not self.hll_failed:
+            try:
+                registers, has_nulls = column_hyperloglog_registers(column)
+                self._merge_distinct(registers, has_nulls)
+            except Exception:
+                logger.warning("Failed to estimate distinct count of: %s.", column.name)
+                self.hll_failed = True
+
+        if _is_fast_numeric(column.dtype):
+            values = column.to_numpy(dtype=np.float64, na_value=np.nan)[~null_mask]
+            if len(values):
+                mean = values.mean()
+                self._merge_moments(
+                    len(values),
+                    mean,
+                    float(((values - mean) ** 2).sum()),
+                    values.min(),
+                    values.max(),
+                )
+
+    def cast(self, dtype):
+        # type: (Any) -> _ColumnAccumulator
+        """The accumulator of the column cast to the dtype, the moments are kept only by numeric columns"""
+        if _is_fast_numeric(dtype) or not self.values_count:
+            return self
+        accumulator = copy.copy(self)
+        accumulator.values_count = 0
+        accumulator.mean = accumulator.m2 = 0.0
+        accumulator.min_value = accumulator.max_value = None
+        return accumulator
+
+    def merge(self, other):
+        # type: (_ColumnAccumulator) -> None
+        self.null_count += other.null_count
+        self.hll_failed |= other.hll_failed
+        self._merge_distinct(other.hll_registers, other.has_nulls)
+        if other.values_count:
+            self._merge_moments(
+                other.values_count,
+                other.mean,
+                other.m2,
+                other.min_value,
+                other.max_value,
+            )
+
+    def _merge_distinct(self, registers, has_nulls):
+        self.has_nulls |= has_nulls
+        if registers is None:
+            return
+        if self.hll_registers is None:
+            self.hll_registers = registers
+        else:
+            self.hll_registers = np.maximum(self.hll_registers, registers)
+
+    def _merge_moments(self, count, mean, m2, min_value, max_value):
+        total = self.values_count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta**2 * self.values_count * count / total
+        self.values_count = total
+
+        self.min_value = (
+            min_value if self.min_value is None else min(self.min_value, min_value)
+        )
+        self.max_value = (
+            max_value if self.max_value is None else max(self.max_value, max_value)
+        )
+
+    @property
+    def distinct_count(self):
+        # type: () -> Optional[int]
+        if self.hll_failed:
+            return None
+        return estimate_distinct_count_from_registers(
+            self.hll_registers, self.has_nulls
+        )
+
+    @property
+    def numeric_stats(self):
+        # type: () -> Optional[Tuple[float, float, float, float]]
+        if not self.values_count:
+            return None
+        std = (
+            np.sqrt(self.m2 / (self.values_count - 1))
+            if self.values_count > 1
+            else np.nan
+        )
+        return self.mean, std, self.min_value, self.max_value
+
+
+class PandasStatsAccumulator(object):
+    """
+    Streaming stats and histograms of a DataFrame that is fed chunk by chunk,
+    e.g. by `pd.read_csv(chunksize=...)`, so the whole frame is never kept in memory.
+
+    Counts, mean, std, min and max are exact, distinct count is estimated with HyperLogLog.
+    Quartiles, most frequent values and histograms are calculated on a reproducible sample of the rows
+    (the rows with the smallest keys derived from the row and index hashes),
+    they are exact as long as all the rows fit into the sample.
+    Accumulators of consecutive parts of the data can be merged.
+
+    A column that has different dtypes in different chunks (e.g. ints followed by strings or nulls)
+    gets the common dtype of all its chunks, numbers mixed with strings become strings.
+    Distinct values of the chunks before such a change are estimated by their former dtype.
+    """
+
+    def __init__(self, meta_conf, sample_size=None):
+        # type: (ValueMetaConf, Optional[int]) -> None
+        self.meta_conf = meta_conf
+        if sample_size is None:
+            sample_size = meta_conf.log_stats_sample_size
+            if not sample_size or sample_size < 1:
+                # fraction of rows is unknown before all the chunks are read
+                sample_size = DEFAULT_ACCUMULATOR_SAMPLE_SIZE
+        self.sample_size = int(sample_size)
+        self.sample_seed = meta_conf.get_stats_sample_seed()
+
+        self.records_count = 0
+        self.columns = None  # type: Optional[pd.Index]
+        self.dtypes = None  # type: Optional[pd.Series]
+        self._columns_accumulators = []  # type: List[_ColumnAccumulator]
+        self._chunks_hashes = []  # type: List[str]
+
+        self._sample = None  # type: Optional[pd.DataFrame]
+        self._sample_keys = np.empty(0, dtype=np.uint64)
+        self._sample_positions = np.empty(0, dtype=np.int64)
+        self._head = None  # type: Optional[pd.DataFrame]
+        self._tail = None  # type: Optional[pd.DataFrame]
+
+    def update(self, chunk):
+        # type: (pd.DataFrame) -> None
+        if isinstance(chunk, pd.Series):
+            chunk = chunk.to_frame()
+        if self.columns is None:
+            self.columns = chunk.columns
+            self._columns_accumulators = [_ColumnAccumulator() for _ in chunk.columns]
+        elif not chunk.columns.equals(self.columns):
+            raise ValueError(
+                "All the chunks should have the same columns, expected %s got %s"
+                % (list(self.columns), list(chunk.columns))
+            )
+        chunk = self._reconcile_dtypes(chunk)
+
+        for accumulator, (_, column) in zip(self._columns_accumulators, chunk.items()):
+            accumulator.update(column)
+
+        try:
+            rows_hashes = hash_pandas_object(chunk, index=True).to_numpy()
+        except Exception as e:
+            logger.warning("Could not hash dataframe chunk! Exception: %s", e)
+            rows_hashes = None
+
+        if rows_hashes is not None:
+            self._chunks_hashes.append(hashlib.md5(rows_hashes.tobytes()).hexdigest())
+            keys = _sample_keys(rows_hashes, self.sample_seed)
+        else:
+            rng = np.random.default_rng([self.sample_seed, self.records_count])
+            keys = rng.integers(0, np.iinfo(np.uint64).max, len(chunk), np.uint64)
+        self._add_to_sample(
+            chunk, keys, np.arange(self.records_count, self.records_count + len(chunk))
+        )
+        self._update_preview(chunk, chunk)
+        self.records_count += len(chunk)
+
+    def merge(self, other):
+        # type: (PandasStatsAccumulator) -> None
+        """Merge the accumulator of the data that comes right after the data of this one"""
+        if other.columns is None:
+            return
+        if self.columns is None:
+            self.columns = other.columns
+            self._columns_accumulators = [_ColumnAccumulator() for _ in other.columns]
+        if not self.records_count:
+            self.dtypes = other.dtypes
+        elif other.records_count:
+            dtypes = _common_dtypes(self.dtypes, other.dtypes)
+            self._cast_state(dtypes)
+            other = copy.copy(other)
+            other._cast_state(dtypes)
+        for accumulator, other_accumulator in zip(
+            self._columns_accumulators, other._columns_accumulators
+        ):
+            accumulator.merge(other_accumulator)
+        self._chunks_hashes.extend(other._chunks_hashes)
+
+        if other._sample is not None:
+            self._add_to_sample(
+                other._sample,
+                other._sample_keys,
+                other._sample_positions + self.records_count,
+            )
+        self._update_preview(other._head, other._tail)
+        self.records_count += other.records_count
+
+    def _reconcile_dtypes(self, chunk):
+        # type: (pd.DataFrame) -> pd.DataFrame
+        """The chunk cast to the common dtypes of all the chunks, the kept rows are cast if needed"""
+        if not self.records_count:
+            self.dtypes = chunk.dtypes
+            return chunk
+        if len(chunk):
+            self._cast_state(_common_dtypes(self.dtypes, chunk.dtypes))
+        return _cast_frame(chunk, self.dtypes)
+
+    def _cast_state(self, dtypes):
+        # type: (pd.Series) -> None
+        if list(dtypes) == list(self.dtypes):
+            return
+        self._columns_accumulators = [
+            accumulator.cast(dtype)
+            for accumulator, dtype in zip(self._columns_accumulators, dtypes)
+        ]
+        self._sample = _cast_frame(self._sample, dtypes)
+        self._head = _cast_frame(self._head, dtypes)
+        self._tail = _cast_frame(self._tail, dtypes)
+        self.dtypes = dtypes
+
+    def _add_to_sample(self, rows, keys, positions):
+        # the sample keeps the rows with the smallest keys
+        rows, keys, positions = self._smallest_keys(rows, keys, positions)
+        if self._sample is not None:
+            rows, keys, positions = self._smallest_keys(
+                pd.concat([self._sample, rows]),
+                np.concatenate([self._sample_keys, keys]),
+                np.concatenate([self._sample_positions, positions]),
+            )
+        self._sample, self._sample_keys, self._sample_positions = rows, keys, positions
+
+    def _smallest_keys(self, rows, keys, positions):
+        if len(keys) <= self.sample_size:
+            return rows, keys, positions
+        selected = np.argpartition(keys, self.sample_size - 1)[: self.sample_size]
+        return rows.iloc[selected], keys[selected], positions[selected]
+
+    def _update_preview(self, head, tail):
+        if head is None:
+            return
+        if self._head is None or len(self._head) < _PREVIEW_ROWS:
+            self._head = pd.concat([self._head, head.iloc[:_PREVIEW_ROWS]]).iloc[
+                :_PREVIEW_ROWS
+            ]
+        half = _PREVIEW_ROWS // 2
+        self._tail = pd.concat([self._tail, tail.iloc[-half:]]).iloc[-half:]
+
+    def get_sample(self):
+        # type: () -> pd.DataFrame
+        """The sampled rows, in the order of the data"""
+        if self._sample is None:
+            return pd.DataFrame()
+        return self._sample.iloc[np.argsort(self._sample_positions, kind="stable")]
+
+    def get_preview_df(self):
+        # type: () -> pd.DataFrame
+        """
+        A frame that is rendered as the whole data by df.to_string(max_rows=20):
+        the first and the last rows and one extra row that is truncated away.
+        """
+        if self._head is None:
+            return pd.DataFrame()
+        if self.records_count <= _PREVIEW_ROWS:
+            return self._head
+        half = _PREVIEW_ROWS // 2
+        return pd.concat([self._head.iloc[: half + 1], self._tail])
+
+    def get_data_hash(self):
+        # type: () -> Optional[str]
+        """Hash of the chunks row hashes, it depends on the data and on the chunks sizes"""
+        if not self._chunks_hashes:
+            return None
+        return hashlib.md5("".join(self._chunks_hashes).encode()).hexdigest()
+
+    def get_histograms_and_stats(self):
+        # type: () -> Tuple[List[ColumnStatsArgs], Dict[str, List[List]], Dict[str, Any]]
+        """@return: columns stats, histograms and the approximation system metrics"""
+        sample = self.get_sample()
+        # sampling is done by the accumulator
+        meta_conf = attr.evolve(self.meta_conf, log_stats_sample_size=None)
+        if len(sample) == self.records_count:
+            pandas_histograms = PandasHistograms(sample, meta_conf)
+        else:
+            pandas_histograms = _AccumulatedPandasHistograms(sample, meta_conf, self)
+        columns_stats, histograms = pandas_histograms.get_histograms_and_stats()
+        return columns_stats, histograms, pandas_histograms.approximation_metrics
+
+    def build_columns_stats(self, sample_columns_stats):
+        # type: (List[ColumnStatsArgs]) -> List[ColumnStatsArgs]
+        """Complete the stats of the sampled columns with the stats of all the rows"""
+        accumulators = {
+            str(name): accumulator
+            for name, accumulator in zip(self.columns, self._columns_accumulators)
+        }
+        scale = self.records_count / max(len(self._sample_keys), 1)
+        columns_stats = []
+        for sample_stats in sample_columns_stats:
+            accumulator = accumulators[sample_stats.column_name]
+            columns_stats.append(
+                build_sampled_column_stats(
+                    sample_stats,
+                    scale=scale,
+                    records_count=self.records_count,
+                    null_count=accumulator.null_count,
+                    distinct_count=accumulator.distinct_count,
+                    numeric_stats=accumulator.numeric_stats,
+                )
+            )
+        return columns_stats
+
+
+class _AccumulatedPandasHistograms(PandasHistograms):
+    """PandasHistograms of the accumulator sample, with stats of all the accumulated rows"""
+
+    def __init__(self, sample_df, meta_conf, accumulator):
+        # type: (pd.DataFrame, ValueMetaConf, PandasStatsAccumulator) -> None
+        super(_AccumulatedPandasHistograms, self).__init__(sample_df, meta_conf)
+        self.accumulator = accumulator
+
+    def _build_sample(self):
+        self.sample_df = self.df
+        self.sample_scale = self.accumulator.records_count / len(self.df)
+        self.approximation_metrics = {
+            "stats_approximate": True,
+            "stats_sample_size": len(self.df),
+            "stats_sample_seed": self.accumulator.sample_seed,
+            "distinct_count_algorithm": "hyperloglog",
+        }
+
+    def _calculate_stats(self, df):
+        # type: (pd.DataFrame) -> List[ColumnStatsArgs]
+        stats_column_names = self._get_column_names_from_request(
+            df, self.meta_conf.log_stats
+        )
+        sample_columns_stats = calculate_columns_stats(df.filter(stats_column_names))
+        return self.accumulator.build_columns_stats(sample_columns_stats)
@@ -7,15 +7,13 @@ import os
 import time
 import typing
 
-from typing import Dict
+from typing import Dict, Iterable
 
 import pandas as pd
 import six
 
-from pandas.core.util.hashing import hash_pandas_object
-
 from dbnd._core.errors import friendly_error
-from dbnd._vendor import fast_hasher
+from targets.providers.pandas.pandas_hashing import hash_pandas
 from targets.providers.pandas.pandas_histograms import PandasHistograms
 from targets.target_config import FileFormat
 from targets.value_meta import ValueMeta
@@ -39,7 +37,7 @@ class DataFrameValueType(DataValueType):
 
     def to_signature(self, x):
         shape = "[%s]" % (",".join(map(str, x.shape)))
-        return "%s:%s" % (shape, fast_hasher.hash(x))
+        return "%s:%s" % (shape, hash_pandas(x))
 
     def to_preview(self, df, preview_size):  # type: (pd.DataFrame, int) -> str
         return df.to_string(index=False, max_rows=20, max_cols=1000)[:preview_size]
@@ -73,8 +71,10 @@ class DataFrameValueType(DataValueType):
                 value, preview_size=meta_conf.get_preview_size()
             )
             try:
-                data_hash = fast_hasher.hash(
-                    hash_pandas_object(value, index=True).values
+                data_hash = hash_pandas(
+                    value,
+                    index=True,
+                    max_column_bytes=meta_conf.log_data_hash_max_bytes,
                 )
             except Exception as e:
                 logger.warning(
@@ -85,12 +85,12 @@ class DataFrameValueType(DataValueType):
         hist_sys_metrics = None
         if meta_conf.log_histograms or meta_conf.log_stats:
             start_time = time.time()
-            columns_stats, histograms = PandasHistograms(
-                value, meta_conf
-            ).get_histograms_and_stats()
+            pandas_histograms = PandasHistograms(value, meta_conf)
+            columns_stats, histograms = pandas_histograms.get_histograms_and_stats()
             hist_sys_metrics = {
                 "histograms_and_stats_calc_time": time.time() - start_time
             }
+            hist_sys_metrics.update(pandas_histograms.approximation_metrics)
 
         return ValueMeta(
             value_preview=value_preview,
@@ -102,6 +102,69 @@ class DataFrameValueType(DataValueType):
             histograms=histograms,
         )
 
+    def get_value_meta_from_chunks(self, chunks, meta_conf):
+        # type: (Iterable[pd.DataFrame], ValueMetaConf) -> ValueMeta
+        """
+        Build the value meta of the data that is read chunk by chunk, without keeping all of it in memory.
+        See PandasStatsAccumulator for the stats that are approximated when the data is larger than the sample.
+        """
+        from targets.providers.pandas.pandas_stats_accumulator import (
+            PandasStatsAccumulator,
+        )
+
+        start_time = time.time()
+        accumulator = PandasStatsAccumulator(meta_conf)
+        for chunk in chunks:
+            accumulator.update(chunk)
+
+        columns = list(accumulator.columns) if accumulator.columns is not None else []
+        shape = (accumulator.records_count, len(columns))
+        data_schema = {}
+        if meta_conf.log_schema:
+            # the common dtypes of all the chunks
+            dtypes = accumulator.dtypes if accumulator.dtypes is not None else {}
+            data_schema.update(
+                {
+                    "type": self.type_str,
+                    "columns": columns,
+                    "shape": shape,
+                    "dtypes": {col: str(type_) for col, type_ in dtypes.items()},
+                }
+            )
+
+        if meta_conf.log_size:
+            data_schema["size.bytes"] = int(shape[0] * shape[1])
+
+        value_preview, data_hash = None, None
+        if meta_conf.log_preview:
+            value_preview = self.to_preview(
+                accumulator.get_preview_df(), preview_size=meta_conf.get_preview_size()
+            )
+            data_hash = accumulator.get_data_hash()
+
+        columns_stats, histograms = [], {}
+        hist_sys_metrics = None
+        if meta_conf.log_histograms or meta_conf.log_stats:
+            (
+                columns_stats,
+                histograms,
+                approximation_metrics,
+            ) = accumulator.get_histograms_and_stats()
+            hist_sys_metrics = {
+                "histograms_and_stats_calc_time": time.time() - start_time
+            }
+            hist_sys_metrics.update(approximation_metrics)
+
+        return ValueMeta(
+            value_preview=value_preview,
+            data_dimensions=shape,
+            data_schema=data_schema,
+            data_hash=data_hash,
+            columns_stats=columns_stats,
+            histogram_system_metrics=hist_sys_metrics,
+            histograms=histograms,
+        )
+
     def merge_values(self, *values, **kwargs):
         # Concatenate all data into one DataFrame
         # We don't want list to be stored in memory
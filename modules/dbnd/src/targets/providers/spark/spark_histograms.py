@@ -0,0 +1,398 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+from __future__ import absolute_import
+
+import logging
+import typing
+
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pyspark.sql as spark
+import pyspark.sql.functions as F
+
+from pyspark.sql import Window
+from pyspark.sql.types import (
+    BooleanType,
+    DoubleType,
+    FloatType,
+    NumericType,
+    StringType,
+)
+
+from dbnd._core.tracking.schemas.column_stats import ColumnStatsArgs
+
+
+if typing.TYPE_CHECKING:
+    from dbnd._core.tracking.log_data_request import LogDataRequest
+    from targets.value_meta import ValueMetaConf
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_HISTOGRAM_BINS = 20
+# the same limits of the string histograms as the pandas histograms have
+CATEGORICAL_HISTOGRAM_MAX_VALUES = 50
+CATEGORICAL_HISTOGRAM_OTHERS = "_others"
+QUARTILES = (0.25, 0.5, 0.75)
+
+
+def _quote(name):
+    # type: (str) -> str
+    """Reference a column by its name, even if it contains dots or spaces"""
+    return "`%s`" % name.replace("`", "``")
+
+
+def _column(name):
+    # type: (str) -> spark.Column
+    return F.col(_quote(name))
+
+
+def _is_floating(field):
+    # type: (spark.types.StructField) -> bool
+    return isinstance(field.dataType, (FloatType, DoubleType))
+
+
+def _stats_expression(field):
+    # type: (spark.types.StructField) -> str
+    """NaN values are counted as nulls, as pandas does"""
+    if _is_floating(field):
+        return "nanvl(%s, CAST(NULL AS DOUBLE))" % _quote(field.name)
+    return _quote(field.name)
+
+
+def _histogram_column(field):
+    # type: (spark.types.StructField) -> spark.Column
+    """NaN and infinite values can't be bucketed, they are left out of the numeric histograms"""
+    column = _column(field.name)
+    if _is_floating(field):
+        is_finite = (
+            ~F.isnan(column)
+            & (column > F.lit(float("-inf")))
+            & (column < F.lit(float("inf")))
+        )
+        return F.when(is_finite, column)
+    return column
+
+
+def _to_python(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+class SparkHistograms(object):
+    """
+    calculates histograms and stats on spark dataframe.
+
+    All the stats and the records count are calculated by a single aggregation job,
+    the histograms of all the columns are counted by a second aggregation (numeric histograms need min/max).
+    """
+
+    def __init__(self, df, meta_conf):
+        # type: (spark.DataFrame, ValueMetaConf) -> None
+        self.df = df
+        self.meta_conf = meta_conf
+
+        # calculated by the aggregation job
+        self.records_count = None  # type: Optional[int]
+
+    def get_histograms_and_stats(
+        self,
+    ) -> Tuple[List[ColumnStatsArgs], Dict[str, List[List]]]:
+        stats_fields, histograms_fields = [], []
+        if self.meta_conf.log_stats:
+            stats_fields = [
+                field
+                for field in self._get_fields_from_request(self.meta_conf.log_stats)
+                # We calculate descriptive statistics only for numeric and string columns
+                if isinstance(field.dataType, (NumericType, StringType))
+            ]
+        if self.meta_conf.log_histograms:
+            histograms_fields = self._get_fields_from_request(
+                self.meta_conf.log_histograms
+            )
+
+        cache = bool(
+            self.meta_conf.log_spark_cache
+            and histograms_fields
+            and not self.df.is_cached
+        )
+        if cache:
+            # the dataframe is scanned twice: by the aggregation and by the histograms jobs
+            self.df.cache()
+        try:
+            aggregations = self._aggregate(stats_fields, histograms_fields)
+            columns_stats = [
+                self._build_column_stats(field, aggregations[field.name])
+                for field in stats_fields
+            ]
+            histograms = self._calculate_histograms(histograms_fields, aggregations)
+        finally:
+            if cache:
+                self.df.unpersist()
+
+        return columns_stats, histograms
+
+    def get_records_count(self):
+        # type: () -> int
+        if self.records_count is None:
+            self._aggregate([], [])
+        return self.records_count
+
+    def _get_fields_from_request(self, data_request):
+        # type: (LogDataRequest) -> List[spark.types.StructField]
+        """The same columns selection as the pandas histograms have, by the spark types"""
+        fields = self.df.schema.fields
+        column_names = list(data_request.include_columns)
+        for field in fields:
+            if data_request.include_all_string and isinstance(
+                field.dataType, StringType
+            ):
+                column_names.append(field.name)
+            elif data_request.include_all_boolean and isinstance(
+                field.dataType, BooleanType
+            ):
+                column_names.append(field.name)
+            elif data_request.include_all_numeric and isinstance(
+                field.dataType, NumericType
+            ):
+                column_names.append(field.name)
+
+        if len(data_request.exclude_columns) > 0:
+            if len(column_names) == 0:
+                column_names.extend(field.name for field in fields)
+            column_names = [
+                column
+                for column in column_names
+                if column not in data_request.exclude_columns
+            ]
+
+        return [
+            field
+            for field in fields
+            if field.name in column_names
+            and isinstance(field.dataType, (NumericType, StringType, BooleanType))
+        ]
+
+    def _aggregate(self, stats_fields, histograms_fields):
+        # type: (List[spark.types.StructField], List[spark.types.StructField]) -> Dict[str, Dict[str, Any]]
+        """
+        Calculate the records count, the stats of stats_fields and the range of the numeric histograms_fields
+        by a single aggregation of the dataframe.
+        """
+        metrics = {}  # type: Dict[str, List[Tuple[str, spark.Column]]]
+        for field in stats_fields:
+            stats_expression = _stats_expression(field)
+            column = F.expr(stats_expression)
+            field_metrics = [
+                ("count", F.count(column)),
+                ("distinct", F.approx_count_distinct(column)),
+            ]
+            if isinstance(field.dataType, NumericType):
+                field_metrics += [
+                    ("mean", F.mean(column)),
+                    ("stddev", F.stddev(column)),
+                    ("min", F.min(column)),
+                    ("max", F.max(column)),
+                    (
+                        "quartiles",
+                        F.expr(
+                            "percentile_approx(%s, array(%s))"
+                            % (stats_expression, ", ".join(str(q) for q in QUARTILES))
+                        ),
+                    ),
+                ]
+            metrics[field.name] = field_metrics
+
+        for field in histograms_fields:
+            if isinstance(field.dataType, NumericType):
+                column = _histogram_column(field)
+                metrics.setdefault(field.name, []).extend(
+                    [("histogram_min", F.min(column)), ("histogram_max", F.max(column))]
+                )
+
+        aliases = {}
+        expressions = [F.count(F.lit(1)).alias("records_count")]
+        for i, (column_name, field_metrics) in enumerate(metrics.items()):
+            for metric_name, expression in field_metrics:
+                alias = "m%s_%s" % (i, metric_name)
+                aliases[alias] = (column_name, metric_name)
+                expressions.append(expression.alias(alias))
+
+        row = self.df.alias("DBND_INTERNAL_STATS").agg(*expressions).collect()[0]
+        row = row.asDict()
+
+        self.records_count = row.pop("records_count")
+        aggregations = {column_name: {} for column_name in metrics}
+        for alias, value in row.items():
+            column_name, metric_name = aliases[alias]
+            aggregations[column_name][metric_name] = value
+        return aggregations
+
+    def _build_column_stats(self, field, aggregation):
+        # type: (spark.types.StructField, Dict[str, Any]) -> ColumnStatsArgs
+        numeric_stats = {}
+        if isinstance(field.dataType, NumericType):
+            quartiles = aggregation["quartiles"] or [None] * len(QUARTILES)
+            numeric_stats = dict(
+                mean_value=aggregation["mean"],
+                std_value=aggregation["stddev"],
+                min_value=aggregation["min"],
+                max_value=aggregation["max"],
+                quartile_1=quartiles[0],
+                quartile_2=quartiles[1],
+                quartile_3=quartiles[2],
+            )
+        return ColumnStatsArgs(
+            column_name=field.name,
+            column_type=str(field.dataType),
+            records_count=self.records_count,
+            distinct_count=aggregation["distinct"],
+            null_count=self.records_count - aggregation["count"],
+            **{name: _to_python(value) for name, value in numeric_stats.items()}
+        )
+
+    def _numeric_histogram_range(self, aggregation):
+        # type: (Dict[str, Any]) -> Optional[Tuple[float, float]]
+        """The same range np.histogram uses, None for a column without finite values"""
+        if aggregation["histogram_min"] is None:
+            return None
+        first = float(aggregation["histogram_min"])
+        last = float(aggregation["histogram_max"])
+        if first == last:
+            first, last = first - 0.5, last + 0.5
+        return first, last
+
+    def _calculate_histograms(self, histograms_fields, aggregations):
+        # type: (List[spark.types.StructField], Dict[str, Dict[str, Any]]) -> Dict[str, List[List]]
+        """
+        Calculate the histograms of all the columns together:
+        every row is exploded to a (column, value, bucket) row per column and all of them are counted together.
+        Numeric columns are counted by their bucket, other columns by their value,
+        only the most frequent values are collected to the driver.
+        """
+        entries, numeric_ranges = [], {}
+        for field in histograms_fields:
+            if isinstance(field.dataType, NumericType):
+                histogram_range = self._numeric_histogram_range(
+                    aggregations[field.name]
+                )
+                if histogram_range is None:
+                    continue
+                numeric_ranges[field.name] = histogram_range
+                first, last = histogram_range
+                bucket = F.least(
+                    F.floor(
+                        (_histogram_column(field).cast("double") - first)
+                        * (NUMERIC_HISTOGRAM_BINS / (last - first))
+                    ).cast("int"),
+                    F.lit(NUMERIC_HISTOGRAM_BINS - 1),
+                )
+                value = F.lit(None).cast("string")
+                categorical = F.lit(False)
+            else:
+                bucket = F.lit(None).cast("int")
+                value = _column(field.name).cast("string")
+                categorical = F.lit(True)
+            entries.append(
+                F.struct(
+                    F.lit(field.name).alias("column"),
+                    value.alias("value"),
+                    bucket.alias("bucket"),
+                    categorical.alias("categorical"),
+                )
+            )
+
+        if not entries:
+            return {}
+
+        exploded = (
+            self.df.alias("DBND_INTERNAL_HISTOGRAMS")
+            .select(F.explode(F.array(*entries)).alias("entry"))
+            .select("entry.*")
+            # nulls, NaN and infinite values of numeric columns are not counted
+            .where(F.col("categorical") | F.col("bucket").isNotNull())
+        )
+        counts = exploded.groupBy("column", "value", "bucket").count()
+        rows = self._collect_histogram_counts(counts)
+
+        rows_by_column = {}  # type: Dict[str, List[Dict[str, Any]]]
+        for row in rows:
+            rows_by_column.setdefault(row["column"], []).append(row)
+
+        histograms = {}
+        for field in histograms_fields:
+            column_rows = rows_by_column.get(field.name, [])
+            if field.name in numeric_ranges:
+                counts = [0] * NUMERIC_HISTOGRAM_BINS
+                for row in column_rows:
+                    counts[row["bucket"]] = row["count"]
+                first, last = numeric_ranges[field.name]
+                values = np.linspace(first, last, NUMERIC_HISTOGRAM_BINS + 1).tolist()
+                histograms[field.name] = [counts, values]
+            elif column_rows:
+                histograms[field.name] = self._build_categorical_histogram(
+                    field, column_rows
+                )
+        return histograms
+
+    def _collect_histogram_counts(self, counts):
+        # type: (spark.DataFrame) -> List[Dict[str, Any]]
+        """
+        Collect the counts of the (column, value, bucket) entries by a single job.
+        Columns with more than CATEGORICAL_HISTOGRAM_MAX_VALUES values are collected by their most frequent values
+        (ranked by a window over the counts of the column) and the count of all the others.
+        """
+        column_window = Window.partitionBy("column")
+        ranked = counts.select(
+            "*",
+            F.row_number()
+            .over(column_window.orderBy(F.desc("count"), "value"))
+            .alias("value_rank"),
+            F.count(F.lit(1)).over(column_window).alias("values_count"),
+            F.sum("count").over(column_window).alias("total_count"),
+        ).where(
+            (F.col("values_count") <= CATEGORICAL_HISTOGRAM_MAX_VALUES)
+            | (F.col("value_rank") < CATEGORICAL_HISTOGRAM_MAX_VALUES)
+        )
+
+        rows, others_counts = [], {}
+        for row in ranked.collect():
+            row = row.asDict()
+            del row["value_rank"]
+            values_count, total_count = row.pop("values_count"), row.pop("total_count")
+            if values_count > CATEGORICAL_HISTOGRAM_MAX_VALUES:
+                column = row["column"]
+                others_counts[column] = (
+                    others_counts.get(column, total_count) - row["count"]
+                )
+            rows.append(row)
+
+        for column, others_count in others_counts.items():
+            rows.append(
+                dict(
+                    column=column,
+                    value=CATEGORICAL_HISTOGRAM_OTHERS,
+                    bucket=None,
+                    count=others_count,
+                )
+            )
+        return rows
+
+    def _build_categorical_histogram(self, field, rows):
+        # type: (spark.types.StructField, List[Dict[str, Any]]) -> List[List]
+        def sort_key(row):
+            # the "others" are always the last value of the histogram
+            return row["value"] == CATEGORICAL_HISTOGRAM_OTHERS, -row["count"]
+
+        rows = sorted(rows, key=sort_key)
+        values = [row["value"] for row in rows]
+        if isinstance(field.dataType, BooleanType):
+            values = [
+                value
+                if value in (None, CATEGORICAL_HISTOGRAM_OTHERS)
+                else value == "true"
+                for value in values
+            ]
+        return [[row["count"] for row in rows], values]
@@ -3,23 +3,19 @@
 from __future__ import absolute_import
 
 import logging
-import typing
 
-from collections import defaultdict
 from typing import List
 
 import pyspark.sql as spark
 
 from dbnd._core.tracking.schemas.column_stats import ColumnStatsArgs
-from targets.value_meta import ValueMeta
+from targets.providers.spark.spark_histograms import SparkHistograms
+from targets.value_meta import ValueMeta, ValueMetaConf
 from targets.values.builtins_values import DataValueType
 
 
 LOG_DATASET_OP_PYSPARK_SOURCE = "pyspark_manual_logging"
 
-if typing.TYPE_CHECKING:
-    from targets.value_meta import ValueMetaConf
-
 logger = logging.getLogger(__name__)
 
 """
@@ -80,28 +76,29 @@ class SparkDataFrameValueType(DataValueType):
         else:
             data_preview = None
 
+        df_columns_stats, histogram_dict, hist_sys_metrics = [], {}, {}
+        spark_histograms = SparkHistograms(value, meta_conf)
+        if meta_conf.log_stats or meta_conf.log_histograms:
+            # the records count is calculated by the same aggregation as the stats
+            (
+                df_columns_stats,
+                histogram_dict,
+            ) = spark_histograms.get_histograms_and_stats()
+
         if meta_conf.log_size:
-            size_alias = value.alias("DBND_INTERNAL_DIMS")
             data_schema = data_schema or {}
-            rows = size_alias.count()
-            data_dimensions = (rows, len(size_alias.columns))
+            rows = spark_histograms.get_records_count()
+            columns_count = len(value.columns)
+            data_dimensions = (rows, columns_count)
             data_schema.update(
                 {
-                    "size.bytes": int(rows * len(size_alias.columns)),
-                    "shape": (rows, len(size_alias.columns)),
+                    "size.bytes": int(rows * columns_count),
+                    "shape": (rows, columns_count),
                 }
             )
         else:
             data_dimensions = None
 
-        df_columns_stats, histogram_dict, hist_sys_metrics = [], {}, {}
-
-        if meta_conf.log_histograms:
-            logger.warning("log_histograms are not supported for spark dataframe")
-
-        if meta_conf.log_stats:
-            df_columns_stats = self.calculate_spark_stats(value)
-
         return ValueMeta(
             value_preview=data_preview,
             data_dimensions=data_dimensions,
@@ -118,71 +115,12 @@ class SparkDataFrameValueType(DataValueType):
     ):  # type: (spark.DataFrame) -> List[ColumnStatsArgs]
         """
         Calculate descriptive statistics for Spark Dataframe and return them in format consumable by tracker.
-        Spark has built-in method for stats calculation, it returns table like this:
-        +-------+-------------+--------------------+
-        |summary|serial_number|      capacity_bytes|
-        +-------+-------------+--------------------+
-        |  count|        42390|               42389|
-        |   mean|         null|2.549704589668174E12|
-        | stddev|         null|7.415846913745422E11|
-        |    min|     5XW004Q0|       1000204886016|
-        |    25%|         null|       2000398934016|
-        |    50%|         null|       3000592982016|
-        |    75%|         null|       3000592982016|
-        |    max|     Z2926ALH|       4000787030016|
-        +-------+-------------+--------------------+
-        Each row represents specific metric values for every column.
-        We are iterating over this table and converting results to list of ColumnStatsArgs
-        :param df:
-        :return:
+        All the stats are calculated by a single aggregation job, see SparkHistograms.
         """
-        stats_alias = df.alias("DBND_INTERNAL_STATS")
-        total_count = stats_alias.count()
-        stats = defaultdict(dict)
-
-        for row in stats_alias.summary().collect():
-            metric_row = row.asDict()
-            metric_name = metric_row["summary"]
-            for col in stats_alias.columns:
-                stats[col][metric_name] = metric_row.get(col)
-
-        result: List[ColumnStatsArgs] = []
-        for col in stats_alias.schema.fields:
-            if not isinstance(
-                col.dataType, (spark.types.NumericType, spark.types.StringType)
-            ):
-                # We calculate descriptive statistics only for numeric and string columns
-                continue
-
-            name = col.name
-            col_stats = stats[name]
-            if isinstance(col.dataType, spark.types.StringType):
-                result.append(
-                    ColumnStatsArgs(
-                        column_name=name,
-                        column_type=str(col.dataType),
-                        records_count=total_count,
-                        null_count=total_count - int(col_stats["count"]),
-                    )
-                )
-            elif isinstance(col.dataType, spark.types.NumericType):
-                result.append(
-                    ColumnStatsArgs(
-                        column_name=name,
-                        column_type=str(col.dataType),
-                        records_count=total_count,
-                        null_count=total_count - int(col_stats["count"]),
-                        min_value=col_stats["min"],
-                        max_value=col_stats["max"],
-                        std_value=col_stats["stddev"],
-                        mean_value=col_stats["mean"],
-                        quartile_1=col_stats["25%"],
-                        quartile_2=col_stats["50%"],
-                        quartile_3=col_stats["75%"],
-                    )
-                )
-
-        return result
+        columns_stats, _ = SparkHistograms(
+            df, ValueMetaConf(log_stats=True)
+        ).get_histograms_and_stats()
+        return columns_stats
 
     def support_fast_count(self, target):
         from targets import FileTarget
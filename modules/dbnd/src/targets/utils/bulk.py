@@ -0,0 +1,115 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+"""
+Bulk file system operations, see `FileSystem.copy_many` and friends.
+
+Every call is independent (a single file, or a batch of files for the batch APIs),
+the calls run by a bounded thread pool, a failed call is retried with an exponential backoff.
+Errors of the file system itself (`FileSystemException`: already exists, invalid delete, ...)
+are not retried.
+"""
+
+import logging
+import time
+import typing
+
+from concurrent.futures import ThreadPoolExecutor
+
+from targets.errors import BulkOperationException, FileSystemException
+
+
+if typing.TYPE_CHECKING:
+    from typing import Any, Callable, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BULK_MAX_CONCURRENCY = 16
+DEFAULT_BULK_MAX_RETRIES = 2
+DEFAULT_BULK_RETRY_DELAY = 0.5
+
+
+def _call_with_retries(func, args, max_retries, retry_delay):
+    attempt = 0
+    while True:
+        try:
+            return func(*args)
+        except FileSystemException:
+            raise
+        except Exception as ex:
+            if attempt >= max_retries:
+                raise
+            delay = retry_delay * (2**attempt)
+            attempt += 1
+            logger.warning(
+                "Failed to run %s%s: %s, retrying in %.1fs (%s/%s)",
+                getattr(func, "__name__", func),
+                args,
+                ex,
+                delay,
+                attempt,
+                max_retries,
+            )
+            time.sleep(delay)
+
+
+def run_bulk(
+    func,
+    calls,
+    max_concurrency=DEFAULT_BULK_MAX_CONCURRENCY,
+    max_retries=DEFAULT_BULK_MAX_RETRIES,
+    retry_delay=DEFAULT_BULK_RETRY_DELAY,
+):
+    # type: (Callable, Iterable[tuple], int, int, float) -> List[Any]
+    """
+    Calls ``func(*args)`` for every args of ``calls``, returns the results in the order of ``calls``.
+
+    All the calls are completed even if some of them fail,
+    the failures are raised together as BulkOperationException.
+    """
+    calls = [tuple(args) for args in calls]
+    if not calls:
+        return []
+
+    results = [None] * len(calls)
+    failures = []
+    if max_concurrency <= 1 or len(calls) == 1:
+        for i, args in enumerate(calls):
+            try:
+                results[i] = _call_with_retries(func, args, max_retries, retry_delay)
+            except Exception as ex:
+                failures.append((args, ex))
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(max_concurrency, len(calls)), thread_name_prefix="dbnd-bulk"
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _call_with_retries, func, args, max_retries, retry_delay
+                )
+                for args in calls
+            ]
+            for i, (args, future) in enumerate(zip(calls, futures)):
+                try:
+                    results[i] = future.result()
+                except Exception as ex:
+                    failures.append((args, ex))
+
+    if failures:
+        raise BulkOperationException(
+            "%s of %s calls of %s have failed, first error at %s: %s"
+            % (
+                len(failures),
+                len(calls),
+                getattr(func, "__name__", func),
+                failures[0][0],
+                failures[0][1],
+            ),
+            failures=failures,
+        )
+    return results
+
+
+def chunks(items, size):
+    """Splits the items to the lists of `size` items (the batches of the batch APIs)"""
+    items = list(items)
+    return [items[i : i + size] for i in range(0, len(items), size)]
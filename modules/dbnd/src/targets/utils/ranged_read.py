@@ -0,0 +1,211 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+"""
+Seekable reader of remote files over byte ranges.
+
+File systems that can fetch a byte range of an object (GCS, S3, ...) open their files with
+`FileSystem.open_ranged_read`: the file is read by blocks, the blocks are fetched concurrently
+by a thread pool and kept in a bounded buffer.
+
+* Sequential reads fetch `read_ahead_blocks` blocks ahead of the current position,
+  so large files are streamed while the previous blocks are processed.
+* Random reads (seek to the footer of a parquet file) fetch only the block of the position.
+* `prefetch` schedules known ranges in advance (e.g. the column chunks of a columnar reader).
+"""
+
+import io
+import threading
+import typing
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+if typing.TYPE_CHECKING:
+    from typing import Callable, Optional
+
+DEFAULT_BLOCK_SIZE = 8 * 1024 * 1024
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_READ_AHEAD_BLOCKS = 4
+
+
+class _RangedRawIO(io.RawIOBase):
+    def __init__(
+        self,
+        read_range,
+        size,
+        name=None,
+        block_size=DEFAULT_BLOCK_SIZE,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        read_ahead_blocks=DEFAULT_READ_AHEAD_BLOCKS,
+        max_buffer_blocks=None,
+    ):
+        # type: (Callable[[int, int], bytes], int, Optional[str], int, int, int, Optional[int]) -> None
+        super(_RangedRawIO, self).__init__()
+        if block_size <= 0:
+            raise ValueError("block_size should be positive, got %s" % block_size)
+
+        self.read_range = read_range
+        self.size = size
+        self.name = name
+        self.block_size = block_size
+        self.max_concurrency = max(max_concurrency, 1)
+        self.read_ahead_blocks = max(read_ahead_blocks, 0)
+        # the current block and the read ahead blocks always fit into the buffer
+        self.max_buffer_blocks = max(max_buffer_blocks or 0, self.read_ahead_blocks + 2)
+
+        self._num_blocks = (size + block_size - 1) // block_size
+        self._pos = 0
+        self._last_block = -1
+        self._blocks = OrderedDict()  # block index -> Future[bytes]
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError("Invalid whence (%s)" % whence)
+        if pos < 0:
+            raise ValueError("Negative seek position %s" % pos)
+        self._pos = pos
+        return pos
+
+    def readinto(self, b):
+        if self._pos >= self.size:
+            return 0
+        index, offset = divmod(self._pos, self.block_size)
+        block = self._read_block(index)
+
+        n = min(len(b), len(block) - offset)
+        b[:n] = memoryview(block)[offset : offset + n]
+        self._pos += n
+        return n
+
+    def readall(self):
+        chunks = []
+        while self._pos < self.size:
+            index, offset = divmod(self._pos, self.block_size)
+            block = self._read_block(index)
+            chunks.append(memoryview(block)[offset:])
+            self._pos += len(block) - offset
+        return b"".join(chunks)
+
+    def prefetch(self, offset, length):
+        """Schedules the fetch of the blocks of the range, limited by the size of the buffer"""
+        if length <= 0 or offset >= self.size:
+            return
+        first = offset // self.block_size
+        last = min(
+            (min(offset + length, self.size) - 1) // self.block_size,
+            first + self.max_buffer_blocks - 1,
+        )
+        for index in range(first, last + 1):
+            self._schedule(index)
+
+    def close(self):
+        if self.closed:
+            return
+        for future in self._blocks.values():
+            future.cancel()
+        self._blocks.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        super(_RangedRawIO, self).close()
+
+    def _read_block(self, index):
+        sequential = index in (self._last_block, self._last_block + 1)
+        self._last_block = index
+
+        self._schedule(index)
+        # keep the current block away from the eviction by the read ahead
+        self._blocks.move_to_end(index)
+        if sequential:
+            last = min(index + self.read_ahead_blocks, self._num_blocks - 1)
+            for read_ahead in range(index + 1, last + 1):
+                self._schedule(read_ahead)
+
+        block = self._blocks[index].result()
+        expected = self._block_length(index)
+        if len(block) != expected:
+            raise IOError(
+                "Unexpected size of range %s of %s: got %s bytes, expected %s. "
+                "Has the file changed while reading?"
+                % (index * self.block_size, self.name, len(block), expected)
+            )
+        return block
+
+    def _block_length(self, index):
+        return min(self.block_size, self.size - index * self.block_size)
+
+    def _schedule(self, index):
+        if index in self._blocks:
+            return
+        while len(self._blocks) >= self.max_buffer_blocks:
+            _, evicted = self._blocks.popitem(last=False)
+            evicted.cancel()
+
+        start = index * self.block_size
+        end = start + self._block_length(index)
+        self._blocks[index] = self._get_executor().submit(self.read_range, start, end)
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency,
+                        thread_name_prefix="dbnd-ranged-read",
+                    )
+        return self._executor
+
+
+class RangedReadFile(io.BufferedReader):
+    """
+    Read-only, seekable file over `read_range(start, end) -> bytes` (end is exclusive).
+
+    The blocks are cached by the underlying raw file, the buffer of the reader itself is small.
+    """
+
+    def __init__(
+        self,
+        read_range,
+        size,
+        name=None,
+        block_size=DEFAULT_BLOCK_SIZE,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        read_ahead_blocks=DEFAULT_READ_AHEAD_BLOCKS,
+        max_buffer_blocks=None,
+    ):
+        raw = _RangedRawIO(
+            read_range,
+            size,
+            name=name,
+            block_size=block_size,
+            max_concurrency=max_concurrency,
+            read_ahead_blocks=read_ahead_blocks,
+            max_buffer_blocks=max_buffer_blocks,
+        )
+        super(RangedReadFile, self).__init__(raw)
+
+    @property
+    def size(self):
+        return self.raw.size
+
+    def prefetch(self, offset, length):
+        """Starts fetching the range in background, so the following reads of it don't wait"""
+        self.raw.prefetch(offset, length)
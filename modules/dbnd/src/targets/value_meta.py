@@ -1,5 +1,8 @@
 # © Copyright Databand.ai, an IBM Company 2022
 
+import math
+import os
+
 from collections import ChainMap
 from typing import Dict, List, Optional, Tuple, Union
 
@@ -141,10 +144,44 @@ class ValueMetaConf(object):
     log_stats = attr.ib(
         default=None, converter=LogDataRequest.from_user_param
     )  # type: Optional[Union[LogDataRequest, bool]]
+    # amount of rows (>= 1) or a fraction of rows (< 1) to calculate stats and histograms on
+    log_stats_sample_size = attr.ib(default=None)  # type: Optional[Union[int, float]]
+    log_stats_sample_seed = attr.ib(default=None)  # type: Optional[int]
+    # calculate the counts, mean, std, min, max and distinct count of the sampled stats on all the rows
+    log_stats_exact_counts = attr.ib(default=None)  # type: Optional[bool]
+    # amount of threads calculating histograms of different columns, 0 for the amount of cpus
+    log_histograms_parallelism = attr.ib(default=None)  # type: Optional[int]
+    # hash only sampled blocks of the data columns that are larger than this
+    log_data_hash_max_bytes = attr.ib(default=None)  # type: Optional[int]
+    # cache lazy evaluated values (spark) between the stats and the histograms calculations
+    log_spark_cache = attr.ib(default=None)  # type: Optional[bool]
 
     def get_preview_size(self):
         return self.log_preview_size or _DEFAULT_VALUE_PREVIEW_MAX_LEN
 
+    def get_stats_sample_size(self, records_count):
+        # type: (int) -> Optional[int]
+        """The amount of sampled rows for stats and histograms, None if all the rows should be used"""
+        sample_size = self.log_stats_sample_size
+        if not sample_size:
+            return None
+        if sample_size < 1:
+            sample_size = math.ceil(records_count * sample_size)
+        sample_size = int(sample_size)
+        if sample_size >= records_count:
+            return None
+        return sample_size
+
+    def get_stats_sample_seed(self):
+        # type: () -> int
+        return self.log_stats_sample_seed or 0
+
+    def get_histograms_parallelism(self):
+        # type: () -> int
+        if self.log_histograms_parallelism is None:
+            return 1
+        return self.log_histograms_parallelism or os.cpu_count() or 1
+
     @classmethod
     def enabled(cls):
         return ValueMetaConf(
@@ -1,5 +1,6 @@
 # © Copyright Databand.ai, an IBM Company 2022
 
+from dbnd._core.configuration.config_value import extend, fold_config_value, override
 from dbnd._core.configuration.dbnd_config import config
 from dbnd._core.configuration.pprint_config import pformat_current_config
 
@@ -64,3 +65,48 @@ class TestDbndConfig(object):
             }
         ):
             assert config.get("b", "a") == "from_a"
+
+    def test_multisection_config_value(self):
+        with config({"task": {"p": 1}, "my_task": {"p": 2}}, source="first"):
+            with config({"task": {"p": override(3)}}, source="second"):
+                with config({"my_task": {"p": extend([4])}}, source="third"):
+                    sections = ["my_task", "task"]
+                    expected = _multisection_config_value_by_layers(
+                        config, sections, "p"
+                    )
+                    actual = config.get_multisection_config_value(sections, "p")
+                    assert actual == expected
+                    assert [v.value for v in actual] == [3]
+
+                    # the second lookup is memoized by the layer
+                    assert config.get_multisection_config_value(sections, "p") == actual
+
+                # a new layer has its own view of the config
+                assert [
+                    v.value
+                    for v in config.get_multisection_config_value(
+                        ["my_task", "task"], "p"
+                    )
+                ] == [3]
+
+            with config({"my_task": {"p": extend([4])}}, source="third"):
+                actual = config.get_multisection_config_value(["my_task", "task"], "p")
+                assert [v.value for v in actual] == [2, [4]]
+                assert actual == _multisection_config_value_by_layers(
+                    config, ["my_task", "task"], "p"
+                )
+
+
+def _multisection_config_value_by_layers(dbnd_config, sections, key):
+    # layer by layer, section by section (the plain walk over the layers)
+    config_value_stack = []
+    layer = dbnd_config.config_layer
+    while layer:
+        for section in sections:
+            config_value = layer.layer_config.get_config_value(section, key)
+            if config_value:
+                config_value_stack = fold_config_value(
+                    stack=config_value_stack, lower=config_value
+                )
+        layer = layer.parent
+    return config_value_stack
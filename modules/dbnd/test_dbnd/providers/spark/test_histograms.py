@@ -70,3 +70,23 @@ class TestSparkHistograms(BaseHistogramTests):
         assert value_meta.histograms["null_column"] == ([20], [None])
         col_stats = value_meta.get_column_stats_by_col_name("null_column")
         assert col_stats.column_type == "string"
+
+    def test_high_cardinality_str_column(self, spark_session, meta_conf):
+        from targets.providers.spark.spark_histograms import (
+            CATEGORICAL_HISTOGRAM_MAX_VALUES,
+            CATEGORICAL_HISTOGRAM_OTHERS,
+        )
+
+        # value i appears i + 1 times, the most frequent values are the last ones
+        values = [(str(i),) for i in range(100) for _ in range(i + 1)]
+        df = spark_session.createDataFrame(values, ["str_column"])
+        value_meta = SparkDataFrameValueType().get_value_meta(df, meta_conf)
+
+        counts, histogram_values = value_meta.histograms["str_column"]
+        top_count = CATEGORICAL_HISTOGRAM_MAX_VALUES - 1
+        assert histogram_values[:top_count] == [
+            str(i) for i in range(99, 99 - top_count, -1)
+        ]
+        assert histogram_values[-1] == CATEGORICAL_HISTOGRAM_OTHERS
+        assert counts[-1] == sum(range(1, 100 - top_count + 1))
+        assert sum(counts) == len(values)
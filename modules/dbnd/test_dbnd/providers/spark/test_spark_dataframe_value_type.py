@@ -1,6 +1,7 @@
 # © Copyright Databand.ai, an IBM Company 2022
 import logging
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -148,12 +149,57 @@ class TestSparkDataFrameValueType(object):
         # assert df_value_meta.histograms == expected_value_meta.histograms
         # assert attr.asdict(df_value_meta) == attr.asdict(expected_value_meta)
 
+        births_counts, births_values = np.histogram(
+            spark_data_frame.toPandas()["Births"], bins=20
+        )
+        assert df_value_meta.histograms["Births"] == [
+            births_counts.tolist(),
+            births_values.tolist(),
+        ]
+        assert df_value_meta.histograms["Married"] == [[3, 2], [True, False]]
+        names_counts, names = df_value_meta.histograms["Names"]
+        assert names_counts == [1] * 5
+        assert sorted(names) == ["Bob", "Jessica", "John", "Mary", "Mel"]
+
         pandas_data_frame = spark_data_frame.toPandas()
         pandas_value_meta = DataFrameValueType().get_value_meta(
             pandas_data_frame, meta_conf
         )
         # assert df_value_meta == pandas_value_meta
 
+    @pytest.mark.spark
+    def test_spark_df_histograms_of_special_values(self, spark_session):
+        values = [float(i) for i in range(100)] + [
+            float("nan"),
+            float("inf"),
+            float("-inf"),
+            None,
+        ]
+        pandas_df = pd.DataFrame(
+            {
+                "floats": values,
+                "strings": ["value_%s" % (i % 60) for i in range(len(values))],
+            }
+        )
+        spark_df = spark_session.createDataFrame(pandas_df)
+
+        value_meta = SparkDataFrameValueType().get_value_meta(
+            spark_df, ValueMetaConf.enabled()
+        )
+
+        # NaN and infinite values are not bucketed, the range is of the finite values
+        counts, bins = np.histogram(range(100), bins=20)
+        assert value_meta.histograms["floats"] == [counts.tolist(), bins.tolist()]
+        floats_stats = value_meta.get_column_stats_by_col_name("floats")
+        # NaN and None are nulls, as in pandas
+        assert floats_stats.null_count == 2
+        assert floats_stats.max_value == float("inf")
+
+        strings_counts, strings = value_meta.histograms["strings"]
+        assert len(strings) == 50
+        assert strings[-1] == "_others"
+        assert sum(strings_counts) == len(values)
+
 
 @pytest.fixture
 def spark_data_frame_stats():
@@ -162,7 +208,7 @@ def spark_data_frame_stats():
             column_name="Names",
             column_type="StringType()",
             records_count=5,
-            distinct_count=None,
+            distinct_count=5,
             null_count=0,
             unique_count=None,
             most_freq_value=None,
@@ -179,34 +225,34 @@ def spark_data_frame_stats():
             column_name="Births",
             column_type="LongType()",
             records_count=5,
-            distinct_count=None,
+            distinct_count=5,
             null_count=0,
             unique_count=None,
             most_freq_value=None,
             most_freq_value_count=None,
-            mean_value="550.2",
-            min_value="77",
-            max_value="973",
-            std_value="428.42467249214303",
-            quartile_1="155",
-            quartile_2="578",
-            quartile_3="968",
+            mean_value=550.2,
+            min_value=77,
+            max_value=973,
+            std_value=428.42467249214303,
+            quartile_1=155,
+            quartile_2=578,
+            quartile_3=968,
         ),
         ColumnStatsArgs(
             column_name="Weights",
             column_type="DoubleType()",
             records_count=5,
-            distinct_count=None,
+            distinct_count=5,
             null_count=0,
             unique_count=None,
             most_freq_value=None,
             most_freq_value_count=None,
-            mean_value="41.160000000000004",
-            min_value="12.3",
-            max_value="67.8",
-            std_value="23.01744990219377",
-            quartile_1="23.4",
-            quartile_2="45.6",
-            quartile_3="56.7",
+            mean_value=41.160000000000004,
+            min_value=12.3,
+            max_value=67.8,
+            std_value=23.01744990219377,
+            quartile_1=23.4,
+            quartile_2=45.6,
+            quartile_3=56.7,
         ),
     ]
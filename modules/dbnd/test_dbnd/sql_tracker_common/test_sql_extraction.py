@@ -3,6 +3,8 @@
 import pytest
 import sqlparse
 
+from mock import patch
+
 from dbnd._core.constants import DbndTargetOperationType
 from dbnd._core.utils.sql_tracker_common.sql_extract import Column, SqlQueryExtractor
 
@@ -259,3 +261,33 @@ def test_invalid_query(sqlquery, expected):
 )
 def test_clean_query(sqlquery, expected):
     assert SqlQueryExtractor().clean_query(sqlquery) == expected
+
+
+def test_extract_query_operations_schemas_is_cached():
+    query = """copy into JSON_TABLE from s3://bucket/file_cached.json CREDENTIALS = (AWS_KEY_ID = '12345' AWS_SECRET_KEY = '12345')"""
+    expected = SqlQueryExtractor().extract_operations_schemas(
+        parse_first_query(SqlQueryExtractor().clean_query(query))
+    )
+
+    with patch(
+        "dbnd._core.utils.sql_tracker_common.sql_extract.sqlparse.parse",
+        wraps=sqlparse.parse,
+    ) as parse_mock:
+        first = SqlQueryExtractor().extract_query_operations_schemas(query)
+        second = SqlQueryExtractor().extract_query_operations_schemas(query)
+
+    assert first == second == expected
+    # the same query is parsed only once, but the callers don't share the result
+    assert parse_mock.call_count == 1
+    assert first is not second
+
+
+@pytest.mark.parametrize(
+    "sqlquery", ["", "SHOW TABLES", "USE WAREHOUSE compute_wh", "COMMIT"]
+)
+def test_extract_query_operations_schemas_skips_parsing(sqlquery):
+    with patch(
+        "dbnd._core.utils.sql_tracker_common.sql_extract.sqlparse.parse"
+    ) as parse_mock:
+        assert SqlQueryExtractor().extract_query_operations_schemas(sqlquery) == {}
+    parse_mock.assert_not_called()
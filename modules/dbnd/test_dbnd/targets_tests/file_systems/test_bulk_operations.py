@@ -0,0 +1,136 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+import os
+
+import pytest
+
+from targets.errors import (
+    BulkOperationException,
+    FileAlreadyExists,
+    FileNotFoundException,
+)
+from targets.fs.file_system import FileSystem
+from targets.utils.bulk import chunks, run_bulk
+
+
+class DictFileSystem(FileSystem):
+    """Object store like file system that keeps the files in memory"""
+
+    bulk_max_concurrency = 4
+
+    def __init__(self, files=None):
+        super(DictFileSystem, self).__init__()
+        self.files = dict(files or {})
+
+    def exists(self, path):
+        return path in self.files
+
+    def remove(self, path, recursive=True, skip_trash=True):
+        return self.files.pop(path, None) is not None
+
+    def copy(self, path, dest, raise_if_exists=False):
+        if raise_if_exists and dest in self.files:
+            raise FileAlreadyExists(dest)
+        self.files[dest] = self.files[path]
+
+    def copy_from_local_file(self, local_path, dest, **kwargs):
+        with open(local_path, "rb") as f:
+            self.files[dest] = f.read()
+
+    def download_file(self, path, location, **kwargs):
+        if path not in self.files:
+            raise FileNotFoundException(path)
+        with open(location, "wb") as f:
+            f.write(self.files[path])
+
+
+def _partitions(count):
+    return {"s3://bucket/data/part-%04d" % i: b"%d" % i for i in range(count)}
+
+
+class TestRunBulk(object):
+    def test_results_order(self):
+        assert run_bulk(lambda x, y: x * y, [(i, 2) for i in range(50)]) == [
+            i * 2 for i in range(50)
+        ]
+        assert run_bulk(lambda x: x, []) == []
+
+    def test_retry(self):
+        attempts = []
+
+        def flaky(i):
+            attempts.append(i)
+            if attempts.count(i) < 2:
+                raise IOError("connection reset")
+            return i
+
+        assert run_bulk(flaky, [(i,) for i in range(10)], retry_delay=0) == list(
+            range(10)
+        )
+        assert len(attempts) == 20
+
+    def test_failures(self):
+        calls = []
+
+        def copy(i):
+            calls.append(i)
+            if i % 3 == 0:
+                raise FileAlreadyExists("exists %s" % i)
+
+        with pytest.raises(BulkOperationException, match="4 of 10 calls") as ex:
+            run_bulk(copy, [(i,) for i in range(10)], retry_delay=0)
+
+        # all calls are completed, file system errors are not retried
+        assert sorted(calls) == list(range(10))
+        assert sorted(args for args, _ in ex.value.failures) == [(0,), (3,), (6,), (9,)]
+
+    def test_chunks(self):
+        assert chunks(range(5), 2) == [[0, 1], [2, 3], [4]]
+        assert chunks([], 2) == []
+
+
+class TestFileSystemBulkOperations(object):
+    def test_copy_many(self):
+        fs = DictFileSystem(_partitions(100))
+        fs.copy_many(
+            [(path, path.replace("/data/", "/copy/")) for path in _partitions(100)]
+        )
+
+        assert len(fs.files) == 200
+        assert fs.files["s3://bucket/copy/part-0042"] == b"42"
+
+    def test_copy_many_failures(self):
+        fs = DictFileSystem(_partitions(10))
+        with pytest.raises(BulkOperationException) as ex:
+            fs.copy_many(
+                [(path, "s3://bucket/data/part-0000") for path in _partitions(10)],
+                raise_if_exists=True,
+            )
+        assert len(ex.value.failures) == 10
+
+    def test_remove_many(self):
+        fs = DictFileSystem(_partitions(100))
+        fs.remove_many(list(_partitions(50)))
+        assert sorted(fs.files) == sorted(_partitions(100))[50:]
+
+    def test_put_and_get_many(self, tmpdir):
+        local = tmpdir.mkdir("local")
+        for i in range(20):
+            local.join("part-%04d" % i).write_binary(b"%d" % i)
+
+        fs = DictFileSystem()
+        fs.copy_from_local(str(local), "s3://bucket/data")
+        assert fs.files == {
+            os.path.join("s3://bucket/data", name): data
+            for name, data in (("part-%04d" % i, b"%d" % i) for i in range(20))
+        }
+
+        target = tmpdir.join("downloaded")
+        fs.get_many(
+            [
+                (path, str(target.join("nested", os.path.basename(path))))
+                for path in fs.files
+            ]
+        )
+        assert target.join("nested", "part-0007").read_binary() == b"7"
+        assert len(target.join("nested").listdir()) == 20
@@ -0,0 +1,116 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+from targets import target
+from targets.caching import TargetsExistenceCache, target_exists
+from targets.fs.file_system import FileSystem
+
+
+class ListingFileSystem(FileSystem):
+    """Object store like file system that counts its requests"""
+
+    exists_many_by_listing = True
+    exists_many_listing_min_paths = 2
+
+    def __init__(self, files):
+        super(ListingFileSystem, self).__init__()
+        self.files = set(files)
+        self.exists_calls = 0
+        self.listdir_calls = 0
+
+    def exists(self, path):
+        self.exists_calls += 1
+        return path in self.files or any(
+            f.startswith(path.rstrip("/") + "/") for f in self.files
+        )
+
+    def listdir(self, path):
+        self.listdir_calls += 1
+        return [f for f in self.files if f.startswith(path)]
+
+    def remove(self, path, recursive=True, skip_trash=True):
+        self.files.discard(path)
+
+
+FILES = [
+    "s3://bucket/root/task/task_1/result.csv",
+    "s3://bucket/root/task/task_2/result.csv",
+    "s3://bucket/root/task/task_3/output/part-0000",
+    "s3://bucket/root/other/other_1/result.csv",
+]
+
+
+def test_exists_many_by_listing():
+    fs = ListingFileSystem(FILES)
+    paths = [
+        "s3://bucket/root/task/task_1/result.csv",
+        "s3://bucket/root/task/task_2/result.csv",
+        "s3://bucket/root/task/task_3/output/",
+        "s3://bucket/root/task/task_4/result.csv",
+        "s3://bucket/root/other/other_1/result.csv",
+        "s3://bucket/top.csv",
+    ]
+
+    result = fs.exists_many(paths)
+    assert result == {
+        "s3://bucket/root/task/task_1/result.csv": True,
+        "s3://bucket/root/task/task_2/result.csv": True,
+        "s3://bucket/root/task/task_3/output/": True,
+        "s3://bucket/root/task/task_4/result.csv": False,
+        "s3://bucket/root/other/other_1/result.csv": True,
+        "s3://bucket/top.csv": False,
+    }
+    # a single listing of the "task" folder, other paths are alone in their prefix
+    assert fs.listdir_calls == 1
+    assert fs.exists_calls == 2
+    assert result == {path: fs.exists(path) for path in paths}
+
+
+def test_exists_many_without_listing():
+    fs = ListingFileSystem(FILES)
+    fs.exists_many_by_listing = False
+
+    assert fs.exists_many(FILES[:2]) == {FILES[0]: True, FILES[1]: True}
+    assert fs.listdir_calls == 0
+    assert fs.exists_calls == 2
+
+
+def test_exists_many_small_groups():
+    fs = ListingFileSystem(FILES)
+    fs.exists_many_listing_min_paths = 4
+
+    assert fs.exists_many(FILES[:3]) == {path: True for path in FILES[:3]}
+    # listing is not worth it for a few paths
+    assert fs.listdir_calls == 0
+    assert fs.exists_calls == 3
+
+
+def test_exists_many_listing_limit():
+    files = ["s3://bucket/root/task/task_%s/result.csv" % i for i in range(100)]
+    fs = ListingFileSystem(files)
+    fs.exists_many_listing_max_objects = 10
+    paths = files[:5] + ["s3://bucket/root/task/task_100/result.csv"]
+
+    result = fs.exists_many(paths)
+    assert result == {path: path in files for path in paths}
+    # the listing is stopped, the paths are checked one by one
+    assert fs.listdir_calls == 1
+    assert fs.exists_calls == len(paths)
+
+
+def test_targets_existence_cache():
+    fs = ListingFileSystem(FILES)
+    existing = [target(path, fs=fs) for path in FILES[:2]]
+    missing = target("s3://bucket/root/task/task_4/result.csv", fs=fs)
+
+    existence_cache = TargetsExistenceCache()
+    existence_cache.prefetch(existing + [missing])
+    assert fs.listdir_calls == 1
+
+    with TargetsExistenceCache.context(existence_cache):
+        assert all(target_exists(t) for t in existing)
+        assert not target_exists(missing)
+    assert fs.exists_calls == 0
+
+    # not active - checked directly
+    assert not target_exists(missing)
+    assert fs.exists_calls == 1
@@ -0,0 +1,101 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+import io
+import threading
+
+import pytest
+
+from targets.utils.ranged_read import RangedReadFile
+
+
+class RangeSource(object):
+    """Remote object that records the requested ranges"""
+
+    def __init__(self, data):
+        self.data = data
+        self.ranges = []
+        self._lock = threading.Lock()
+
+    def read_range(self, start, end):
+        with self._lock:
+            self.ranges.append((start, end))
+        return self.data[start:end]
+
+
+DATA = bytes(bytearray(i % 251 for i in range(10000)))
+
+
+def _open(source, **kwargs):
+    kwargs.setdefault("block_size", 1000)
+    kwargs.setdefault("read_ahead_blocks", 2)
+    return RangedReadFile(
+        source.read_range, len(source.data), name="s3://b/f", **kwargs
+    )
+
+
+class TestRangedReadFile(object):
+    def test_read_all(self):
+        source = RangeSource(DATA)
+        with _open(source) as f:
+            assert f.read() == DATA
+            assert f.read() == b""
+        assert sorted(source.ranges) == [(i, i + 1000) for i in range(0, 10000, 1000)]
+
+    def test_read_chunks(self):
+        source = RangeSource(DATA)
+        with _open(source) as f:
+            chunks = iter(lambda: f.read(333), b"")
+            assert b"".join(chunks) == DATA
+
+    def test_read_lines(self):
+        lines = ["line %s\n" % i for i in range(1000)]
+        source = RangeSource("".join(lines).encode("utf-8"))
+        with _open(source, block_size=100) as f:
+            assert io.TextIOWrapper(f, encoding="utf-8").readlines() == lines
+
+    def test_seek_to_footer(self):
+        source = RangeSource(DATA)
+        with _open(source) as f:
+            f.seek(-8, io.SEEK_END)
+            assert f.tell() == 9992
+            assert f.read() == DATA[-8:]
+            f.seek(1500)
+            assert f.read(10) == DATA[1500:1510]
+        # random access doesn't read ahead
+        assert source.ranges == [(9000, 10000), (1000, 2000)]
+
+    def test_bounded_buffer(self):
+        source = RangeSource(DATA)
+        with _open(source, read_ahead_blocks=2, max_buffer_blocks=3) as f:
+            while f.read(100):
+                assert len(f.raw._blocks) <= 4
+        assert len(source.ranges) == 10
+
+    def test_prefetch(self):
+        source = RangeSource(DATA)
+        with _open(source, read_ahead_blocks=0) as f:
+            f.prefetch(5500, 2000)
+            assert len(source.ranges) <= 3
+            f.seek(5500)
+            assert f.read(2000) == DATA[5500:7500]
+        assert sorted(source.ranges) == [(5000, 6000), (6000, 7000), (7000, 8000)]
+
+    def test_empty(self):
+        source = RangeSource(b"")
+        with _open(source) as f:
+            assert f.read() == b""
+        assert source.ranges == []
+
+    def test_read_error(self):
+        def read_range(start, end):
+            raise IOError("connection reset")
+
+        with RangedReadFile(read_range, 100) as f:
+            with pytest.raises(IOError, match="connection reset"):
+                f.read()
+
+    def test_changed_file(self):
+        source = RangeSource(DATA)
+        with RangedReadFile(source.read_range, len(DATA) + 10, block_size=1000) as f:
+            with pytest.raises(IOError, match="Has the file changed"):
+                f.read()
@@ -0,0 +1,110 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+import logging
+import time
+
+import attr
+import numpy as np
+import pandas as pd
+import pytest
+
+from targets.providers.pandas.pandas_column_stats import (
+    calculate_columns_stats,
+    calculate_columns_stats_legacy,
+)
+from targets.providers.pandas.pandas_sketches import estimate_distinct_count
+from test_dbnd.targets_tests.pandas_tests.test_pandas_histograms import diverse_df
+
+
+logger = logging.getLogger(__name__)
+
+
+def _build_dtypes_df(size=400):
+    values = np.arange(size)
+    return pd.DataFrame(
+        {
+            "int": values % 13,
+            "float": np.where(values % 7 == 0, np.nan, values / 3.0),
+            "float32": (values / 7.0).astype("float32"),
+            "uint8": (values % 200).astype("uint8"),
+            "nullable_int": pd.array(
+                [None if v % 5 == 0 else v % 11 for v in values], dtype="Int64"
+            ),
+            "bool": values % 3 == 0,
+            "nullable_bool": pd.array(
+                [None if v % 4 == 0 else bool(v % 3) for v in values], dtype="boolean"
+            ),
+            "str": [None if v % 9 == 0 else "str_%d" % (v % 17) for v in values],
+            "none_and_nan": [
+                np.nan if v % 11 == 0 else (None if v % 13 == 0 else "v%d" % (v % 5))
+                for v in values
+            ],
+            "string": pd.array(
+                [None if v % 6 == 0 else "s%d" % (v % 3) for v in values],
+                dtype="string",
+            ),
+            "category": pd.Categorical(["abca"[v % 4] for v in values]),
+            "datetime": pd.date_range("2020-01-01", periods=size, freq="H"),
+            "all_nan": [np.nan] * size,
+            "all_none": [None] * size,
+            7: values % 5,
+        }
+    )
+
+
+def _assert_same_stats(df):
+    actual = calculate_columns_stats(df)
+    expected = calculate_columns_stats_legacy(df)
+    assert [s.column_name for s in actual] == [s.column_name for s in expected]
+    for actual_stats, expected_stats in zip(actual, expected):
+        assert attr.asdict(actual_stats) == pytest.approx(attr.asdict(expected_stats))
+
+
+@pytest.mark.parametrize(
+    "df",
+    [
+        diverse_df,
+        _build_dtypes_df(),
+        _build_dtypes_df(size=1),
+        _build_dtypes_df(size=0),
+        pd.DataFrame(),
+    ],
+)
+def test_columns_stats_same_as_describe(df):
+    _assert_same_stats(df)
+
+
+def test_columns_stats_keeps_columns_order():
+    df = pd.DataFrame({"b": ["x", "y"], "a": [1, 2], "c": [1.5, None], "d": [3, 4]})
+    assert [s.column_name for s in calculate_columns_stats(df)] == ["b", "a", "c", "d"]
+
+
+@pytest.mark.parametrize("cardinality", [1, 10, 1000, 100000])
+def test_estimate_distinct_count(cardinality):
+    column = pd.Series(np.arange(200000) % cardinality)
+    assert estimate_distinct_count(column) == pytest.approx(cardinality, rel=0.02)
+
+    with_nulls = pd.Series(["v%s" % (i % cardinality) for i in range(1000)] + [None])
+    assert estimate_distinct_count(with_nulls) == pytest.approx(
+        len(with_nulls.unique()), rel=0.02
+    )
+
+
+@pytest.mark.skip("performance tests")
+class TestPandasColumnStatsPerformance(object):
+    def test_performance(self):
+        rows, columns = 1000000, 200
+        df = pd.DataFrame(
+            np.random.random((rows, columns)),
+            columns=["column_%s" % i for i in range(columns)],
+        )
+        for calculate in [calculate_columns_stats, calculate_columns_stats_legacy]:
+            start = time.time()
+            calculate(df)
+            logger.info(
+                "%s on %sx%s: %.2fs",
+                calculate.__name__,
+                rows,
+                columns,
+                time.time() - start,
+            )
@@ -0,0 +1,83 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+import numpy as np
+import pandas as pd
+
+from targets.providers.pandas.pandas_hashing import hash_pandas
+from targets.providers.pandas.pandas_values import DataFrameValueType
+
+
+def _build_df():
+    return pd.DataFrame(
+        {
+            "int": [1, 2, 3],
+            "float": [1.5, None, 3.5],
+            "str": ["a", None, "c"],
+            "nullable": pd.array([1, None, 3], dtype="Int64"),
+            "date": pd.date_range("2020-01-01", periods=3),
+            "category": pd.Categorical(["x", "y", "x"]),
+        }
+    )
+
+
+def test_hash_is_stable():
+    assert hash_pandas(_build_df()) == hash_pandas(_build_df())
+    assert hash_pandas(_build_df()["str"]) == hash_pandas(_build_df()["str"])
+
+
+def test_hash_changes_with_content():
+    df = _build_df()
+    expected = hash_pandas(df)
+
+    changed_value = _build_df()
+    changed_value.loc[1, "str"] = "b"
+    changed_dtype = _build_df().astype({"int": "int32"})
+    renamed = _build_df().rename(columns={"int": "other"})
+    reindexed = _build_df().set_index(pd.Index([10, 20, 30]))
+
+    for changed in [changed_value, changed_dtype, renamed, reindexed]:
+        assert hash_pandas(changed) != expected
+
+    # the index is ignored when it's not requested
+    assert hash_pandas(reindexed, index=False) == hash_pandas(df, index=False)
+
+
+def test_sampled_hash():
+    df = pd.DataFrame({"a": np.arange(1000000), "b": np.arange(1000000) * 2.0})
+    sampled = hash_pandas(df, max_column_bytes=1024)
+    assert sampled == hash_pandas(df.copy(), max_column_bytes=1024)
+    assert sampled != hash_pandas(df)
+
+    changed = df.copy()
+    changed.loc[0, "a"] = -1
+    assert hash_pandas(changed, max_column_bytes=1024) != sampled
+
+
+def test_dataframe_signature():
+    value_type = DataFrameValueType()
+    signature = value_type.to_signature(_build_df())
+    assert signature.startswith("[3,6]:")
+    assert signature == value_type.to_signature(_build_df())
+
+
+def test_sampled_hash_of_objects():
+    df = pd.DataFrame({"a": ["value_%s" % i for i in range(100000)]})
+    sampled = hash_pandas(df, max_column_bytes=1024)
+    assert sampled == hash_pandas(df.copy(), max_column_bytes=1024)
+
+    changed = df.copy()
+    changed.loc[0, "a"] = "changed"
+    assert hash_pandas(changed, max_column_bytes=1024) != sampled
+
+
+def test_hash_of_unhashable_values():
+    def build_df():
+        return pd.DataFrame({"a": [[1, 2], [3]], "b": [{"x": 1}, {"y": 2}]})
+
+    value_type = DataFrameValueType()
+    signature = value_type.to_signature(build_df())
+    assert signature == value_type.to_signature(build_df())
+
+    changed = build_df()
+    changed.at[1, "a"] = [4]
+    assert value_type.to_signature(changed) != signature
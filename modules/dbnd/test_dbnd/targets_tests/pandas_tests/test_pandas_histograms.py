@@ -3,9 +3,18 @@
 from collections import ChainMap
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
+import pytest
+
+from mock import patch
 
 from dbnd._core.tracking.schemas.column_stats import ColumnStatsArgs
+from targets.providers.pandas import (
+    pandas_column_stats,
+    pandas_hashing,
+    pandas_sketches,
+)
 from targets.providers.pandas.pandas_histograms import PandasHistograms
 from targets.value_meta import ValueMetaConf
 
@@ -216,3 +225,118 @@ def test_pandas_histograms_work_with_NaNs_and_nonseq_index(pandas_data_frame):
         ]
     }
     # fmt: on
+
+
+def _sampled_df(size):
+    return pd.DataFrame(
+        {
+            "int_column": np.arange(size) % 100,
+            "float_column": np.where(
+                np.arange(size) % 10 == 0, np.nan, np.arange(size)
+            ),
+            "str_column": ["value_%s" % (i % 7) for i in range(size)],
+        }
+    )
+
+
+def test_pandas_sampled_histograms_and_stats():
+    size = 10000
+    df = _sampled_df(size)
+    meta_conf = ValueMetaConf.enabled()
+    meta_conf.log_stats_sample_size = 1000
+    meta_conf.log_stats_sample_seed = 42
+
+    pandas_histograms = PandasHistograms(df, meta_conf)
+    columns_stats, histograms = pandas_histograms.get_histograms_and_stats()
+
+    assert pandas_histograms.approximation_metrics == {
+        "stats_approximate": True,
+        "stats_sample_size": 1000,
+        "stats_sample_seed": 42,
+        "distinct_count_algorithm": "shlosser",
+    }
+    stats = {column_stats.column_name: column_stats for column_stats in columns_stats}
+    # counts are scaled from the sample, mean, std, min and max are the ones of the sample
+    float_stats = stats["float_column"]
+    assert float_stats.records_count == size
+    assert float_stats.null_count == pytest.approx(size // 10, rel=0.2)
+    assert float_stats.mean_value == pytest.approx(df["float_column"].mean(), rel=0.1)
+    assert float_stats.quartile_2 == pytest.approx(size / 2, rel=0.1)
+
+    # values that appear in the sample more than once are counted precisely
+    assert stats["int_column"].distinct_count == 100
+    assert stats["str_column"].distinct_count == 7
+    assert stats["str_column"].unique_count == 7
+    assert stats["str_column"].most_freq_value_count == pytest.approx(size / 7, rel=0.2)
+    # values that appear once are scaled to the size of the df
+    assert stats["float_column"].distinct_count == pytest.approx(
+        df["float_column"].nunique(dropna=False), rel=0.2
+    )
+
+    # histograms are scaled to the size of the df
+    assert sum(histograms["int_column"][0]) == pytest.approx(size, rel=0.01)
+    assert sum(histograms["str_column"][0]) == pytest.approx(size, rel=0.01)
+
+    # the same seed - the same sample
+    assert (columns_stats, histograms) == PandasHistograms(
+        df, meta_conf
+    ).get_histograms_and_stats()
+
+
+def test_pandas_sampled_stats_with_exact_counts():
+    size = 10000
+    df = _sampled_df(size)
+    meta_conf = ValueMetaConf.enabled()
+    meta_conf.log_stats_sample_size = 1000
+    meta_conf.log_stats_exact_counts = True
+
+    pandas_histograms = PandasHistograms(df, meta_conf)
+    columns_stats, _ = pandas_histograms.get_histograms_and_stats()
+    assert pandas_histograms.approximation_metrics["distinct_count_algorithm"] == (
+        "hyperloglog"
+    )
+
+    # counts, mean, std, min and max are exact
+    float_stats = {stats.column_name: stats for stats in columns_stats}["float_column"]
+    assert float_stats.records_count == size
+    assert float_stats.null_count == size // 10
+    assert float_stats.non_null_count == size - size // 10
+    assert float_stats.mean_value == df["float_column"].mean()
+    assert float_stats.min_value == 1.0
+    assert float_stats.max_value == size - 1.0
+    assert float_stats.distinct_count == pytest.approx(
+        df["float_column"].nunique(dropna=False), rel=0.02
+    )
+
+
+def test_pandas_sampled_stats_scan_only_the_sample():
+    df = _sampled_df(100000)
+    meta_conf = ValueMetaConf.enabled()
+    meta_conf.log_stats_sample_size = 1000
+
+    hashed_sizes = []
+
+    def hash_values(values, index=False):
+        hashed_sizes.append(len(values))
+        return pandas_hashing.hash_values(values, index=index)
+
+    with patch.object(pandas_sketches, "hash_values", hash_values), patch.object(
+        pandas_column_stats,
+        "calculate_columns_stats",
+        wraps=pandas_column_stats.calculate_columns_stats,
+    ) as calculate_columns_stats:
+        PandasHistograms(df, meta_conf).get_histograms_and_stats()
+
+    assert hashed_sizes and max(hashed_sizes) <= 1000
+    (sample_df,), _ = calculate_columns_stats.call_args
+    assert len(sample_df) == 1000
+
+
+def test_pandas_parallel_histograms():
+    meta_conf = ValueMetaConf.enabled()
+    expected = PandasHistograms(diverse_df, meta_conf).get_histograms_and_stats()
+
+    meta_conf.log_histograms_parallelism = 4
+    assert (
+        PandasHistograms(diverse_df, meta_conf).get_histograms_and_stats() == expected
+    )
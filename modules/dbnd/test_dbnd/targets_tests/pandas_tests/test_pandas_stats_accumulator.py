@@ -0,0 +1,179 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from targets import target
+from targets.providers.pandas.pandas_histograms import PandasHistograms
+from targets.providers.pandas.pandas_marshaller import DataFrameToCsv
+from targets.providers.pandas.pandas_stats_accumulator import PandasStatsAccumulator
+from targets.providers.pandas.pandas_values import DataFrameValueType
+from targets.target_config import file
+from targets.value_meta import ValueMetaConf
+from test_dbnd.targets_tests.pandas_tests.test_pandas_histograms import diverse_df
+
+
+def _build_df(size):
+    values = np.arange(size)
+    return pd.DataFrame(
+        {
+            "int_column": values % 100,
+            "float_column": np.where(values % 10 == 0, np.nan, values / 3.0),
+            "str_column": [
+                None if v % 13 == 0 else "value_%s" % (v % 7) for v in values
+            ],
+        }
+    )
+
+
+def _chunks(df, chunk_size):
+    return [df.iloc[i : i + chunk_size] for i in range(0, len(df), chunk_size)]
+
+
+def test_accumulator_is_exact_when_the_data_fits_the_sample():
+    meta_conf = ValueMetaConf.enabled()
+    accumulator = PandasStatsAccumulator(meta_conf)
+    for chunk in _chunks(diverse_df, 7):
+        accumulator.update(chunk)
+
+    (
+        columns_stats,
+        histograms,
+        approximation_metrics,
+    ) = accumulator.get_histograms_and_stats()
+    assert (columns_stats, histograms) == PandasHistograms(
+        diverse_df, meta_conf
+    ).get_histograms_and_stats()
+    assert approximation_metrics == {}
+
+
+def test_accumulator_with_sample():
+    df = _build_df(10000)
+    accumulator = PandasStatsAccumulator(ValueMetaConf.enabled(), sample_size=1000)
+    for chunk in _chunks(df, 999):
+        accumulator.update(chunk)
+
+    (
+        columns_stats,
+        histograms,
+        approximation_metrics,
+    ) = accumulator.get_histograms_and_stats()
+    assert approximation_metrics["stats_approximate"]
+    assert approximation_metrics["stats_sample_size"] == 1000
+
+    stats = {column_stats.column_name: column_stats for column_stats in columns_stats}
+    float_stats = stats["float_column"]
+    assert float_stats.records_count == 10000
+    assert float_stats.null_count == 1000
+    assert float_stats.mean_value == pytest.approx(df["float_column"].mean())
+    assert float_stats.std_value == pytest.approx(df["float_column"].std())
+    assert float_stats.min_value == pytest.approx(df["float_column"].min())
+    assert float_stats.max_value == pytest.approx(df["float_column"].max())
+    assert stats["int_column"].distinct_count == 100
+    assert stats["str_column"].distinct_count == len(df["str_column"].unique())
+    assert stats["str_column"].null_count == df["str_column"].isnull().sum()
+    assert sum(histograms["int_column"][0]) == pytest.approx(10000, rel=0.01)
+
+
+def test_accumulator_merge():
+    df = _build_df(5000)
+    meta_conf = ValueMetaConf.enabled()
+
+    accumulator = PandasStatsAccumulator(meta_conf, sample_size=500)
+    for chunk in _chunks(df, 1000):
+        accumulator.update(chunk)
+
+    first, second = (PandasStatsAccumulator(meta_conf, sample_size=500) for _ in "ab")
+    for chunk in _chunks(df.iloc[:3000], 1000):
+        first.update(chunk)
+    for chunk in _chunks(df.iloc[3000:], 1000):
+        second.update(chunk)
+    first.merge(second)
+
+    assert first.get_histograms_and_stats() == accumulator.get_histograms_and_stats()
+    assert first.get_data_hash() == accumulator.get_data_hash()
+
+
+def test_value_meta_from_chunks(pandas_data_frame, tmpdir):
+    meta_conf = ValueMetaConf.enabled()
+    t = target(str(tmpdir / "df.csv"))
+    t.write_df(pandas_data_frame)
+
+    chunks = DataFrameToCsv().target_to_chunks(t, chunksize=2)
+    value_meta = DataFrameValueType().get_value_meta_from_chunks(chunks, meta_conf)
+    expected = DataFrameValueType().get_value_meta(t.read_df(), meta_conf)
+
+    assert value_meta.value_preview == expected.value_preview
+    assert value_meta.data_dimensions == expected.data_dimensions
+    assert value_meta.data_schema == expected.data_schema
+    assert value_meta.columns_stats == expected.columns_stats
+    assert value_meta.histograms == expected.histograms
+    assert value_meta.data_hash
+
+
+def test_value_meta_of_chunks_with_different_dtypes(tmpdir):
+    # ints followed by strings, ints followed by nulls
+    df = pd.DataFrame(
+        {
+            "mixed": [str(i % 50) for i in range(300)]
+            + ["x%s" % (i % 7) for i in range(300)],
+            "nullable": [str(i % 30) for i in range(500)] + [None] * 100,
+        }
+    )
+    path = str(tmpdir / "df.csv")
+    df.to_csv(path, index=False)
+
+    meta_conf = ValueMetaConf.enabled()
+    value_meta = DataFrameValueType().get_value_meta_from_chunks(
+        pd.read_csv(path, chunksize=100), meta_conf
+    )
+    expected = DataFrameValueType().get_value_meta(pd.read_csv(path), meta_conf)
+
+    assert value_meta.data_schema == expected.data_schema
+    assert value_meta.data_schema.columns_types == {
+        "mixed": "object",
+        "nullable": "float64",
+    }
+    assert value_meta.columns_stats == expected.columns_stats
+    assert value_meta.histograms == expected.histograms
+
+
+def test_preview_of_chunks():
+    df = _build_df(100)
+    accumulator = PandasStatsAccumulator(ValueMetaConf.enabled())
+    for chunk in _chunks(df, 3):
+        accumulator.update(chunk)
+
+    value_type = DataFrameValueType()
+    assert value_type.to_preview(
+        accumulator.get_preview_df(), 10000
+    ) == value_type.to_preview(df, 10000)
+
+
+def test_tracking_value_meta_of_target_by_chunks(tmpdir):
+    from dbnd._core.settings import TrackingConfig
+    from dbnd._core.settings.tracking_config import ValueTrackingLevel, get_value_meta
+
+    df = _build_df(100)
+    meta_conf = ValueMetaConf.enabled()
+    csv_dir = tmpdir.mkdir("df")
+    for i, chunk in enumerate(_chunks(df, 40)):
+        chunk.to_csv(str(csv_dir / ("part-%04d.csv" % i)), index=False)
+    t = target(str(csv_dir) + "/", config=file.csv)
+
+    c = TrackingConfig.from_databand_context()
+    c.value_reporting_strategy = ValueTrackingLevel.ALL
+    c.log_value_read_chunksize = 7
+    value_meta = get_value_meta(t, meta_conf, tracking_config=c)
+    expected = DataFrameValueType().get_value_meta(
+        pd.concat(p.read_df() for p in t.list_partitions()), meta_conf
+    )
+
+    assert value_meta.data_dimensions == (100, 3)
+    assert value_meta.columns_stats == expected.columns_stats
+    assert value_meta.histograms == expected.histograms
+
+    # without the chunk size the target is logged by its path only
+    c.log_value_read_chunksize = None
+    assert get_value_meta(t, meta_conf, tracking_config=c).data_dimensions is None
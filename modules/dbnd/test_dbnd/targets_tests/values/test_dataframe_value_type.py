@@ -1,8 +1,6 @@
 # © Copyright Databand.ai, an IBM Company 2022
 
-from pandas.core.util.hashing import hash_pandas_object
-
-from dbnd._vendor import fast_hasher
+from targets.providers.pandas.pandas_hashing import hash_pandas
 from targets.providers.pandas.pandas_values import DataFrameValueType
 from targets.value_meta import ValueMeta, ValueMetaConf
 
@@ -26,9 +24,7 @@ class TestDataFrameValueType(object):
             ),
             data_dimensions=pandas_data_frame.shape,
             data_schema=expected_data_schema,
-            data_hash=fast_hasher.hash(
-                hash_pandas_object(pandas_data_frame, index=True).values
-            ),
+            data_hash=hash_pandas(pandas_data_frame, index=True),
         )
 
         df_value_meta = DataFrameValueType().get_value_meta(
@@ -1,13 +1,16 @@
 # © Copyright Databand.ai, an IBM Company 2022
 
+import threading
+
 from mock import patch
 
-from dbnd import get_databand_context, new_dbnd_context
+from dbnd import dbnd_cmd, get_databand_context, new_dbnd_context
 from dbnd._core.errors.base import (
     DatabandSystemError,
     DatabandWebserverNotReachableError,
 )
 from dbnd._core.tracking.backends.channels.tracking_async_web_channel import (
+    AsyncWebChannelQueueItem,
     TrackingAsyncWebChannel,
 )
 from dbnd._core.tracking.backends.tracking_store_channels import (
@@ -100,3 +103,186 @@ class TestAsyncTracking:
         async_store.flush()
         assert async_store.is_ready()
         async_store.flush()
+
+    @patch("dbnd.utils.api_client.ApiClient.api_request")
+    def test_batching_merges_same_endpoint_calls(self, fake_api_request):
+        with new_dbnd_context(
+            conf={
+                "core": {
+                    "tracker_async_batching": True,
+                    "tracker_async_batch_max_items": 3,
+                    "tracker_async_batch_linger": 5,
+                }
+            }
+        ) as ctx:
+            async_store = TrackingStoreThroughChannel.build_with_async_web_channel(ctx)
+            for i in range(4):
+                async_store.channel.log_metrics({"metrics_info": [i]})
+            async_store.channel.heartbeat({"run_uid": "1"})
+            async_store.flush()
+
+        calls = [c[0] for c in fake_api_request.call_args_list]
+        assert calls == [
+            ("tracking/log_metrics", {"metrics_info": [0, 1, 2]}),
+            ("tracking/log_metrics", {"metrics_info": [3]}),
+            ("tracking/heartbeat", {"run_uid": "1"}),
+        ]
+
+    @patch("dbnd.utils.api_client.ApiClient.api_request")
+    def test_batching_merges_external_links(self, fake_api_request):
+        with new_dbnd_context(
+            conf={
+                "core": {
+                    "tracker_async_batching": True,
+                    "tracker_async_batch_linger": 5,
+                }
+            }
+        ) as ctx:
+            async_store = TrackingStoreThroughChannel.build_with_async_web_channel(ctx)
+            uid = get_uuid()
+            for name in ("a", "b"):
+                async_store.channel.save_external_links(
+                    {"task_run_attempt_uid": uid, "external_links_dict": {name: name}}
+                )
+            async_store.channel.save_external_links(
+                {"task_run_attempt_uid": get_uuid(), "external_links_dict": {"c": "c"}}
+            )
+            async_store.flush()
+
+        calls = [
+            c[0][1]["external_links_dict"] for c in fake_api_request.call_args_list
+        ]
+        assert calls == [{"a": "a", "b": "b"}, {"c": "c"}]
+
+    @patch("dbnd.utils.api_client.ApiClient.api_request")
+    def test_bounded_queue_drops_metrics(self, fake_api_request):
+        with new_dbnd_context(
+            conf={
+                "core": {
+                    "tracker_async_max_queue_items": 2,
+                    "tracker_async_queue_overflow_policy": "drop-low-priority",
+                }
+            }
+        ) as ctx:
+            async_store = TrackingStoreThroughChannel.build_with_async_web_channel(ctx)
+            worker = async_store.channel._background_worker
+            # fill the queue before the worker thread is started
+            for i in range(5):
+                worker.queue.put(
+                    AsyncWebChannelQueueItem(
+                        name="log_metrics",
+                        data={"metrics_info": [i]},
+                        is_orchestration_run=False,
+                        stop_tracking_on_failure=False,
+                    )
+                )
+            assert worker.queue.qsize() == 2
+            assert worker.dropped_count == 3
+
+            async_store.heartbeat(get_uuid())
+            async_store.flush()
+            assert worker.dropped_count == 3
+
+    @patch("dbnd.utils.api_client.ApiClient.api_request")
+    def test_dropped_calls_reported_as_metrics(self, fake_api_request):
+        ctx = get_databand_context()
+        async_store = TrackingStoreThroughChannel.build_with_async_web_channel(ctx)
+        async_store.channel._background_worker._flushed_dropped_count = 4
+
+        task_run_attempt_uid = str(get_uuid())
+        async_store.channel.update_task_run_attempts(
+            {
+                "task_run_attempt_updates": [
+                    {"task_run_attempt_uid": task_run_attempt_uid}
+                ]
+            }
+        )
+        async_store.flush()
+
+        (log_metrics_call, update_call) = fake_api_request.call_args_list
+        assert log_metrics_call[0][0] == "tracking/log_metrics"
+        metrics = {
+            m["metric"]["key"]: m["metric"]["value_int"]
+            for m in log_metrics_call[0][1]["metrics_info"]
+        }
+        assert metrics == {
+            "tracking_queue_dropped_calls": 4,
+            "tracking_queue_blocked_calls": 0,
+        }
+        assert update_call[0][0] == "tracking/update_task_run_attempts"
+
+    @patch("dbnd.utils.api_client.ApiClient.api_request")
+    def test_senders_send_concurrently_and_keep_state_calls_order(
+        self, fake_api_request
+    ):
+        # passes only if all the metrics calls are sent at the same time
+        metrics_barrier = threading.Barrier(3, timeout=10)
+        sent = []
+
+        def api_request(endpoint, data):
+            if endpoint == "tracking/log_metrics":
+                metrics_barrier.wait()
+            sent.append(endpoint)
+
+        fake_api_request.side_effect = api_request
+        with new_dbnd_context(conf={"core": {"tracker_async_senders": 3}}) as ctx:
+            async_store = TrackingStoreThroughChannel.build_with_async_web_channel(ctx)
+            async_store.heartbeat(get_uuid())
+            for i in range(3):
+                async_store.channel.log_metrics({"metrics_info": [i]})
+            async_store.heartbeat(get_uuid())
+            async_store.flush()
+
+        assert sent == (
+            ["tracking/heartbeat"]
+            + ["tracking/log_metrics"] * 3
+            + ["tracking/heartbeat"]
+        )
+
+    @patch("dbnd.utils.api_client.ApiClient.api_request")
+    def test_spool_when_webserver_not_reachable(self, fake_api_request, tmpdir):
+        with new_dbnd_context(
+            conf={
+                "core": {
+                    "tracker_async_spool": True,
+                    "tracker_async_spool_dir": str(tmpdir),
+                }
+            }
+        ) as ctx:
+            async_store = TrackingStoreThroughChannel.build_with_async_web_channel(ctx)
+            fake_api_request.side_effect = DatabandWebserverNotReachableError(
+                "fake_message"
+            )
+            async_store.heartbeat(get_uuid())  # fail and spool here
+            async_store.heartbeat(get_uuid())  # spool here
+            async_store.flush()
+
+        fake_api_request.side_effect = None
+        fake_api_request.reset_mock()
+        dbnd_cmd("tracker", ["replay", "--spool-dir", str(tmpdir)])
+        assert [c[0][0] for c in fake_api_request.call_args_list] == [
+            "tracking/heartbeat",
+            "tracking/heartbeat",
+        ]
+
+    @patch("dbnd.utils.api_client.ApiClient.api_request")
+    def test_spool_pending_calls_on_flush_timeout(self, fake_api_request, tmpdir):
+        release = threading.Event()
+        fake_api_request.side_effect = lambda endpoint, data: release.wait(10)
+        with new_dbnd_context(
+            conf={
+                "core": {
+                    "tracker_async_spool": True,
+                    "tracker_async_spool_dir": str(tmpdir),
+                    "tracker_async_spool_flush_timeout": 0.2,
+                }
+            }
+        ) as ctx:
+            async_store = TrackingStoreThroughChannel.build_with_async_web_channel(ctx)
+            for _ in range(3):
+                async_store.heartbeat(get_uuid())
+            async_store.flush()
+            release.set()
+
+            spool = async_store.channel._spool
+            assert spool.replay(lambda name, data: None) == 2
@@ -0,0 +1,99 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+import queue
+
+import pytest
+
+from dbnd._core.tracking.backends.channels.bounded_queue import (
+    BoundedQueue,
+    QueueItemPriority,
+    QueueOverflowPolicy,
+)
+
+
+def _priority(item):
+    return {"low": QueueItemPriority.low, "state": QueueItemPriority.critical}.get(
+        item[0], QueueItemPriority.normal
+    )
+
+
+def _drain(q):
+    items = []
+    while not q.empty():
+        items.append(q.get_nowait())
+        q.task_done()
+    return items
+
+
+class TestBoundedQueue(object):
+    def test_unbounded(self):
+        q = BoundedQueue()
+        for i in range(100):
+            q.put(("normal", i))
+        assert q.qsize() == 100
+        assert q.dropped_count == 0
+
+    def test_block_policy(self):
+        q = BoundedQueue(max_items=2, overflow_policy=QueueOverflowPolicy.block)
+        q.put(("normal", 1))
+        q.put(("normal", 2))
+        with pytest.raises(queue.Full):
+            q.put(("normal", 3), timeout=0.01)
+        assert q.blocked_count == 1
+        assert _drain(q) == [("normal", 1), ("normal", 2)]
+
+    def test_drop_oldest_policy(self):
+        q = BoundedQueue(
+            max_items=2,
+            overflow_policy=QueueOverflowPolicy.drop_oldest,
+            item_priority_callback=_priority,
+        )
+        q.put(("state", 1))
+        q.put(("normal", 2))
+        q.put(("normal", 3))
+        assert q.dropped_count == 1
+        assert q.unfinished_tasks == 2
+        assert _drain(q) == [("state", 1), ("normal", 3)]
+
+    def test_drop_low_priority_policy(self):
+        q = BoundedQueue(
+            max_items=2,
+            overflow_policy=QueueOverflowPolicy.drop_low_priority,
+            item_priority_callback=_priority,
+        )
+        q.put(("normal", 1))
+        q.put(("low", 2))
+        q.put(("normal", 3))
+        # the queue is full of not low priority items, so the new low item is dropped
+        q.put(("low", 4))
+        assert q.dropped_count == 2
+        assert _drain(q) == [("normal", 1), ("normal", 3)]
+
+    def test_state_items_are_never_dropped(self):
+        q = BoundedQueue(
+            max_items=1,
+            overflow_policy=QueueOverflowPolicy.drop_low_priority,
+            item_priority_callback=_priority,
+        )
+        q.put(("low", 1))
+        with pytest.raises(queue.Full):
+            q.put(("state", 2), block=False)
+        assert q.blocked_count == 1
+
+    def test_max_bytes(self):
+        q = BoundedQueue(
+            max_bytes=10,
+            overflow_policy=QueueOverflowPolicy.drop_oldest,
+            item_size_callback=lambda item: item[1],
+        )
+        # a single item can exceed the limit
+        q.put(("normal", 20))
+        q.put(("normal", 6))
+        q.put(("normal", 4))
+        assert q.size_bytes == 10
+        assert _drain(q) == [("normal", 6), ("normal", 4)]
+        assert q.size_bytes == 0
+
+    def test_wrong_policy(self):
+        with pytest.raises(ValueError):
+            BoundedQueue(overflow_policy="drop-everything")
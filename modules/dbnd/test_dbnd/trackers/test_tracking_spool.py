@@ -0,0 +1,60 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+import os
+
+import pytest
+
+from dbnd._core.tracking.backends.channels.tracking_spool import TrackingSpool
+
+
+class TestTrackingSpool(object):
+    def test_append_and_replay(self, tmpdir):
+        spool = TrackingSpool(str(tmpdir))
+        spool.append("init_run", {"run_uid": "1"})
+        spool.append("log_metrics", {"metrics_info": [1]})
+        # the segment is still open by the current process
+        assert spool.list_segments() == []
+
+        spool.close()
+        assert len(spool.list_segments()) == 1
+
+        calls = []
+        assert spool.replay(lambda name, data: calls.append((name, data))) == 2
+        assert calls == [
+            ("init_run", {"run_uid": "1"}),
+            ("log_metrics", {"metrics_info": [1]}),
+        ]
+        assert os.listdir(str(tmpdir)) == []
+
+    def test_segments_rotation(self, tmpdir):
+        spool = TrackingSpool(str(tmpdir), max_segment_bytes=1)
+        for i in range(3):
+            spool.append("heartbeat", {"i": i})
+        assert len(spool.list_segments()) == 3
+
+        calls = []
+        spool.replay(lambda name, data: calls.append(data["i"]))
+        assert calls == [0, 1, 2]
+
+    def test_replay_failure_keeps_not_sent_calls(self, tmpdir):
+        spool = TrackingSpool(str(tmpdir))
+        for i in range(3):
+            spool.append("heartbeat", {"i": i})
+        spool.close()
+
+        def failing_handler(name, data):
+            if data["i"] == 1:
+                raise ConnectionError()
+
+        with pytest.raises(ConnectionError):
+            spool.replay(failing_handler)
+
+        calls = []
+        assert spool.replay(lambda name, data: calls.append(data["i"])) == 2
+        assert calls == [1, 2]
+
+    def test_segment_of_dead_process_is_replayed(self, tmpdir):
+        # pid that can't exist
+        tmpdir.join("1-abc.open-99999999").write('{"name": "heartbeat", "data": {}}\n')
+        spool = TrackingSpool(str(tmpdir))
+        assert spool.replay(lambda name, data: None) == 1
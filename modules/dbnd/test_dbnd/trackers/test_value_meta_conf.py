@@ -95,6 +95,22 @@ class TestValueMetaConf(object):
     def test_summing(self, meta_conf_list, expected):
         assert reduce(lambda x, y: x.merge_if_none(y), meta_conf_list) == expected
 
+    @pytest.mark.parametrize(
+        "sample_size, records_count, expected",
+        [
+            (None, 1000, None),
+            (100, 1000, 100),
+            (100.0, 1000, 100),
+            (0.25, 1000, 250),
+            (0.0001, 1000, 1),
+            (1000, 1000, None),
+            (5000, 1000, None),
+        ],
+    )
+    def test_stats_sample_size(self, sample_size, records_count, expected):
+        meta_conf = ValueMetaConf(log_stats_sample_size=sample_size)
+        assert meta_conf.get_stats_sample_size(records_count) == expected
+
 
 @pytest.mark.parametrize(
     "level, value_type, target, expected",
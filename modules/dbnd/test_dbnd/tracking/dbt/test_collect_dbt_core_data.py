@@ -1,11 +1,9 @@
 # © Copyright Databand.ai, an IBM Company 2022
 
 import json
-import os
 
 from pathlib import Path
-from unittest import mock
-from unittest.mock import ANY, mock_open
+from unittest.mock import ANY
 
 import dateutil.parser
 import pytest
@@ -20,7 +18,8 @@ from dbnd.providers.dbt.dbt_core import (
     _extract_environment,
     _extract_jinja_values,
     _load_dbt_core_assets,
-    _read_and_truncate_logs,
+    _load_pruned_manifest,
+    _read_new_logs,
     collect_data_from_dbt_core,
 )
 
@@ -173,42 +172,101 @@ def test_extract_environment(profile, expected):
 
 
 @patch("dbnd.providers.dbt.dbt_core._load_json_file")
-@patch("dbnd.providers.dbt.dbt_core._read_and_truncate_logs")
+@patch("dbnd.providers.dbt.dbt_core._read_new_logs")
 @patch("dbnd.providers.dbt.dbt_core._load_yaml_with_jinja")
 def test_load_dbt_core_assets(
-    mock_load_yaml_with_jinja, mock_read_and_truncate_logs, mock_load_json_file
+    mock_load_yaml_with_jinja, mock_read_new_logs, mock_load_json_file
 ):
     mock_load_json_file.side_effect = [MagicMock(), MagicMock()]
     mock_load_yaml_with_jinja.side_effect = [
         {"profile": "sample_profile"},
         {"sample_profile": MagicMock()},
     ]
-    mock_read_and_truncate_logs.return_value = MagicMock()
+    mock_read_new_logs.return_value = MagicMock()
 
     assets = _load_dbt_core_assets("fake/path")
 
     assert isinstance(assets, DbtCoreAssets)
 
 
-def test_read_and_truncate_logs():
-    dbt_project_path = "/dummy/dbt_project_path"
-    dbt_log_path = os.path.join(dbt_project_path, "logs", "dbt.log")
-    original_log_content = "Some log content"
+@pytest.mark.parametrize("streaming", [True, False])
+def test_load_pruned_manifest(tmp_path, streaming):
+    with Path(__file__).with_name("dbt_build_command_assets.json").open("r") as fp:
+        assets = json.load(fp)
+    manifest = assets["manifest"]
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest))
+    node_ids = {r["unique_id"] for r in assets["runs_info"]["results"]}
+
+    if streaming:
+        pytest.importorskip("ijson")
+        pruned = _load_pruned_manifest(str(manifest_path), node_ids)
+    else:
+        with patch("dbnd.providers.dbt.dbt_core.ijson", None):
+            pruned = _load_pruned_manifest(str(manifest_path), node_ids)
+
+    assert set(pruned) == {"metadata", "sources", "nodes", "parent_map", "child_map"}
+    assert pruned["metadata"] == manifest["metadata"]
+    assert pruned["sources"] == manifest["sources"]
+    assert set(pruned["nodes"]) == node_ids
+    for node_id in node_ids:
+        assert pruned["nodes"][node_id] == manifest["nodes"][node_id]
+        assert pruned["child_map"][node_id] == manifest["child_map"][node_id]
+
+
+@pytest.fixture
+def dbt_log(tmp_path):
+    logs_dir = tmp_path / "logs"
+    logs_dir.mkdir()
+    dbt_log = logs_dir / "dbt.log"
+    dbt_log.write_text("")
+    return dbt_log
+
+
+def _append(path, text):
+    with path.open("a") as f:
+        f.write(text)
+
+
+def test_read_new_logs(tmp_path, dbt_log):
+    _append(dbt_log, "first line\nsecond line\n")
+    assert _read_new_logs(str(tmp_path)) == "first line\nsecond line\n"
+
+    # nothing new, the log is not truncated or copied
+    assert _read_new_logs(str(tmp_path)) == ""
+    assert dbt_log.read_text() == "first line\nsecond line\n"
+    assert sorted(p.name for p in dbt_log.parent.iterdir()) == [
+        ".dbnd_dbt_log_state.json",
+        "dbt.log",
+    ]
+
+    # the last line is not complete yet
+    _append(dbt_log, "third line\nfour")
+    assert _read_new_logs(str(tmp_path)) == "third line\n"
+    _append(dbt_log, "th line\n")
+    assert _read_new_logs(str(tmp_path)) == "fourth line\n"
+
+    # the log has been rotated
+    dbt_log.rename(dbt_log.with_name("dbt.log.1"))
+    dbt_log.write_text("new log\n")
+    assert _read_new_logs(str(tmp_path)) == "new log\n"
+
 
-    m = mock_open(read_data=original_log_content)
-    with patch("dbnd.providers.dbt.dbt_core.open", m):
-        with patch("dbnd.providers.dbt.dbt_core.shutil.copy") as copy_mock:
-            result = _read_and_truncate_logs(dbt_project_path)
+def test_read_new_logs_tail(tmp_path, dbt_log):
+    lines = ["line number %s" % i for i in range(1000)]
+    _append(dbt_log, "\n".join(lines) + "\n")
 
-    assert (
-        result == original_log_content
-    ), "The function did not read the log content correctly"
+    logs = _read_new_logs(str(tmp_path), max_logs_size=100)
 
-    assert copy_mock.call_count == 1, "A backup of the log file was not created"
+    first_line, tail = logs.split("\n", 1)
+    assert "are truncated" in first_line
+    assert len(tail) <= 100
+    assert tail.endswith(lines[-1] + "\n")
+    assert tail.split("\n")[0] in lines
 
-    assert m.call_args_list[-1] == mock.call(
-        dbt_log_path, "w"
-    ), "The original log file was not truncated"
+    # new logs smaller than the limit are reported as is
+    _append(dbt_log, "short log\n")
+    assert _read_new_logs(str(tmp_path), max_logs_size=100) == "short log\n"
 
 
 def test_extract_jinja_values():
@@ -1,5 +1,7 @@
 # © Copyright Databand.ai, an IBM Company 2022
 
+import pickle
+
 from contextlib import contextmanager
 from unittest import TestCase
 from unittest.mock import MagicMock, call, patch
@@ -95,6 +97,15 @@ class TestApiClient(TestCase):
         sut._send_request(session_instance, "POST", {})
         session_instance.request.assert_has_calls([call("POST", {})])
 
+    def test_session_lock_per_client(self):
+        sut = ApiClient(self.base_url, self.creds)
+        other = ApiClient(self.base_url, self.creds)
+        assert sut._session_lock is not other._session_lock
+
+        loaded = pickle.loads(pickle.dumps(sut))
+        assert loaded._api_base_url == self.base_url
+        assert loaded._session_lock is not sut._session_lock
+
     def login_call(self):
         return call(
             "/api/v1/auth/login",
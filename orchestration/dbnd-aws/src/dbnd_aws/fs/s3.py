@@ -45,6 +45,7 @@ from targets import (
 from targets.config import get_config_section_values
 from targets.errors import FileNotFoundException, TargetError
 from targets.fs import FileSystems
+from targets.utils.bulk import chunks
 from targets.utils.path import path_to_bucket_and_key
 
 
@@ -55,6 +56,9 @@ logger = logging.getLogger(__name__)
 S3_DIRECTORY_MARKER_SUFFIX_0 = "_$folder$"
 S3_DIRECTORY_MARKER_SUFFIX_1 = "/"
 
+# the limit of a single DeleteObjects request
+S3_DELETE_OBJECTS_BATCH_SIZE = 1000
+
 
 class InvalidDeleteException(FileSystemException):
     pass
@@ -89,6 +93,7 @@ class S3Client(FileSystem):
 
     name = FileSystems.s3
     _exist_after_write_consistent = False
+    exists_many_by_listing = True
     _s3 = None
 
     @classmethod
@@ -240,13 +245,67 @@ class S3Client(FileSystem):
             )
 
         if len(delete_key_list) > 0:
-            self.s3.meta.client.delete_objects(
-                Bucket=bucket, Delete={"Objects": delete_key_list}
-            )
+            self._delete_keys(bucket, [k["Key"] for k in delete_key_list])
             return True
 
         return False
 
+    def _delete_keys(self, bucket, keys):
+        """Deletes the keys by batches of DeleteObjects requests, the batches run concurrently"""
+
+        def delete_objects(batch):
+            response = self.s3.meta.client.delete_objects(
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            errors = response.get("Errors")
+            if errors:
+                raise FileSystemException(
+                    "Failed to delete %s keys from bucket %s, first error: %s"
+                    % (len(errors), bucket, errors[0])
+                )
+
+        self._run_bulk(
+            delete_objects,
+            [(batch,) for batch in chunks(keys, S3_DELETE_OBJECTS_BATCH_SIZE)],
+        )
+
+    def remove_many(self, paths, recursive=True):
+        """
+        Remove all the ``paths`` by batch DeleteObjects requests.
+
+        Paths are removed the same as by ``remove``: a path that is not a key is a directory,
+        all the keys with its prefix are removed (only if ``recursive``). Missing paths are ignored.
+        """
+        keys_by_bucket = {}
+        for path in paths:
+            (bucket, key) = self._path_to_bucket_and_key(path)
+            if self._is_root(key):
+                raise InvalidDeleteException(
+                    "Cannot delete root of bucket at path %s" % path
+                )
+
+            keys = keys_by_bucket.setdefault(bucket, [])
+            if not key.endswith(S3_DIRECTORY_MARKER_SUFFIX_1):
+                if self._exists(bucket, key):
+                    keys.append(key)
+                    continue
+                key = self._add_path_delimiter(key)
+
+            dir_keys = [
+                obj.key for obj in self.s3.Bucket(bucket).objects.filter(Prefix=key)
+            ]
+            if dir_keys and not recursive:
+                raise InvalidDeleteException(
+                    "Path %s is a directory. Must use recursive delete" % path
+                )
+            keys.extend(dir_keys)
+            # the directory marker file (a missing key is ignored)
+            keys.append(key.rstrip("/") + S3_DIRECTORY_MARKER_SUFFIX_0)
+
+        for bucket, keys in keys_by_bucket.items():
+            self._delete_keys(bucket, keys)
+
     def move(self, source_path, destination_path, **kwargs):
         """
         Rename/move an object from one S3 location to another.
@@ -380,6 +439,7 @@ class S3Client(FileSystem):
             src_prefix = self._add_path_delimiter(src_key)
             dst_prefix = self._add_path_delimiter(dst_key)
             total_size_bytes = 0
+            copied_paths = []
             for item in self.list(
                 source_path, start_time=start_time, end_time=end_time, return_key=True
             ):
@@ -388,15 +448,19 @@ class S3Client(FileSystem):
                 if path != "" and path != "/":
                     total_keys += 1
                     total_size_bytes += item.size
-                    copy_source = {"Bucket": src_bucket, "Key": src_prefix + path}
+                    copied_paths.append((path,))
+
+            def copy_key(path):
+                self.s3.meta.client.copy(
+                    {"Bucket": src_bucket, "Key": src_prefix + path},
+                    dst_bucket,
+                    dst_prefix + path,
+                    Config=transfer_config,
+                    ExtraArgs=kwargs,
+                )
 
-                    self.s3.meta.client.copy(
-                        copy_source,
-                        dst_bucket,
-                        dst_prefix + path,
-                        Config=transfer_config,
-                        ExtraArgs=kwargs,
-                    )
+            # the keys are copied concurrently, see `FileSystem.copy_many`
+            self._run_bulk(copy_key, copied_paths)
 
             end = datetime.datetime.now()
             duration = end - start
@@ -572,11 +636,27 @@ class S3Client(FileSystem):
             else:
                 raise
 
+    def _read_range(self, bucket, key, start, end):
+        response = self.s3.meta.client.get_object(
+            Bucket=bucket, Key=key, Range="bytes=%d-%d" % (start, end - 1)
+        )
+        return response["Body"].read()
+
     def open_read(self, path, mode="r"):
+        """
+        Streams the object by concurrent ranged reads, see `FileSystem.open_ranged_read`
+        """
         s3_key = self.get_key(path)
         if not s3_key:
             raise FileNotFoundException("Could not find file at %s" % path)
-        return ReadableS3File(s3_key)
+
+        # boto3 clients (unlike resources) are thread safe
+        bucket, key = s3_key.bucket_name, s3_key.key
+        return self.open_ranged_read(
+            path,
+            size=s3_key.size,
+            read_range=lambda start, end: self._read_range(bucket, key, start, end),
+        )
 
     def open_write(self, path, mode="w", **kwargs):
         return AtomicLocalFile(path, self, mode=mode, **kwargs)
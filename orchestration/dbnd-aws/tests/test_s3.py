@@ -112,6 +112,23 @@ class TestS3Client(_S3BaseTestCase):
         assert not self.client.exists(self.bucket_url("test_remove_recursive/1"))
         assert not self.client.exists(self.bucket_url("test_remove_recursive/2"))
 
+    def test_remove_many(self):
+        self.client.put_string("hello", self.bucket_url("test_remove_many/file"))
+        self.client.put_string("hello", self.bucket_url("test_remove_many/dir/1"))
+        self.client.put_string("hello", self.bucket_url("test_remove_many/dir/2"))
+        # a directory without a trailing "/" is removed as a directory
+        self.client.remove_many(
+            [
+                self.bucket_url("test_remove_many/file"),
+                self.bucket_url("test_remove_many/dir"),
+                self.bucket_url("test_remove_many/does_not_exist"),
+            ]
+        )
+
+        assert not self.client.exists(self.bucket_url("test_remove_many/file"))
+        assert not self.client.exists(self.bucket_url("test_remove_many/dir"))
+        assert not self.client.exists(self.bucket_url("test_remove_many/dir/1"))
+
     def test_listdir(self):
         self.client.put_string("hello", self.bucket_url("test_listdir/1"))
         self.client.put_string("hello", self.bucket_url("test_listdir/2"))
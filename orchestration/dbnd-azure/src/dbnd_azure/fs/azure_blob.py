@@ -148,10 +148,14 @@ class AzureBlobStorageClient(FileSystem):
                     "Path {} is a directory. Must use recursive delete".format(path)
                 )
 
-            blobs = self.listdir(path)
-            for b in blobs:
-                _, _, blob_to_remove = self._path_to_account_container_and_blob(b)
-                self.conn.delete_blob(container_name, blob_to_remove)
+            # the blobs are removed concurrently, see `FileSystem.remove_many`
+            self._run_bulk(
+                self.conn.delete_blob,
+                [
+                    (container_name, self._path_to_account_container_and_blob(b)[2])
+                    for b in self.listdir(path)
+                ],
+            )
             _wait_for_consistency(lambda: not self.isdir(path))
             return
 
@@ -196,17 +200,17 @@ class AzureBlobStorageClient(FileSystem):
             blobs = self.conn.list_blobs(
                 source_container, self._add_path_delimiter(source_blob)
             )
-            copied = []
-            for b in blobs:
-                blob_suffix = b.name.replace(source_blob, "")
-                destination_path = dest_prefix + blob_suffix
-                self.conn.copy_blob(
+            copies = [
+                (
                     dest_container,
-                    destination_path,
+                    dest_prefix + b.name.replace(source_blob, ""),
                     self._get_path_prefix(source_container) + b.name,
                 )
-
-                copied.append(destination_path)
+                for b in blobs
+            ]
+            # the blobs are copied concurrently, see `FileSystem.copy_many`
+            self._run_bulk(self.conn.copy_blob, copies)
+            copied = [blob for _, blob, _ in copies]
 
             _wait_for_consistency(
                 lambda: all(self.conn.exists(dest_container, c) for c in copied)
@@ -19,6 +19,7 @@
 import logging
 import mimetypes
 import os
+import threading
 import time
 
 import six
@@ -36,6 +37,7 @@ from targets.errors import InvalidDeleteException
 from targets.fs import FileSystems
 from targets.fs.file_system import FileSystem
 from targets.utils.atomic import _DeleteOnCloseFile
+from targets.utils.bulk import chunks
 from targets.utils.path import path_to_bucket_and_key
 
 
@@ -43,6 +45,8 @@ logger = logging.getLogger(__name__)
 
 try:
     import google.auth
+    import google.auth.credentials
+    import google_auth_httplib2
     import httplib2
 
     from googleapiclient import discovery, errors, http
@@ -61,6 +65,15 @@ NUM_RETRIES = 5
 # Number of bytes to send/receive in each request.
 CHUNKSIZE = 10 * 1024 * 1024
 
+# Maximum number of calls in a single batch request.
+BATCH_SIZE = 100
+
+# The scopes of the storage API, the same as `discovery.build` requests for the client.
+GCS_SCOPES = [
+    "https://www.googleapis.com/auth/devstorage.full_control",
+    "https://www.googleapis.com/auth/cloud-platform",
+]
+
 # Mimetype to use if one can't be guessed from the file extension.
 DEFAULT_MIMETYPE = "application/octet-stream"
 
@@ -141,6 +154,7 @@ class GCSClient(FileSystem):
 
     name = FileSystems.gcs
     _exist_after_write_consistent = False
+    exists_many_by_listing = True
 
     def __init__(
         self,
@@ -152,6 +166,18 @@ class GCSClient(FileSystem):
     ):
         self.chunksize = chunksize
         authenticate_kwargs = get_authenticate_kwargs(oauth_credentials, http_)
+        # httplib2 is not thread safe, see `_thread_http`
+        self._credentials = authenticate_kwargs.get("credentials")
+        if self._credentials is not None:
+            self._credentials = google.auth.credentials.with_scopes_if_required(
+                self._credentials, GCS_SCOPES
+            )
+        self._thread_local = threading.local()
+        self._client_thread = threading.current_thread().ident
+        if self._credentials is None:
+            # a user provided http client can't be shared between the threads
+            self.bulk_max_concurrency = 1
+            self.read_max_concurrency = 1
 
         build_kwargs = authenticate_kwargs.copy()
         build_kwargs.update(discovery_build_kwargs)
@@ -162,6 +188,34 @@ class GCSClient(FileSystem):
             build_kwargs.setdefault("cache_discovery", False)
             self.client = discovery.build("storage", "v1", **build_kwargs)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_thread_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._thread_local = threading.local()
+        self._client_thread = threading.current_thread().ident
+
+    def _thread_http(self):
+        """
+        The authorized http client of the current worker thread (bulk operations and ranged reads are concurrent).
+        None (the http client of the discovery client) at the thread of the client,
+        or if the http client is provided by the user.
+        """
+        if (
+            self._credentials is None
+            or threading.current_thread().ident == self._client_thread
+        ):
+            return None
+        http_ = getattr(self._thread_local, "http", None)
+        if http_ is None:
+            http_ = self._thread_local.http = google_auth_httplib2.AuthorizedHttp(
+                self._credentials, http=http.build_http()
+            )
+        return http_
+
     def _path_to_bucket_and_key(self, path):
         return path_to_bucket_and_key(path)
 
@@ -173,7 +227,9 @@ class GCSClient(FileSystem):
 
     def _obj_exists(self, bucket, obj):
         try:
-            self.client.objects().get(bucket=bucket, object=obj).execute()
+            self.client.objects().get(bucket=bucket, object=obj).execute(
+                http=self._thread_http()
+            )
         except errors.HttpError as ex:
             if ex.resp["status"] == "404":
                 return False
@@ -183,7 +239,7 @@ class GCSClient(FileSystem):
 
     def _list_iter(self, bucket, prefix):
         request = self.client.objects().list(bucket=bucket, prefix=prefix)
-        response = request.execute()
+        response = request.execute(http=self._thread_http())
 
         while response is not None:
             for it in response.get("items", []):
@@ -193,7 +249,7 @@ class GCSClient(FileSystem):
             if request is None:
                 break
 
-            response = request.execute()
+            response = request.execute(http=self._thread_http())
 
     def _do_put(self, media, dest_path):
         bucket, obj = self._path_to_bucket_and_key(dest_path)
@@ -202,14 +258,14 @@ class GCSClient(FileSystem):
             bucket=bucket, name=obj, media_body=media
         )
         if not media.resumable():
-            return request.execute()
+            return request.execute(http=self._thread_http())
 
         response = None
         attempts = 0
         while response is None:
             error = None
             try:
-                status, response = request.next_chunk()
+                status, response = request.next_chunk(http=self._thread_http())
                 if status:
                     logger.debug("Upload progress: %.2f%%", 100 * status.progress())
             except errors.HttpError as err:
@@ -242,7 +298,9 @@ class GCSClient(FileSystem):
         bucket, obj = self._path_to_bucket_and_key(path)
         if self._is_root(obj):
             try:
-                self.client.buckets().get(bucket=bucket).execute()
+                self.client.buckets().get(bucket=bucket).execute(
+                    http=self._thread_http()
+                )
             except errors.HttpError as ex:
                 if ex.resp["status"] == "404":
                     return False
@@ -256,7 +314,7 @@ class GCSClient(FileSystem):
         resp = (
             self.client.objects()
             .list(bucket=bucket, prefix=obj, maxResults=20)
-            .execute()
+            .execute(http=self._thread_http())
         )
         lst = next(iter(resp.get("items", [])), None)
         return bool(lst)
@@ -270,7 +328,9 @@ class GCSClient(FileSystem):
             )
 
         if self._obj_exists(bucket, obj):
-            self.client.objects().delete(bucket=bucket, object=obj).execute()
+            self.client.objects().delete(bucket=bucket, object=obj).execute(
+                http=self._thread_http()
+            )
             _wait_for_consistency(lambda: not self._obj_exists(bucket, obj))
             return True
 
@@ -280,16 +340,76 @@ class GCSClient(FileSystem):
                     "Path {} is a directory. Must use recursive delete".format(path)
                 )
 
-            req = http.BatchHttpRequest()
-            for it in self._list_iter(bucket, self._add_path_delimiter(obj)):
-                req.add(self.client.objects().delete(bucket=bucket, object=it["name"]))
-            req.execute()
+            self._delete_objects(
+                bucket,
+                [
+                    it["name"]
+                    for it in self._list_iter(bucket, self._add_path_delimiter(obj))
+                ],
+            )
 
             _wait_for_consistency(lambda: not self.isdir(path))
             return True
 
         return False
 
+    def _delete_objects(self, bucket, objs):
+        """Deletes the objects by batch requests, the batches run concurrently"""
+
+        def delete_batch(batch):
+            failed = []
+
+            def on_delete(request_id, response, exception):
+                # the object is already deleted
+                if exception is not None and not (
+                    isinstance(exception, errors.HttpError)
+                    and exception.resp.status == 404
+                ):
+                    failed.append(exception)
+
+            batch_request = self.client.new_batch_http_request(callback=on_delete)
+            for obj in batch:
+                batch_request.add(
+                    self.client.objects().delete(bucket=bucket, object=obj)
+                )
+            batch_request.execute(http=self._thread_http())
+            if failed:
+                raise failed[0]
+
+        self._run_bulk(delete_batch, [(batch,) for batch in chunks(objs, BATCH_SIZE)])
+
+    def remove_many(self, paths, recursive=True):
+        """
+        Remove all the ``paths`` by batch requests.
+
+        Paths are removed the same as by ``remove``: a path that is not an object is a directory,
+        all the objects with its prefix are removed (only if ``recursive``). Missing paths are ignored.
+        """
+        objs_by_bucket = {}
+        for path in paths:
+            (bucket, obj) = self._path_to_bucket_and_key(path)
+            if self._is_root(obj):
+                raise InvalidDeleteException(
+                    "Cannot delete root of bucket at path {}".format(path)
+                )
+
+            objs = objs_by_bucket.setdefault(bucket, [])
+            if not obj.endswith("/"):
+                if self._obj_exists(bucket, obj):
+                    objs.append(obj)
+                    continue
+                obj = self._add_path_delimiter(obj)
+
+            dir_objs = [it["name"] for it in self._list_iter(bucket, obj)]
+            if dir_objs and not recursive:
+                raise InvalidDeleteException(
+                    "Path {} is a directory. Must use recursive delete".format(path)
+                )
+            objs.extend(dir_objs)
+
+        for bucket, objs in objs_by_bucket.items():
+            self._delete_objects(bucket, objs)
+
     def put(self, filename, dest_path, mimetype=None, chunksize=None):
         chunksize = chunksize or self.chunksize
         resumable = os.path.getsize(filename) > 0
@@ -370,18 +490,20 @@ class GCSClient(FileSystem):
             dest_prefix = self._add_path_delimiter(dest_obj)
 
             source_path = self._add_path_delimiter(source_path)
-            copied_objs = []
-            for obj in self.listdir(source_path):
-                suffix = obj[len(source_path) :]
+            suffixes = [obj[len(source_path) :] for obj in self.listdir(source_path)]
 
+            def copy_object(suffix):
                 self.client.objects().copy(
                     sourceBucket=src_bucket,
                     sourceObject=src_prefix + suffix,
                     destinationBucket=dest_bucket,
                     destinationObject=dest_prefix + suffix,
                     body={},
-                ).execute()
-                copied_objs.append(dest_prefix + suffix)
+                ).execute(http=self._thread_http())
+
+            # the objects are copied concurrently, see `FileSystem.copy_many`
+            self._run_bulk(copy_object, [(suffix,) for suffix in suffixes])
+            copied_objs = [dest_prefix + suffix for suffix in suffixes]
 
             _wait_for_consistency(
                 lambda: all(self._obj_exists(dest_bucket, obj) for obj in copied_objs)
@@ -393,7 +515,7 @@ class GCSClient(FileSystem):
                 destinationBucket=dest_bucket,
                 destinationObject=dest_obj,
                 body={},
-            ).execute()
+            ).execute(http=self._thread_http())
             _wait_for_consistency(lambda: self._obj_exists(dest_bucket, dest_obj))
 
     def rename(self, *args, **kwargs):
@@ -472,11 +594,16 @@ class GCSClient(FileSystem):
                 return_fp = fp
 
             # Special case empty files because chunk-based downloading doesn't work.
-            result = self.client.objects().get(bucket=bucket, object=obj).execute()
+            result = (
+                self.client.objects()
+                .get(bucket=bucket, object=obj)
+                .execute(http=self._thread_http())
+            )
             if int(result["size"]) == 0:
                 return return_fp
 
             request = self.client.objects().get_media(bucket=bucket, object=obj)
+            request.http = self._thread_http() or request.http
             downloader = http.MediaIoBaseDownload(fp, request, chunksize=chunksize)
 
             attempts = 0
@@ -522,5 +649,25 @@ class GCSClient(FileSystem):
     def copy_from_local_file(self, local_path, dest, **kwargs):
         self.put(local_path, dest)
 
+    def _read_range(self, bucket, obj, start, end):
+        request = self.client.objects().get_media(bucket=bucket, object=obj)
+        request.headers["range"] = "bytes=%d-%d" % (start, end - 1)
+        return request.execute(http=self._thread_http(), num_retries=NUM_RETRIES)
+
     def open_read(self, path, mode="r"):
-        return self._open_read(path)
+        """
+        Streams the object by concurrent ranged reads, see `FileSystem.open_ranged_read`
+        """
+        bucket, obj = self._path_to_bucket_and_key(path)
+        result = (
+            self.client.objects()
+            .get(bucket=bucket, object=obj)
+            .execute(http=self._thread_http())
+        )
+
+        return self.open_ranged_read(
+            path,
+            size=int(result["size"]),
+            read_range=lambda start, end: self._read_range(bucket, obj, start, end),
+            block_size=self.chunksize,
+        )
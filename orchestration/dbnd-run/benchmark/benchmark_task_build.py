@@ -0,0 +1,135 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+"""
+Benchmark of the task build (DAG creation) throughput.
+
+A pipeline of --tasks tasks (with --params parameters each) is built inside --layers nested config contexts,
+every layer sets some of the parameters of the tasks, so the lookup of every parameter has to go over the layers.
+Reports tasks per second of the full build, and the time of the multi-section config lookups alone:
+the plain walk over all the layers compared with the memoized lookup of the layer.
+
+Usage:
+    python -m benchmark.benchmark_task_build --tasks 100 1000 --params 10 --layers 1 10 50
+"""
+
+import argparse
+import contextlib
+import time
+
+from dbnd import config, dbnd_bootstrap, new_dbnd_context, parameter
+from dbnd._core.configuration.config_value import fold_config_value
+from dbnd_run.tasks import PipelineTask, PythonTask
+
+
+def build_task_class(params):
+    attrs = {"p_%s" % i: parameter.value(i)[int] for i in range(params)}
+    attrs["run"] = lambda self: None
+    return type("BenchmarkTask", (PythonTask,), attrs)
+
+
+def build_pipeline_class(task_cls, tasks):
+    def band(self):
+        self.results = [
+            task_cls(task_name="benchmark_task_%s" % i) for i in range(tasks)
+        ]
+
+    return type(
+        "BenchmarkPipeline",
+        (PipelineTask,),
+        {"results": parameter.output.value(None), "band": band},
+    )
+
+
+def layers_config(layers, tasks, params):
+    """Every layer sets one parameter for all the tasks and one for a specific task"""
+    for layer in range(layers):
+        yield {
+            "BenchmarkTask": {"p_%s" % (layer % params): layer},
+            "benchmark_task_%s"
+            % (layer % tasks): {"p_%s" % ((layer + 1) % params): layer},
+        }
+
+
+def legacy_multisection_config_value(dbnd_config, sections, key):
+    """The walk over all the layers, section by section, for every lookup"""
+    config_value_stack = []
+    layer = dbnd_config.config_layer
+    while layer:
+        for section in sections:
+            config_value = layer.layer_config.get_config_value(section, key)
+            if config_value:
+                config_value_stack = fold_config_value(
+                    stack=config_value_stack, lower=config_value
+                )
+        layer = layer.parent
+    return config_value_stack
+
+
+def _timed(func, *args, **kwargs):
+    start = time.time()
+    result = func(*args, **kwargs)
+    return time.time() - start, result
+
+
+def _lookup_all(lookup, tasks, params):
+    for task_index in range(tasks):
+        sections = ["benchmark_task_%s" % task_index, "benchmarktask", "task"]
+        for param_index in range(params):
+            lookup(sections, "p_%s" % param_index)
+
+
+def run_benchmark(tasks, params, layers, repeat):
+    task_cls = build_task_class(params)
+    pipeline_cls = build_pipeline_class(task_cls, tasks)
+
+    with new_dbnd_context(), contextlib.ExitStack() as layers_stack:
+        for layer_values in layers_config(layers, tasks, params):
+            layers_stack.enter_context(config(layer_values))
+
+        build_times = []
+        for _ in range(repeat):
+            with new_dbnd_context():
+                build_time, pipeline = _timed(pipeline_cls)
+                build_times.append(build_time)
+        assert len(pipeline.results) == tasks
+        build_time = min(build_times)
+
+        legacy_time, _ = _timed(
+            _lookup_all,
+            lambda sections, key: legacy_multisection_config_value(
+                config, sections, key
+            ),
+            tasks,
+            params,
+        )
+        lookup_time, _ = _timed(
+            _lookup_all, config.get_multisection_config_value, tasks, params
+        )
+        memoized_time, _ = _timed(
+            _lookup_all, config.get_multisection_config_value, tasks, params
+        )
+
+    print(
+        f"tasks={tasks} params={params} layers={layers}: "
+        f"build={build_time:.2f}s ({tasks / build_time:.0f} tasks/s) "
+        f"lookups: legacy={legacy_time * 1000:.1f}ms "
+        f"first={lookup_time * 1000:.1f}ms memoized={memoized_time * 1000:.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--params", type=int, default=10)
+    parser.add_argument("--layers", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    dbnd_bootstrap(enable_dbnd_run=True)
+    for tasks in args.tasks:
+        for layers in args.layers:
+            run_benchmark(tasks, args.params, layers, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
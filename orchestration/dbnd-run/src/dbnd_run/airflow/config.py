@@ -47,6 +47,13 @@ class AirflowConfig(Config):
         " DAG and task concurrency checks"
     )[bool]
 
+    ready_queue_scheduler = parameter(
+        default=False,
+        description="Enable scheduling from an in-memory ready queue: on every loop only task instances "
+        "with changed (upstream) states are evaluated and ready task instances are queued in batch. "
+        "Requires optimize_airflow_db_access.",
+    )[bool]
+
     dbnd_dag_concurrency = parameter(
         description="Set Concurrency for dbnd ad-hoc DAGs"
     )[int]
@@ -93,6 +100,7 @@ class AirflowConfig(Config):
         if not self.optimize_airflow_db_access:
             self.disable_db_ping_on_connect = False
             self.disable_dag_concurrency_rules = False
+            self.ready_queue_scheduler = False
 
 
 username = dbnd_getuser()
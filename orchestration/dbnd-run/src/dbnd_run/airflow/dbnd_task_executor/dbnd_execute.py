@@ -91,7 +91,9 @@ def dbnd_operator__execute(dbnd_operator, context):
 
             dbnd_bootstrap(enable_dbnd_run=True)
             run_executor = RunExecutor.load_run(
-                dump_file=target(driver_dump), disable_tracking_api=False
+                dump_file=target(driver_dump),
+                disable_tracking_api=False,
+                task_id=dbnd_operator.dbnd_task_id,
             )
             run = run_executor.run
         except Exception as e:
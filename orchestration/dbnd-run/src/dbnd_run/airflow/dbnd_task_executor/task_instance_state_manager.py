@@ -18,6 +18,9 @@ class AirflowTaskInstanceStateManager(object):
         return self.status[(dag_id, execution_date)]
 
     def refresh_from_db(self, dag_id, execution_date, session):
+        """
+        Reloads the states of the dag run, returns task_ids with a changed state
+        """
         TI = TaskInstance
         updated_status = (
             session.query(TI.task_id, TI.state)
@@ -25,7 +28,14 @@ class AirflowTaskInstanceStateManager(object):
             .all()
         )
 
-        self.status[(dag_id, execution_date)] = dict(updated_status)
+        previous_status = self.status.get((dag_id, execution_date), {})
+        updated_status = dict(updated_status)
+        self.status[(dag_id, execution_date)] = updated_status
+        return {
+            task_id
+            for task_id, state in updated_status.items()
+            if task_id not in previous_status or previous_status[task_id] != state
+        }
 
     def get_state(self, dag_id, execution_date, task_id):
         return self._get_dag_run(dag_id, execution_date).get(task_id)
@@ -43,5 +53,6 @@ class AirflowTaskInstanceStateManager(object):
     def refresh_task_instances_state(
         self, task_instances, dag_id, execution_date, session
     ):
-        self.refresh_from_db(dag_id, execution_date, session)
+        changed_task_ids = self.refresh_from_db(dag_id, execution_date, session)
         self.sync_to_object(task_instances)
+        return changed_task_ids
@@ -56,6 +56,7 @@ from dbnd_run.airflow.executors.kubernetes_executor.kubernetes_runtime_zombies_c
     ClearKubernetesRuntimeZombiesForDagRun,
 )
 from dbnd_run.airflow.scheduler.dagrun_zombies import fix_zombie_dagrun_task_instances
+from dbnd_run.airflow.scheduler.ti_ready_queue import TaskInstancesReadyQueue
 from dbnd_run.current import get_run_executor, is_killed
 
 
@@ -431,6 +432,12 @@ class SingleDagRunJob(BaseJob, SingletonContext):
         all_ti = list(ti_status.to_run.values())
         waiting_for_executor_result = {}
 
+        ready_queue = None
+        if self.airflow_config.ready_queue_scheduler:
+            ready_queue = TaskInstancesReadyQueue(self.dag)
+            # keys are never updated during the run
+            keys_by_task_id = {ti.task_id: key for key, ti in ti_status.to_run.items()}
+
         while (len(ti_status.to_run) > 0 or len(ti_status.running) > 0) and len(
             ti_status.deadlocked
         ) == 0:
@@ -441,172 +448,26 @@ class SingleDagRunJob(BaseJob, SingletonContext):
             self.log.debug("*** Clearing out not_ready list ***")
             ti_status.not_ready.clear()
 
-            self.ti_state_manager.refresh_task_instances_state(
-                all_ti, self.dag.dag_id, self.execution_date, session=session
-            )
+            self._refresh_task_instances_state(all_ti, ready_queue, session=session)
 
-            # we need to execute the tasks bottom to top
-            # or leaf to root, as otherwise tasks might be
-            # determined deadlocked while they are actually
-            # waiting for their upstream to finish
-            for task in self.dag.topological_sort():
-
-                # TODO: too complicated mechanism,
-                # it's not possible that we have multiple tasks with the same id in to run
-                for key, ti in list(ti_status.to_run.items()):
-                    if task.task_id != ti.task_id:
-                        continue
-
-                    if not self._optimize:
-                        ti.refresh_from_db()
-
-                    task = self.dag.get_task(ti.task_id)
-                    ti.task = task
-
-                    # TODO : do we need that?
-                    # ignore_depends_on_past = (
-                    #     self.ignore_first_depends_on_past and
-                    #     ti.execution_date == (start_date or ti.start_date))
-                    ignore_depends_on_past = False
-                    self.log.debug("Task instance to run %s state %s", ti, ti.state)
-
-                    # guard against externally modified tasks instances or
-                    # in case max concurrency has been reached at task runtime
-                    if ti.state == State.NONE:
-                        self.log.warning(
-                            "FIXME: task instance {} state was set to None "
-                            "externally. This should not happen"
-                        )
-                        ti.set_state(State.SCHEDULED, session=session)
-
-                    # The task was already marked successful or skipped by a
-                    # different Job. Don't rerun it.
-                    if ti.state == State.SUCCESS:
-                        ti_status.succeeded.add(key)
-                        self.log.debug("Task instance %s succeeded. Don't rerun.", ti)
-                        ti_status.to_run.pop(key)
-                        if key in ti_status.running:
-                            ti_status.running.pop(key)
-                        continue
-                    elif ti.state == State.SKIPPED:
-                        ti_status.skipped.add(key)
-                        self.log.debug("Task instance %s skipped. Don't rerun.", ti)
-                        ti_status.to_run.pop(key)
-                        if key in ti_status.running:
-                            ti_status.running.pop(key)
-                        continue
-                    elif ti.state == State.FAILED:
-                        self.log.error("Task instance %s failed", ti)
-                        ti_status.failed.add(key)
-                        ti_status.to_run.pop(key)
-                        if key in ti_status.running:
-                            ti_status.running.pop(key)
-                        continue
-                    elif ti.state == State.UPSTREAM_FAILED:
-                        self.log.error("Task instance %s upstream failed", ti)
-                        ti_status.failed.add(key)
-                        ti_status.to_run.pop(key)
-                        if key in ti_status.running:
-                            ti_status.running.pop(key)
-                        continue
-
-                    runtime_deps = []
-                    if self.airflow_config.disable_dag_concurrency_rules:
-                        # RUN Deps validate dag and task concurrency
-                        # It's less relevant when we run in stand along mode with SingleDagRunJob
-                        # from airflow.ti_deps.deps.runnable_exec_date_dep import RunnableExecDateDep
-                        from airflow.ti_deps.deps.valid_state_dep import ValidStateDep
-
-                        # from airflow.ti_deps.deps.dag_ti_slots_available_dep import DagTISlotsAvailableDep
-                        # from airflow.ti_deps.deps.task_concurrency_dep import TaskConcurrencyDep
-                        # from airflow.ti_deps.deps.pool_slots_available_dep import PoolSlotsAvailableDep
-                        runtime_deps = {
-                            # RunnableExecDateDep(),
-                            ValidStateDep(SCHEDULED_OR_RUNNABLE),
-                            # DagTISlotsAvailableDep(),
-                            # TaskConcurrencyDep(),
-                            # PoolSlotsAvailableDep(),
-                        }
-                    else:
-                        runtime_deps = RUNNING_DEPS
-
-                    dagrun_dep_context = DepContext(
-                        deps=runtime_deps,
-                        ignore_depends_on_past=ignore_depends_on_past,
-                        ignore_task_deps=self.ignore_task_deps,
-                        flag_upstream_failed=True,
-                    )
-
-                    # Is the task runnable? -- then run it
-                    # the dependency checker can change states of tis
-                    if ti.are_dependencies_met(
-                        dep_context=dagrun_dep_context,
-                        session=session,
-                        verbose=self.verbose,
-                    ):
-                        ti.refresh_from_db(lock_for_update=True, session=session)
-                        if (
-                            ti.state == State.SCHEDULED
-                            or ti.state == State.UP_FOR_RETRY
-                        ):
-                            if executor.has_task(ti):
-                                self.log.debug(
-                                    "Task Instance %s already in executor "
-                                    "waiting for queue to clear",
-                                    ti,
-                                )
-                            else:
-                                self.log.debug("Sending %s to executor", ti)
-                                # if ti.state == State.UP_FOR_RETRY:
-                                #     ti._try_number += 1
-                                # Skip scheduled state, we are executing immediately
-                                ti.state = State.QUEUED
-                                session.merge(ti)
-
-                                cfg_path = None
-                                if executor.__class__ in (
-                                    LocalExecutor,
-                                    SequentialExecutor,
-                                ):
-                                    cfg_path = tmp_configuration_copy()
-
-                                executor.queue_task_instance(
-                                    ti,
-                                    mark_success=self.mark_success,
-                                    pickle_id=pickle_id,
-                                    ignore_task_deps=self.ignore_task_deps,
-                                    ignore_depends_on_past=ignore_depends_on_past,
-                                    pool=self.pool,
-                                    cfg_path=cfg_path,
-                                )
-
-                                ti_status.to_run.pop(key)
-                                ti_status.running[key] = ti
-                                waiting_for_executor_result[key] = ti
-                        session.commit()
-                        continue
-
-                    if ti.state == State.UPSTREAM_FAILED:
-                        self.log.error("Task instance %s upstream failed", ti)
-                        ti_status.failed.add(key)
-                        ti_status.to_run.pop(key)
-                        if key in ti_status.running:
-                            ti_status.running.pop(key)
-                        continue
-
-                    # special case
-                    if ti.state == State.UP_FOR_RETRY:
-                        self.log.debug(
-                            "Task instance %s retry period not " "expired yet", ti
-                        )
-                        if key in ti_status.running:
-                            ti_status.running.pop(key)
-                        ti_status.to_run[key] = ti
-                        continue
-
-                    # all remaining tasks
-                    self.log.debug("Adding %s to not_ready", ti)
-                    ti_status.not_ready.add(key)
+            if ready_queue:
+                self._process_ready_task_instances(
+                    ti_status=ti_status,
+                    ready_queue=ready_queue,
+                    keys_by_task_id=keys_by_task_id,
+                    executor=executor,
+                    pickle_id=pickle_id,
+                    waiting_for_executor_result=waiting_for_executor_result,
+                    session=session,
+                )
+            else:
+                self._process_task_instances_in_topological_order(
+                    ti_status=ti_status,
+                    executor=executor,
+                    pickle_id=pickle_id,
+                    waiting_for_executor_result=waiting_for_executor_result,
+                    session=session,
+                )
 
             # sync the attempt with the retries
             self.sync_task_run_attempts_retries(ti_status)
@@ -630,9 +491,7 @@ class SingleDagRunJob(BaseJob, SingletonContext):
                 ti_status.deadlocked.update(ti_status.to_run.values())
                 ti_status.to_run.clear()
 
-            self.ti_state_manager.refresh_task_instances_state(
-                all_ti, self.dag.dag_id, self.execution_date, session=session
-            )
+            self._refresh_task_instances_state(all_ti, ready_queue, session=session)
 
             # check executor state
             self._manage_executor_state(ti_status.running, waiting_for_executor_result)
@@ -674,6 +533,368 @@ class SingleDagRunJob(BaseJob, SingletonContext):
         # return updated status
         return executed_run_dates
 
+    def _process_task_instances_in_topological_order(
+        self, ti_status, executor, pickle_id, waiting_for_executor_result, session
+    ):
+        # we need to execute the tasks bottom to top
+        # or leaf to root, as otherwise tasks might be
+        # determined deadlocked while they are actually
+        # waiting for their upstream to finish
+        for task in self.dag.topological_sort():
+
+            # TODO: too complicated mechanism,
+            # it's not possible that we have multiple tasks with the same id in to run
+            for key, ti in list(ti_status.to_run.items()):
+                if task.task_id != ti.task_id:
+                    continue
+
+                if not self._optimize:
+                    ti.refresh_from_db()
+
+                task = self.dag.get_task(ti.task_id)
+                ti.task = task
+
+                # TODO : do we need that?
+                # ignore_depends_on_past = (
+                #     self.ignore_first_depends_on_past and
+                #     ti.execution_date == (start_date or ti.start_date))
+                ignore_depends_on_past = False
+                self.log.debug("Task instance to run %s state %s", ti, ti.state)
+
+                # guard against externally modified tasks instances or
+                # in case max concurrency has been reached at task runtime
+                if ti.state == State.NONE:
+                    self.log.warning(
+                        "FIXME: task instance {} state was set to None "
+                        "externally. This should not happen"
+                    )
+                    ti.set_state(State.SCHEDULED, session=session)
+
+                # The task was already marked successful or skipped by a
+                # different Job. Don't rerun it.
+                if ti.state == State.SUCCESS:
+                    ti_status.succeeded.add(key)
+                    self.log.debug("Task instance %s succeeded. Don't rerun.", ti)
+                    ti_status.to_run.pop(key)
+                    if key in ti_status.running:
+                        ti_status.running.pop(key)
+                    continue
+                elif ti.state == State.SKIPPED:
+                    ti_status.skipped.add(key)
+                    self.log.debug("Task instance %s skipped. Don't rerun.", ti)
+                    ti_status.to_run.pop(key)
+                    if key in ti_status.running:
+                        ti_status.running.pop(key)
+                    continue
+                elif ti.state == State.FAILED:
+                    self.log.error("Task instance %s failed", ti)
+                    ti_status.failed.add(key)
+                    ti_status.to_run.pop(key)
+                    if key in ti_status.running:
+                        ti_status.running.pop(key)
+                    continue
+                elif ti.state == State.UPSTREAM_FAILED:
+                    self.log.error("Task instance %s upstream failed", ti)
+                    ti_status.failed.add(key)
+                    ti_status.to_run.pop(key)
+                    if key in ti_status.running:
+                        ti_status.running.pop(key)
+                    continue
+
+                dagrun_dep_context = self._get_dagrun_dep_context(
+                    ignore_depends_on_past=ignore_depends_on_past
+                )
+
+                # Is the task runnable? -- then run it
+                # the dependency checker can change states of tis
+                if ti.are_dependencies_met(
+                    dep_context=dagrun_dep_context,
+                    session=session,
+                    verbose=self.verbose,
+                ):
+                    ti.refresh_from_db(lock_for_update=True, session=session)
+                    if ti.state == State.SCHEDULED or ti.state == State.UP_FOR_RETRY:
+                        if executor.has_task(ti):
+                            self.log.debug(
+                                "Task Instance %s already in executor "
+                                "waiting for queue to clear",
+                                ti,
+                            )
+                        else:
+                            self.log.debug("Sending %s to executor", ti)
+                            # if ti.state == State.UP_FOR_RETRY:
+                            #     ti._try_number += 1
+                            # Skip scheduled state, we are executing immediately
+                            ti.state = State.QUEUED
+                            session.merge(ti)
+
+                            cfg_path = None
+                            if executor.__class__ in (
+                                LocalExecutor,
+                                SequentialExecutor,
+                            ):
+                                cfg_path = tmp_configuration_copy()
+
+                            executor.queue_task_instance(
+                                ti,
+                                mark_success=self.mark_success,
+                                pickle_id=pickle_id,
+                                ignore_task_deps=self.ignore_task_deps,
+                                ignore_depends_on_past=ignore_depends_on_past,
+                                pool=self.pool,
+                                cfg_path=cfg_path,
+                            )
+
+                            ti_status.to_run.pop(key)
+                            ti_status.running[key] = ti
+                            waiting_for_executor_result[key] = ti
+                    session.commit()
+                    continue
+
+                if ti.state == State.UPSTREAM_FAILED:
+                    self.log.error("Task instance %s upstream failed", ti)
+                    ti_status.failed.add(key)
+                    ti_status.to_run.pop(key)
+                    if key in ti_status.running:
+                        ti_status.running.pop(key)
+                    continue
+
+                # special case
+                if ti.state == State.UP_FOR_RETRY:
+                    self.log.debug(
+                        "Task instance %s retry period not " "expired yet", ti
+                    )
+                    if key in ti_status.running:
+                        ti_status.running.pop(key)
+                    ti_status.to_run[key] = ti
+                    continue
+
+                # all remaining tasks
+                self.log.debug("Adding %s to not_ready", ti)
+                ti_status.not_ready.add(key)
+
+    def _get_dagrun_dep_context(self, ignore_depends_on_past):
+        runtime_deps = []
+        if self.airflow_config.disable_dag_concurrency_rules:
+            # RUN Deps validate dag and task concurrency
+            # It's less relevant when we run in stand along mode with SingleDagRunJob
+            # from airflow.ti_deps.deps.runnable_exec_date_dep import RunnableExecDateDep
+            from airflow.ti_deps.deps.valid_state_dep import ValidStateDep
+
+            # from airflow.ti_deps.deps.dag_ti_slots_available_dep import DagTISlotsAvailableDep
+            # from airflow.ti_deps.deps.task_concurrency_dep import TaskConcurrencyDep
+            # from airflow.ti_deps.deps.pool_slots_available_dep import PoolSlotsAvailableDep
+            runtime_deps = {
+                # RunnableExecDateDep(),
+                ValidStateDep(SCHEDULED_OR_RUNNABLE),
+                # DagTISlotsAvailableDep(),
+                # TaskConcurrencyDep(),
+                # PoolSlotsAvailableDep(),
+            }
+        else:
+            runtime_deps = RUNNING_DEPS
+
+        return DepContext(
+            deps=runtime_deps,
+            ignore_depends_on_past=ignore_depends_on_past,
+            ignore_task_deps=self.ignore_task_deps,
+            flag_upstream_failed=True,
+        )
+
+    def _refresh_task_instances_state(self, all_ti, ready_queue, session):
+        changed_task_ids = self.ti_state_manager.refresh_task_instances_state(
+            all_ti, self.dag.dag_id, self.execution_date, session=session
+        )
+        if ready_queue:
+            ready_queue.on_state_changes(
+                changed_task_ids,
+                lambda task_id: self.ti_state_manager.get_state(
+                    self.dag.dag_id, self.execution_date, task_id
+                ),
+            )
+
+    def _pop_finished_task_instance(self, ti_status, key, ti):
+        """
+        Moves finished task instance out of to_run/running, returns False if it's not finished
+        """
+        if ti.state == State.SUCCESS:
+            ti_status.succeeded.add(key)
+            self.log.debug("Task instance %s succeeded. Don't rerun.", ti)
+        elif ti.state == State.SKIPPED:
+            ti_status.skipped.add(key)
+            self.log.debug("Task instance %s skipped. Don't rerun.", ti)
+        elif ti.state == State.FAILED:
+            self.log.error("Task instance %s failed", ti)
+            ti_status.failed.add(key)
+        elif ti.state == State.UPSTREAM_FAILED:
+            self.log.error("Task instance %s upstream failed", ti)
+            ti_status.failed.add(key)
+        else:
+            return False
+
+        ti_status.to_run.pop(key, None)
+        ti_status.running.pop(key, None)
+        return True
+
+    def _process_ready_task_instances(
+        self,
+        ti_status,
+        ready_queue,
+        keys_by_task_id,
+        executor,
+        pickle_id,
+        waiting_for_executor_result,
+        session,
+    ):
+        """
+        Ready queue version of the scheduling loop iteration:
+        evaluates only the candidates of the ready queue (instead of all task instances),
+        the states are already synced from ti_state_manager (no refresh per task instance),
+        and all ready task instances are marked as QUEUED by a single update.
+        """
+        ignore_depends_on_past = False
+        dagrun_dep_context = self._get_dagrun_dep_context(
+            ignore_depends_on_past=ignore_depends_on_past
+        )
+
+        # not evaluated task instances are still waiting for their upstream
+        deferred = set()
+        ready = []
+        for task_id in ready_queue.pop_candidates():
+            key = keys_by_task_id.get(task_id)
+            ti = ti_status.to_run.get(key)
+            if ti is None:
+                continue
+            ti.task = self.dag.get_task(task_id)
+            self.log.debug("Task instance to run %s state %s", ti, ti.state)
+
+            # guard against externally modified tasks instances or
+            # in case max concurrency has been reached at task runtime
+            if ti.state == State.NONE:
+                self.log.warning(
+                    "FIXME: task instance %s state was set to None "
+                    "externally. This should not happen",
+                    ti,
+                )
+                ti.set_state(State.SCHEDULED, session=session)
+
+            if self._pop_finished_task_instance(ti_status, key, ti):
+                continue
+
+            # the dependency checker can change states of tis
+            if ti.are_dependencies_met(
+                dep_context=dagrun_dep_context, session=session, verbose=self.verbose
+            ):
+                # runnable task instances are never "not ready"
+                deferred.add(key)
+                if ti.state in (
+                    State.SCHEDULED,
+                    State.UP_FOR_RETRY,
+                ) and not executor.has_task(ti):
+                    ready.append((key, ti))
+                else:
+                    self.log.debug(
+                        "Task Instance %s is runnable, but can't be queued yet", ti
+                    )
+                    ready_queue.wait(task_id)
+                continue
+
+            if self._pop_finished_task_instance(ti_status, key, ti):
+                continue
+
+            if ti.state == State.UP_FOR_RETRY:
+                self.log.debug("Task instance %s retry period not expired yet", ti)
+                deferred.add(key)
+                ready_queue.wait(task_id)
+            elif ready_queue.is_upstream_done(task_id):
+                # blocked by something else than upstream (pools, concurrency)
+                ready_queue.wait(task_id)
+
+        if ready:
+            not_queued = self._queue_ready_task_instances(
+                ready=ready,
+                ti_status=ti_status,
+                executor=executor,
+                pickle_id=pickle_id,
+                ignore_depends_on_past=ignore_depends_on_past,
+                waiting_for_executor_result=waiting_for_executor_result,
+                session=session,
+            )
+            for ti in not_queued:
+                ready_queue.wait(ti.task_id)
+
+        for key in ti_status.to_run:
+            if key not in deferred:
+                ti_status.not_ready.add(key)
+
+    def _queue_ready_task_instances(
+        self,
+        ready,
+        ti_status,
+        executor,
+        pickle_id,
+        ignore_depends_on_past,
+        waiting_for_executor_result,
+        session,
+    ):
+        """
+        Moves the ready task instances to QUEUED and sends them to the executor,
+        returns the task instances that were changed externally meanwhile (they are not queued)
+        """
+        # DBNDPATCH
+        # batch update instead of refresh_from_db(lock_for_update=True) per task instance,
+        # only task instances that are still SCHEDULED/UP_FOR_RETRY are moved to QUEUED,
+        # they are locked till the commit, so these are exactly the rows moved by the update
+        queued_task_ids = {
+            task_id
+            for task_id, in session.query(TI.task_id)
+            .filter(
+                TI.dag_id == self.dag_id,
+                TI.execution_date == self.execution_date,
+                TI.task_id.in_([ti.task_id for _, ti in ready]),
+                TI.state.in_([State.SCHEDULED, State.UP_FOR_RETRY]),
+            )
+            .with_for_update()
+        }
+        if queued_task_ids:
+            session.query(TI).filter(
+                TI.dag_id == self.dag_id,
+                TI.execution_date == self.execution_date,
+                TI.task_id.in_(queued_task_ids),
+            ).update({TI.state: State.QUEUED}, synchronize_session=False)
+        session.commit()
+
+        not_queued = [ti for _, ti in ready if ti.task_id not in queued_task_ids]
+        if not_queued:
+            self.log.warning(
+                "Task instances %s were changed externally, they are not queued",
+                not_queued,
+            )
+            ready = [(key, ti) for key, ti in ready if ti.task_id in queued_task_ids]
+
+        cfg_path = None
+        if executor.__class__ in (LocalExecutor, SequentialExecutor):
+            cfg_path = tmp_configuration_copy()
+
+        for key, ti in ready:
+            self.log.debug("Sending %s to executor", ti)
+            # Skip scheduled state, we are executing immediately
+            ti.state = State.QUEUED
+            executor.queue_task_instance(
+                ti,
+                mark_success=self.mark_success,
+                pickle_id=pickle_id,
+                ignore_task_deps=self.ignore_task_deps,
+                ignore_depends_on_past=ignore_depends_on_past,
+                pool=self.pool,
+                cfg_path=cfg_path,
+            )
+
+            ti_status.to_run.pop(key)
+            ti_status.running[key] = ti
+            waiting_for_executor_result[key] = ti
+        return not_queued
+
     def sync_task_run_attempts_retries(self, ti_status):
         databand_run = get_databand_run()
         for dag_run in ti_status.active_runs:
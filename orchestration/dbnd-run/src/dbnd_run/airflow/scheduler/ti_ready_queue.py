@@ -0,0 +1,119 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+import typing
+
+from airflow.utils.state import State
+from airflow.utils.trigger_rule import TriggerRule
+
+
+if typing.TYPE_CHECKING:
+    from typing import Callable, Dict, Iterable, List, Optional, Set
+
+    from airflow.models import DAG
+
+# the same states TriggerRuleDep counts as "done"
+UPSTREAM_DONE_STATES = {
+    State.SUCCESS,
+    State.SKIPPED,
+    State.FAILED,
+    State.UPSTREAM_FAILED,
+}
+
+# a downstream can be resolved (skipped/upstream failed) before all its upstream are done
+UPSTREAM_PROPAGATED_STATES = {State.SKIPPED, State.FAILED, State.UPSTREAM_FAILED}
+
+# trigger rules that can't pass until all upstream tasks are done
+WAIT_FOR_ALL_TRIGGER_RULES = {TriggerRule.ALL_SUCCESS, TriggerRule.ALL_DONE}
+
+
+class TaskInstancesReadyQueue(object):
+    """
+    In-memory dependency counters of the dag tasks, fed by the state changes of ti_state_manager.
+
+    Every scheduling loop evaluates only the "candidates":
+      * tasks that have changed their own state
+      * tasks with a changed upstream that can affect them
+        (all upstream are done, an upstream failed/skipped, or a trigger rule that doesn't wait for all)
+      * tasks that were ready at the previous loop, but were not queued (retry period, executor is busy)
+    all other tasks are still waiting for their upstream and their evaluation can be skipped.
+    """
+
+    def __init__(self, dag):
+        # type: (DAG) -> None
+        tasks = dag.topological_sort()
+        self._order = {task.task_id: i for i, task in enumerate(tasks)}
+        self._trigger_rules = {task.task_id: task.trigger_rule for task in tasks}
+        self._downstream = {
+            task.task_id: [
+                task_id
+                for task_id in task.downstream_task_ids
+                if task_id in self._order
+            ]
+            for task in tasks
+        }  # type: Dict[str, List[str]]
+        self._pending_upstream = {
+            task.task_id: len(
+                [
+                    task_id
+                    for task_id in task.upstream_task_ids
+                    if task_id in self._order
+                ]
+            )
+            for task in tasks
+        }  # type: Dict[str, int]
+
+        self._done = set()  # type: Set[str]
+        self._candidates = set(self._order)  # type: Set[str]
+        self._waiting = set()  # type: Set[str]
+
+    def is_upstream_done(self, task_id):
+        return self._pending_upstream[task_id] == 0
+
+    def on_state_changes(self, task_ids, get_state):
+        # type: (Iterable[str], Callable[[str], Optional[str]]) -> None
+        for task_id in task_ids:
+            if task_id not in self._order:
+                continue
+            self._candidates.add(task_id)
+
+            state = get_state(task_id)
+            is_done = state in UPSTREAM_DONE_STATES
+            was_done = task_id in self._done
+            if is_done == was_done:
+                if not is_done:
+                    # running/retry, wakes up rules like "one_success"
+                    self._add_downstream_candidates(task_id, state)
+                continue
+
+            if is_done:
+                self._done.add(task_id)
+                delta = -1
+            else:
+                # cleared or up for retry
+                self._done.discard(task_id)
+                delta = 1
+
+            for downstream_id in self._downstream[task_id]:
+                self._pending_upstream[downstream_id] += delta
+            self._add_downstream_candidates(task_id, state)
+
+    def _add_downstream_candidates(self, task_id, state):
+        for downstream_id in self._downstream[task_id]:
+            if (
+                self._pending_upstream[downstream_id] == 0
+                or state in UPSTREAM_PROPAGATED_STATES
+                or self._trigger_rules[downstream_id] not in WAIT_FOR_ALL_TRIGGER_RULES
+            ):
+                self._candidates.add(downstream_id)
+
+    def wait(self, task_id):
+        """The task is ready but can't be queued yet, it's evaluated again at the next loop"""
+        self._waiting.add(task_id)
+
+    def pop_candidates(self):
+        # type: () -> List[str]
+        """Candidates in topological order, so upstream are resolved before their downstream"""
+        candidates = self._candidates | self._waiting
+        self._candidates = set()
+        self._waiting = set()
+        return sorted(candidates, key=self._order.get)
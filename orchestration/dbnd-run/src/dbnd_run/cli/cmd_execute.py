@@ -72,17 +72,23 @@ def execute(
                 DbndVersionsClashWarning,
             )
 
+    ctx.obj = {"dbnd_run": dbnd_run, "disable_tracking_api": disable_tracking_api}
+
+
+def _load_run(ctx, task_id):
+    # type: (click.Context, str) -> DatabandRun
+    """the run is loaded by the command, a run snapshot is loaded only for the task"""
     from targets import target
 
     with env_context(**{ENV_DBND__TRACKING: "False"}):
         run_executor = RunExecutor.load_run(
-            dump_file=target(dbnd_run), disable_tracking_api=disable_tracking_api
+            dump_file=target(ctx.obj["dbnd_run"]),
+            disable_tracking_api=ctx.obj["disable_tracking_api"],
+            task_id=task_id,
         )
-        ctx.obj = {
-            "run_executor": run_executor,
-            "run": run_executor.run,
-            "disable_tracking_api": disable_tracking_api,
-        }
+    ctx.obj["run_executor"] = run_executor
+    ctx.obj["run"] = run_executor.run
+    return run_executor.run
 
 
 @execute.command(name="task")
@@ -91,7 +97,7 @@ def execute(
 def run_task(ctx, task_id):
     """(Internal) Run a task inline (task.run function)"""
 
-    run = ctx.obj["run"]  # type: DatabandRun
+    run = _load_run(ctx, task_id)
     with set_active_run_context(run):
         task = run._get_task_by_id(task_id)
         task_run = task.current_task_run
@@ -109,7 +115,7 @@ def run_task(ctx, task_id):
 def run_task_submit(ctx, task_id):
     """Submit a task"""
 
-    run = ctx.obj["run"]  # type: DatabandRun
+    run = _load_run(ctx, task_id)
     with set_active_run_context(run):
         task = run._get_task_by_id(task_id)
         task._task_submit()
@@ -121,7 +127,7 @@ def run_task_submit(ctx, task_id):
 def run_task_execute(ctx, task_id):
     """Execute a task"""
 
-    run = ctx.obj["run"]  # type: DatabandRun
+    run = _load_run(ctx, task_id)
     with set_active_run_context(run):
         task_run = run.get_task_run_by_id(task_id)
         task_run.task_run_executor.execute(allow_resubmit=False)
@@ -48,8 +48,8 @@ def cyclic_graph_detected(task, cyclic_nodes):
 
     logger.warning("Cyclic graph detected: %s", tasks_trail(circle_trail))
     return DatabandBuildError(
-        "A cyclic dependency occurred %s: {short_trail}.. ({num_of_tasks} tasks)".format(
-            task_call="in '{task_call}'" % _band_call_str(task) if task else "",
+        "A cyclic dependency occurred{task_call}: {short_trail}.. ({num_of_tasks} tasks)".format(
+            task_call=" in '%s'" % _band_call_str(task) if task else "",
             short_trail=tasks_trail(circle_trail[:3]),
             num_of_tasks=len(circle_trail),
         ),
@@ -7,6 +7,7 @@ import json
 import logging
 import os
 import re
+import threading
 import time
 import typing
 
@@ -32,7 +33,7 @@ from targets import target
 
 
 if typing.TYPE_CHECKING:
-    from typing import Iterable, List
+    from typing import Dict, Iterable, List, Optional
 
     from dbnd._core.task_run.task_run import TaskRun
     from targets.value_meta import ValueMeta
@@ -51,10 +52,112 @@ def _parse_metric(value):
 _METRICS_RE = re.compile(r"(\d+)\s+(.+)")
 
 
+def _metric_index_name(metric_target):
+    return re.sub(r"\.json\b", "", os.path.basename(str(metric_target)))
+
+
+class _MetricFileWriter(object):
+    """
+    Buffered writer of a single metric file.
+
+    Local files are appended through one open handle,
+    remote files can't be appended, their content is kept and the file is rewritten on flush.
+    """
+
+    def __init__(self, metric_target, index_target):
+        self.metric_target = metric_target
+        self.index_target = index_target
+        self.pending = []  # type: List[str]
+        self.indexed = False
+
+        self._handle = None
+        self._content = None  # type: Optional[str]
+
+    def append(self, line):
+        self.pending.append(line)
+
+    def flush(self):
+        # type: () -> bool
+        if not self.pending:
+            return False
+        data = "".join(self.pending)
+        self.pending = []
+
+        if self.metric_target.fs.local:
+            if self._handle is None:
+                self.metric_target.mkdir_parent()
+                self._handle = open(self.metric_target.path, "a")
+            self._handle.write(data)
+            self._handle.flush()
+            return True
+
+        if self._content is None:
+            # data written by the previous attempts/processes is read only once
+            self._content = (
+                self.metric_target.read() if self.metric_target.exists() else ""
+            )
+        self._content += data
+        self.metric_target.write(self._content)
+        return True
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        self._content = None
+
+
 class FileTrackingStore(TrackingStore):
+    """
+    Tracking store that writes task runs info and metrics into the task run meta files.
+
+    Metrics are appended to their files in batches (one writer per metric file),
+    every batch is flushed after `metrics_flush_lines` values or `metrics_flush_interval` seconds,
+    when the task run is finished, and on flush().
+    Every metrics source folder has an index of its metric names,
+    so readers don't need to list all the metric files.
+    """
+
+    def __init__(
+        self,
+        *args,
+        metrics_flush_lines=1000,
+        metrics_flush_interval=1.0,
+        max_open_metric_files=64,
+        **kwargs
+    ):
+        super(FileTrackingStore, self).__init__(*args, **kwargs)
+        self.metrics_flush_lines = metrics_flush_lines
+        self.metrics_flush_interval = metrics_flush_interval
+        self.max_open_metric_files = max_open_metric_files
+
+        self._metrics_lock = threading.RLock()
+        self._metric_writers = {}  # type: Dict[str, _MetricFileWriter]
+        self._metric_writers_pid = os.getpid()
+        self._metric_indexes = {}  # type: Dict[str, List[str]]
+        self._pending_metric_lines = 0
+        self._last_metrics_flush = time.time()
+
+    def __getstate__(self):
+        # the lock and the open metric files can't be pickled,
+        # the unpickled store opens its own writers on the next metrics
+        state = self.__dict__.copy()
+        for name in ("_metrics_lock", "_metric_writers", "_metric_indexes"):
+            del state[name]
+        state["_pending_metric_lines"] = 0
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._metrics_lock = threading.RLock()
+        self._metric_writers = {}
+        self._metric_indexes = {}
+
     def set_task_run_state(self, task_run, state, error=None, timestamp=None):
         if state == TaskRunState.RUNNING:
             self.dump_task_run_info(task_run)
+        elif state in TaskRunState.finished_states():
+            self.flush()
 
     def _get_meta_files(self, task_run):
         return task_run.task_run_executor.meta_files
@@ -97,20 +200,99 @@ class FileTrackingStore(TrackingStore):
             }
         )
         metric_path.write(data)
+        with self._metrics_lock:
+            self._add_to_metric_index(
+                self._get_meta_files(task_run).get_metric_index_target(
+                    source=MetricSource.histograms
+                ),
+                metric_path,
+            )
 
     def log_metrics(self, task_run, metrics):
         # type: (TaskRun, List[Metric]) -> None
-        for metric in metrics:
-            metric_path = self._get_meta_files(task_run).get_metric_target(
-                metric.key, source=metric.source
+        meta_files = self._get_meta_files(task_run)
+        with self._metrics_lock:
+            if self._metric_writers_pid != os.getpid():
+                # forked process, the writers (and their buffers) belong to the parent
+                self._metric_writers = {}
+                self._metric_indexes = {}
+                self._pending_metric_lines = 0
+                self._metric_writers_pid = os.getpid()
+
+            for metric in metrics:
+                metric_path = meta_files.get_metric_target(
+                    metric.key, source=metric.source
+                )
+                timestamp = int(time.mktime(metric.timestamp.timetuple()))
+                value = "{} {}\n".format(timestamp, metric.serialized_value)
+
+                writer = self._metric_writers.get(str(metric_path))
+                if writer is None:
+                    writer = self._open_metric_writer(
+                        metric_path,
+                        meta_files.get_metric_index_target(source=metric.source),
+                    )
+                writer.append(value)
+                self._pending_metric_lines += 1
+
+            if (
+                self._pending_metric_lines >= self.metrics_flush_lines
+                or time.time() - self._last_metrics_flush >= self.metrics_flush_interval
+            ):
+                self._flush_metrics()
+
+    def _open_metric_writer(self, metric_path, index_target):
+        if len(self._metric_writers) >= self.max_open_metric_files:
+            # close the least recently opened writer
+            oldest_path = next(iter(self._metric_writers))
+            self._close_metric_writer(self._metric_writers.pop(oldest_path))
+
+        writer = self._metric_writers[str(metric_path)] = _MetricFileWriter(
+            metric_path, index_target
+        )
+        return writer
+
+    def _flush_metric_writer(self, writer):
+        # the name is indexed only when its file exists
+        if writer.flush() and not writer.indexed:
+            self._add_to_metric_index(writer.index_target, writer.metric_target)
+            writer.indexed = True
+
+    def _close_metric_writer(self, writer):
+        self._flush_metric_writer(writer)
+        writer.close()
+
+    def _add_to_metric_index(self, index_target, metric_path):
+        index = self._metric_indexes.get(str(index_target))
+        if index is None:
+            index = self._metric_indexes[str(index_target)] = (
+                [name.strip() for name in index_target.readlines()]
+                if index_target.exists()
+                else []
             )
-            timestamp = int(time.mktime(metric.timestamp.timetuple()))
-            value = "{} {}\n".format(timestamp, metric.serialized_value)
 
-            data = value
-            if metric_path.exists():
-                data = metric_path.read() + value
-            metric_path.write(data)
+        name = _metric_index_name(metric_path)
+        if name in index:
+            return
+        index.append(name)
+        # metric names are few, the index is rewritten on every new name
+        index_target.write("".join(name + "\n" for name in index))
+
+    def _flush_metrics(self):
+        for writer in self._metric_writers.values():
+            self._flush_metric_writer(writer)
+        self._pending_metric_lines = 0
+        self._last_metrics_flush = time.time()
+
+    def flush(self):
+        with self._metrics_lock:
+            if self._metric_writers_pid != os.getpid():
+                return
+            for writer in self._metric_writers.values():
+                self._close_metric_writer(writer)
+            self._metric_writers = {}
+            self._pending_metric_lines = 0
+            self._last_metrics_flush = time.time()
 
     def log_artifact(self, task_run, name, artifact, artifact_target):
         artifact_target.mkdir_parent()
@@ -154,9 +336,18 @@ class TaskRunMetricsFileStoreReader(object):
         self.meta = TaskRunMetaFiles(attempt_folder)
 
     def _get_all_metrics_names(self, source=None):
+        index_target = self.meta.get_metric_index_target(source=source)
+        if index_target.exists():
+            # ordered and without duplicates
+            return list(
+                dict.fromkeys(
+                    name.strip() for name in index_target.readlines() if name.strip()
+                )
+            )
+
+        # written without index
         metrics_root = self.meta.get_metric_folder(source=source)
-        all_files = [os.path.basename(str(p)) for p in metrics_root.list_partitions()]
-        return [re.sub(r"\.json\b", "", f) for f in all_files]
+        return [_metric_index_name(p) for p in metrics_root.list_partitions()]
 
     def get_metric_history(self, key, source=None):
         metric_target = self.meta.get_metric_target(key, source=source)
@@ -166,7 +357,14 @@ class TaskRunMetricsFileStoreReader(object):
         rsl = []
         for pair in metric_data:
             ts, val = pair.strip().split(" ")
-            rsl.append(Metric(key, float(val), datetime.fromtimestamp(int(ts))))
+            rsl.append(
+                Metric(
+                    key=key,
+                    value=float(val),
+                    timestamp=datetime.fromtimestamp(int(ts)),
+                    source=source,
+                )
+            )
         return rsl
 
     def get_all_metrics_values(self, source=None):
@@ -193,10 +391,11 @@ class TaskRunMetricsFileStoreReader(object):
         metric_target = self.meta.get_metric_target(key, source=source)
         if not metric_target.exists():
             raise DatabandRuntimeError("Metric '%s' not found" % key)
-        metric_data = metric_target.readlines()
-        if len(metric_data) == 0:
+        # only the first value is used, there is no need to read the whole history
+        with metric_target.open("r") as fp:
+            first_line = fp.readline()
+        if not first_line:
             raise DatabandRuntimeError("Metric '%s' is malformed. No data found." % key)
-        first_line = metric_data[0]
 
         metric_parsed = _METRICS_RE.match(first_line)
         if not metric_parsed:
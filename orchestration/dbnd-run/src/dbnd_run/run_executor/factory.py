@@ -1,6 +1,7 @@
 # © Copyright Databand.ai, an IBM Company 2022
 
 import logging
+import os
 import typing
 
 from typing import List
@@ -41,13 +42,7 @@ def calculate_task_executor_type(submit_tasks, remote_engine, run_config):
         from dbnd_run.airflow.executors import AirflowTaskExecutorType
 
         if parallel:
-            if task_executor_type == TaskExecutorType.local:
-                logger.warning(
-                    "Auto switching to engine type '%s' due to parallel mode.",
-                    AirflowTaskExecutorType.airflow_multiprocess_local,
-                )
-                task_executor_type = AirflowTaskExecutorType.airflow_multiprocess_local
-
+            # explicitly requested local executor runs tasks in parallel by itself
             if task_executor_type == AirflowTaskExecutorType.airflow_inprocess:
                 logger.warning(
                     "Auto switching to engine type '%s' due to parallel mode.",
@@ -94,7 +89,10 @@ def calculate_task_executor_type(submit_tasks, remote_engine, run_config):
                     parallel = True
     else:
         if parallel:
-            logger.warning("Airflow is not installed, parallel mode is not supported")
+            logger.info(
+                "Airflow is not installed, running tasks in parallel by '%s' executor",
+                TaskExecutorType.local,
+            )
 
     all_executor_types = [TaskExecutorType.local]
     if dbnd_run_airflow_enabled:
@@ -110,6 +108,15 @@ def calculate_task_executor_type(submit_tasks, remote_engine, run_config):
     return task_executor_type, parallel
 
 
+def calculate_local_executor_parallelism(run_config, parallel):
+    """Number of tasks the local executor runs concurrently"""
+    if run_config.task_executor_parallelism:
+        return max(run_config.task_executor_parallelism, 1)
+    if parallel:
+        return os.cpu_count() or 1
+    return 1
+
+
 def get_task_executor(
     run_executor: "RunExecutor",
     task_executor_type: str,
@@ -125,6 +132,7 @@ def get_task_executor(
             host_engine=host_engine,
             target_engine=target_engine,
             task_runs=task_runs,
+            parallelism=run_executor.local_executor_parallelism,
         )
     else:
 
@@ -25,7 +25,11 @@ from dbnd._core.constants import (
 )
 from dbnd._core.context.use_dbnd_run import is_dbnd_orchestration_via_airflow_enabled
 from dbnd._core.current import current_task_run
-from dbnd._core.errors import DatabandRunError, DatabandSystemError
+from dbnd._core.errors import (
+    DatabandRunError,
+    DatabandRuntimeError,
+    DatabandSystemError,
+)
 from dbnd._core.errors.base import (
     DatabandError,
     DatabandFailFastError,
@@ -53,24 +57,28 @@ from dbnd._core.utils.uid_utils import get_uuid
 from dbnd.api.runs import kill_run
 from dbnd_run.plugin.dbnd_plugins import pm
 from dbnd_run.run_executor.factory import (
+    calculate_local_executor_parallelism,
     calculate_task_executor_type,
     get_task_executor,
 )
 from dbnd_run.run_executor.heartbeat_sender import start_heartbeat_sender
 from dbnd_run.run_executor.results_view import RunResultBand
-from dbnd_run.run_executor.task_runs_builder import TaskRunsBuilder
-from dbnd_run.run_executor_engine.local_task_executor import (
-    LocalTaskExecutor,
-    topological_sort,
+from dbnd_run.run_executor.run_snapshot import (
+    is_run_snapshot,
+    load_run_snapshot,
+    save_run_snapshot,
 )
+from dbnd_run.run_executor.task_runs_builder import TaskRunsBuilder
+from dbnd_run.run_executor_engine.local_task_executor import LocalTaskExecutor
 from dbnd_run.run_settings import EnvConfig, RunLoggingConfig, RunSettings
 from dbnd_run.run_settings.engine import build_engine_config
 from dbnd_run.run_settings.run import RunConfig
 from dbnd_run.task.task import Task
 from dbnd_run.task_ctrl.task_dag_describe import print_tasks_tree
+from dbnd_run.task_ctrl.task_dag_index import TaskDagIndex
 from dbnd_run.task_ctrl.task_run_executor import TaskRunExecutor
 from targets import FileTarget, target
-from targets.caching import TARGET_CACHE
+from targets.caching import TARGET_CACHE, TargetsExistenceCache
 from targets.providers.pandas import register_pd_to_hdf5_as_table_marshaler
 
 
@@ -139,6 +147,12 @@ class RunExecutor(SingletonContext):
         self.run_local_root = self.env.dbnd_local_root.folder(self.run_folder_prefix)
 
         self.driver_dump = self.run_root.file("run.pickle")
+        # the tasks can be executed from the driver dump only if it's saved, see `_is_save_run_pickle`
+        self.driver_dump_saved = False
+        # dependencies index of the run tasks, built by the driver
+        self.task_dag_index = None  # type: Optional[TaskDagIndex]
+        # existence of the tasks outputs, shared by completeness checks of the run
+        self.targets_existence_cache = TargetsExistenceCache()
 
         self.local_engine = build_engine_config(self.env.local_engine)
         self.remote_engine = build_engine_config(
@@ -161,6 +175,9 @@ class RunExecutor(SingletonContext):
         self.task_executor_type, self.parallel = calculate_task_executor_type(
             self.submit_tasks, self.remote_engine, self.run_config
         )
+        self.local_executor_parallelism = calculate_local_executor_parallelism(
+            self.run_config, self.parallel
+        )
 
         self.local_engine = build_engine_config(self.env.local_engine).clone(
             require_submit=False
@@ -374,7 +391,8 @@ class RunExecutor(SingletonContext):
             return True
 
         if self.task_executor_type == TaskExecutorType.local:
-            return False
+            # parallel local executor runs every task from the run pickle in a separate process
+            return self.local_executor_parallelism > 1
 
         if is_dbnd_orchestration_via_airflow_enabled():
             from dbnd_run.airflow.executors import AirflowTaskExecutorType
@@ -395,18 +413,36 @@ class RunExecutor(SingletonContext):
         # Ensure tracking is completed before pickling
         self.run.tracker.tracking_store.flush()
 
-        with t.open("wb") as fp:
-            cloudpickle.dump(obj=self.run.run_executor, file=fp)
+        if self.run_config.save_run_snapshot:
+            save_run_snapshot(self.run.run_executor, t)
+        else:
+            with t.open("wb") as fp:
+                cloudpickle.dump(obj=self.run.run_executor, file=fp)
+
+        if target_file is None:
+            self.driver_dump_saved = True
 
     @classmethod
-    def load_run(cls, dump_file, disable_tracking_api):
-        # type: (FileTarget, bool) -> RunExecutor
+    def load_run(cls, dump_file, disable_tracking_api, task_id=None):
+        # type: (FileTarget, bool, Optional[str]) -> RunExecutor
+        """
+        Loads the run saved by save_run_pickle,
+        the run snapshot is loaded only with the task run of task_id (and its direct upstream)
+        """
         logger.info("Loading dbnd run execution from %s", dump_file)
-        with dump_file.open("rb") as fp:
-            run_executor: RunExecutor = cloudpickle.load(file=fp)
-            if disable_tracking_api:
-                run_executor.run_config.context.tracking_store.disable_tracking_api()
-                logger.info("Tracking has been disabled")
+        if is_run_snapshot(dump_file):
+            if not task_id:
+                raise DatabandRuntimeError(
+                    "Run snapshot %s can be loaded only for a specific task" % dump_file
+                )
+            run_executor = load_run_snapshot(dump_file, task_id=task_id)
+        else:
+            with dump_file.open("rb") as fp:
+                run_executor = cloudpickle.load(file=fp)  # type: RunExecutor
+
+        if disable_tracking_api:
+            run_executor.run_config.context.tracking_store.disable_tracking_api()
+            logger.info("Tracking has been disabled")
         try:
             if run_executor.run_config.pickle_handler:
                 pickle_handler = load_python_callable(
@@ -556,9 +592,10 @@ class RunExecutor(SingletonContext):
             )
             run.root_task = root_task
 
-        tasks = run.root_task.task_dag.subdag_tasks()
         # assert that graph is DAG
-        topological_sort(tasks)
+        self.task_dag_index = TaskDagIndex(
+            run.root_task.task_dag.subdag_tasks(), root_task=run.root_task
+        )
 
         # now we init all task runs for all tasks in the pipeline
         task_runs = self._init_task_runs_for_execution(task_engine=remote_engine)
@@ -574,7 +611,7 @@ class RunExecutor(SingletonContext):
             logger.warning("Execution has been stopped due to run.dry=True flag!")
             return run
 
-        print_tasks_tree(root_task_run.task, task_runs)
+        print_tasks_tree(root_task_run.task, task_runs, dag_index=self.task_dag_index)
         if self._is_save_run_pickle(task_runs, remote_engine):
             run_executor.save_run_pickle()
 
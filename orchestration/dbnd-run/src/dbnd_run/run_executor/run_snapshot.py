@@ -0,0 +1,278 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+"""
+Run snapshot
+============
+The run pickle (run.pickle) is a single cloudpickle of the whole run executor,
+every remote task (pod, sub-process, spark job) downloads and unpickles all the tasks of the run
+just to execute one of them.
+
+The run snapshot is an indexed container (zip file) of
+  * "shared" record - the run executor, the run and the context, without the tasks of the run
+  * "tasks/<task_id>" record per task - the task, its task run and its direct upstream tasks
+  * "index.json" - the list of the tasks and the snapshot version
+
+References between the records are pickled as persistent ids:
+objects of the shared record are referenced by their index,
+tasks (and task runs) that are not a part of the record are referenced by their task_id.
+Loading a task reads only the shared record and the record of the task,
+all other tasks of the run are replaced by TaskSnapshotRef placeholders.
+
+Enabled by [run]save_run_snapshot, the snapshot is saved instead of the run pickle (at the same path).
+"""
+
+import contextlib
+import json
+import logging
+import pickle
+import shutil
+import tempfile
+import typing
+import zipfile
+
+from io import BytesIO
+
+from dbnd._core.errors import DatabandRuntimeError
+from dbnd._core.utils.seven import cloudpickle
+
+
+if typing.TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Set
+
+    from dbnd_run.run_executor.run_executor import RunExecutor
+    from targets import FileTarget
+
+logger = logging.getLogger(__name__)
+
+RUN_SNAPSHOT_VERSION = 1
+
+_INDEX_RECORD = "index.json"
+_SHARED_RECORD = "shared.pickle"
+_TASK_RECORD = "tasks/{}.pickle"
+
+_REF_SHARED = "shared"
+_REF_TASK = "task"
+_REF_TASK_RUN = "task_run"
+
+# values are pickled inline, there is no identity to keep between the records
+_VALUE_TYPES = (
+    str,
+    bytes,
+    int,
+    float,
+    bool,
+    type(None),
+    tuple,
+    list,
+    dict,
+    set,
+    frozenset,
+)
+
+_ZIP_MAGIC = b"PK\x03\x04"
+
+
+class TaskSnapshotRef(object):
+    """
+    Placeholder of a task (or a task run) that is not a part of the loaded snapshot record
+    """
+
+    def __init__(self, task_id, kind=_REF_TASK):
+        self.task_id = task_id
+        self.kind = kind
+
+    def __getattr__(self, item):
+        if item.startswith("__"):
+            raise AttributeError(item)
+        raise AttributeError(
+            "%s '%s' is not loaded from the run snapshot, can't access '%s'. "
+            "Only the executed task and its direct upstream tasks are available."
+            % (self.kind, self.task_id, item)
+        )
+
+    def __repr__(self):
+        return "TaskSnapshotRef(%s, %s)" % (self.kind, self.task_id)
+
+
+class _SnapshotPickler(cloudpickle.CloudPickler):
+    def __init__(self, file, task_refs, shared_refs=None, inline=None, record=None):
+        super(_SnapshotPickler, self).__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.task_refs = task_refs  # type: Dict[int, tuple]
+        self.shared_refs = shared_refs or {}  # type: Dict[int, tuple]
+        self.inline = inline or set()  # type: Set[int]
+        self.record = record  # type: Optional[List[Any]]
+
+    def persistent_id(self, obj):
+        obj_id = id(obj)
+        ref = self.shared_refs.get(obj_id)
+        if ref is not None:
+            return ref
+        if obj_id not in self.inline:
+            ref = self.task_refs.get(obj_id)
+            if ref is not None:
+                return ref
+        if self.record is not None and not isinstance(obj, _VALUE_TYPES):
+            self.record.append(obj)
+        return None
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file, shared_objects, refs):
+        super(_SnapshotUnpickler, self).__init__(file)
+        self.shared_objects = shared_objects  # type: List[Any]
+        self.refs = refs  # type: Dict[tuple, TaskSnapshotRef]
+
+    def persistent_load(self, pid):
+        kind, value = pid
+        if kind == _REF_SHARED:
+            return self.shared_objects[value]
+        ref = self.refs.get(pid)
+        if ref is None:
+            ref = self.refs[pid] = TaskSnapshotRef(value, kind=kind)
+        return ref
+
+
+def _dumps(obj, **pickler_kwargs):
+    buffer = BytesIO()
+    _SnapshotPickler(buffer, **pickler_kwargs).dump(obj)
+    return buffer.getvalue()
+
+
+def save_run_snapshot(run_executor, target_file):
+    # type: (RunExecutor, FileTarget) -> None
+    run = run_executor.run
+    # the root task is a part of the shared record
+    root_task_run = run.root_task_run
+    task_runs = [tr for tr in run.task_runs if tr is not root_task_run]
+
+    task_refs = {}
+    for task_run in task_runs:
+        task_id = task_run.task.task_id
+        task_refs[id(task_run.task)] = (_REF_TASK, task_id)
+        task_refs[id(task_run)] = (_REF_TASK_RUN, task_id)
+
+    # the first pass finds the objects of the shared record
+    shared_objects = []
+    _dumps(run_executor, task_refs=task_refs, record=shared_objects)
+    shared_refs = {id(obj): (_REF_SHARED, i) for i, obj in enumerate(shared_objects)}
+
+    index = {"version": RUN_SNAPSHOT_VERSION, "tasks": {}}
+    with target_file.open("wb") as fp, zipfile.ZipFile(
+        fp, mode="w", compression=zipfile.ZIP_DEFLATED
+    ) as snapshot:
+        snapshot.writestr(_SHARED_RECORD, _dumps(shared_objects, task_refs=task_refs))
+
+        for task_run in task_runs:
+            task = task_run.task
+            upstream = list(task.ctrl.task_dag.upstream)
+            upstream_runs = [
+                run.task_runs_by_id[t.task_id]
+                for t in upstream
+                if t.task_id in run.task_runs_by_id
+            ]
+            inline = {id(obj) for obj in [task, task_run] + upstream + upstream_runs}
+            snapshot.writestr(
+                _TASK_RECORD.format(task.task_id),
+                _dumps(
+                    (task_run, upstream_runs),
+                    task_refs=task_refs,
+                    shared_refs=shared_refs,
+                    inline=inline,
+                ),
+            )
+            index["tasks"][task.task_id] = [t.task_id for t in upstream]
+
+        snapshot.writestr(_INDEX_RECORD, json.dumps(index))
+
+
+def is_run_snapshot(dump_file):
+    # type: (FileTarget) -> bool
+    with dump_file.open("rb") as fp:
+        return fp.read(len(_ZIP_MAGIC)) == _ZIP_MAGIC
+
+
+@contextlib.contextmanager
+def _open_snapshot(dump_file):
+    if dump_file.fs.local:
+        with zipfile.ZipFile(dump_file.path) as snapshot:
+            yield snapshot
+        return
+
+    with dump_file.open("rb") as fp:
+        if _is_seekable(fp):
+            # ranged reads (gcs, s3), only the index and the loaded records are fetched
+            with zipfile.ZipFile(fp) as snapshot:
+                yield snapshot
+            return
+
+        # zip requires a seekable file, the snapshot is copied to a local file (not to memory)
+        with tempfile.TemporaryFile() as local_copy:
+            shutil.copyfileobj(fp, local_copy)
+            with zipfile.ZipFile(local_copy) as snapshot:
+                yield snapshot
+
+
+def _is_seekable(fp):
+    try:
+        return fp.seekable()
+    except AttributeError:
+        return False
+
+
+def load_run_snapshot(dump_file, task_id):
+    # type: (FileTarget, str) -> RunExecutor
+    """
+    Loads the run executor with the task run of the task and its direct upstream task runs
+    """
+    refs = {}  # type: Dict[tuple, TaskSnapshotRef]
+    with _open_snapshot(dump_file) as snapshot:
+        index = json.loads(snapshot.read(_INDEX_RECORD))
+        if index["version"] != RUN_SNAPSHOT_VERSION:
+            raise DatabandRuntimeError(
+                "Run snapshot %s has version %s, expected %s"
+                % (dump_file, index["version"], RUN_SNAPSHOT_VERSION)
+            )
+
+        shared_objects = _SnapshotUnpickler(
+            BytesIO(snapshot.read(_SHARED_RECORD)), shared_objects=[], refs=refs
+        ).load()
+        run_executor = shared_objects[0]
+        run = run_executor.run
+
+        if task_id == run.root_task.task_id:
+            # the root task is a part of the shared record
+            return run_executor
+
+        if task_id not in index["tasks"]:
+            raise DatabandRuntimeError(
+                "Task %s is not found in the run snapshot %s" % (task_id, dump_file)
+            )
+        task_run, upstream_runs = _SnapshotUnpickler(
+            BytesIO(snapshot.read(_TASK_RECORD.format(task_id))),
+            shared_objects=shared_objects,
+            refs=refs,
+        ).load()
+
+    _replace_refs(run, [task_run] + upstream_runs)
+    return run_executor
+
+
+def _replace_refs(run, task_runs):
+    """The run (and the context) reference all tasks by placeholders, replaces the loaded ones"""
+    loaded = {tr.task.task_id: tr for tr in task_runs}
+
+    run.task_runs = [
+        loaded.get(tr.task_id, tr) if isinstance(tr, TaskSnapshotRef) else tr
+        for tr in run.task_runs
+    ]
+    for task_run in task_runs:
+        run.task_runs_by_id[task_run.task.task_id] = task_run
+        run.task_runs_by_af_id[task_run.task_af_id] = task_run
+
+    # tasks are resolved by their ids (upstream/downstream) from the context they were created at
+    contexts = {id(run.context): run.context}
+    for task_run in task_runs:
+        contexts[id(task_run.task.dbnd_context)] = task_run.task.dbnd_context
+    for context in contexts.values():
+        for task_run in task_runs:
+            context.task_instance_cache.register_task_instance(task_run.task)
@@ -11,12 +11,14 @@ from dbnd._core.task_build.task_context import TaskContextPhase
 from dbnd._core.task_build.task_registry import build_task_from_config
 from dbnd._core.task_ctrl.task_dag import _TaskDagNode, all_subdags
 from dbnd._core.task_run.task_run import TaskRun
+from dbnd._core.utils.basics.nested_context import nested
 from dbnd._core.utils.task_utils import (
     calculate_friendly_task_ids,
     tasks_summary,
     tasks_to_ids_set,
 )
 from dbnd_run.run_settings import EngineConfig, RunConfig
+from targets.caching import TargetsExistenceCache
 
 
 if typing.TYPE_CHECKING:
@@ -26,25 +28,59 @@ if typing.TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-def check_if_completed_dfs(task, existing_completed_status=None):
+def _upstream_tasks(task, dag_index=None):
+    if dag_index is not None:
+        return dag_index.upstream_tasks(task)
+    return task.ctrl.task_dag.upstream
+
+
+def check_if_completed_dfs(task, existing_completed_status=None, dag_index=None):
     completed_status = existing_completed_status or dict()
-    task_id = task.task_id
-    completed_status[task_id] = completed = task._complete()
-    if not completed:
-        for c in task.ctrl.task_dag.upstream:
-            if c.task_id in completed_status:
-                continue
-            completed_status.update(check_if_completed_dfs(c, completed_status))
+    # iterative, huge pipelines can be deeper than the recursion limit
+    tasks_to_check = [task]
+    while tasks_to_check:
+        current = tasks_to_check.pop()
+        completed_status[current.task_id] = completed = current._complete()
+        if completed:
+            continue
+        for c in _upstream_tasks(current, dag_index):
+            if c.task_id not in completed_status:
+                # scheduled to check, so it's not added twice
+                completed_status[c.task_id] = None
+                tasks_to_check.append(c)
     return completed_status
 
 
-def check_if_completed_bfs(root_task, number_of_threads):
+def _prefetch_outputs_existence(tasks, existence_cache):
+    targets = []
+    for task in tasks:
+        get_targets = getattr(task, "_get_complete_check_targets", None)
+        if get_targets:
+            targets.extend(get_targets())
+    existence_cache.prefetch(targets)
+
+
+def check_if_completed_bfs(
+    root_task, number_of_threads, dag_index=None, existence_cache=None
+):
+    """
+    Checks the completeness of the graph level by level,
+    with existence_cache the outputs of every level are resolved in batch before the checks.
+    """
     completed_status = {}
     tasks_to_check_list = [root_task]
 
-    with ThreadPoolExecutor(max_workers=number_of_threads) as executor:
+    ctx_managers = []
+    if existence_cache:
+        ctx_managers.append(TargetsExistenceCache.context(existence_cache))
+
+    with ThreadPoolExecutor(max_workers=number_of_threads) as executor, nested(
+        *ctx_managers
+    ):
         while tasks_to_check_list:
             new_task_to_check_list = []
+            if existence_cache:
+                _prefetch_outputs_existence(tasks_to_check_list, existence_cache)
 
             task_results = {}
             for task in tasks_to_check_list:
@@ -67,8 +103,9 @@ def check_if_completed_bfs(root_task, number_of_threads):
                 if completed_status[task.task_id]:
                     continue
 
-                for upstream_task in task.ctrl.task_dag.upstream:
+                for upstream_task in _upstream_tasks(task, dag_index):
                     if upstream_task.task_id not in completed_status:
+                        completed_status[upstream_task.task_id] = None
                         new_task_to_check_list.append(upstream_task)
 
             tasks_to_check_list = new_task_to_check_list
@@ -76,18 +113,28 @@ def check_if_completed_bfs(root_task, number_of_threads):
     return completed_status
 
 
-def find_tasks_to_skip_complete(root_tasks, all_tasks, number_of_threads):
+def find_tasks_to_skip_complete(
+    root_tasks, all_tasks, number_of_threads, dag_index=None, existence_cache=None
+):
     # if True = should run, if False or None - should notcheck_if_completed
     completed_status = {}
 
     logger.info("Looking for completed tasks..")
 
-    if number_of_threads > 1:
+    # batch existence checks require level by level traversal
+    if number_of_threads > 1 or existence_cache:
         for t in root_tasks:
-            completed_status.update(check_if_completed_bfs(t, number_of_threads))
+            completed_status.update(
+                check_if_completed_bfs(
+                    t,
+                    number_of_threads,
+                    dag_index=dag_index,
+                    existence_cache=existence_cache,
+                )
+            )
     else:
         for t in root_tasks:
-            completed_status.update(check_if_completed_dfs(t))
+            completed_status.update(check_if_completed_dfs(t, dag_index=dag_index))
 
     # only if completed_status is False task is not skipped
     # otherwise - it wasn't discovered or it's completed
@@ -149,7 +196,13 @@ class TaskRunsBuilder(object):
         task_skipped_as_not_required = set()
         if run_config.skip_completed:
             tasks_completed, task_skipped_as_not_required = find_tasks_to_skip_complete(
-                roots, enabled_tasks, run_config.task_complete_parallelism_level
+                roots,
+                enabled_tasks,
+                run_config.task_complete_parallelism_level,
+                dag_index=run_executor.task_dag_index,
+                existence_cache=run_executor.targets_existence_cache
+                if run_config.task_complete_batch_exists
+                else None,
             )
 
         # # if any of the tasks is spark add policy
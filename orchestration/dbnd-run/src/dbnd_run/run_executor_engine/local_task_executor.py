@@ -1,64 +1,136 @@
 # © Copyright Databand.ai, an IBM Company 2022
 
 import logging
+import subprocess
+import threading
+import typing
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 
 from dbnd._core.constants import TaskRunState
 from dbnd._core.errors.base import DatabandRunError, DatabandSigTermError
-from dbnd_run import errors
 from dbnd_run.run_executor_engine import RunExecutorEngine
+from dbnd_run.task_ctrl.task_dag_index import TaskDagIndex
+
 
+if typing.TYPE_CHECKING:
+    from typing import Dict, List, Set, Tuple
+
+    from dbnd._core.task_run.task_run import TaskRun
 
 logger = logging.getLogger(__name__)
 
+# seconds between the checks of the run kill while waiting for the running tasks
+KILL_CHECK_INTERVAL = 1
+
 
 class LocalTaskExecutor(RunExecutorEngine):
+    """
+    Executes the tasks of the run on the local machine.
+
+    With parallelism of 1 the tasks are executed one by one inside the current process,
+    otherwise every task is executed by its own `dbnd execute` process (tasks share global contexts,
+    so they can't run by threads of the same process) and up to `parallelism` tasks run concurrently.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.parallelism = kwargs.pop("parallelism", 1)
+        super(LocalTaskExecutor, self).__init__(*args, **kwargs)
+
     def do_run(self):
-        topological_tasks = topological_sort([tr.task for tr in self.task_runs])
-        fail_fast = self.run_executor.run_config.fail_fast
-        task_failed = False
+        dag_index = self._get_dag_index()
+        if self.parallelism > 1 and self.target_engine.require_submit:
+            logger.warning(
+                "Engine %s requires tasks submission, tasks are executed sequentially",
+                self.target_engine,
+            )
+            self.parallelism = 1
+        if self.parallelism > 1 and not self.run_executor.driver_dump_saved:
+            # every parallel task is executed by `dbnd execute` from the driver dump
+            logger.warning(
+                "The run is not saved (run.disable_save_pipeline), tasks are executed sequentially"
+            )
+            self.parallelism = 1
 
-        task_runs_to_update_state = []
-        for task in topological_tasks:
-            tr = self.run.get_task_run_by_id(task.task_id)
-            if tr.is_reused:
-                continue
+        if self.parallelism > 1:
+            task_runs_to_update_state, task_failed = self._run_parallel(dag_index)
+        else:
+            task_runs_to_update_state, task_failed = self._run_sequential(dag_index)
 
-            if fail_fast and task_failed:
-                state = self.run_executor.get_upstream_failed_task_run_state(tr)
+        if task_runs_to_update_state:
+            self.run.tracker.set_task_run_states(task_runs_to_update_state)
 
-                logger.info("Setting %s to %s", task.task_id, state)
-                tr.set_task_run_state(state, track=False)
-                task_runs_to_update_state.append(tr)
-                continue
+        if task_failed:
+            err = _collect_errors(self.run.task_runs)
 
-            upstream_task_runs = [
-                self.run.get_task_run_by_id(t.task_id)
-                for t in task.ctrl.task_dag.upstream
-            ]
-            failed_upstream = [
-                upstream_task_run
-                for upstream_task_run in upstream_task_runs
-                if upstream_task_run.task_run_state in TaskRunState.fail_states()
-            ]
-            if failed_upstream:
-                logger.info(
-                    "Setting %s to %s", task.task_id, TaskRunState.UPSTREAM_FAILED
-                )
-                tr.set_task_run_state(TaskRunState.UPSTREAM_FAILED, track=False)
-                task_runs_to_update_state.append(tr)
+            if err:
+                raise DatabandRunError(err)
+
+    def _get_dag_index(self):
+        # type: () -> TaskDagIndex
+        """
+        The dag index of the run is reused, unless it doesn't have all the executed tasks
+        (the submission of the run to a remote engine executes a task of its own).
+        """
+        dag_index = self.run_executor.task_dag_index
+        if dag_index is None or not all(tr.task in dag_index for tr in self.task_runs):
+            dag_index = TaskDagIndex([tr.task for tr in self.task_runs])
+        return dag_index
+
+    def _get_executed_positions(self, dag_index):
+        # type: (TaskDagIndex) -> Set[int]
+        """The tasks of the index that are not executed by this executor (skipped tasks) are passed over"""
+        return {dag_index.positions[tr.task.task_id] for tr in self.task_runs}
+
+    def _get_not_executed_state(self, tr, upstream_task_runs, task_failed):
+        """
+        Returns the state of the task run if it shouldn't be executed (fail fast, failed upstream or killed run)
+        """
+        task = tr.task
+        if self.run_executor.run_config.fail_fast and task_failed:
+            state = self.run_executor.get_upstream_failed_task_run_state(tr)
+            logger.info("Setting %s to %s", task.task_id, state)
+            return state
+
+        failed_upstream = [
+            upstream_task_run
+            for upstream_task_run in upstream_task_runs
+            if upstream_task_run.task_run_state in TaskRunState.fail_states()
+        ]
+        if failed_upstream:
+            logger.info("Setting %s to %s", task.task_id, TaskRunState.UPSTREAM_FAILED)
+            return TaskRunState.UPSTREAM_FAILED
+
+        if self.run_executor.is_killed():
+            logger.info(
+                "Databand Context is killed! Stopping %s to %s",
+                task.task_id,
+                TaskRunState.FAILED,
+            )
+            return TaskRunState.FAILED
+        return None
+
+    def _run_sequential(self, dag_index):
+        # type: (TaskDagIndex) -> Tuple[List[TaskRun], bool]
+        task_runs = dag_index.get_task_runs(self.run)
+        upstream_task_runs = dag_index.get_upstream_task_runs(self.run)
+        executed_positions = self._get_executed_positions(dag_index)
+        task_failed = False
+
+        task_runs_to_update_state = []
+        for i in dag_index.topological_order:
+            tr = task_runs[i]
+            if i not in executed_positions or tr.is_reused:
                 continue
 
-            if self.run_executor.is_killed():
-                logger.info(
-                    "Databand Context is killed! Stopping %s to %s",
-                    task.task_id,
-                    TaskRunState.FAILED,
-                )
-                tr.set_task_run_state(TaskRunState.FAILED, track=False)
+            state = self._get_not_executed_state(tr, upstream_task_runs[i], task_failed)
+            if state:
+                tr.set_task_run_state(state, track=False)
                 task_runs_to_update_state.append(tr)
                 continue
 
-            logger.debug("Executing task: %s", task.task_id)
+            logger.debug("Executing task: %s", tr.task.task_id)
 
             try:
                 tr.task_run_executor.execute()
@@ -66,16 +138,143 @@ class LocalTaskExecutor(RunExecutorEngine):
                 raise e
             except Exception:
                 task_failed = True
-                logger.exception("Failed to execute task '%s':" % task.task_id)
+                logger.exception("Failed to execute task '%s':" % tr.task.task_id)
 
-        if task_runs_to_update_state:
-            self.run.tracker.set_task_run_states(task_runs_to_update_state)
+        return task_runs_to_update_state, task_failed
 
-        if task_failed:
-            err = _collect_errors(self.run.task_runs)
+    def _run_parallel(self, dag_index):
+        # type: (TaskDagIndex) -> Tuple[List[TaskRun], bool]
+        """
+        Runs every task as soon as all its upstream tasks are finished, up to `parallelism` tasks at once.
+        The states of the executed tasks are tracked by their processes.
+        """
+        task_runs = dag_index.get_task_runs(self.run)
+        upstream_task_runs = dag_index.get_upstream_task_runs(self.run)
+        executed_positions = self._get_executed_positions(dag_index)
+        task_failed = False
+        task_runs_to_update_state = []
 
-            if err:
-                raise DatabandRunError(err)
+        # a task is ready when all its upstream tasks are finished
+        unfinished_upstream = [len(upstream) for upstream in dag_index.upstream]
+        ready = deque(
+            i for i in dag_index.topological_order if not unfinished_upstream[i]
+        )
+        running = {}  # type: Dict[Future, int]
+        # the processes are registered by the pool threads
+        processes = {}  # type: Dict[str, subprocess.Popen]
+        processes_lock = threading.Lock()
+
+        def finish(position):
+            for downstream in dag_index.downstream[position]:
+                unfinished_upstream[downstream] -= 1
+                if not unfinished_upstream[downstream]:
+                    ready.append(downstream)
+
+        logger.info(
+            "Executing %s tasks with parallelism of %s",
+            len(executed_positions),
+            self.parallelism,
+        )
+        pool = ThreadPoolExecutor(
+            max_workers=self.parallelism, thread_name_prefix="dbnd_task_executor"
+        )
+        try:
+            while ready or running:
+                while ready and len(running) < self.parallelism:
+                    i = ready.popleft()
+                    tr = task_runs[i]
+                    if i not in executed_positions or tr.is_reused:
+                        finish(i)
+                        continue
+
+                    state = self._get_not_executed_state(
+                        tr, upstream_task_runs[i], task_failed
+                    )
+                    if state:
+                        tr.set_task_run_state(state, track=False)
+                        task_runs_to_update_state.append(tr)
+                        finish(i)
+                        continue
+
+                    logger.debug("Executing task: %s", tr.task.task_id)
+                    future = pool.submit(
+                        self._execute_in_process, tr, processes, processes_lock
+                    )
+                    running[future] = i
+
+                if not running:
+                    continue
+
+                done, _ = wait(
+                    list(running),
+                    timeout=KILL_CHECK_INTERVAL,
+                    return_when=FIRST_COMPLETED,
+                )
+                if self.run_executor.is_killed():
+                    # the running tasks are failed by their terminated processes
+                    _terminate_processes(processes, processes_lock)
+                for future in done:
+                    i = running.pop(future)
+                    tr = task_runs[i]
+                    try:
+                        returncode = future.result()
+                    except Exception:
+                        logger.exception(
+                            "Failed to execute task '%s':" % tr.task.task_id
+                        )
+                        returncode = -1
+
+                    if returncode:
+                        task_failed = True
+                        logger.error(
+                            "Failed to execute task '%s': process exited with %s",
+                            tr.task.task_id,
+                            returncode,
+                        )
+                        # the process tracks the actual state, it can be killed before tracking it
+                        if tr.task_run_state not in TaskRunState.final_states():
+                            tr.set_task_run_state(TaskRunState.FAILED, track=False)
+                    else:
+                        tr.set_task_run_state(TaskRunState.SUCCESS, track=False)
+                    finish(i)
+        finally:
+            _terminate_processes(processes, processes_lock)
+            pool.shutdown(wait=True)
+
+        return task_runs_to_update_state, task_failed
+
+    def _execute_in_process(self, task_run, processes, processes_lock):
+        # type: (TaskRun, Dict[str, subprocess.Popen], threading.Lock) -> int
+        task_id = task_run.task.task_id
+        cmd = self.host_engine.dbnd_executable + [
+            "execute",
+            "--dbnd-run",
+            str(self.run_executor.driver_dump),
+            "task_execute",
+            "--task-id",
+            task_id,
+        ]
+        with processes_lock:
+            # checked under the lock, so a killed run can't start a process after terminating the running ones
+            if self.run_executor.is_killed():
+                return -1
+            process = subprocess.Popen(cmd)
+            processes[task_id] = process
+        try:
+            return process.wait()
+        finally:
+            with processes_lock:
+                processes.pop(task_id, None)
+
+
+def _terminate_processes(processes, processes_lock):
+    # type: (Dict[str, subprocess.Popen], threading.Lock) -> None
+    with processes_lock:
+        running_processes = list(processes.items())
+    for task_id, process in running_processes:
+        if process.poll() is None:
+            logger.info("Terminating the process of %s", task_id)
+            process.terminate()
 
 
 def _collect_errors(task_runs):
@@ -103,9 +302,6 @@ def topological_sort(tasks, root_task=None):
     Sorts tasks in topographical order, such that a task comes after any of its
     upstream dependencies.
 
-    Heavily inspired by:
-    http://blog.jupo.org/2012/04/06/topological-sorting-acyclic-directed-graphs/
-
     :return: list of tasks in topological order
     """
 
@@ -113,37 +309,4 @@ def topological_sort(tasks, root_task=None):
     if len(tasks) == 0:
         return tuple()
 
-    graph_unsorted = set(tasks)
-
-    graph_sorted = []
-
-    # Run until the unsorted graph is empty.
-    while graph_unsorted:
-        # Go through each of the node/edges pairs in the unsorted
-        # graph. If a set of edges doesn't contain any nodes that
-        # haven't been resolved, that is, that are still in the
-        # unsorted graph, remove the pair from the unsorted graph,
-        # and append it to the sorted graph. Note here that by using
-        # using the items() method for iterating, a copy of the
-        # unsorted graph is used, allowing us to modify the unsorted
-        # graph as we move through it. We also keep a flag for
-        # checking that that graph is acyclic, which is true if any
-        # nodes are resolved during each pass through the graph. If
-        # not, we need to bail out as the graph therefore can't be
-        # sorted.
-        acyclic = False
-        for node in list(graph_unsorted):
-            for edge in node.ctrl.task_dag.upstream:
-                if edge in graph_unsorted:
-                    break
-            # no edges in upstream tasks
-            else:
-                # we found at least one node in graph
-                acyclic = True
-                graph_unsorted.remove(node)
-                graph_sorted.append(node)
-
-        if not acyclic:
-            raise errors.graph.cyclic_graph_detected(root_task, graph_unsorted)
-
-    return tuple(graph_sorted)
+    return TaskDagIndex(tasks, root_task=root_task).topological_tasks()
@@ -18,6 +18,12 @@ class RunConfig(config.Config):
 
     # Executor configuration
     parallel = parameter(default=None).help("Run specific tasks in parallel.")[bool]
+    task_executor_parallelism = parameter(
+        default=None,
+        description="Set the maximum number of tasks the `local` executor runs concurrently, "
+        "every task is executed by a separate process. "
+        "Defaults to the number of CPUs in parallel mode and to 1 (in-process execution) otherwise.",
+    )[int]
     task_executor_type = parameter(
         default=None,
         description="Set alternate executor type. Some of the options are `local`, `airflow_inprocess`, "
@@ -120,6 +126,12 @@ class RunConfig(config.Config):
         "Set the number of threads to use when checking if tasks are already complete."
     )[int]
 
+    task_complete_batch_exists = parameter(default=False).help(
+        "When checking if tasks are already complete, resolve the outputs of all the tasks "
+        "at the same level of the graph together (a single listing per common folder on object stores, "
+        "when the folder has many outputs and not too many objects) and share the results across the run."
+    )[bool]
+
     pool = parameter(
         default=None, description="Determine which resource pool will be used."
     )[str]
@@ -133,6 +145,10 @@ class RunConfig(config.Config):
     disable_save_pipeline = parameter(description="Disable pipeline pickling.").value(
         False
     )
+    save_run_snapshot = parameter(
+        description="Save the run as an indexed snapshot with a separate record per task instead of "
+        "a single pickle, so a remote task loads only its task and its direct upstream tasks."
+    ).value(False)
     donot_pickle = parameter(
         description="Do not attempt to pickle the DAG object to send over to the workers. "
         "Instead, tell the workers to run their version of the code."
@@ -5,6 +5,7 @@ import abc
 from dbnd._core.constants import TaskType
 from dbnd_run.current import try_get_run_executor
 from dbnd_run.task.task import Task
+from targets.caching import target_exists
 
 
 class PipelineTask(Task):
@@ -41,7 +42,7 @@ class PipelineTask(Task):
 
     def _complete(self):
         if self.task_band:
-            if not self.task_band.exists():
+            if not target_exists(self.task_band):
                 return False
             # With very large pipelines, checking all tasks might take a very long time
             # so we might want to assume that if the band exist, probably all outputs also exist
@@ -40,6 +40,7 @@ from dbnd_run.run_settings import RunSettings
 from dbnd_run.run_settings.env import EnvConfig
 from dbnd_run.task_ctrl.task_output_builder import calculate_path
 from targets import InMemoryTarget, target
+from targets.caching import target_exists
 from targets.target_config import TargetConfig, folder
 from targets.values import get_value_type_of_obj
 from targets.values.version_value import VersionStr
@@ -199,18 +200,26 @@ class Task(_TaskWithParams, _TaskCtrlMixin, _TaskParamContainer, _TaskDbndRun):
     def descendants(self):
         return self.ctrl.descendants
 
+    def _get_complete_outputs(self):
+        # we check only user side task outputs
+        # all system tasks outputs are not important (if the exists or not)
+        # user don't see them
+        return [o for o in flatten(self.task_outputs) if not o.config.overwrite_target]
+
+    def _get_complete_check_targets(self):
+        """Targets that can be checked by `_complete`, used to prefetch their existence in batch"""
+        targets = self._get_complete_outputs()
+        if self.task_band:
+            targets.append(self.task_band)
+        return targets
+
     def _complete(self):
         """
         If the task has any outputs, return ``True`` if all outputs exist. Otherwise, return ``False``.
 
         However, you may freely override this method with custom logic.
         """
-        # we check only user side task outputs
-        # all system tasks outputs are not important (if the exists or not)
-        # user don't see them
-        outputs = [
-            o for o in flatten(self.task_outputs) if not o.config.overwrite_target
-        ]
+        outputs = self._get_complete_outputs()
         if len(outputs) == 0:
             if not self.task_band:
                 warnings.warn(
@@ -220,14 +229,14 @@ class Task(_TaskWithParams, _TaskCtrlMixin, _TaskParamContainer, _TaskDbndRun):
                 )
                 return False
             else:
-                return self.task_band.exists()
+                return target_exists(self.task_band)
 
-        incomplete_outputs = [str(o) for o in outputs if not o.exists()]
+        incomplete_outputs = [str(o) for o in outputs if not target_exists(o)]
 
         num_of_incomplete_outputs = len(incomplete_outputs)
 
         if 0 < num_of_incomplete_outputs < len(outputs):
-            complete_outputs = [str(o) for o in outputs if o.exists()]
+            complete_outputs = [str(o) for o in outputs if target_exists(o)]
             exc = incomplete_output_found_for_task(
                 self.task_name, complete_outputs, incomplete_outputs
             )
@@ -22,13 +22,26 @@ def tasks_trail(tasks):
 
 
 class DescribeDagCtrl(TaskSubCtrl):
-    def __init__(self, task, describe_format=DescribeFormat.long, complete_status=None):
+    def __init__(
+        self,
+        task,
+        describe_format=DescribeFormat.long,
+        complete_status=None,
+        dag_index=None,
+    ):
         super(DescribeDagCtrl, self).__init__(task)
 
         self.describe_format = describe_format
 
         # dummy implementation of complete cache
         self._complete_status = complete_status or {}
+        # prebuilt dependencies index of the run (TaskDagIndex)
+        self._dag_index = dag_index
+
+    def _upstream_tasks(self, task):
+        if self._dag_index is not None:
+            return self._dag_index.upstream_tasks(task)
+        return task.ctrl.task_dag.upstream
 
     @property
     def config(self):
@@ -51,14 +64,14 @@ class DescribeDagCtrl(TaskSubCtrl):
             seen.add(task)
             level += 1
             count = 0
-            task_dag = task.ctrl.task_dag
-            for t in task_dag.upstream:
+            upstream = self._upstream_tasks(task)
+            for t in upstream:
                 count += 1
                 if isinstance(t, DataSourceTask):
                     continue
 
                 if count > 30:
-                    result.append((level, "..(%s tasks).." % len(task_dag.upstream)))
+                    result.append((level, "..(%s tasks).." % len(upstream)))
                     break
                 result.extend(get_downstream(t, level))
 
@@ -133,11 +146,13 @@ class DescribeDagCtrl(TaskSubCtrl):
             self.ctrl.describe_dag.list_view()
 
 
-def print_tasks_tree(root_task, task_runs, describe_format=DescribeFormat.short):
+def print_tasks_tree(
+    root_task, task_runs, describe_format=DescribeFormat.short, dag_index=None
+):
     from dbnd_run.task_ctrl.task_dag_describe import DescribeDagCtrl
 
     completed = {tr.task.task_id: tr.is_reused for tr in task_runs}
     run_describe_dag = DescribeDagCtrl(
-        root_task, describe_format, complete_status=completed
+        root_task, describe_format, complete_status=completed, dag_index=dag_index
     )
     run_describe_dag.tree_view(describe_format=describe_format)
@@ -0,0 +1,111 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+import logging
+import typing
+
+from collections import deque
+
+from dbnd_run import errors
+
+
+if typing.TYPE_CHECKING:
+    from typing import Iterable, List, Optional, Tuple
+
+    from dbnd._core.run.databand_run import DatabandRun
+    from dbnd._core.task.base_task import _BaseTask
+    from dbnd._core.task_run.task_run import TaskRun
+
+logger = logging.getLogger(__name__)
+
+
+class TaskDagIndex(object):
+    """
+    Index of the dependencies between a set of tasks, built once per run.
+
+    Tasks are addressed by their position in `tasks`, `upstream` and `downstream` hold the positions
+    of the connected tasks (dependencies on tasks outside of the set are ignored).
+    The topological order is calculated by Kahn's algorithm in O(V+E),
+    a cyclic graph raises the same error as before.
+    """
+
+    def __init__(self, tasks, root_task=None):
+        # type: (Iterable[_BaseTask], Optional[_BaseTask]) -> None
+        self.tasks = list(tasks)  # type: List[_BaseTask]
+        self.positions = {task.task_id: i for i, task in enumerate(self.tasks)}
+
+        self.upstream = [[] for _ in self.tasks]  # type: List[List[int]]
+        self.downstream = [[] for _ in self.tasks]  # type: List[List[int]]
+        for i, task in enumerate(self.tasks):
+            for upstream_task_id in task.ctrl.task_dag.upstream_task_ids:
+                j = self.positions.get(upstream_task_id)
+                if j is not None:
+                    self.upstream[i].append(j)
+                    self.downstream[j].append(i)
+
+        self.topological_order = self._sort(root_task)  # type: List[int]
+
+    def _sort(self, root_task):
+        in_degree = [len(upstream) for upstream in self.upstream]
+        ready = deque(i for i, degree in enumerate(in_degree) if not degree)
+
+        order = []
+        while ready:
+            i = ready.popleft()
+            order.append(i)
+            for j in self.downstream[i]:
+                in_degree[j] -= 1
+                if not in_degree[j]:
+                    ready.append(j)
+
+        if len(order) < len(self.tasks):
+            # every task of a circle (or downstream of it) is left with unresolved upstream
+            cyclic_nodes = [
+                task for task, degree in zip(self.tasks, in_degree) if degree
+            ]
+            raise errors.graph.cyclic_graph_detected(root_task, cyclic_nodes)
+        return order
+
+    def __contains__(self, task):
+        return task.task_id in self.positions
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def topological_tasks(self):
+        # type: () -> Tuple[_BaseTask, ...]
+        return tuple(self.tasks[i] for i in self.topological_order)
+
+    def upstream_tasks(self, task):
+        # type: (_BaseTask) -> List[_BaseTask]
+        """Direct upstream tasks of the task, tasks outside of the index are resolved by their dag"""
+        i = self.positions.get(task.task_id)
+        if i is None:
+            return list(task.ctrl.task_dag.upstream)
+        return [self.tasks[j] for j in self.upstream[i]]
+
+    def downstream_tasks(self, task):
+        # type: (_BaseTask) -> List[_BaseTask]
+        return [self.tasks[j] for j in self.downstream[self.positions[task.task_id]]]
+
+    def get_task_runs(self, run):
+        # type: (DatabandRun) -> List[TaskRun]
+        """Task runs of the run, aligned with the positions of the tasks"""
+        return [run.get_task_run_by_id(task.task_id) for task in self.tasks]
+
+    def get_upstream_task_runs(self, run):
+        # type: (DatabandRun) -> List[List[TaskRun]]
+        """
+        All the direct upstream task runs of every task (aligned with the positions of the tasks),
+        including upstream tasks that are not part of the index
+        """
+        return [
+            [
+                task_run
+                for task_run in (
+                    run.get_task_run_by_id(task_id)
+                    for task_id in task.ctrl.task_dag.upstream_task_ids
+                )
+                if task_run is not None
+            ]
+            for task in self.tasks
+        ]
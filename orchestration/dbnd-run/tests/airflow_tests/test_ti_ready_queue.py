@@ -0,0 +1,90 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+from datetime import datetime
+
+import pytest
+
+from airflow import DAG
+from airflow.operators.bash_operator import BashOperator
+from airflow.utils.state import State
+from airflow.utils.trigger_rule import TriggerRule
+
+from dbnd_run.airflow.scheduler.ti_ready_queue import TaskInstancesReadyQueue
+
+
+@pytest.fixture
+def dag():
+    with DAG(dag_id="test_ti_ready_queue", start_date=datetime(2020, 1, 1)) as dag:
+        a = BashOperator(task_id="a", bash_command="echo a")
+        b = BashOperator(task_id="b", bash_command="echo b")
+        c = BashOperator(task_id="c", bash_command="echo c")
+        d = BashOperator(
+            task_id="d", bash_command="echo d", trigger_rule=TriggerRule.ONE_SUCCESS
+        )
+        a >> c
+        b >> c
+        c >> d
+    return dag
+
+
+class TestTaskInstancesReadyQueue(object):
+    @pytest.fixture(autouse=True)
+    def _ready_queue(self, dag):
+        self.states = {}
+        self.ready_queue = TaskInstancesReadyQueue(dag)
+        # all tasks are evaluated at the first loop
+        assert self.ready_queue.pop_candidates() == ["a", "b", "c", "d"]
+
+    def set_states(self, **states):
+        self.states.update(states)
+        self.ready_queue.on_state_changes(states, self.states.get)
+
+    def test_upstream_release(self):
+        self.set_states(a=State.SUCCESS)
+        # c is still waiting for b
+        assert self.ready_queue.pop_candidates() == ["a"]
+        assert not self.ready_queue.is_upstream_done("c")
+
+        self.set_states(b=State.SUCCESS)
+        assert self.ready_queue.pop_candidates() == ["b", "c"]
+        assert self.ready_queue.is_upstream_done("c")
+
+        # nothing has changed
+        assert self.ready_queue.pop_candidates() == []
+
+    def test_failed_upstream(self):
+        # c can be marked as upstream failed before b is done
+        self.set_states(a=State.FAILED, b=State.RUNNING)
+        assert self.ready_queue.pop_candidates() == ["a", "b", "c"]
+        assert not self.ready_queue.is_upstream_done("c")
+
+        # upstream failed is propagated further
+        self.set_states(c=State.UPSTREAM_FAILED)
+        assert self.ready_queue.pop_candidates() == ["c", "d"]
+        assert self.ready_queue.is_upstream_done("d")
+
+    def test_trigger_rule_not_waiting_for_all_upstream(self):
+        self.set_states(c=State.RUNNING)
+        assert self.ready_queue.pop_candidates() == ["c", "d"]
+
+    def test_rerun(self):
+        self.set_states(a=State.SUCCESS, b=State.SUCCESS)
+        assert self.ready_queue.pop_candidates() == ["a", "b", "c"]
+
+        # a is cleared (or up for retry), c waits for it again
+        self.set_states(a=State.UP_FOR_RETRY)
+        assert self.ready_queue.pop_candidates() == ["a"]
+        assert not self.ready_queue.is_upstream_done("c")
+
+        self.set_states(a=State.SUCCESS)
+        assert self.ready_queue.pop_candidates() == ["a", "c"]
+        assert self.ready_queue.is_upstream_done("c")
+
+    def test_wait(self):
+        self.set_states(a=State.SCHEDULED)
+        assert self.ready_queue.pop_candidates() == ["a"]
+
+        # a can't be queued yet, it's evaluated again without any change
+        self.ready_queue.wait("a")
+        assert self.ready_queue.pop_candidates() == ["a"]
+        assert self.ready_queue.pop_candidates() == []
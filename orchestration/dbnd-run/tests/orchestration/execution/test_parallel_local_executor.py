@@ -0,0 +1,132 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+import threading
+import time
+
+from typing import List
+
+import pytest
+
+from mock import patch
+
+from dbnd import new_dbnd_context, pipeline, task
+from dbnd._core.constants import TaskExecutorType, TaskRunState
+from dbnd._core.errors import DatabandRunError
+from dbnd_run.run_executor.factory import calculate_local_executor_parallelism
+
+
+@task
+def parallel_step(i):
+    # type: (int) -> int
+    return i * 2
+
+
+@task
+def parallel_failing_step(i):
+    # type: (int) -> int
+    raise TypeError("Some user error")
+
+
+@task
+def parallel_sum(values):
+    # type: (List[int]) -> int
+    return sum(values)
+
+
+@task
+def parallel_sleeping_step(seconds):
+    # type: (int) -> int
+    time.sleep(seconds)
+    return seconds
+
+
+@pipeline
+def parallel_pipeline(size=4):
+    return parallel_sum([parallel_step(i) for i in range(size)])
+
+
+@pipeline
+def parallel_failing_pipeline():
+    return parallel_sum([parallel_step(1), parallel_failing_step(2)])
+
+
+@pipeline
+def parallel_sleeping_pipeline():
+    return parallel_sum([parallel_sleeping_step(60), parallel_sleeping_step(60)])
+
+
+def _parallel_context(parallelism=2, **run_conf):
+    run_conf.update(
+        {
+            "task_executor_type": TaskExecutorType.local,
+            "task_executor_parallelism": parallelism,
+        }
+    )
+    return new_dbnd_context(conf={"run": run_conf})
+
+
+class TestParallelLocalExecutor(object):
+    def test_parallelism(self):
+        with _parallel_context(3):
+            run = parallel_pipeline.dbnd_run(size=3)
+        assert run.run_executor.local_executor_parallelism == 3
+        assert run.root_task.result.load(int) == 6
+
+        states = {tr.task.task_name: tr.task_run_state for tr in run.task_runs}
+        assert set(states.values()) == {TaskRunState.SUCCESS}
+
+    def test_run_dag_index_is_reused(self):
+        with _parallel_context(), patch(
+            "dbnd_run.run_executor_engine.local_task_executor.TaskDagIndex",
+            side_effect=AssertionError("the dag index of the run should be reused"),
+        ):
+            run = parallel_pipeline.dbnd_run(size=2)
+        assert run.root_task.result.load(int) == 2
+
+    def test_run_is_not_saved(self):
+        # tasks can't be executed from the driver dump, they are executed sequentially
+        with _parallel_context(disable_save_pipeline=True):
+            run = parallel_pipeline.dbnd_run(size=2)
+        assert not run.run_executor.driver_dump.exists()
+        assert run.root_task.result.load(int) == 2
+
+    def test_failed_task(self):
+        with _parallel_context(), pytest.raises(DatabandRunError) as exc_info:
+            parallel_failing_pipeline.dbnd_run()
+
+        states = {
+            tr.task.friendly_task_name: tr.task_run_state
+            for tr in exc_info.value.run.task_runs
+        }
+        assert states[parallel_failing_step.__name__] == TaskRunState.FAILED
+        assert states[parallel_sum.__name__] == TaskRunState.UPSTREAM_FAILED
+        assert states[parallel_failing_pipeline.__name__] in (
+            TaskRunState.FAILED,
+            TaskRunState.UPSTREAM_FAILED,
+        )
+
+    def test_killed_run(self):
+        from dbnd_run.run_executor import run_executor
+
+        kill_timer = threading.Timer(10, run_executor._is_killed.set)
+        start_time = time.time()
+        try:
+            with _parallel_context(), pytest.raises(DatabandRunError):
+                kill_timer.start()
+                parallel_sleeping_pipeline.dbnd_run()
+        finally:
+            kill_timer.cancel()
+            run_executor._is_killed.clear()
+
+        # the processes of the running tasks are terminated, instead of waiting for them
+        assert time.time() - start_time < 50
+
+    def test_calculate_parallelism(self):
+        class RunConfigStub(object):
+            task_executor_parallelism = None
+
+        assert calculate_local_executor_parallelism(RunConfigStub, False) == 1
+        assert calculate_local_executor_parallelism(RunConfigStub, True) >= 1
+
+        RunConfigStub.task_executor_parallelism = 4
+        assert calculate_local_executor_parallelism(RunConfigStub, False) == 4
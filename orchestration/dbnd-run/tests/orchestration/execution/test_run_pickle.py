@@ -3,6 +3,8 @@
 from __future__ import absolute_import
 
 import logging
+import os
+import zipfile
 import zlib
 
 from typing import List
@@ -17,9 +19,11 @@ from dbnd._core.settings import CoreConfig
 from dbnd._core.utils.seven import cloudpickle
 from dbnd.testing.helpers_profile import cProfile_benchmark
 from dbnd_run.run_executor.run_executor import RunExecutor
+from dbnd_run.run_executor.run_snapshot import TaskSnapshotRef, load_run_snapshot
 from dbnd_run.run_settings import RunConfig
 from dbnd_run.tasks import PythonTask
 from dbnd_test_scenarios.test_common.task.factories import TTask
+from targets import FileTarget, LocalFileSystem
 
 
 logger = logging.getLogger(__name__)
@@ -46,6 +50,32 @@ def generate_huge_task(num_of_tasks):
     return cur_t
 
 
+class RangedReadFileSystem(LocalFileSystem):
+    """Reads the local files as a remote file system with ranged reads, records the read ranges"""
+
+    local = False
+
+    def __init__(self, block_size):
+        super(RangedReadFileSystem, self).__init__()
+        self.block_size = block_size
+        self.read_ranges = []
+
+    def _read_range(self, path, start, end):
+        self.read_ranges.append((start, end))
+        with open(path, "rb") as fp:
+            fp.seek(start)
+            return fp.read(end - start)
+
+    def open_read(self, path, mode="r"):
+        return self.open_ranged_read(
+            path,
+            size=os.path.getsize(path),
+            read_range=lambda start, end: self._read_range(path, start, end),
+            block_size=self.block_size,
+            read_ahead_blocks=0,
+        )
+
+
 class TClassTask(PythonTask):
     t_param = parameter.value("1")
     t_output = output.data
@@ -71,11 +101,12 @@ def pipeline_with_generics(selected_partners):
 
 
 class TestRunPickle(object):
-    def _save_graph(self, task):
+    def _save_graph(self, task, save_run_snapshot=False):
         with new_dbnd_context(
             conf={
                 RunConfig.task_executor_type: override(TaskExecutorType.local),
                 RunConfig.dry: override(True),
+                RunConfig.save_run_snapshot: override(save_run_snapshot),
                 CoreConfig.tracker: override(["console"]),
             }
         ) as dc:
@@ -83,7 +114,9 @@ class TestRunPickle(object):
             run.run_executor.save_run_pickle()
 
         loaded_run = RunExecutor.load_run(
-            dump_file=run.run_executor.driver_dump, disable_tracking_api=False
+            dump_file=run.run_executor.driver_dump,
+            disable_tracking_api=False,
+            task_id=run.root_task.task_id,
         )
         assert loaded_run
         return run
@@ -104,6 +137,58 @@ class TestRunPickle(object):
         actual = RunExecutor.load_run(r.run_executor.driver_dump, False)
         assert actual
 
+    def test_save_run_snapshot(self):
+        task = generate_huge_task(20)
+        r = self._save_graph(task, save_run_snapshot=True)
+
+        middle = task.ctrl.task_dag.upstream.pop().ctrl.task_dag.upstream.pop()
+        actual = RunExecutor.load_run(
+            r.run_executor.driver_dump, False, task_id=middle.task_id
+        )
+
+        task_run = actual.run.get_task_run_by_id(middle.task_id)
+        assert task_run.task.task_id == middle.task_id
+        assert task_run.task.tidx == middle.tidx
+        assert actual.run.task_runs_by_af_id[task_run.task_af_id] is task_run
+        assert actual.run._get_task_by_id(middle.task_id) is task_run.task
+
+        # direct upstream is loaded, but not its upstream
+        (upstream,) = task_run.task.ctrl.task_dag.upstream
+        assert upstream.tidx == middle.tidx - 1
+        assert actual.run.get_task_run_by_id(upstream.task_id).task is upstream
+        (upstream_upstream,) = upstream.ctrl.task_dag.upstream
+        assert isinstance(upstream_upstream, TaskSnapshotRef)
+        with pytest.raises(AttributeError, match="is not loaded from the run snapshot"):
+            upstream_upstream.task_name
+
+    def test_load_run_snapshot_reads_task_record(self):
+        task = generate_huge_task(20)
+        r = self._save_graph(task, save_run_snapshot=True)
+        middle = task.ctrl.task_dag.upstream.pop().ctrl.task_dag.upstream.pop()
+
+        path = r.run_executor.driver_dump.path
+        fs = RangedReadFileSystem(block_size=64)
+        actual = load_run_snapshot(FileTarget(path, fs), task_id=middle.task_id)
+        assert actual.run.get_task_run_by_id(middle.task_id).task.tidx == middle.tidx
+
+        def is_read(info):
+            start = info.header_offset + 30 + len(info.filename)
+            end = start + info.compress_size
+            return any(
+                start <= r_start and r_end <= end for r_start, r_end in fs.read_ranges
+            )
+
+        with zipfile.ZipFile(path) as snapshot:
+            task_records = {
+                info.filename: info
+                for info in snapshot.infolist()
+                if info.filename.startswith("tasks/")
+            }
+        middle_record = task_records.pop("tasks/%s.pickle" % middle.task_id)
+        assert is_read(middle_record)
+        # the records of all other tasks are never fetched
+        assert not [name for name, info in task_records.items() if is_read(info)]
+
     def _benchmark_pipeline_save(
         self, benchmark, pipeline, pickle_func=cloudpickle.dumps
     ):
@@ -0,0 +1,74 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+import pytest
+
+from dbnd import pipeline, task
+from dbnd._core.errors import DatabandBuildError
+from dbnd_run.run_executor_engine.local_task_executor import topological_sort
+from dbnd_run.task_ctrl.task_dag_index import TaskDagIndex
+
+
+@task
+def dag_index_step(i):
+    # type: (int) -> int
+    return i
+
+
+@task
+def dag_index_join(a, b):
+    # type: (int, int) -> int
+    return a + b
+
+
+@pipeline
+def dag_index_pipeline(width=20):
+    steps = [dag_index_step(i) for i in range(width)]
+    result = steps[0]
+    for step in steps[1:]:
+        result = dag_index_join(result, step)
+    return result
+
+
+def _assert_topological(tasks):
+    positions = {t.task_id: i for i, t in enumerate(tasks)}
+    for t in tasks:
+        for upstream in t.ctrl.task_dag.upstream:
+            if upstream.task_id in positions:
+                assert positions[upstream.task_id] < positions[t.task_id]
+
+
+class TestTaskDagIndex(object):
+    def test_topological_order(self):
+        root = dag_index_pipeline.task(width=20)
+        tasks = root.task_dag.subdag_tasks()
+
+        dag_index = TaskDagIndex(tasks, root_task=root)
+        sorted_tasks = dag_index.topological_tasks()
+        assert len(sorted_tasks) == len(tasks)
+        assert sorted_tasks[-1] == root
+        _assert_topological(sorted_tasks)
+        _assert_topological(topological_sort(tasks))
+
+    def test_upstream_and_downstream(self):
+        root = dag_index_pipeline.task(width=3)
+        dag_index = TaskDagIndex(root.task_dag.subdag_tasks())
+
+        for t in dag_index.tasks:
+            assert set(dag_index.upstream_tasks(t)) == t.ctrl.task_dag.upstream
+            assert set(dag_index.downstream_tasks(t)) == t.ctrl.task_dag.downstream
+
+        # dependencies outside of the index are ignored
+        partial = TaskDagIndex([root])
+        assert partial.upstream_tasks(root) == []
+        assert partial.topological_tasks() == (root,)
+
+    def test_cycle(self):
+        root = dag_index_pipeline.task(width=3)
+        tasks = root.task_dag.subdag_tasks()
+        sink = root.task_dag.upstream.pop()
+        sink.task_dag.set_downstream(
+            [t for t in tasks if t.task_name.startswith("dag_index_step")]
+        )
+
+        with pytest.raises(DatabandBuildError, match="A cyclic dependency occurred"):
+            TaskDagIndex(tasks, root_task=root)
@@ -0,0 +1,52 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+import pytest
+
+from dbnd import new_dbnd_context, pipeline, task
+from dbnd_run.run_executor.task_runs_builder import find_tasks_to_skip_complete
+from targets.caching import TargetsExistenceCache
+
+
+@task
+def builder_step(i):
+    # type: (int) -> int
+    return i
+
+
+@task
+def builder_sum(a, b):
+    # type: (int, int) -> int
+    return a + b
+
+
+@pipeline
+def builder_pipeline(seed=1):
+    return builder_sum(builder_step(seed), builder_step(seed + 1))
+
+
+class TestTaskRunsBuilder(object):
+    @pytest.mark.parametrize("batch_exists", [True, False])
+    def test_rerun_reuses_completed_tasks(self, batch_exists):
+        conf = {"run": {"task_complete_batch_exists": batch_exists}}
+        with new_dbnd_context(conf=conf):
+            first = builder_pipeline.dbnd_run(seed=10)
+        assert not any(tr.is_reused for tr in first.task_runs)
+
+        with new_dbnd_context(conf=conf):
+            second = builder_pipeline.dbnd_run(seed=10)
+        assert all(
+            tr.is_reused for tr in second.task_runs if not tr.task.task_is_system
+        )
+
+    def test_find_tasks_to_skip_complete_with_existence_cache(self):
+        run = builder_pipeline.dbnd_run(seed=20)
+        root_task = run.root_task
+        all_tasks = root_task.task_dag.subdag_tasks()
+
+        existence_cache = TargetsExistenceCache()
+        completed, skipped = find_tasks_to_skip_complete(
+            [root_task], all_tasks, 1, existence_cache=existence_cache
+        )
+        assert completed == {root_task}
+        assert skipped == all_tasks - {root_task}
+        assert str(root_task.task_band) in existence_cache._exists
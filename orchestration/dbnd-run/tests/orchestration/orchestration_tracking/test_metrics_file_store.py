@@ -1,5 +1,7 @@
 # © Copyright Databand.ai, an IBM Company 2022
 
+import pickle
+
 import pytest
 import six
 
@@ -8,6 +10,8 @@ from mock import Mock
 from dbnd._core.constants import MetricSource
 from dbnd._core.task_run.task_run_meta_files import TaskRunMetaFiles
 from dbnd._core.task_run.task_run_tracker import TaskRunTracker
+from dbnd._core.tracking.schemas.metrics import Metric
+from dbnd._core.utils.timezone import utcnow
 from dbnd_run.orchestration_tracking.backends.tracking_store_file import (
     FileTrackingStore,
     TaskRunMetricsFileStoreReader,
@@ -22,7 +26,7 @@ def get_task_run_and_tracker(tmpdir):
     task_run = Mock()
     task_run.task_run_executor = Mock()
     task_run.task_run_executor.meta_files = TaskRunMetaFiles(metrics_folder)
-    t = FileTrackingStore()
+    t = FileTrackingStore(metrics_flush_interval=60)
     tr_tracker = TaskRunTracker(task_run=task_run, tracking_store=t)
     tr_tracker.settings.tracking.get_value_meta_conf = Mock(
         return_value=ValueMetaConf.enabled()
@@ -38,6 +42,7 @@ class TestFileMetricsStore(object):
         tr_tracker.log_metric("a_string", "1")
         tr_tracker.log_metric("a_list", [1, 3])
         tr_tracker.log_metric("a_tuple", (1, 2))
+        tr_tracker.tracking_store.flush()
 
         user_metrics = TaskRunMetricsFileStoreReader(
             metrics_folder
@@ -50,6 +55,28 @@ class TestFileMetricsStore(object):
             "a_tuple": [1, 2],
         }
 
+    def test_pickle_with_open_metric_files(self, tmpdir):
+        task_run, tr_tracker, metrics_folder = get_task_run_and_tracker(tmpdir)
+        tr_tracker.log_metric("a", 1)
+        tr_tracker.tracking_store.log_metrics(
+            task_run,
+            [Metric(key="b", value=2, timestamp=utcnow(), source=MetricSource.user)],
+        )
+        tr_tracker.tracking_store._flush_metrics()
+
+        store = pickle.loads(pickle.dumps(tr_tracker.tracking_store))
+        store.log_metrics(
+            task_run,
+            [Metric(key="b", value=3, timestamp=utcnow(), source=MetricSource.user)],
+        )
+        store.flush()
+        tr_tracker.tracking_store.flush()
+
+        user_metrics = TaskRunMetricsFileStoreReader(metrics_folder).get_metric_history(
+            "b", source=MetricSource.user
+        )
+        assert [metric.value for metric in user_metrics] == [2.0, 3.0]
+
     @pytest.mark.skipif(six.PY2, reason="float representation issue with stats.std")
     def test_task_metrics_histograms(self, tmpdir, pandas_data_frame):
         task_run, tr_tracker, metrics_folder = get_task_run_and_tracker(tmpdir)
@@ -72,3 +99,30 @@ class TestFileMetricsStore(object):
         # std value varies in different py versions due to float precision fluctuation
         df_births_std = hist_metrics["df.Births.std"]
         assert df_births_std == pytest.approx(428.4246)
+
+    def test_task_metrics_history(self, tmpdir):
+        task_run, tr_tracker, metrics_folder = get_task_run_and_tracker(tmpdir)
+        store = tr_tracker.tracking_store
+        store.metrics_flush_lines = 10
+
+        for step in range(25):
+            tr_tracker.log_metric("loss", step)
+        reader = TaskRunMetricsFileStoreReader(metrics_folder)
+        # only full batches are flushed
+        assert len(reader.get_metric_history("loss")) == 20
+        assert reader._get_all_metrics_names() == ["loss"]
+
+        tr_tracker.log_metric("accuracy", 0.5)
+        store.flush()
+
+        history = reader.get_metric_history("loss")
+        assert [m.value for m in history] == [float(step) for step in range(25)]
+        assert reader._get_all_metrics_names() == ["loss", "accuracy"]
+        assert reader.get_all_metrics_values() == {"loss": 0.0, "accuracy": 0.5}
+
+        # a new store appends to the existing files
+        tr_tracker.tracking_store = FileTrackingStore()
+        tr_tracker.log_metric("loss", 100)
+        tr_tracker.tracking_store.flush()
+        assert len(reader.get_metric_history("loss")) == 26
+        assert reader._get_all_metrics_names() == ["loss", "accuracy"]
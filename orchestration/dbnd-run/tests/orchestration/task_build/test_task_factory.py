@@ -1,15 +1,20 @@
 # © Copyright Databand.ai, an IBM Company 2022
 
+import datetime
 import logging
 
 import pytest
 
+from mock import patch
 from pytest import fixture
 
 from dbnd import config, new_dbnd_context
 from dbnd._core.constants import ParamValidation
 from dbnd._core.errors import DatabandError, UnknownParameterError
 from dbnd._core.settings import CoreConfig
+from dbnd._core.task_build.task_build_cache import get_task_build_cache
+from dbnd._core.task_build.task_factory import TaskFactory
+from dbnd._core.utils.timezone import utcnow
 from dbnd_test_scenarios.test_common.task.factories import (
     CaseSensitiveParameterTask,
     TTask,
@@ -145,3 +150,65 @@ class TestTaskFactory(object):
                 }
             ):
                 CoreConfig()
+
+    def test_persistent_build_cache(self, tmpdir):
+        cache_dir = str(tmpdir.join("task_build_cache"))
+        conf = {
+            "task_build": {
+                "persistent_cache": "True",
+                "persistent_cache_dir": cache_dir,
+            }
+        }
+        with new_dbnd_context(conf=conf):
+            task = TTask(t_param="cached")
+        assert tmpdir.join("task_build_cache").listdir()
+
+        # new "process" - only the entries on disk are available
+        get_task_build_cache(cache_dir).clear()
+        with new_dbnd_context(conf=conf), patch.object(
+            TaskFactory,
+            "_build_parameter_value",
+            autospec=True,
+            side_effect=TaskFactory._build_parameter_value,
+        ) as build_parameter_value:
+            cached_task = TTask(t_param="cached")
+        # only task_config and task_env are resolved before the cache lookup,
+        # task_target_date is "today" by default, it's resolved on every build
+        built_params = {
+            c.args[1].name
+            for c in build_parameter_value.call_args_list
+            if c.args[0].task_name == "TTask"
+        }
+        assert built_params == {"task_config", "task_env", "task_target_date"}
+        assert cached_task.task_id == task.task_id
+        assert cached_task.t_param == "cached"
+        assert str(cached_task.t_output) == str(task.t_output)
+
+        # any change of the config is a new entry
+        with new_dbnd_context(conf=conf):
+            with config({"TTask": {"t_param": "from_config"}}):
+                assert TTask().t_param == "from_config"
+            assert TTask(t_param="other").task_id != task.task_id
+
+    def test_persistent_build_cache_relative_values(self, tmpdir):
+        cache_dir = str(tmpdir.join("task_build_cache"))
+        conf = {
+            "task_build": {
+                "persistent_cache": "True",
+                "persistent_cache_dir": cache_dir,
+            }
+        }
+        today = utcnow()
+        with new_dbnd_context(conf=conf):
+            task = TTask(t_param="cached", task_target_date="today")
+        assert task.task_target_date == today.date()
+
+        # the next day, another process builds the same task from the cache
+        get_task_build_cache(cache_dir).clear()
+        tomorrow = today + datetime.timedelta(days=1)
+        with new_dbnd_context(conf=conf), patch(
+            "targets.values.datetime_value.utcnow", return_value=tomorrow
+        ):
+            cached_task = TTask(t_param="cached", task_target_date="today")
+        assert cached_task.task_target_date == tomorrow.date()
+        assert cached_task.task_id != task.task_id
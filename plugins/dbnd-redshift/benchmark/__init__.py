@@ -0,0 +1 @@
+# © Copyright Databand.ai, an IBM Company 2022
@@ -0,0 +1,170 @@
+# © Copyright Databand.ai, an IBM Company 2022
+
+"""
+Benchmark of the column level stats queries of the redshift tracker.
+
+Postgres stands in for Redshift: the stats queries of both are the same, except the
+APPROXIMATE COUNT(DISTINCT) which Postgres doesn't support.
+The legacy profiling (scalar subqueries per column) is compared with the current single scan profiling.
+
+Usage:
+    DBND_BENCHMARK_POSTGRES_DSN="dbname=postgres user=postgres" \
+        python -m benchmark.benchmark_column_stats --rows 1000000 --columns 10 20 50
+"""
+
+import argparse
+import os
+import time
+
+from typing import List, Tuple
+
+import psycopg2
+
+from dbnd_redshift.sdk.redshift_utils import TEMP_TABLE_NAME, redshift_query
+from dbnd_redshift.sdk.redshift_values import query_col_stats
+
+
+def create_temp_table(connection, rows: int, columns: int) -> List[Tuple[str, str]]:
+    """Temp table of int, float, text and boolean columns in turn"""
+    types_and_values = [
+        ("integer", "(random() * 1000)::integer"),
+        ("float8", "random() * 1000"),
+        ("text", "'value_' || (random() * 100)::integer"),
+        ("boolean", "random() < 0.5"),
+    ]
+    table_columns, select_list = [], []
+    for col_index in range(columns):
+        col_type, value = types_and_values[col_index % len(types_and_values)]
+        col_name = f"column_{col_index}"
+        table_columns.append((col_name, col_type))
+        # every 10th value is null
+        select_list.append(f"CASE WHEN random() < 0.1 THEN NULL ELSE {value} END")
+
+    redshift_query(
+        connection, f"DROP TABLE IF EXISTS {TEMP_TABLE_NAME}", fetch_all=False
+    )
+    redshift_query(
+        connection,
+        f"CREATE TEMP TABLE {TEMP_TABLE_NAME} ("
+        + ", ".join(f'"{name}" {col_type}' for name, col_type in table_columns)
+        + ")",
+        fetch_all=False,
+    )
+    redshift_query(
+        connection,
+        f"INSERT INTO {TEMP_TABLE_NAME} SELECT {', '.join(select_list)} "
+        f"FROM generate_series(1, {rows})",
+        fetch_all=False,
+    )
+    redshift_query(connection, f"ANALYZE {TEMP_TABLE_NAME}", fetch_all=False)
+    return table_columns
+
+
+def legacy_col_stats_query(columns: List[Tuple[str, str]]) -> str:
+    """The per column scalar subqueries profiling, in the postgres dialect"""
+    selects = []
+    for col_name, col_type in columns:
+        col = f'"{col_name}"'
+        subqueries = [
+            f"SELECT '{col_name}' AS name",
+            f"(SELECT COUNT(*) FROM {TEMP_TABLE_NAME}) AS row_count",
+            f"(SELECT COUNT(*) FROM {TEMP_TABLE_NAME} where {col} is null) AS null_count",
+            f"(SELECT count(distinct {col}) FROM {TEMP_TABLE_NAME}) AS distinct_count",
+            f"(SELECT count({col}) FROM {TEMP_TABLE_NAME} group by {col} order by count({col}) DESC LIMIT 1) AS most_freq_value_count",
+            f"(SELECT {col}::text FROM {TEMP_TABLE_NAME} group by {col} order by count({col}) DESC LIMIT 1) AS most_freq_value",
+        ]
+        if col_type in ("integer", "float8"):
+            subqueries.extend(
+                [
+                    f"(SELECT stddev({col}) FROM {TEMP_TABLE_NAME})::text AS stddev",
+                    f"(SELECT avg({col}::float8) FROM {TEMP_TABLE_NAME})::text AS average",
+                    f"(SELECT min({col}) FROM {TEMP_TABLE_NAME})::text AS minimum",
+                    f"(SELECT max({col}) FROM {TEMP_TABLE_NAME})::text AS maximum",
+                ]
+                + [
+                    f"(SELECT percentile_cont({p}) within group (order by {col} asc) from {TEMP_TABLE_NAME})::text AS percentile_{int(p * 100)}"
+                    for p in (0.25, 0.50, 0.75)
+                ]
+            )
+        else:
+            subqueries.extend(
+                f"NULL::text AS {stat}"
+                for stat in [
+                    "stddev",
+                    "average",
+                    "minimum",
+                    "maximum",
+                    "percentile_25",
+                    "percentile_50",
+                    "percentile_75",
+                ]
+            )
+        selects.append("(" + ",\n".join(subqueries) + ")")
+    return " union all\n".join(selects)
+
+
+def _timed(func, *args, **kwargs):
+    start = time.time()
+    result = func(*args, **kwargs)
+    return time.time() - start, result
+
+
+def run_benchmark(dsn: str, rows: int, columns_counts: List[int]):
+    connection = psycopg2.connect(dsn)
+    try:
+        for columns_count in columns_counts:
+            columns = create_temp_table(connection, rows, columns_count)
+
+            legacy_time, legacy_stats = _timed(
+                redshift_query, connection, legacy_col_stats_query(columns)
+            )
+            single_scan_time, stats = _timed(query_col_stats, connection, columns)
+            sampled_time, _ = _timed(
+                query_col_stats, connection, columns, percentiles_sample_fraction=0.1
+            )
+
+            legacy_by_name = {row["name"]: row for row in legacy_stats}
+            mismatches = [
+                col_stats["name"]
+                for col_stats in stats
+                if any(
+                    col_stats[stat] != legacy_by_name[col_stats["name"]][stat]
+                    for stat in [
+                        "row_count",
+                        "null_count",
+                        "distinct_count",
+                        "most_freq_value_count",
+                        "minimum",
+                        "maximum",
+                        "percentile_25",
+                        "percentile_50",
+                        "percentile_75",
+                    ]
+                )
+            ]
+
+            print(
+                f"rows={rows} columns={columns_count}: "
+                f"legacy={legacy_time:.2f}s single_scan={single_scan_time:.2f}s "
+                f"sampled_percentiles={sampled_time:.2f}s "
+                f"speedup={legacy_time / single_scan_time:.1f}x "
+                f"mismatched_columns={mismatches}"
+            )
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--dsn",
+        default=os.environ.get("DBND_BENCHMARK_POSTGRES_DSN", "dbname=postgres"),
+    )
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--columns", type=int, nargs="+", default=[10, 20, 50])
+    args = parser.parse_args()
+    run_benchmark(args.dsn, args.rows, args.columns)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,10 @@ import contextlib
 import functools
 import logging
 
-from typing import List
+from typing import List, Optional
 
 import attr
 import psycopg2
-import sqlparse
 
 from dbnd import log_dataset_op
 from dbnd._core.log.external_exception_logging import log_exception_to_server
@@ -54,6 +53,11 @@ class RedshiftTrackerConfig:
         with_preview(bool): Should extract preview of the data as meta-data of the target - relevant only with data param.
         with_schema(bool): Should extract schema of the data as meta-data of the target - relevant only with data param.
         send_metrics(bool): Should report preview, schemas and histograms as metrics.
+        with_percentiles(bool): Should calculate the percentiles of the numeric columns as part of the stats.
+        with_approximate_distinct(bool): Should use APPROXIMATE COUNT(DISTINCT) for the distinct counts of the stats,
+                        much cheaper for big tables, with a relative error of about 2%.
+        percentiles_sample_fraction(float): Calculate the percentiles on a random sample of this fraction of the rows,
+                        the percentiles are approximate then.
     """
 
     with_preview: bool = attr.ib(default=False)
@@ -64,6 +68,8 @@ class RedshiftTrackerConfig:
     send_metrics: bool = attr.ib(default=True)
     with_partition: bool = attr.ib(default=None)
     with_percentiles: bool = attr.ib(default=True)
+    with_approximate_distinct: bool = attr.ib(default=False)
+    percentiles_sample_fraction: Optional[float] = attr.ib(default=None)
 
     def __attrs_post_init__(self):
         if self.with_stats and not self.with_schema:
@@ -173,7 +179,10 @@ class RedshiftTracker:
                     op.extract_schema(connection)
                     if self.conf.with_stats:
                         op.extract_stats(
-                            connection, with_percentiles=self.conf.with_percentiles
+                            connection,
+                            with_percentiles=self.conf.with_percentiles,
+                            approximate_distinct=self.conf.with_approximate_distinct,
+                            percentiles_sample_fraction=self.conf.percentiles_sample_fraction,
                         )
                 if self.conf.with_preview:
                     op.extract_preview(connection)
@@ -272,15 +281,14 @@ def build_redshift_operations(
         sql_query_extractor = SqlQueryExtractor(calculate_file_path)
     else:
         sql_query_extractor = SqlQueryExtractor()
-    clean_command = sql_query_extractor.clean_query(command)
     # find the relevant operations schemas from the command
-    parsed_query = sqlparse.parse(clean_command)[0]
-    extracted = sql_query_extractor.extract_operations_schemas(parsed_query)
+    extracted = sql_query_extractor.extract_query_operations_schemas(command)
 
     if not extracted:
         # This is DML statement and no read or write occurred
         return operations
 
+    clean_command = sql_query_extractor.clean_query(command)
     redshift_dataset = get_redshift_dataset(cursor.connection, clean_command)
 
     source_name = None
@@ -3,7 +3,7 @@
 import logging
 
 from itertools import takewhile
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from urllib.parse import urlparse
 
 import attr
@@ -63,70 +63,214 @@ def _is_numeric_type(col_type: str):
     return any(num_type in col_type.upper() for num_type in NUMERIC_TYPES)
 
 
-def get_col_stats_queries(col_name: str, col_type: str, with_percentiles: bool = True):
-    most_freq_value_cast = "integer::text" if col_type == "boolean" else "text"
+# every statement profiles up to this amount of columns, to keep the select lists reasonable
+STATS_QUERY_MAX_COLUMNS = 100
+# wider tables are unpivoted by a single scan cross joined with the column indexes,
+# narrower ones by a UNION ALL of a scan per column, which is faster for them (see benchmark_column_stats)
+UNPIVOT_CROSS_JOIN_MIN_COLUMNS = 30
 
-    query_list = [
-        f"SELECT '{col_name}' AS name",
-        f"(SELECT COUNT(*) FROM {TEMP_TABLE_NAME}) AS row_count",
-        f'(SELECT COUNT(*) FROM {TEMP_TABLE_NAME} where "{col_name}" is null) AS null_count',
-        f'(SELECT count(distinct "{col_name}") FROM {TEMP_TABLE_NAME}) AS distinct_count',
-        f'(SELECT top 1 count("{col_name}") FROM {TEMP_TABLE_NAME} group by "{col_name}" order by count("{col_name}") DESC) AS most_freq_value_count',
-        f'(SELECT top 1 "{col_name}" FROM {TEMP_TABLE_NAME} group by "{col_name}" order by count("{col_name}") DESC)::{most_freq_value_cast} AS most_freq_value',
-    ]
+PERCENTILES = {"percentile_25": 0.25, "percentile_50": 0.5, "percentile_75": 0.75}
 
-    if _is_numeric_type(col_type):
-        query_list.extend(
-            [
-                f'(SELECT stddev("{col_name}") FROM {TEMP_TABLE_NAME})::text AS stddev',
-                f'(SELECT avg("{col_name}"::float8) FROM {TEMP_TABLE_NAME})::text AS average',  # avg calculates in mem, we're limiting the column datatype so it won't cause numeric overflow
-                f'(SELECT min("{col_name}") FROM {TEMP_TABLE_NAME})::text AS minimum',
-                f'(SELECT max("{col_name}") FROM {TEMP_TABLE_NAME})::text AS maximum',
-            ]
-        )
-        query_list.extend(_percentile_queries(col_name, with_percentiles))
 
-    else:
-        query_list.extend(
-            [
-                "(SELECT Null) AS stddev",
-                "(SELECT Null) AS average",
-                "(SELECT Null) AS minimum",
-                "(SELECT Null) AS maximum",
-            ]
-        )
-        query_list.extend(_null_queries_for_percentile())
+def _quote_identifier(col_name: str) -> str:
+    return '"%s"' % col_name.replace('"', '""')
 
-    return query_list
 
+def get_col_stats_aggregates_query(
+    columns: List[Tuple[str, str]], approximate_distinct: bool = False
+) -> str:
+    """
+    Build a single scan query of the aggregated stats of all the given (name, type) columns.
+    Returns a single row with the row_count and c<index>_<stat> values for every column.
+    """
+    count_distinct = (
+        "APPROXIMATE COUNT(DISTINCT {})"
+        if approximate_distinct
+        else "COUNT(DISTINCT {})"
+    )
 
-def _percentile_queries(col_name: str, with_percentiles: bool) -> List[str]:
-    if not with_percentiles:
-        return _null_queries_for_percentile()
+    select_list = ["COUNT(*) AS row_count"]
+    for col_index, (col_name, col_type) in enumerate(columns):
+        col = _quote_identifier(col_name)
+        select_list.extend(
+            [
+                f"COUNT({col}) AS c{col_index}_non_null_count",
+                f"{count_distinct.format(col)} AS c{col_index}_distinct_count",
+            ]
+        )
+        if _is_numeric_type(col_type):
+            select_list.extend(
+                [
+                    f"STDDEV({col})::text AS c{col_index}_stddev",
+                    # avg calculates in mem, we're limiting the column datatype so it won't cause numeric overflow
+                    f"AVG({col}::float8)::text AS c{col_index}_average",
+                    f"MIN({col})::text AS c{col_index}_minimum",
+                    f"MAX({col})::text AS c{col_index}_maximum",
+                ]
+            )
 
-    return [
-        f'(SELECT percentile_cont(0.25) within group (order by "{col_name}" asc) from {TEMP_TABLE_NAME})::text AS percentile_25',
-        f'(SELECT percentile_cont(0.50) within group (order by "{col_name}" asc) from {TEMP_TABLE_NAME})::text AS percentile_50',
-        f'(SELECT percentile_cont(0.75) within group (order by "{col_name}" asc) from {TEMP_TABLE_NAME})::text AS percentile_75',
-    ]
+    return "SELECT " + ",\n".join(select_list) + f"\nFROM {TEMP_TABLE_NAME}"
 
 
-def _null_queries_for_percentile() -> List[str]:
-    return [
-        "(SELECT Null) AS percentile_25",
-        "(SELECT Null) AS percentile_50",
-        "(SELECT Null) AS percentile_75",
+def _unpivot_union_all(
+    text_values: List[str], numeric_values: List[Optional[str]]
+) -> str:
+    """A scan of the table per column, for narrow tables"""
+    return "\nUNION ALL\n".join(
+        f"SELECT {col_index} AS column_index, {text_value} AS text_value, "
+        f"{numeric_value or 'NULL::float8'} AS numeric_value FROM {TEMP_TABLE_NAME}"
+        for col_index, (text_value, numeric_value) in enumerate(
+            zip(text_values, numeric_values)
+        )
+    )
+
+
+def _unpivot_cross_join(
+    text_values: List[str], numeric_values: List[Optional[str]]
+) -> str:
+    """A single scan of the table cross joined with the column indexes, for wide tables"""
+    text_cases = " ".join(
+        f"WHEN {col_index} THEN {text_value}"
+        for col_index, text_value in enumerate(text_values)
+    )
+    numeric_cases = " ".join(
+        f"WHEN {col_index} THEN {numeric_value}"
+        for col_index, numeric_value in enumerate(numeric_values)
+        if numeric_value
+    )
+    numeric_value = (
+        f"CASE i.column_index {numeric_cases} END" if numeric_cases else "NULL::float8"
+    )
+    column_indexes = " UNION ALL ".join(
+        f"SELECT {col_index} AS column_index" for col_index in range(len(text_values))
+    )
+    return (
+        f"SELECT i.column_index, CASE i.column_index {text_cases} END AS text_value, "
+        f"{numeric_value} AS numeric_value\n"
+        f"FROM {TEMP_TABLE_NAME} CROSS JOIN ({column_indexes}) i"
+    )
+
+
+def get_col_stats_frequencies_query(
+    columns: List[Tuple[str, str]],
+    with_percentiles: bool = True,
+    percentiles_sample_fraction: Optional[float] = None,
+) -> str:
+    """
+    Build a query of the most frequent value and the percentiles of all the given (name, type) columns.
+    The columns are unpivoted to (column_index, text_value, numeric_value) rows,
+    so all of them are grouped and sorted by the same statement instead of a statement per column.
+    Tables of UNPIVOT_CROSS_JOIN_MIN_COLUMNS columns or more are unpivoted by a single scan.
+    Returns a row per column: column_index, most_freq_value, most_freq_value_count and the percentiles.
+    """
+    with_percentiles = with_percentiles and any(
+        _is_numeric_type(col_type) for _, col_type in columns
+    )
+
+    text_values, numeric_values = [], []
+    for col_name, col_type in columns:
+        col = _quote_identifier(col_name)
+        text_values.append(
+            f"{col}::integer::text" if col_type == "boolean" else f"{col}::text"
+        )
+        numeric_value = None
+        if with_percentiles and _is_numeric_type(col_type):
+            numeric_value = f"{col}::float8"
+            if percentiles_sample_fraction:
+                numeric_value = f"CASE WHEN RANDOM() < {float(percentiles_sample_fraction)} THEN {numeric_value} END"
+        numeric_values.append(numeric_value)
+
+    unpivot = (
+        _unpivot_cross_join
+        if len(columns) >= UNPIVOT_CROSS_JOIN_MIN_COLUMNS
+        else _unpivot_union_all
+    )
+    ctes = [
+        "dbnd_unpivoted AS (\n" + unpivot(text_values, numeric_values) + "\n)",
+        "dbnd_frequencies AS (\n"
+        "SELECT column_index, text_value, COUNT(text_value) AS value_count, "
+        "ROW_NUMBER() OVER (PARTITION BY column_index ORDER BY COUNT(text_value) DESC) AS value_rank\n"
+        "FROM dbnd_unpivoted GROUP BY column_index, text_value\n)",
     ]
+    if with_percentiles:
+        percentiles = ", ".join(
+            f"PERCENTILE_CONT({fraction}) WITHIN GROUP (ORDER BY numeric_value)::text AS {name}"
+            for name, fraction in PERCENTILES.items()
+        )
+        ctes.append(
+            "dbnd_percentiles AS (\n"
+            f"SELECT column_index, {percentiles}\n"
+            "FROM dbnd_unpivoted GROUP BY column_index\n)"
+        )
+        percentiles_select = ", ".join(f"p.{name}" for name in PERCENTILES)
+        percentiles_join = (
+            "\nLEFT JOIN dbnd_percentiles p ON f.column_index = p.column_index"
+        )
+    else:
+        percentiles_select = ", ".join(f"NULL AS {name}" for name in PERCENTILES)
+        percentiles_join = ""
+
+    return (
+        "WITH "
+        + ",\n".join(ctes)
+        + "\nSELECT f.column_index, f.text_value AS most_freq_value, "
+        f"f.value_count AS most_freq_value_count, {percentiles_select}\n"
+        f"FROM dbnd_frequencies f{percentiles_join}\n"
+        "WHERE f.value_rank = 1"
+    )
+
+
+def query_col_stats(
+    connection,
+    columns: List[Tuple[str, str]],
+    with_percentiles: bool = True,
+    approximate_distinct: bool = False,
+    percentiles_sample_fraction: Optional[float] = None,
+) -> List[dict]:
+    """
+    Query the stats of the given (name, type) columns, two statements per STATS_QUERY_MAX_COLUMNS columns.
+    Returns a dict of stats per column, the columns of failed statements are skipped.
+    """
+    stats = []
+    for chunk_start in range(0, len(columns), STATS_QUERY_MAX_COLUMNS):
+        chunk = columns[chunk_start : chunk_start + STATS_QUERY_MAX_COLUMNS]
+
+        aggregates = redshift_query(
+            connection, get_col_stats_aggregates_query(chunk, approximate_distinct)
+        )
+        if not aggregates:
+            continue
+        frequencies = redshift_query(
+            connection,
+            get_col_stats_frequencies_query(
+                chunk, with_percentiles, percentiles_sample_fraction
+            ),
+        )
+        frequencies_by_index = {row["column_index"]: row for row in frequencies or []}
+
+        aggregates_row = aggregates[0]
+        row_count = aggregates_row["row_count"]
+        for col_index, (col_name, col_type) in enumerate(chunk):
+            col_stats = {
+                "name": col_name,
+                "row_count": row_count,
+                "null_count": row_count
+                - aggregates_row[f"c{col_index}_non_null_count"],
+                "distinct_count": aggregates_row[f"c{col_index}_distinct_count"],
+            }
+            for stat in ["stddev", "average", "minimum", "maximum"]:
+                col_stats[stat] = (
+                    aggregates_row[f"c{col_index}_{stat}"]
+                    if _is_numeric_type(col_type)
+                    else None
+                )
 
+            frequencies_row = frequencies_by_index.get(col_index)
+            for stat in ["most_freq_value", "most_freq_value_count", *PERCENTILES]:
+                col_stats[stat] = frequencies_row[stat] if frequencies_row else None
+            stats.append(col_stats)
 
-def query_list_to_text(cols_queries_lists: List[List[str]]):
-    query = ""
-    for col_index, col_query_list in enumerate(cols_queries_lists):
-        query += "("
-        query += ",\n".join(col_query_list)
-        query += ") union all\n" if col_index != len(cols_queries_lists) - 1 else ")\n"
-
-    return query
+    return stats
 
 
 @attr.s
@@ -226,13 +370,19 @@ class RedshiftOperation(SqlOperation):
                     self.schema_cache = res_schema
 
     def extract_stats(
-        self, connection: PostgresConnectionWrapper, with_percentiles: bool
+        self,
+        connection: PostgresConnectionWrapper,
+        with_percentiles: bool,
+        approximate_distinct: bool = False,
+        percentiles_sample_fraction: Optional[float] = None,
     ):
         """
         Extracts column level stats of data in motion, data is copied to a temp table in redshift (in redshift_tracker)
         and here it is queried to extract column level statistics from it
-        The query is constructed with respect to the schema of the table, int values calculates (std, min, max, etc...)
+        The queries are constructed with respect to the schema of the table, int values calculates (std, min, max, etc...)
         on top of the normally computed column level stats (nullity, row_count, distinct, frequent values, etc...)
+        All the columns are profiled together: a single scan of the aggregated stats,
+        and a single statement of the most frequent values and the percentiles of all the unpivoted columns.
 
         Example:
             value = RedshiftOperation(...)
@@ -246,24 +396,20 @@ class RedshiftOperation(SqlOperation):
             return
 
         if self.schema:
-            queries = [
-                list(
-                    get_col_stats_queries(
-                        col, col_type, with_percentiles=with_percentiles
-                    )
-                )
-                for col, col_type in self.schema["dtypes"].items()
-            ]
-
-            query = query_list_to_text(queries)
-
-            if not query:
+            columns = list(self.schema["dtypes"].items())
+            if not columns:
                 logger.warning(
                     "redshift_tracker: cannot execute empty query for column level stats"
                 )
                 return
 
-            column_stats = redshift_query(connection.connection, query)
+            column_stats = query_col_stats(
+                connection.connection,
+                columns,
+                with_percentiles=with_percentiles,
+                approximate_distinct=approximate_distinct,
+                percentiles_sample_fraction=percentiles_sample_fraction,
+            )
 
             if column_stats:
                 for col in column_stats:
@@ -13,9 +13,11 @@ from dbnd_redshift.sdk.redshift_tracker import RedshiftTracker
 from dbnd_redshift.sdk.redshift_utils import COPY_ROWS_COUNT_QUERY
 from dbnd_redshift.sdk.redshift_values import (
     NUMERIC_TYPES,
+    UNPIVOT_CROSS_JOIN_MIN_COLUMNS,
     RedshiftOperation,
-    get_col_stats_queries,
-    query_list_to_text,
+    get_col_stats_aggregates_query,
+    get_col_stats_frequencies_query,
+    query_col_stats,
 )
 
 
@@ -175,93 +177,178 @@ schema = {
 }
 
 
-def test_boolean_type_get_col_stats_queries():
-    queries = get_col_stats_queries("column1", "boolean")
-    for q in queries:
-        if q.endswith("AS most_freq_value"):
-            assert "integer::text" in q
+def test_boolean_type_get_col_stats_frequencies_query():
+    query = get_col_stats_frequencies_query([("column1", "boolean")])
+    assert '"column1"::integer::text AS text_value' in query
 
 
 @pytest.mark.parametrize("col_type", NUMERIC_TYPES + NON_NUMERIC_TYPES)
 def test_get_type_agnostic_column_stats_queries(col_type):
     col_name = "column"
-    most_freq_value_cast = "integer::text" if col_type == "boolean" else "text"
-    queries = get_col_stats_queries(col_name, col_type)
+    query = get_col_stats_aggregates_query([(col_name, col_type)])
 
-    assert f"SELECT '{col_name}' AS name" in queries
-    assert f"(SELECT COUNT(*) FROM DBND_TEMP) AS row_count" in queries
-    assert (
-        f'(SELECT COUNT(*) FROM DBND_TEMP where "{col_name}" is null) AS null_count'
-        in queries
-    )
-    assert (
-        f'(SELECT count(distinct "{col_name}") FROM DBND_TEMP) AS distinct_count'
-        in queries
-    )
-    assert (
-        f"""(SELECT top 1 count("{col_name}") FROM DBND_TEMP group by "{col_name}" order by count("{col_name}") DESC) AS most_freq_value_count"""
-        in queries
-    )
-    assert (
-        f"""(SELECT top 1 "{col_name}" FROM DBND_TEMP group by "{col_name}" order by count("{col_name}") DESC)::{most_freq_value_cast} AS most_freq_value"""
-        in queries
-    )
+    assert "COUNT(*) AS row_count" in query
+    assert f'COUNT("{col_name}") AS c0_non_null_count' in query
+    assert f'COUNT(DISTINCT "{col_name}") AS c0_distinct_count' in query
+
+    query = get_col_stats_frequencies_query([(col_name, col_type)])
+    assert "f.text_value AS most_freq_value" in query
+    assert "f.value_count AS most_freq_value_count" in query
 
 
 @pytest.mark.parametrize("col_type", NUMERIC_TYPES + ["decimal(10,5)", "numeric(3,14)"])
 def test_get_col_stats_queries_stats_numeric_types(col_type):
     col_name = "column"
-    queries = get_col_stats_queries(col_name, col_type)
-    assert f'(SELECT stddev("{col_name}") FROM DBND_TEMP)::text AS stddev' in queries
-    assert (
-        f'(SELECT avg("{col_name}"::float8) FROM DBND_TEMP)::text AS average' in queries
-    )
-    assert f'(SELECT min("{col_name}") FROM DBND_TEMP)::text AS minimum' in queries
-    assert f'(SELECT max("{col_name}") FROM DBND_TEMP)::text AS maximum' in queries
-    assert (
-        f'(SELECT percentile_cont(0.25) within group (order by "{col_name}" asc) from DBND_TEMP)::text AS percentile_25'
-        in queries
-    )
-    assert (
-        f'(SELECT percentile_cont(0.50) within group (order by "{col_name}" asc) from DBND_TEMP)::text AS percentile_50'
-        in queries
-    )
-    assert (
-        f'(SELECT percentile_cont(0.75) within group (order by "{col_name}" asc) from DBND_TEMP)::text AS percentile_75'
-        in queries
-    )
+    query = get_col_stats_aggregates_query([(col_name, col_type)])
+    assert f'STDDEV("{col_name}")::text AS c0_stddev' in query
+    assert f'AVG("{col_name}"::float8)::text AS c0_average' in query
+    assert f'MIN("{col_name}")::text AS c0_minimum' in query
+    assert f'MAX("{col_name}")::text AS c0_maximum' in query
+
+    query = get_col_stats_frequencies_query([(col_name, col_type)])
+    assert f'"{col_name}"::float8 AS numeric_value' in query
+    for percentile in ["0.25", "0.5", "0.75"]:
+        assert (
+            f"PERCENTILE_CONT({percentile}) WITHIN GROUP (ORDER BY numeric_value)"
+            in query
+        )
 
 
 @pytest.mark.parametrize("col_type", NON_NUMERIC_TYPES)
 def test_get_col_stats_queries_stats_other_types(col_type):
     col_name = "column"
-    queries = get_col_stats_queries(col_name, col_type)
+    query = get_col_stats_aggregates_query([(col_name, col_type)])
+    for stat in ["stddev", "average", "minimum", "maximum"]:
+        assert f"c0_{stat}" not in query
 
-    assert "(SELECT Null) AS stddev" in queries
-    assert "(SELECT Null) AS average" in queries
-    assert "(SELECT Null) AS minimum" in queries
-    assert "(SELECT Null) AS maximum" in queries
-    assert "(SELECT Null) AS percentile_25" in queries
-    assert "(SELECT Null) AS percentile_50" in queries
-    assert "(SELECT Null) AS percentile_75" in queries
+    query = get_col_stats_frequencies_query([(col_name, col_type)])
+    assert "NULL::float8 AS numeric_value" in query
+    assert "NULL AS percentile_25" in query
+    assert "PERCENTILE_CONT" not in query
 
 
 @pytest.mark.parametrize("col_type", NUMERIC_TYPES)
 def test_get_col_stats_queries_stats_numeric_no_percentiles(col_type):
-    col_name = "column"
-    queries = get_col_stats_queries(col_name, col_type, with_percentiles=False)
+    query = get_col_stats_frequencies_query(
+        [("column", col_type)], with_percentiles=False
+    )
 
-    assert "(SELECT Null) AS percentile_25" in queries
-    assert "(SELECT Null) AS percentile_50" in queries
-    assert "(SELECT Null) AS percentile_75" in queries
+    assert "PERCENTILE_CONT" not in query
+    assert "NULL AS percentile_25" in query
+    assert "NULL AS percentile_50" in query
+    assert "NULL AS percentile_75" in query
+
+
+def test_get_col_stats_queries_approximations():
+    columns = [("column", "integer")]
+    query = get_col_stats_aggregates_query(columns, approximate_distinct=True)
+    assert 'APPROXIMATE COUNT(DISTINCT "column") AS c0_distinct_count' in query
+
+    query = get_col_stats_frequencies_query(columns, percentiles_sample_fraction=0.1)
+    assert (
+        'CASE WHEN RANDOM() < 0.1 THEN "column"::float8 END AS numeric_value' in query
+    )
 
 
 def test_extract_stats_query():
-    queries = [
-        list(get_col_stats_queries(col, col_type)) for col, col_type in schema.items()
-    ]
-    query = query_list_to_text(queries)
+    columns = list(schema.items())
+    query = get_col_stats_aggregates_query(columns)
     assert all(k in query for k in schema)
+    # all the columns are aggregated by a single scan of the table
+    assert query.count("FROM DBND_TEMP") == 1
+
+    query = get_col_stats_frequencies_query(columns)
+    assert all(k in query for k in schema)
+    # narrow tables are unpivoted by a scan per column
+    assert query.count("FROM DBND_TEMP") == len(schema)
+
+
+def test_wide_table_frequencies_query():
+    columns = [
+        ("column_%s" % i, "integer" if i % 2 else "boolean")
+        for i in range(UNPIVOT_CROSS_JOIN_MIN_COLUMNS)
+    ]
+    query = get_col_stats_frequencies_query(columns, percentiles_sample_fraction=0.1)
+    # the columns are unpivoted by a single scan of the table
+    assert query.count("FROM DBND_TEMP") == 1
+    assert "CROSS JOIN" in query
+    assert 'WHEN 0 THEN "column_0"::integer::text' in query
+    assert 'WHEN 1 THEN CASE WHEN RANDOM() < 0.1 THEN "column_1"::float8 END' in query
+    assert 'THEN "column_0"::float8' not in query
+
+
+def test_query_col_stats():
+    columns = [("int_column", "integer"), ("str_column", "str")]
+    aggregates = {
+        "row_count": 10,
+        "c0_non_null_count": 8,
+        "c0_distinct_count": 5,
+        "c0_stddev": "1.5",
+        "c0_average": "3.0",
+        "c0_minimum": "1",
+        "c0_maximum": "5",
+        "c1_non_null_count": 10,
+        "c1_distinct_count": 2,
+    }
+    frequencies = [
+        {
+            "column_index": 0,
+            "most_freq_value": "3",
+            "most_freq_value_count": 4,
+            "percentile_25": "2",
+            "percentile_50": "3",
+            "percentile_75": "4",
+        },
+        {
+            "column_index": 1,
+            "most_freq_value": "a",
+            "most_freq_value_count": 7,
+            "percentile_25": None,
+            "percentile_50": None,
+            "percentile_75": None,
+        },
+    ]
+
+    with patch(
+        "dbnd_redshift.sdk.redshift_values.redshift_query",
+        side_effect=[[aggregates], frequencies],
+    ) as redshift_query_mock:
+        stats = query_col_stats(Mock(), columns)
+
+    # two statements for all the columns
+    assert redshift_query_mock.call_count == 2
+    assert stats == [
+        {
+            "name": "int_column",
+            "row_count": 10,
+            "null_count": 2,
+            "distinct_count": 5,
+            "stddev": "1.5",
+            "average": "3.0",
+            "minimum": "1",
+            "maximum": "5",
+            "most_freq_value": "3",
+            "most_freq_value_count": 4,
+            "percentile_25": "2",
+            "percentile_50": "3",
+            "percentile_75": "4",
+        },
+        {
+            "name": "str_column",
+            "row_count": 10,
+            "null_count": 0,
+            "distinct_count": 2,
+            "stddev": None,
+            "average": None,
+            "minimum": None,
+            "maximum": None,
+            "most_freq_value": "a",
+            "most_freq_value_count": 7,
+            "percentile_25": None,
+            "percentile_50": None,
+            "percentile_75": None,
+        },
+    ]
 
 
 def test_multiple_psycopg2_connections(mock_redshift):
@@ -3,12 +3,13 @@
 import contextlib
 import functools
 import logging
+import re
+import time
+import weakref
 
-from collections import namedtuple
-from itertools import chain, takewhile
-from typing import Dict, List, Optional
-
-import sqlparse
+from collections import defaultdict, namedtuple
+from itertools import chain, product, takewhile
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from snowflake.connector import SnowflakeConnection
 from snowflake.connector.cursor import DictCursor, SnowflakeCursor
@@ -24,6 +25,7 @@ from dbnd._core.utils.sql_tracker_common.sql_operation import (
     DTypes,
     SqlOperation,
     render_connection_path,
+    split_table_name,
 )
 
 
@@ -60,6 +62,18 @@ ParsedResultMetadata = namedtuple(
 
 SNOWFLAKE_TRACKER_OP_SOURCE = "snowflake_tracker"
 
+# seconds a table schema is reused by the operations of the same connection
+DEFAULT_SCHEMA_CACHE_TTL = 300
+
+# statements that can change the schemas of the tables, after the leading comments
+DDL_STATEMENT_RE = re.compile(
+    r"^\s*(?:(?:--[^\n]*(?:\n|$)|/\*.*?\*/)\s*)*(?:create|alter|drop)\b",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# information_schema reports the data types by their synonyms, `desc table` reports them by their names
+INFORMATION_SCHEMA_TYPES_MAP = {"TEXT": "VARCHAR"}
+
 
 def extract_schema_from_sf_desc(description):
     # todo: support ResultMetadata in version 2.4.6
@@ -69,12 +83,59 @@ def extract_schema_from_sf_desc(description):
     return dtypes
 
 
+class TableSchemaCache(object):
+    """
+    Schemas of the tables of a single connection, every schema is reused for `ttl` seconds.
+    Missing schemas are resolved in bulk, by a single query per database.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_SCHEMA_CACHE_TTL):
+        self.ttl = ttl
+        self._schemas: Dict[str, Tuple[float, DTypes]] = {}
+
+    def get_schemas(
+        self, connection: SnowflakeConnection, tables: Iterable[str]
+    ) -> Dict[str, DTypes]:
+        now = time.monotonic()
+        tables_schemas, missing_tables = {}, []
+        for table in dict.fromkeys(tables):
+            cached = self._schemas.get(table)
+            if cached and cached[0] > now:
+                tables_schemas[table] = cached[1]
+            else:
+                missing_tables.append(table)
+
+        if missing_tables:
+            resolved = get_snowflake_tables_schemas(connection, missing_tables)
+            if self.ttl:
+                expires_at = now + self.ttl
+                self._schemas.update(
+                    (table, (expires_at, schema)) for table, schema in resolved.items()
+                )
+            tables_schemas.update(resolved)
+
+        return tables_schemas
+
+    def invalidate(self):
+        self._schemas.clear()
+
+
 class SnowflakeTracker(object):
-    def __init__(self):
+    def __init__(self, schema_cache_ttl: float = DEFAULT_SCHEMA_CACHE_TTL):
         self.operations = []
         self._connection = None
         # result set of executed snowflake statement
         self.result_set: dict = None
+        # tables schemas by connection, 0 disables the reuse of the schemas
+        self.schema_cache_ttl = schema_cache_ttl
+        self._schema_caches = weakref.WeakKeyDictionary()
+
+    def get_schema_cache(self, connection: SnowflakeConnection) -> TableSchemaCache:
+        schema_cache = self._schema_caches.get(connection)
+        if schema_cache is None:
+            schema_cache = TableSchemaCache(ttl=self.schema_cache_ttl)
+            self._schema_caches[connection] = schema_cache
+        return schema_cache
 
     def __enter__(self):
         if not hasattr(SnowflakeCursor.execute, "__dbnd_patched__"):
@@ -143,13 +204,11 @@ class SnowflakeTracker(object):
             op.tables for op in operations if not (op.is_file or op.is_stage)
         )
 
-        tables_schemas: Dict[str, DTypes] = {}
         if not connection.is_closed():
             # connection already closed, cannot get table schema
-            for table in tables:
-                table_schema = get_snowflake_table_schema(connection, table)
-                if table_schema:
-                    tables_schemas[table] = table_schema
+            tables_schemas = self.get_schema_cache(connection).get_schemas(
+                connection, tables
+            )
 
             operations: List[SqlOperation] = [
                 op.evolve_schema(tables_schemas) for op in operations
@@ -180,6 +239,12 @@ class SnowflakeTracker(object):
             error = str(e)
             raise
         finally:
+            try:
+                if is_ddl_statement(command):
+                    # the schemas of the tables could be changed by the statement
+                    self.get_schema_cache(cursor.connection).invalidate()
+            except Exception:
+                logging.exception("Error invalidating snowflake tables schemas")
             try:
                 operations = build_snowflake_operations(
                     cursor, command, success, self.result_set, error
@@ -195,6 +260,120 @@ class SnowflakeTracker(object):
                 logging.exception("Error parsing snowflake query")
 
 
+def is_ddl_statement(command: str) -> bool:
+    return bool(DDL_STATEMENT_RE.match(command))
+
+
+def _normalize_col_type(col_type: str) -> str:
+    # remove the trailing part of the column type that's inside brackets
+    # `NUMBER(123,0) -> NUMBER`, `VARCHAR(23,2) -> VARCHAR` and so on
+    return "".join(takewhile(lambda c: c != "(", col_type))
+
+
+def _identifier_names(identifier: str) -> Tuple[str, ...]:
+    """
+    The names snowflake could store the identifier by: quoted identifiers keep their case,
+    unquoted identifiers are stored upper cased.
+    The tracked tables names are rendered without the quotes, so both names are looked up, upper cased first.
+    """
+    if len(identifier) > 1 and identifier[0] == identifier[-1] == '"':
+        return (identifier[1:-1].replace('""', '"'),)
+    return tuple(dict.fromkeys([identifier.upper(), identifier]))
+
+
+def _quote_identifier(name: str) -> str:
+    return '"%s"' % name.replace('"', '""')
+
+
+def get_snowflake_tables_schemas(connection, tables: List[str]) -> Dict[str, DTypes]:
+    """
+    Resolve the schemas of the tables by a single information_schema.columns query per database.
+    Tables without a full database.schema.table name, of a failed query,
+    or missing from the query results are described one by one.
+    """
+    tables_by_database = defaultdict(dict)
+    tables_to_describe = []
+    for table in tables:
+        database, schema, table_name = split_table_name(table)
+        if database and schema:
+            database_name = _identifier_names(database)[0]
+            tables_by_database[database_name][table] = (
+                _identifier_names(schema),
+                _identifier_names(table_name),
+            )
+        else:
+            tables_to_describe.append(table)
+
+    tables_schemas = {}
+    for database, tables_names in tables_by_database.items():
+        try:
+            database_schemas = _query_information_schema(
+                connection, database, tables_names
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to fetch tables columns of database %s", database, exc_info=True
+            )
+            log_exception_to_server(e)
+            tables_to_describe.extend(tables_names)
+        else:
+            tables_schemas.update(database_schemas)
+            tables_to_describe.extend(
+                table for table in tables_names if table not in database_schemas
+            )
+
+    for table in tables_to_describe:
+        table_schema = get_snowflake_table_schema(connection, table)
+        if table_schema:
+            tables_schemas[table] = table_schema
+    return tables_schemas
+
+
+def _query_information_schema(
+    connection,
+    database: str,
+    tables_names: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]],
+) -> Dict[str, DTypes]:
+    """
+    Query the columns of the tables of the database,
+    `tables_names` are the possible (schema names, table names) of every table.
+    """
+    conditions, params = [], []
+    for schema_names, table_names in tables_names.values():
+        conditions.append(
+            "(table_schema in (%s) and table_name in (%s))"
+            % (
+                ", ".join(["%s"] * len(schema_names)),
+                ", ".join(["%s"] * len(table_names)),
+            )
+        )
+        params.extend(schema_names)
+        params.extend(table_names)
+    columns = snowflake_query(
+        connection,
+        "select table_schema, table_name, column_name, data_type "
+        f"from {_quote_identifier(database)}.information_schema.columns "
+        f"where {' or '.join(conditions)} order by ordinal_position",
+        params,
+    )
+
+    found_tables = defaultdict(dict)
+    for column in columns:
+        col_type = _normalize_col_type(column["DATA_TYPE"])
+        col_type = INFORMATION_SCHEMA_TYPES_MAP.get(col_type, col_type)
+        found_tables[(column["TABLE_SCHEMA"], column["TABLE_NAME"])][
+            column["COLUMN_NAME"].lower()
+        ] = col_type
+
+    tables_schemas = {}
+    for table, (schema_names, table_names) in tables_names.items():
+        for key in product(schema_names, table_names):
+            if key in found_tables:
+                tables_schemas[table] = found_tables[key]
+                break
+    return tables_schemas
+
+
 def get_snowflake_table_schema(connection, table) -> Optional[DTypes]:
     try:
         desc_results = snowflake_query(connection, f"desc table {table}")
@@ -206,11 +385,7 @@ def get_snowflake_table_schema(connection, table) -> Optional[DTypes]:
     else:
         schema = {}
         for col_desc in desc_results:
-            # remove the trailing part of the column type that's inside brackets
-            # `NUMBER(123,0) -> NUMBER`, `VARCHAR(23,2) -> VARCHAR` and so on
-            normalized_col_type = "".join(
-                takewhile(lambda c: c != "(", col_desc["type"])
-            )
+            normalized_col_type = _normalize_col_type(col_desc["type"])
             normalized_col_name = col_desc["name"].lower()
             schema[normalized_col_name] = normalized_col_type
         return schema
@@ -242,8 +417,7 @@ def build_snowflake_operations(
     sql_query_extractor = SqlQueryExtractor()
     command = sql_query_extractor.clean_query(command)
     # find the relevant operations schemas from the command
-    parsed_query = sqlparse.parse(command)[0]
-    extracted = sql_query_extractor.extract_operations_schemas(parsed_query)
+    extracted = sql_query_extractor.extract_query_operations_schemas(command)
 
     if not extracted:
         # This is DML statement and no read or write occurred
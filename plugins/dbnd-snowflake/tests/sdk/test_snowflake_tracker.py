@@ -16,6 +16,8 @@ from dbnd._core.utils.sql_tracker_common.sql_operation import SqlOperation
 from dbnd_snowflake.sdk.snowflake_tracker import (
     SNOWFLAKE_TRACKER_OP_SOURCE,
     SnowflakeTracker,
+    TableSchemaCache,
+    is_ddl_statement,
 )
 
 
@@ -1079,6 +1081,165 @@ def test_report_operations(mock_snowflake):
     )
 
 
+INFORMATION_SCHEMA_COLUMNS = [
+    {
+        "TABLE_SCHEMA": "SCHEMA",
+        "TABLE_NAME": "FIRST",
+        "COLUMN_NAME": "COLUMN_A",
+        "DATA_TYPE": "NUMBER",
+    },
+    {
+        "TABLE_SCHEMA": "SCHEMA",
+        "TABLE_NAME": "FIRST",
+        "COLUMN_NAME": "COLUMN_B",
+        "DATA_TYPE": "TEXT",
+    },
+    {
+        "TABLE_SCHEMA": "SCHEMA",
+        "TABLE_NAME": "SECOND",
+        "COLUMN_NAME": "COLUMN_C",
+        "DATA_TYPE": "TIMESTAMP_NTZ",
+    },
+]
+
+
+def test_table_schema_cache():
+    connection = Mock()
+    schema_cache = TableSchemaCache(ttl=60)
+    tables = ["db.schema.first", "db.schema.second", "db.schema.first"]
+
+    with patch(
+        "dbnd_snowflake.sdk.snowflake_tracker.snowflake_query",
+        return_value=INFORMATION_SCHEMA_COLUMNS,
+    ) as mock_query:
+        schemas = schema_cache.get_schemas(connection, tables)
+        # the schemas are reused by the next batches of operations
+        assert schema_cache.get_schemas(connection, tables) == schemas
+
+    expected = {
+        "db.schema.first": {"column_a": "NUMBER", "column_b": "VARCHAR"},
+        "db.schema.second": {"column_c": "TIMESTAMP_NTZ"},
+    }
+    assert schemas == expected
+    # all the tables are resolved by a single query
+    mock_query.assert_called_once()
+    query, params = mock_query.call_args.args[1:]
+    assert '"DB".information_schema.columns' in query
+    # unquoted identifiers could be stored upper cased or by their quoted case
+    assert params == ["SCHEMA", "schema", "FIRST", "first"] + [
+        "SCHEMA",
+        "schema",
+        "SECOND",
+        "second",
+    ]
+
+    schema_cache.invalidate()
+    with patch(
+        "dbnd_snowflake.sdk.snowflake_tracker.snowflake_query",
+        return_value=INFORMATION_SCHEMA_COLUMNS,
+    ) as mock_query:
+        assert schema_cache.get_schemas(connection, tables) == expected
+    mock_query.assert_called_once()
+
+
+def test_table_schema_cache_partial_names():
+    schema_cache = TableSchemaCache()
+    desc_results = [{"name": "COLUMN_A", "type": "NUMBER(38,0)"}]
+
+    with patch(
+        "dbnd_snowflake.sdk.snowflake_tracker.snowflake_query",
+        return_value=desc_results,
+    ) as mock_query:
+        schemas = schema_cache.get_schemas(Mock(), ["table"])
+
+    # tables without the database can't be looked up at the information_schema
+    mock_query.assert_called_once()
+    assert mock_query.call_args.args[1] == "desc table table"
+    assert schemas == {"table": {"column_a": "NUMBER"}}
+
+
+def test_table_schema_cache_missing_tables():
+    desc_results = [{"name": "COLUMN_D", "type": "VARCHAR(16777216)"}]
+
+    def query(connection, command, params=None):
+        if command.startswith("desc table"):
+            return desc_results
+        return INFORMATION_SCHEMA_COLUMNS
+
+    with patch(
+        "dbnd_snowflake.sdk.snowflake_tracker.snowflake_query", side_effect=query
+    ) as mock_query:
+        schemas = TableSchemaCache().get_schemas(
+            Mock(), ["db.schema.first", "db.schema.third"]
+        )
+
+    # tables missing from the information_schema results are described one by one
+    assert mock_query.call_args.args[1] == "desc table db.schema.third"
+    assert schemas == {
+        "db.schema.first": {"column_a": "NUMBER", "column_b": "VARCHAR"},
+        "db.schema.third": {"column_d": "VARCHAR"},
+    }
+
+
+def test_table_schema_cache_quoted_names():
+    columns = [
+        {
+            "TABLE_SCHEMA": "Mixed Schema",
+            "TABLE_NAME": "MixedCase",
+            "COLUMN_NAME": "Column_A",
+            "DATA_TYPE": "NUMBER",
+        },
+        {
+            "TABLE_SCHEMA": "SCHEMA",
+            "TABLE_NAME": "FIRST",
+            "COLUMN_NAME": "COLUMN_A",
+            "DATA_TYPE": "NUMBER",
+        },
+    ]
+    tables = ['"Db"."Mixed Schema"."MixedCase"', "db.Schema.first"]
+
+    with patch(
+        "dbnd_snowflake.sdk.snowflake_tracker.snowflake_query", return_value=columns
+    ) as mock_query:
+        schemas = TableSchemaCache().get_schemas(Mock(), tables)
+
+    # quoted identifiers keep their case
+    queries = [call.args[1] for call in mock_query.call_args_list]
+    assert len(queries) == 2
+    assert '"Db".information_schema.columns' in queries[0]
+    assert mock_query.call_args_list[0].args[2] == ["Mixed Schema", "MixedCase"]
+    assert '"DB".information_schema.columns' in queries[1]
+    assert schemas == {
+        '"Db"."Mixed Schema"."MixedCase"': {"column_a": "NUMBER"},
+        "db.Schema.first": {"column_a": "NUMBER"},
+    }
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("create or replace table TEST (a int)", True),
+        ("ALTER TABLE TEST ADD COLUMN b int", True),
+        ("-- comment\n drop table TEST", True),
+        (COPY_INTO_TABLE_FROM_S3_FILE_QUERY, False),
+        ("select * from TEST", False),
+    ],
+)
+def test_is_ddl_statement(query, expected):
+    assert is_ddl_statement(query) == expected
+
+
+def test_track_execute_keeps_the_original_error():
+    tracker = SnowflakeTracker()
+    with patch(
+        "dbnd_snowflake.sdk.snowflake_tracker.is_ddl_statement",
+        side_effect=TypeError("not a string"),
+    ):
+        with pytest.raises(ValueError, match="original"):
+            with tracker.track_execute(Mock(), "drop table TEST"):
+                raise ValueError("original")
+
+
 def run_tracker_custom_query(mock_snowflake, query, expected):
     snowflake_connection = _snowflake_connect()
     snowflake_tracker = SnowflakeTracker()